@@ -0,0 +1,234 @@
+# benchmarks/bench_allocate.py
+"""
+Allocation throughput under concurrent allocators.
+
+Creates a scratch resource with SUPPLIES supply rows, then runs THREADS
+allocators that each submit PLANS random plans of LINES lines, once with
+one sp_allocate_supply call per line and once with sp_allocate_batch per
+plan. Prints allocations/s, deadlock retries and checks that every supply
+was debited exactly once per allocated line.
+
+The fefo mode gives a second scratch resource SUPPLIES lots with staggered
+expiry dates, just enough stock for the run, and has every thread allocate
+by ResourceID (sp_allocate_resource), so all of them compete for the same
+soonest-expiring lots. Besides the debit check it verifies the lots were
+drained in expiry order and reports deadlocks (errno 1213) on their own.
+Scratch rows are removed.
+
+  python benchmarks/bench_allocate.py --threads 8 --plans 50 --lines 10
+  python benchmarks/bench_allocate.py --modes fefo --threads 32 --supplies 8
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector  # noqa: E402
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS  # noqa: E402
+from srs_alloc import allocate_batch, RETRYABLE_ERRNOS  # noqa: E402
+
+START_QTY = Decimal("1000000.000")
+TAG = "bench_allocate"
+ER_LOCK_DEADLOCK = 1213
+
+
+def connect():
+    return mysql.connector.connect(host=HOST, database=DATABASE, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def setup(conn, n_supplies, lot_qty=START_QTY, name=TAG):
+    """A scratch resource with n_supplies lots of lot_qty; lots expire a week apart (the last never)."""
+    cur = conn.cursor()
+    cur.execute("INSERT INTO Resources (ResourceName, Unit, Description) VALUES (%s, 'Units', %s)", (name, TAG))
+    rid = cur.lastrowid
+    # inserted latest expiry first, so FEFO order is not SupplyID order
+    first = date.today() + timedelta(days=30)
+    cur.executemany("INSERT INTO Supplies (ResourceID, Quantity, Unit, ExpiryDate, SupplierName) "
+                    "VALUES (%s, %s, 'Units', %s, %s)",
+                    [(rid, lot_qty, None if i == 0 else first + timedelta(weeks=n_supplies - i), TAG)
+                     for i in range(n_supplies)])
+    cur.execute("SELECT SupplyID FROM Supplies WHERE ResourceID = %s ORDER BY SupplyID", (rid,))
+    supplies = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT MissionID FROM Missions")
+    missions = [r[0] for r in cur.fetchall()]
+    cur.close()
+    if not missions:
+        raise SystemExit("Need at least one row in Missions")
+    return rid, supplies, missions
+
+
+def teardown(conn, rid):
+    cur = conn.cursor()
+    cur.execute("DELETE ra FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID "
+                "WHERE s.ResourceID = %s", (rid,))
+    cur.execute("DELETE FROM Resources WHERE ResourceID = %s", (rid,))   # cascades to Supplies
+    cur.execute("DELETE FROM AuditLog WHERE TableName = 'Supplies' AND JSON_EXTRACT(NewRow, '$.ResourceID') = %s",
+                (rid,))
+    cur.close()
+
+
+def check(conn, rid, start_qty=START_QTY):
+    """Every supply must be down by exactly what was allocated against it."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT s.SupplyID, s.Quantity, COALESCE(SUM(ra.QuantityAllocated), 0)
+        FROM Supplies s LEFT JOIN ResourceAllocations ra ON ra.SupplyID = s.SupplyID
+        WHERE s.ResourceID = %s GROUP BY s.SupplyID, s.Quantity""", (rid,))
+    bad = [r for r in cur.fetchall() if r[1] != start_qty - r[2]]
+    cur.close()
+    return bad
+
+
+def check_fefo(conn, rid, start_qty):
+    """In expiry order the lots must be: empty ones, at most one partly used, then untouched ones."""
+    cur = conn.cursor()
+    cur.execute("SELECT SupplyID, Quantity FROM Supplies WHERE ResourceID = %s "
+                "ORDER BY ExpiryDate IS NULL, ExpiryDate, SupplyID", (rid,))
+    lots = cur.fetchall()
+    cur.close()
+    state = [0 if q == 0 else 2 if q == start_qty else 1 for _sid, q in lots]
+    return state == sorted(state) and state.count(1) <= 1
+
+
+def make_plans(n, lines, supplies, missions, seed):
+    rnd = random.Random(seed)
+    return [[(rnd.choice(missions), rnd.choice(supplies), Decimal(rnd.randint(1, 20))) for _ in range(lines)]
+            for _ in range(n)]
+
+
+def per_line(conn, plan, stats):
+    # the old path: one CALL and one commit per line
+    for mid, sid, qty in plan:
+        for attempt in range(4):
+            cur = conn.cursor()
+            try:
+                cur.callproc("sp_allocate_supply", [mid, sid, qty])
+                conn.commit()
+                break
+            except mysql.connector.Error as e:
+                conn.rollback()
+                if e.errno not in RETRYABLE_ERRNOS or attempt == 3:
+                    raise
+                stats["retries"] += 1
+            finally:
+                cur.close()
+
+
+def batched(conn, plan, stats):
+    allocate_batch(conn, plan)
+
+
+def fefo(conn, plan, stats):
+    # each line by resource: the line's supply stands for the scratch FEFO resource
+    for mid, rid, qty in plan:
+        for attempt in range(4):
+            cur = conn.cursor()
+            try:
+                cur.callproc("sp_allocate_resource", [mid, rid, qty])
+                for res in cur.stored_results():
+                    res.fetchall()
+                conn.commit()
+                break
+            except mysql.connector.Error as e:
+                conn.rollback()
+                if e.errno == ER_LOCK_DEADLOCK:
+                    stats["deadlocks"] += 1
+                if e.errno not in RETRYABLE_ERRNOS or attempt == 3:
+                    raise
+                stats["retries"] += 1
+            finally:
+                cur.close()
+
+
+MODES = {"per-line": per_line, "batch": batched, "fefo": fefo}
+
+
+def run(mode, threads, plans_per_thread, lines, supplies, missions):
+    fn = MODES[mode]
+    stats = {"retries": 0, "errors": 0, "deadlocks": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(i):
+        conn = connect()
+        plans = make_plans(plans_per_thread, lines, supplies, missions, seed=i)
+        local = {"retries": 0, "deadlocks": 0}
+        barrier.wait()
+        for plan in plans:
+            try:
+                fn(conn, plan, local)
+            except mysql.connector.Error:
+                with lock:
+                    stats["errors"] += 1
+        conn.close()
+        with lock:
+            stats["retries"] += local["retries"]
+            stats["deadlocks"] += local["deadlocks"]
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in ts:
+        t.join()
+    dt = time.perf_counter() - t0
+    total = threads * plans_per_thread * lines
+    print(f"{mode:>9}: {total:,} allocations in {dt:.2f}s = {total / dt:,.0f} alloc/s, "
+          f"{stats['retries']} retries ({stats['deadlocks']} deadlocks), {stats['errors']} failed plans")
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--plans", type=int, default=50, help="plans per thread")
+    ap.add_argument("--lines", type=int, default=10, help="lines per plan")
+    ap.add_argument("--supplies", type=int, default=20, help="scratch supply rows (fewer = more contention)")
+    ap.add_argument("--modes", default="per-line,batch,fefo", help=f"comma-separated, of {', '.join(MODES)}")
+    args = ap.parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        ap.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    conn = connect()
+    scratch = []
+    failed = False
+    try:
+        lot_modes = [m for m in modes if m != "fefo"]
+        if lot_modes:
+            rid, supplies, missions = setup(conn, args.supplies)
+            scratch.append(rid)
+            for mode in lot_modes:
+                run(mode, args.threads, args.plans, args.lines, supplies, missions)
+            bad = check(conn, rid)
+            failed |= bool(bad)
+            print("stock check:", "OK, each allocation debited once" if not bad else f"{len(bad)} supplies off: {bad[:5]}")
+        if "fefo" in modes:
+            # lines draw 1..20, 10.5 on average: stock for the whole run and a little over
+            demand = args.threads * args.plans * args.lines * 10.5
+            lot_qty = Decimal(int(demand * 1.1 / args.supplies) + 1)
+            rid, _lots, missions = setup(conn, args.supplies, lot_qty, f"{TAG}_fefo")
+            scratch.append(rid)
+            stats = run("fefo", args.threads, args.plans, args.lines, [rid], missions)
+            bad = check(conn, rid, lot_qty)
+            ordered = check_fefo(conn, rid, lot_qty)
+            failed |= bool(bad) or not ordered or stats["deadlocks"] > 0
+            print("fefo check:", "OK, each allocation debited once" if not bad else f"{len(bad)} lots off: {bad[:5]}",
+                  "| lots drained in expiry order" if ordered else "| lots NOT drained in expiry order")
+    finally:
+        for rid in scratch:
+            teardown(conn, rid)
+        conn.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+# benchmarks/bench_api.py
+"""
+Load test for the SRSMS HTTP API (srs_api.py).
+
+Runs --clients concurrent clients against a running API for --duration
+seconds. Each loops over a weighted mix of requests (first pages, the
+dashboard searches, a following page through "next", the fn_* functions,
+the example queries) and the run reports requests/s and p50/p95/p99
+latency per request kind and overall. --stream adds full NDJSON streams of
+a month of Communications to the mix, --writes adds tiny
+sp_allocate_supply calls (needs operator or admin).
+
+  python srs_api.py &
+  python benchmarks/bench_api.py --clients 64 --duration 30 --role viewer
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import aiohttp  # noqa: E402
+from srs_config import API_HOST, API_PORT, ROLE_CREDENTIALS, TABLES_TO_SHOW, VIEWS  # noqa: E402
+from srs_advisor import GUI_SEARCHES  # noqa: E402
+from srs_service import EXAMPLE_QUERIES  # noqa: E402
+
+STREAM_SEARCH = "TimeStamp:2026-01-01..2026-01-31"
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+class LoadTest:
+    def __init__(self, base, auth, seed, page_size, stream=False, writes=False):
+        self.base = base.rstrip("/")
+        self.auth = auth
+        self.rnd = random.Random(seed)
+        self.page_size = page_size
+        self.latencies = {}     # kind -> [seconds]
+        self.errors = {}        # (kind, status) -> count
+        self.missions = []
+        self.supplies = []
+        self.mix = [(self.page, 4), (self.search, 4), (self.next_page, 2), (self.functions, 3),
+                    (self.example, 1)]
+        if stream:
+            self.mix.append((self.stream, 1))
+        if writes:
+            self.mix.append((self.allocate, 1))
+
+    async def _get(self, session, kind, path, read_all=False):
+        t0 = time.perf_counter()
+        async with session.get(self.base + path) as resp:
+            if read_all:
+                body = None
+                async for _chunk in resp.content.iter_chunked(1 << 16):
+                    pass        # just drain it; the client's own parsing is not what is measured
+            else:
+                body = await resp.read()
+            status = resp.status
+        self._record(kind, status, time.perf_counter() - t0)
+        return json.loads(body) if status == 200 and body else None
+
+    def _record(self, kind, status, secs):
+        if status >= 400:
+            self.errors[(kind, status)] = self.errors.get((kind, status), 0) + 1
+        else:
+            self.latencies.setdefault(kind, []).append(secs)
+
+    # ---------------- request kinds ----------------
+    async def page(self, session):
+        table = self.rnd.choice(TABLES_TO_SHOW + VIEWS)
+        await self._get(session, "page", f"/tables/{table}?limit={self.page_size}")
+
+    async def search(self, session):
+        table, text = self.rnd.choice(GUI_SEARCHES)
+        await self._get(session, "search", f"/tables/{table}?limit={self.page_size}&search={quote(text)}")
+
+    async def next_page(self, session):
+        table = self.rnd.choice(TABLES_TO_SHOW)
+        first = await self._get(session, "page", f"/tables/{table}?limit={self.page_size}")
+        if first and first.get("next") is not None:
+            after = quote(json.dumps(first["next"]))
+            await self._get(session, "page next", f"/tables/{table}?limit={self.page_size}&after={after}")
+
+    async def functions(self, session):
+        if self.rnd.random() < 0.5:
+            await self._get(session, "fn_mission_duration", f"/missions/{self.rnd.choice(self.missions)}/duration")
+        else:
+            await self._get(session, "fn_remaining_supply", f"/supplies/{self.rnd.choice(self.supplies)}/remaining")
+
+    async def example(self, session):
+        await self._get(session, "example query", "/queries/" + quote(self.rnd.choice(list(EXAMPLE_QUERIES)), safe=""))
+
+    async def stream(self, session):
+        await self._get(session, "stream", f"/tables/Communications/stream?search={quote(STREAM_SEARCH)}",
+                        read_all=True)
+
+    async def allocate(self, session):
+        t0 = time.perf_counter()
+        body = {"mission": self.rnd.choice(self.missions), "supply": self.rnd.choice(self.supplies), "qty": "0.001"}
+        async with session.post(self.base + "/allocate", json=body) as resp:
+            await resp.read()
+            self._record("sp_allocate_supply", resp.status, time.perf_counter() - t0)
+
+    # ---------------- driver ----------------
+    async def _ids(self, session, table, column):
+        async with session.get(f"{self.base}/tables/{table}?limit=1000") as resp:
+            resp.raise_for_status()
+            page = await resp.json()
+        idx = page["columns"].index(column)
+        return [r[idx] for r in page["rows"]]
+
+    async def client(self, session, deadline):
+        kinds, weights = zip(*self.mix)
+        while time.perf_counter() < deadline:
+            kind = self.rnd.choices(kinds, weights)[0]
+            try:
+                await kind(session)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # no HTTP status: counted as 599 against the request kind
+                self._record(kind.__name__, 599, 0.0)
+
+    async def run(self, clients, duration):
+        conn = aiohttp.TCPConnector(limit=clients)
+        timeout = aiohttp.ClientTimeout(total=max(60, duration))
+        async with aiohttp.ClientSession(connector=conn, auth=self.auth, timeout=timeout) as session:
+            self.missions = await self._ids(session, "Missions", "MissionID")
+            self.supplies = await self._ids(session, "Supplies", "SupplyID")
+            if not self.missions or not self.supplies:
+                raise SystemExit("Need Missions and Supplies rows to call the functions with")
+            t0 = time.perf_counter()
+            deadline = t0 + duration
+            await asyncio.gather(*(self.client(session, deadline) for _ in range(clients)))
+            return time.perf_counter() - t0
+
+    def report(self, elapsed):
+        rows = []
+        everything = []
+        for kind, samples in sorted(self.latencies.items()):
+            samples.sort()
+            everything.extend(samples)
+            rows.append((kind, samples))
+        everything.sort()
+        rows.append(("all", everything))
+        out = {}
+        print(f"{'request':22} {'count':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for kind, samples in rows:
+            res = {"count": len(samples), "rps": round(len(samples) / elapsed, 1),
+                   "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                   "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                   "p99_ms": round(percentile(samples, 0.99) * 1000, 2)}
+            out[kind] = res
+            print(f"{kind:22} {res['count']:8} {res['rps']:9.1f} {res['p50_ms']:9.2f} "
+                  f"{res['p95_ms']:9.2f} {res['p99_ms']:9.2f}")
+        errors = {f"{k} {s}": n for (k, s), n in self.errors.items()}
+        if errors:
+            print("errors: " + ", ".join(f"{k} x{n}" for k, n in sorted(errors.items())))
+        return out, errors
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--url", default=f"http://{API_HOST}:{API_PORT}")
+    ap.add_argument("--role", default="viewer", choices=sorted(ROLE_CREDENTIALS))
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds")
+    ap.add_argument("--page-size", type=int, default=100)
+    ap.add_argument("--stream", action="store_true", help="include NDJSON streams")
+    ap.add_argument("--writes", action="store_true", help="include sp_allocate_supply calls")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    creds = ROLE_CREDENTIALS[args.role]
+    test = LoadTest(args.url, aiohttp.BasicAuth(creds["user"], creds["password"]), args.seed,
+                    args.page_size, args.stream, args.writes)
+    elapsed = asyncio.run(test.run(args.clients, args.duration))
+    print(f"{args.clients} clients, {elapsed:.1f}s, role {args.role}")
+    results, errors = test.report(elapsed)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"clients": args.clients, "duration": elapsed, "role": args.role,
+                       "stream": args.stream, "writes": args.writes,
+                       "results": results, "errors": errors}, f, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# benchmarks/bench_audit.py
+"""
+Write throughput with audit triggers off, direct and staged.
+
+Inserts ROWS scratch Supplies rows under a scratch resource, updates each
+one and deletes them again, in COMMIT-sized transactions, once per audit
+mode. Staged mode also reports how long the drainer takes to move the
+staged rows into AuditLog. The audit mode installed before the run is
+restored afterwards and scratch rows (and their audit rows) are removed.
+
+  python benchmarks/bench_audit.py --rows 5000 --commit 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector  # noqa: E402
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS  # noqa: E402
+from srs_catalog import SchemaCatalog  # noqa: E402
+import srs_audit_triggers as triggers  # noqa: E402
+
+TAG = "bench_audit"
+MODES = ("off", "direct", "staged")
+
+
+def connect():
+    return mysql.connector.connect(host=HOST, database=DATABASE, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def set_mode(conn, catalog, mode):
+    if mode == "off":
+        triggers.uninstall(conn)
+    else:
+        triggers.install(conn, catalog, mode)
+
+
+def workload(conn, rid, rows, commit_every):
+    """INSERT, UPDATE and DELETE `rows` supplies; returns {phase: seconds}."""
+    cur = conn.cursor()
+    times = {}
+
+    t0 = time.perf_counter()
+    for lo in range(0, rows, commit_every):
+        conn.start_transaction()
+        for _ in range(lo, min(lo + commit_every, rows)):
+            cur.execute("INSERT INTO Supplies (ResourceID, Quantity, Unit, SupplierName) "
+                        "VALUES (%s, 100, 'Units', %s)", (rid, TAG))
+        conn.commit()
+    times["insert"] = time.perf_counter() - t0
+
+    cur.execute("SELECT SupplyID FROM Supplies WHERE ResourceID = %s ORDER BY SupplyID", (rid,))
+    ids = [r[0] for r in cur.fetchall()]
+
+    t0 = time.perf_counter()
+    for lo in range(0, len(ids), commit_every):
+        conn.start_transaction()
+        for sid in ids[lo:lo + commit_every]:
+            cur.execute("UPDATE Supplies SET Quantity = Quantity - 1 WHERE SupplyID = %s", (sid,))
+        conn.commit()
+    times["update"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for lo in range(0, len(ids), commit_every):
+        conn.start_transaction()
+        for sid in ids[lo:lo + commit_every]:
+            cur.execute("DELETE FROM Supplies WHERE SupplyID = %s", (sid,))
+        conn.commit()
+    times["delete"] = time.perf_counter() - t0
+    cur.close()
+    return times
+
+
+def cleanup_audit(conn, since_id, rid):
+    cur = conn.cursor()
+    cur.execute("DELETE FROM AuditLog WHERE AuditID > %s AND ("
+                " (TableName = 'Resources' AND KeyData = CONCAT('ResourceID=', %s)) OR"
+                " (TableName = 'Supplies' AND COALESCE(JSON_EXTRACT(NewRow, '$.ResourceID'),"
+                "                                      JSON_EXTRACT(OldRow, '$.ResourceID')) = %s))",
+                (since_id, rid, rid))
+    cur.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--commit", type=int, default=100, help="statements per transaction")
+    ap.add_argument("--modes", nargs="*", choices=MODES, default=list(MODES))
+    args = ap.parse_args(argv)
+
+    conn = connect()
+    catalog = SchemaCatalog()
+    previous = triggers.installed_mode(conn)
+    cur = conn.cursor()
+    cur.execute("SELECT COALESCE(MAX(AuditID), 0) FROM AuditLog")
+    since_id = cur.fetchone()[0]
+    cur.execute("INSERT INTO Resources (ResourceName, Unit, Description) VALUES (%s, 'Units', %s)", (TAG, TAG))
+    rid = cur.lastrowid
+    cur.close()
+    baseline = None
+    try:
+        for mode in args.modes:
+            set_mode(conn, catalog, mode)
+            times = workload(conn, rid, args.rows, args.commit)
+            total = sum(times.values())
+            rate = 3 * args.rows / total
+            baseline = baseline or rate
+            line = "  ".join(f"{k} {args.rows / v:,.0f}/s" for k, v in times.items())
+            extra = ""
+            if mode == "staged":
+                t0 = time.perf_counter()
+                moved = triggers.drain_all(conn)
+                extra = f"  drained {moved:,} rows in {time.perf_counter() - t0:.2f}s"
+            print(f"{mode:>6}: {line}  overall {rate:,.0f} writes/s ({rate / baseline:.0%}){extra}")
+    finally:
+        # put back whatever was there before the run (mixed -> direct)
+        if previous is None:
+            triggers.uninstall(conn)
+        else:
+            triggers.install(conn, catalog, "staged" if previous == "staged" else "direct")
+        triggers.drain_all(conn)
+        cur = conn.cursor()
+        cur.execute("DELETE FROM Resources WHERE ResourceID = %s", (rid,))
+        cur.close()
+        cleanup_audit(conn, since_id, rid)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
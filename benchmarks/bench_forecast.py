@@ -0,0 +1,120 @@
+# benchmarks/bench_forecast.py
+"""
+Supply forecast benchmark (srs_forecast.py): buckets vs rescanning history.
+
+Against a database with allocation history (srs_datagen.py) it times:
+
+  rescan     what a planner without the trg_mv_alloc_* buckets does: read
+             every ResourceAllocations row joined to its supply, group
+             them by resource and day in pandas, then project
+  buckets    srs_forecast.compute(): a window of mv_ResourceDailyUse plus
+             the per-mission totals, then the same projection
+  dashboard  refresh() finding the stored forecast current, plus reading
+             the reorder list: what opening the forecast window costs
+
+and checks both computations give the same daily rates.
+
+  python srs_datagen.py --database srsbench --scale 1000000
+  python benchmarks/bench_forecast.py --database srsbench
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import srs_forecast as fc  # noqa: E402
+
+RESCAN_SQL = ("SELECT s.ResourceID, DATE(ra.AllocationDate), ra.QuantityAllocated "
+              "FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID "
+              "WHERE ra.AllocationDate IS NOT NULL")
+
+
+def connect(database):
+    import mysql.connector
+    from srs_config import HOST, ROLE_CREDENTIALS
+    return mysql.connector.connect(host=HOST, database=database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def timed(fn, reps=1):
+    """(median ms, last result) of fn() over reps runs."""
+    samples, out = [], None
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+
+def rescan_rates(conn, as_of):
+    """Daily rates from the raw allocation history, the way it is done without the buckets."""
+    cur = conn.cursor()
+    cur.execute("SELECT ResourceID FROM Resources ORDER BY ResourceID")
+    resources = [r[0] for r in cur.fetchall()]
+    cur.execute(RESCAN_SQL)
+    raw = pd.DataFrame(cur.fetchall(), columns=["ResourceID", "UseDate", "Quantity"])
+    cur.close()
+    raw["Quantity"] = raw["Quantity"].astype(float)
+    usage = raw.groupby(["ResourceID", "UseDate"], as_index=False)["Quantity"].sum()
+    return resources, fc.consumption_rates(usage, resources, as_of), len(raw)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--database", help="default: srs_config.DATABASE")
+    ap.add_argument("--as-of", help="forecast date (default: the day after the newest allocation)")
+    ap.add_argument("--reps", type=int, default=3)
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+    if not args.database:
+        from srs_config import DATABASE
+        args.database = DATABASE
+
+    conn = connect(args.database)
+    results = {}
+
+    def report(name, ms, extra=""):
+        results[name] = round(ms, 2)
+        print(f"  {name:44} {ms:10.1f} ms  {extra}")
+
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*), MAX(AllocationDate) FROM ResourceAllocations")
+        allocations, newest = cur.fetchone()
+        cur.execute("SELECT COUNT(*) FROM mv_ResourceDailyUse")
+        buckets = cur.fetchone()[0]
+        cur.close()
+        as_of = date.fromisoformat(args.as_of) if args.as_of else (newest.date() + timedelta(days=1)
+                                                                    if newest else date.today())
+        print(f"{allocations:,} allocations in {buckets:,} resource-day buckets; forecast as of {as_of}")
+
+        ms, (resources, rescanned, rows) = timed(lambda: rescan_rates(conn, as_of), args.reps)
+        report("rescan: rates from every allocation", ms, f"{rows:,} rows read")
+        ms, forecast = timed(lambda: fc.compute(conn, as_of), args.reps)
+        report("buckets: compute() incl. projection", ms, f"{len(forecast.supplies):,} supplies projected")
+        rates = forecast.plan.set_index("ResourceID")["DailyRate"].reindex(resources).to_numpy()
+        if not np.allclose(rates, rescanned, rtol=1e-6, atol=1e-6):
+            print("MISMATCH: bucket rates differ from the rescan (rebuild the summaries?)", file=sys.stderr)
+
+        ms, _ = timed(lambda: fc.save(conn, forecast))
+        report("save() the forecast", ms)
+        ms, plan = timed(lambda: (fc.refresh(conn, as_of=as_of), fc.reorder_plan(conn))[1], args.reps)
+        report("dashboard: refresh() when current + read", ms, f"{len(plan)} resources due")
+    finally:
+        conn.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"allocations": allocations, "buckets": buckets, "as_of": str(as_of),
+                       "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# benchmarks/bench_functions.py
+"""
+fn_mission_duration / fn_remaining_supply: per-ID calls vs set-based bulk.
+
+For --ids IDs of Missions and of Supplies (all of them if there are fewer)
+it times, in ms:
+
+  scalar          one `SELECT fn_...(%s)` round trip per ID (what the
+                  GUI's function windows and the API's /{id} routes do)
+  scalar prepared the same through one server-side prepared statement
+  in a query      `SELECT id, fn_...(id) FROM ... WHERE id IN (...)`: one
+                  round trip, but still one hidden SELECT per row
+  bulk ids        StationService.mission_durations / remaining_supplies
+                  with the ID list (prepared, BULK_ID_CHUNK per execution)
+  bulk search     the same for an ID range given as a search (one execution)
+
+and checks that every variant returns the same value per ID.
+
+  python srs_datagen.py --database srsbench --scale 1000000
+  python benchmarks/bench_functions.py --database srsbench --ids 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector  # noqa: E402
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS  # noqa: E402
+from srs_catalog import SchemaCatalog  # noqa: E402
+from srs_service import StationService, BULK_ID_CHUNK  # noqa: E402
+
+CASES = [
+    ("fn_mission_duration", "Missions", "MissionID", "mission_durations", "DurationDays"),
+    ("fn_remaining_supply", "Supplies", "SupplyID", "remaining_supplies", "Remaining"),
+]
+
+
+def connect(database):
+    return mysql.connector.connect(host=HOST, database=database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def scalar(conn, function, ids, prepared=False):
+    cur = conn.cursor(prepared=prepared)
+    out = {}
+    for i in ids:
+        cur.execute(f"SELECT {function}(%s)", (i,))
+        out[i] = cur.fetchone()[0]
+    cur.close()
+    return out
+
+
+def in_query(conn, function, table, key, ids):
+    cur = conn.cursor()
+    out = {}
+    for n in range(0, len(ids), BULK_ID_CHUNK):
+        chunk = ids[n:n + BULK_ID_CHUNK]
+        cur.execute(f"SELECT `{key}`, {function}(`{key}`) FROM `{table}` "
+                    f"WHERE `{key}` IN ({', '.join(['%s'] * len(chunk))})", chunk)
+        out.update(cur.fetchall())
+    cur.close()
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--database", default=DATABASE)
+    ap.add_argument("--ids", type=int, default=100000, help="IDs per function")
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    conn = connect(args.database)
+    svc = StationService(SchemaCatalog())
+    results = {}
+    try:
+        for function, table, key, method, column in CASES:
+            cur = conn.cursor()
+            cur.execute(f"SELECT `{key}` FROM `{table}` ORDER BY `{key}` LIMIT {int(args.ids)}")
+            ids = [r[0] for r in cur.fetchall()]
+            cur.close()
+            if not ids:
+                print(f"[{function}] {table} is empty, skipped")
+                continue
+            print(f"[{function}] {len(ids):,} IDs of {table}")
+            bulk = getattr(svc, method)
+
+            def as_dict(res):
+                cols, rows = res
+                i = cols.index(column)
+                return {r[0]: r[i] for r in rows}
+            variants = [
+                ("scalar", lambda: scalar(conn, function, ids)),
+                ("scalar prepared", lambda: scalar(conn, function, ids, prepared=True)),
+                ("in a query", lambda: in_query(conn, function, table, key, ids)),
+                ("bulk ids", lambda: as_dict(bulk(conn, ids=ids))),
+                ("bulk search", lambda: as_dict(bulk(conn, f"{key}:{ids[0]}..{ids[-1]}"))),
+            ]
+            res, expected = {}, None
+            for name, fn in variants:
+                ms, got = timed(fn)
+                same = ""
+                if expected is None:
+                    expected = got
+                elif got != expected:
+                    same = "  RESULTS DIFFER"
+                res[name] = round(ms, 1)
+                print(f"  {name:18} {ms:12.1f} ms  {len(ids) / (ms / 1000):12,.0f} IDs/s{same}")
+            print(f"  bulk ids vs scalar: x{res['scalar'] / res['bulk ids']:,.0f}")
+            results[function] = {"ids": len(ids), "ms": res}
+    finally:
+        conn.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"database": args.database, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
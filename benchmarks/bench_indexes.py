@@ -0,0 +1,204 @@
+# benchmarks/bench_indexes.py
+"""
+Before/after timings for migration 0001 (hot predicate indexes).
+
+Fills Missions, Anomalies, Communications, MedicalRecords, Schedules and
+Supplies with ROWS synthetic rows each (tagged, seeded), then times the
+GUI workload from srs_advisor with the migration reverted and applied,
+and prints per-query medians plus what the advisor still flags. The
+migration state found at start is restored; synthetic rows are removed
+unless --keep is given (a later run with --keep reuses them).
+
+  python benchmarks/bench_indexes.py --rows 200000 --reps 5 --json before_after.json
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector  # noqa: E402
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS  # noqa: E402
+from srs_catalog import SchemaCatalog  # noqa: E402
+from srs_advisor import gui_workload, advise  # noqa: E402
+import srs_migrate  # noqa: E402
+import srs_audit_triggers as audit  # noqa: E402
+
+TAG = "bench_indexes"
+VERSION = 1
+BATCH = 5000
+TABLES = ["Missions", "Anomalies", "Communications", "MedicalRecords", "Schedules", "Supplies"]
+
+
+def connect():
+    return mysql.connector.connect(host=HOST, database=DATABASE, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def _ids(cur, sql):
+    cur.execute(sql)
+    return [r[0] for r in cur.fetchall()]
+
+
+def _insert(conn, sql, rows):
+    cur = conn.cursor()
+    for lo in range(0, len(rows), BATCH):
+        cur.executemany(sql, rows[lo:lo + BATCH])
+    cur.close()
+
+
+def _day(rnd, start=datetime.date(2024, 1, 1), span=4 * 365):
+    return start + datetime.timedelta(days=rnd.randrange(span))
+
+
+def fill(conn, rows, seed):
+    rnd = random.Random(seed)
+    cur = conn.cursor()
+    astronauts = _ids(cur, "SELECT AstronautID FROM Astronauts")
+    modules = _ids(cur, "SELECT ModuleID FROM StationModules")
+    if not astronauts or not modules:
+        raise SystemExit("Need the sample Astronauts and StationModules rows")
+    cur.execute("INSERT INTO Resources (ResourceName, Unit, Description) VALUES (%s, 'Units', %s)", (TAG, TAG))
+    rid = cur.lastrowid
+
+    statuses = ["Completed"] * 6 + ["Planned"] * 2 + ["Active", "Aborted"]
+    _insert(conn, "INSERT INTO Missions (MissionName, LaunchDate, MissionType, CurrentStatus) VALUES (%s, %s, %s, %s)",
+            [(f"{TAG}_{i}", _day(rnd), TAG, rnd.choice(statuses)) for i in range(max(rows // 10, 1))])
+    missions = _ids(cur, f"SELECT MissionID FROM Missions WHERE MissionType = '{TAG}'")
+
+    severities = ["Low"] * 5 + ["Medium"] * 3 + ["High", "Critical"]
+    _insert(conn, "INSERT INTO Anomalies (ModuleID, DateDetected, Severity, Description) VALUES (%s, %s, %s, %s)",
+            [(rnd.choice(modules), _day(rnd), rnd.choice(severities), TAG) for _ in range(rows)])
+    _insert(conn, "INSERT INTO Communications (MissionID, AstronautID, MessageType, TimeStamp, MessageContent, Recipient) "
+                  "VALUES (%s, %s, 'Telemetry', %s, %s, %s)",
+            [(rnd.choice(missions), rnd.choice(astronauts),
+              datetime.datetime.combine(_day(rnd), datetime.time(rnd.randrange(24), rnd.randrange(60))),
+              "routine status report", TAG) for _ in range(rows)])
+    _insert(conn, "INSERT INTO MedicalRecords (AstronautID, CheckupDate, HealthCondition) VALUES (%s, %s, %s)",
+            [(rnd.choice(astronauts), _day(rnd), TAG) for _ in range(rows)])
+    _insert(conn, "INSERT INTO Schedules (MissionID, TaskDescription, TaskType, StartTime, EndTime, AstronautID) "
+                  "VALUES (%s, %s, 'Maintenance', %s, %s, %s)",
+            [(rnd.choice(missions), TAG, start, start + datetime.timedelta(hours=rnd.randrange(1, 8)),
+              rnd.choice(astronauts))
+             for start in (datetime.datetime.combine(_day(rnd), datetime.time(rnd.randrange(24)))
+                           for _ in range(rows))])
+    _insert(conn, "INSERT INTO Supplies (ResourceID, Quantity, Unit, ExpiryDate, SupplierName) "
+                  "VALUES (%s, %s, 'Units', %s, %s)",
+            [(rid, rnd.randrange(0, 2000), _day(rnd), TAG) for _ in range(rows)])
+    for t in TABLES:
+        cur.execute(f"ANALYZE TABLE {t}")
+        cur.fetchall()
+    cur.close()
+
+
+def filled(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM Resources WHERE ResourceName = %s", (TAG,))
+    n = cur.fetchone()[0]
+    cur.close()
+    return n > 0
+
+
+def _delete_all(cur, sql, params=()):
+    while True:
+        cur.execute(sql + " LIMIT 10000", params)
+        if cur.rowcount == 0:
+            return
+
+
+def cleanup(conn):
+    cur = conn.cursor()
+    # children first in small batches; the mission / resource deletes then cascade nothing big
+    _delete_all(cur, "DELETE FROM Communications WHERE Recipient = %s", (TAG,))
+    _delete_all(cur, "DELETE FROM Schedules WHERE TaskDescription = %s", (TAG,))
+    _delete_all(cur, "DELETE FROM Anomalies WHERE Description = %s", (TAG,))
+    _delete_all(cur, "DELETE FROM MedicalRecords WHERE HealthCondition = %s", (TAG,))
+    _delete_all(cur, "DELETE FROM Supplies WHERE SupplierName = %s", (TAG,))
+    _delete_all(cur, "DELETE FROM Missions WHERE MissionType = %s", (TAG,))
+    cur.execute("DELETE FROM Resources WHERE ResourceName = %s", (TAG,))
+    cur.close()
+
+
+def time_workload(conn, workload, reps):
+    out = {}
+    cur = conn.cursor()
+    for label, sql, params in workload:
+        samples = []
+        for _ in range(reps):
+            t0 = time.perf_counter()
+            cur.execute(sql, params)
+            cur.fetchall()
+            samples.append(time.perf_counter() - t0)
+        out.setdefault(label, 0.0)
+        out[label] += statistics.median(samples) * 1000
+    cur.close()
+    return out
+
+
+def measure(conn, catalog, reps, min_rows):
+    catalog.invalidate()
+    workload = gui_workload(conn, catalog)
+    times = time_workload(conn, workload, reps)
+    reports, candidates = advise(conn, catalog, workload, min_rows)
+    flagged = sum(len(r.flagged) for r in reports)
+    return times, flagged, [c.create_sql for c in candidates]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200000, help="synthetic rows per table")
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=13)
+    ap.add_argument("--min-rows", type=int, default=1000)
+    ap.add_argument("--keep", action="store_true", help="leave the synthetic rows in place")
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    conn = connect()
+    catalog = SchemaCatalog()
+    was_applied = VERSION in srs_migrate.applied(conn)
+    audit_mode = audit.installed_mode(conn)
+    results = {"rows": args.rows, "reps": args.reps, "seed": args.seed}
+    try:
+        if not filled(conn):
+            audit.uninstall(conn)     # millions of audit rows would only measure the audit log
+            t0 = time.perf_counter()
+            fill(conn, args.rows, args.seed)
+            print(f"filled {len(TABLES)} tables x {args.rows:,} rows in {time.perf_counter() - t0:.1f}s")
+        srs_migrate.downgrade(conn, VERSION - 1, log=lambda _m: None, catalog=catalog)
+        before, flagged_before, proposed = measure(conn, catalog, args.reps, args.min_rows)
+        srs_migrate.upgrade(conn, VERSION, log=lambda _m: None, catalog=catalog)
+        after, flagged_after, still = measure(conn, catalog, args.reps, args.min_rows)
+    finally:
+        if was_applied:
+            srs_migrate.upgrade(conn, VERSION, log=lambda _m: None, catalog=catalog)
+        else:
+            srs_migrate.downgrade(conn, VERSION - 1, log=lambda _m: None, catalog=catalog)
+        if not args.keep:
+            audit.uninstall(conn)
+            cleanup(conn)
+        if audit_mode is not None:
+            audit.install(conn, catalog, "staged" if audit_mode == "staged" else "direct")
+        conn.close()
+
+    print(f"{'query':55} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for label in before:
+        b, a = before[label], after.get(label, 0.0)
+        print(f"{label[:55]:55} {b:10.2f} {a:10.2f} {b / a if a else 0:7.1f}x")
+    print(f"advisor: {flagged_before} flagged accesses before, {flagged_after} after")
+    if still:
+        print("still proposed after the migration:\n  " + "\n  ".join(still))
+    print("proposed before the migration:\n  " + "\n  ".join(proposed or ["(none)"]))
+    if args.json:
+        results.update(before_ms=before, after_ms=after, flagged_before=flagged_before,
+                       flagged_after=flagged_after, proposed_before=proposed, proposed_after=still)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
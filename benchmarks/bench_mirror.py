@@ -0,0 +1,172 @@
+# benchmarks/bench_mirror.py
+"""
+Local mirror (srs_mirror.py) against a local MySQL: snapshot, reads, sync.
+
+  snapshot  copying every station table and view into a fresh SQLite file
+  reads     StationService.page() for the first page, a page deep into the
+            table (by key) and a search, served by MySQL (no query cache)
+            and by the mirror; median of --reps, in ms
+  sync      --changes UPDATEs spread over Supplies (then undone, so the
+            data ends as it started) applied from AuditLog by sync(),
+            against re-copying the table the way a periodic full refresh
+            would
+
+Run it against a scratch database (ideally filled by srs_datagen.py) with
+the audit triggers installed; the SQLite file is deleted afterwards
+unless --keep is given.
+
+  python benchmarks/bench_mirror.py --database srsbench --changes 20000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector  # noqa: E402
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS, TABLES_TO_SHOW  # noqa: E402
+from srs_catalog import SchemaCatalog  # noqa: E402
+from srs_mirror import Mirror  # noqa: E402
+from srs_service import StationService  # noqa: E402
+
+READ_TABLES = ["Supplies", "Experiments", "Schedules", "Anomalies", "Communications", "vw_LowStock"]
+SEARCHES = {"Supplies": "Quantity<50", "Experiments": "CurrentStatus:Active", "Schedules": "maintenance",
+            "Anomalies": "Severity:High", "Communications": "MessageType:Alert"}
+
+
+def connect(database):
+    return mysql.connector.connect(host=HOST, database=database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def timed(fn, reps=1):
+    """(median ms, last result) of fn() over reps runs."""
+    samples, out = [], None
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+
+def touch_supplies(conn, n, mark):
+    """UPDATE n Supplies rows one statement at a time (each one an audit row); returns their ids."""
+    cur = conn.cursor()
+    cur.execute(f"SELECT SupplyID FROM Supplies ORDER BY SupplyID LIMIT {int(n)}")
+    ids = [r[0] for r in cur.fetchall()]
+    for sid in ids:
+        cur.execute("UPDATE Supplies SET SupplierName = CONCAT(COALESCE(SupplierName, ''), %s) WHERE SupplyID = %s",
+                    (mark, sid))
+    cur.close()
+    return ids
+
+
+def untouch_supplies(conn, ids, mark):
+    cur = conn.cursor()
+    for sid in ids:
+        cur.execute("UPDATE Supplies SET SupplierName = NULLIF(LEFT(SupplierName, CHAR_LENGTH(SupplierName) - %s), '') "
+                    "WHERE SupplyID = %s", (len(mark), sid))
+    cur.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--database", default=DATABASE)
+    ap.add_argument("--changes", type=int, default=5000, help="Supplies rows updated for the sync timing")
+    ap.add_argument("--reps", type=int, default=20)
+    ap.add_argument("--keep", action="store_true", help="leave the SQLite file in place")
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    conn = connect(args.database)
+    path = os.path.join(tempfile.gettempdir(), f"bench_mirror_{args.database}.sqlite3")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    mirror = Mirror(path)
+    catalog = SchemaCatalog()
+    catalog.load(conn)
+    results = {}
+
+    def report(name, ms, extra=""):
+        results[name] = round(ms, 3)
+        print(f"  {name:52} {ms:12.3f} ms  {extra}")
+
+    try:
+        print("[snapshot]")
+        ms, copied = timed(lambda: mirror.snapshot(conn, catalog))
+        rows = sum(copied.values())
+        report("snapshot (all tables and views)", ms, f"{rows:,} rows, {rows / (ms / 1000):,.0f} rows/s")
+        print(f"  SQLite file: {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+
+        print("[reads]  MySQL | mirror")
+        remote, local = StationService(catalog), StationService(catalog, mirror=mirror)
+        for table in READ_TABLES:
+            if not local.local(table):
+                print(f"  {table}: not mirrored, skipped")
+                continue
+            cases = [("first page", {})]
+            if SEARCHES.get(table):
+                cases.append((f"search {SEARCHES[table]!r}", {"search": SEARCHES[table]}))
+            pk = catalog.get(conn, table).pk
+            if pk:
+                cols = ", ".join(f"`{c}`" for c in pk)
+                cur = conn.cursor()
+                cur.execute(f"SELECT COUNT(*) FROM `{table}`")
+                half = cur.fetchone()[0] // 2
+                cur.execute(f"SELECT {cols} FROM `{table}` ORDER BY {cols} LIMIT 1 OFFSET {half}")
+                mid = cur.fetchone()
+                cur.close()
+                if mid:
+                    cases.append(("page after the middle key", {"after": list(mid)}))
+            for label, kw in cases:
+                try:
+                    r_ms, r_out = timed(lambda: remote.page(conn, table, **kw), args.reps)
+                    l_ms, l_out = timed(lambda: local.page(None, table, **kw), args.reps)
+                except Exception as e:      # e.g. a search column this schema doesn't have
+                    print(f"  {table} {label}: {e}")
+                    continue
+                same = "" if len(r_out["rows"]) == len(l_out["rows"]) else "  ROW COUNT DIFFERS"
+                report(f"{table} {label} (MySQL)", r_ms)
+                report(f"{table} {label} (mirror)", l_ms, f"x{r_ms / l_ms:,.0f}{same}" if l_ms else same)
+
+        print("[sync]")
+        ms, st = timed(lambda: mirror.sync(conn, catalog))
+        report("sync, nothing to do", ms)
+        mark = "~b"
+        t0 = time.perf_counter()
+        ids = touch_supplies(conn, args.changes, mark)
+        write_ms = (time.perf_counter() - t0) * 1000
+        print(f"  {len(ids):,} UPDATEs on MySQL took {write_ms:,.0f} ms")
+        try:
+            ms, st = timed(lambda: mirror.sync(conn, catalog))
+            report(f"sync {len(ids):,} changes", ms, f"{st.applied / (ms / 1000):,.0f} rows/s; {st}")
+            _, out = mirror.fetch(None, "SELECT COUNT(*) FROM Supplies WHERE SupplierName LIKE %s", (f"%{mark}",))
+            print(f"  mirror rows carrying the change: {out[0][0]:,} of {len(ids):,}")
+            supplies = catalog.get(conn, "Supplies")
+            ms, n = timed(lambda: mirror._copy(conn, supplies, mirror._fks.get("supplies", []), []))
+            report("full re-copy of Supplies instead", ms, f"{n:,} rows")
+        finally:
+            untouch_supplies(conn, ids, mark)
+        ms, st = timed(lambda: mirror.sync(conn, catalog))
+        report(f"sync {len(ids):,} changes undone", ms, str(st))
+    finally:
+        mirror.close()
+        conn.close()
+        if not args.keep:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"database": args.database, "tables": TABLES_TO_SHOW, "changes": args.changes,
+                       "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# benchmarks/bench_render.py
+"""
+Grid rendering: 10^5-row results in the main Treeview.
+
+  insert loop   every row inserted one tree.insert at a time before the
+                window gets back to its event loop (what show_rows did)
+  chunked       VirtualTable.show_rows: the first RENDER_SLICE_MS slice,
+                the longest stall of the event loop while the rest is
+                inserted through after_idle, and the total
+  widths        sizing the columns from a sample vs measuring every row
+  sort          a heading click on the static result: in-memory sort plus
+                the chunked re-render, until the first slice is on screen
+
+With --database it also times server-ordered paging (srs_service.open_table
+with sort=) of --table by --column: the first page and a page after the
+middle key, against fetching the whole table and sorting it in Python.
+
+Needs a display (on a headless box run it under xvfb-run).
+
+  python benchmarks/bench_render.py --rows 100000
+  python benchmarks/bench_render.py --database srsbench --table Supplies --column Quantity
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import tkinter as tk  # noqa: E402
+import tkinter.font as tkfont  # noqa: E402
+from tkinter import ttk  # noqa: E402
+from srs_gui import VirtualTable  # noqa: E402
+
+COLUMNS = ["SupplyID", "ItemName", "Quantity", "Unit", "ExpiryDate", "SupplierName", "UnitCost", "Notes"]
+
+
+def synthetic(n, seed):
+    rnd = random.Random(seed)
+    words = ["oxygen", "filter", "ration", "coolant", "battery", "valve", "sensor", "gasket", "water", "nitrogen"]
+    d0 = date(2026, 1, 1)
+    return [(i + 1, f"{rnd.choice(words)} {rnd.choice(words)} {rnd.randrange(1000)}", rnd.randrange(5000),
+             rnd.choice(["kg", "L", "pcs"]), d0 + timedelta(days=rnd.randrange(1500)),
+             rnd.choice([None, "Orbital Supply Co", "LunarWorks", "Deep Space Logistics"]),
+             Decimal(rnd.randrange(100, 100000)) / 100, rnd.choice([None, "", "check seals before use"]))
+            for i in range(n)]
+
+
+def timed(fn, reps=1):
+    """(median ms, last result) of fn() over reps runs."""
+    samples, out = [], None
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+
+def drain(root, vt):
+    """Run the event loop until vt has rendered everything; (total ms, longest stall ms)."""
+    t0 = time.perf_counter()
+    stall = 0.0
+    while vt.rendering:
+        s = time.perf_counter()
+        root.update()
+        stall = max(stall, (time.perf_counter() - s) * 1000)
+    return (time.perf_counter() - t0) * 1000, stall
+
+
+def run_render(args, results, report):
+    rows = synthetic(args.rows, args.seed)
+    root = tk.Tk()
+    root.geometry("1200x700")
+    tree = ttk.Treeview(root, show='headings')
+    scroll = ttk.Scrollbar(root, orient="vertical", command=tree.yview)
+    tree.pack(side='left', fill='both', expand=True)
+    scroll.pack(side='right', fill='y')
+    vt = VirtualTable(tree, scroll, run=None)
+    root.update()
+    try:
+        print(f"[render] {len(rows):,} rows x {len(COLUMNS)} columns")
+
+        def insert_loop():
+            tree.delete(*tree.get_children())
+            tree['columns'] = COLUMNS
+            for r in rows:
+                tree.insert('', 'end', values=["" if v is None else v for v in r])
+            root.update()
+        ms, _ = timed(insert_loop)
+        report("insert loop (window blocked throughout)", ms)
+        tree.delete(*tree.get_children())
+        root.update()
+
+        first, _ = timed(lambda: vt.show_rows(COLUMNS, rows))
+        total, stall = drain(root, vt)
+        report("chunked: first slice on screen", first)
+        report("chunked: longest event-loop stall", stall)
+        report("chunked: all rows inserted", first + total)
+
+        body = tkfont.nametofont("TkDefaultFont")
+        ms, _ = timed(lambda: VirtualTable._column_widths(COLUMNS, rows), args.reps)
+        report("widths from a sample", ms)
+        ms, _ = timed(lambda: [max(body.measure(str(r[i])) for r in rows) for i in range(len(COLUMNS))])
+        report("widths measuring every row", ms)
+
+        for col in ("Quantity", "ItemName"):
+            first, _ = timed(lambda: vt._heading_clicked(col))
+            total, stall = drain(root, vt)
+            report(f"sort by {col}: first slice on screen", first)
+            report(f"sort by {col}: all rows inserted", first + total, f"stall {stall:.1f} ms")
+    finally:
+        root.destroy()
+
+
+def run_server_sort(args, results, report):
+    import mysql.connector
+    from srs_config import HOST, ROLE_CREDENTIALS
+    from srs_catalog import SchemaCatalog
+    from srs_service import StationService
+
+    conn = mysql.connector.connect(host=HOST, database=args.database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+    try:
+        svc = StationService(SchemaCatalog())
+        meta = svc.meta(conn, args.table)
+        note = "indexed" if meta.leading_indexed(args.column) else "NO index starts with it"
+        print(f"[server sort] {args.table} by {args.column} ({note})")
+        for desc in (False, True):
+            label = "desc" if desc else "asc"
+            ms, (pager, first) = timed(lambda: svc.open_table(conn, args.table, sort=args.column, descending=desc),
+                                       args.reps)
+            report(f"open_table sort={args.column} {label}: first page", ms)
+            cur = conn.cursor()
+            cur.execute(f"SELECT COUNT(*) FROM `{args.table}`")
+            half = cur.fetchone()[0] // 2
+            cols = ", ".join(f"`{c}`" for c in pager.key_cols)
+            direction = " DESC" if desc else ""
+            cur.execute(f"SELECT {cols} FROM `{args.table}` ORDER BY "
+                        + ", ".join(f"`{c}`{direction}" for c in pager.key_cols) + f" LIMIT 1 OFFSET {half}")
+            mid = cur.fetchone()
+            cur.close()
+            if mid:
+                ms, _ = timed(lambda: pager.fetch_after(conn, mid), args.reps)
+                report(f"open_table sort={args.column} {label}: page after the middle", ms)
+
+        def fetch_and_sort():
+            cur = conn.cursor()
+            cur.execute(f"SELECT * FROM `{args.table}`")
+            rows = cur.fetchall()
+            i = list(cur.column_names).index(args.column)
+            cur.close()
+            rows.sort(key=lambda r: (r[i] is not None, r[i]))
+            return rows
+        ms, rows = timed(fetch_and_sort)
+        report("whole table fetched and sorted in Python", ms, f"{len(rows):,} rows")
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--database", help="also time server-ordered paging against this database")
+    ap.add_argument("--table", default="Supplies")
+    ap.add_argument("--column", default="Quantity")
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    results = {}
+
+    def report(name, ms, extra=""):
+        results[name] = round(ms, 3)
+        print(f"  {name:52} {ms:12.3f} ms  {extra}")
+
+    try:
+        run_render(args, results, report)
+    except tk.TclError as e:
+        print(f"cannot open a window: {e}", file=sys.stderr)
+        return 1
+    if args.database:
+        run_server_sort(args, results, report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# benchmarks/bench_schedule.py
+"""
+Schedule conflict detection: sweep-line (srs_schedule.py) vs self-join.
+
+Against a database (ideally filled by srs_datagen.py, whose Schedules are
+loaded without the overlap triggers and so contain double bookings) it
+times the naive SQL self-join that pairs every two bookings of an
+astronaut against srs_schedule.scan(), which streams the bookings off
+idx_schedules_astronaut_span and sweeps them, and checks both find the
+same number of conflicting pairs.
+
+--synthetic N skips MySQL: N random bookings in memory, a Python pairwise
+loop per astronaut against find_conflicts(), at growing sizes up to N.
+
+  python srs_datagen.py --database srsbench --scale 1000000
+  python benchmarks/bench_schedule.py --database srsbench
+  python benchmarks/bench_schedule.py --synthetic 200000 --astronauts 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from srs_schedule import Booking, find_conflicts, scan  # noqa: E402
+
+SELF_JOIN = """
+SELECT COUNT(*)
+FROM Schedules a
+JOIN Schedules b
+  ON b.AstronautID = a.AstronautID AND b.ScheduleID > a.ScheduleID
+ AND b.StartTime < a.EndTime AND a.StartTime < b.EndTime
+WHERE a.EndTime > a.StartTime AND b.EndTime > b.StartTime"""
+
+
+def connect(database):
+    import mysql.connector
+    from srs_config import HOST, ROLE_CREDENTIALS
+    return mysql.connector.connect(host=HOST, database=database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000, out
+
+
+def pairwise(bookings):
+    """The quadratic baseline: every two bookings of the same astronaut compared."""
+    by_astronaut = {}
+    for b in bookings:
+        by_astronaut.setdefault(b.astronaut_id, []).append(b)
+    n = 0
+    for mine in by_astronaut.values():
+        for i, a in enumerate(mine):
+            for b in mine[i + 1:]:
+                if a.start < b.end and b.start < a.end and a.end > a.start and b.end > b.start:
+                    n += 1
+    return n
+
+
+def synthetic(n, astronauts, days, seed):
+    """n bookings of 30 min - 8 h spread over `days`, so density grows with n."""
+    rnd = random.Random(seed)
+    t0 = datetime(2026, 1, 1)
+    out = []
+    for i in range(n):
+        start = t0 + timedelta(minutes=15 * rnd.randrange(days * 96))
+        out.append(Booking(i + 1, rnd.randrange(astronauts), start,
+                           start + timedelta(minutes=rnd.randrange(30, 480, 15))))
+    return out
+
+
+def run_database(args):
+    conn = connect(args.database)
+    results = {}
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*), COUNT(DISTINCT AstronautID) FROM Schedules")
+        rows, astronauts = cur.fetchone()
+        print(f"Schedules: {rows:,} rows, {astronauts:,} astronauts")
+        if args.timeout:
+            cur.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(args.timeout * 1000)}")
+        cur.close()
+
+        def self_join():
+            c = conn.cursor()
+            c.execute(SELF_JOIN)
+            n = c.fetchone()[0]
+            c.close()
+            return n
+        for name, fn in (("sweep (srs_schedule.scan)", lambda: len(scan(conn))), ("SQL self-join", self_join)):
+            try:
+                ms, pairs = timed(fn)
+            except Exception as e:      # e.g. MAX_EXECUTION_TIME for the self-join
+                results[name] = {"error": str(e)}
+                print(f"  {name:32} ERROR {e}")
+                continue
+            results[name] = {"ms": round(ms, 1), "pairs": pairs}
+            print(f"  {name:32} {ms:12.1f} ms  {pairs:,} conflicting pairs")
+    finally:
+        conn.close()
+    return {"rows": rows, "astronauts": astronauts, "results": results}
+
+
+def run_synthetic(args):
+    results = {}
+    n = max(1000, args.synthetic // 16)
+    print(f"{'bookings':>10} {'pairwise ms':>12} {'sweep ms':>10} {'pairs':>10}")
+    while True:
+        bookings = synthetic(n, args.astronauts, args.days, args.seed)
+        sweep_ms, found = timed(lambda: find_conflicts(bookings))
+        res = {"sweep_ms": round(sweep_ms, 1), "pairs": len(found)}
+        if n <= args.pairwise_max:
+            pair_ms, pairs = timed(lambda: pairwise(bookings))
+            res.update(pairwise_ms=round(pair_ms, 1), pairwise_pairs=pairs)
+            if pairs != len(found):
+                print(f"MISMATCH at {n:,}: pairwise {pairs:,} vs sweep {len(found):,}", file=sys.stderr)
+        results[n] = res
+        print(f"{n:10,} {res.get('pairwise_ms', float('nan')):12.1f} {sweep_ms:10.1f} {len(found):10,}")
+        if n >= args.synthetic:
+            break
+        n = min(n * 2, args.synthetic)
+    return {"astronauts": args.astronauts, "days": args.days, "results": results}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--database", help="default: srs_config.DATABASE")
+    ap.add_argument("--timeout", type=float, default=600, help="seconds the self-join may run (0 = no limit)")
+    ap.add_argument("--synthetic", type=int, metavar="N", help="in-memory bookings instead of MySQL")
+    ap.add_argument("--astronauts", type=int, default=100)
+    ap.add_argument("--days", type=int, default=365)
+    ap.add_argument("--pairwise-max", type=int, default=100000, help="largest size the pairwise loop runs at")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    if args.synthetic:
+        out = run_synthetic(args)
+    else:
+        if not args.database:
+            from srs_config import DATABASE
+            args.database = DATABASE
+        out = run_database(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
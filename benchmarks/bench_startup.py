@@ -0,0 +1,86 @@
+# benchmarks/bench_startup.py
+"""
+GUI start-up time: imports and first paint of the login window.
+
+Each run is a fresh interpreter (imports are only slow once) that reports,
+in ms from just before `import srs_gui`:
+
+  import        srs_gui itself (tkinter and the light srs_* modules)
+  first paint   the login window's first Expose event
+  backend       mysql.connector / ttkbootstrap imported and the theme
+                applied, i.e. when Login can actually connect
+
+--eager imports the backend before the window is created, the way srs_gui
+did before the imports were deferred, as the baseline. Needs a display
+(on a headless box run it under xvfb-run).
+
+  python benchmarks/bench_startup.py --reps 10
+  python benchmarks/bench_startup.py --reps 10 --eager
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import srs_gui
+t_import = time.perf_counter()
+if {eager!r}:
+    srs_gui._import_backend()
+app = srs_gui.SRSApp(run=False)
+painted = []
+app.root.bind("<Expose>", lambda _e: painted or painted.append(time.perf_counter()), add="+")
+while not painted:
+    app.root.update()
+while not srs_gui.backend_ready.is_set():
+    app.root.update()
+app.root.update()   # one more round for _backend_tick to apply the theme
+t_ready = time.perf_counter()
+app.on_close()
+print(json.dumps({{"import": (t_import - t0) * 1000, "first paint": (painted[0] - t0) * 1000,
+                  "backend": (t_ready - t0) * 1000}}))
+"""
+
+
+def run_once(eager):
+    out = subprocess.run([sys.executable, "-c", CHILD.format(root=ROOT, eager=eager)],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"exit {out.returncode}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--eager", action="store_true", help="import the backend before the window (old behaviour)")
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    samples = []
+    for _ in range(args.reps):
+        try:
+            samples.append(run_once(args.eager))
+        except RuntimeError as e:
+            print(f"start-up run failed: {e}", file=sys.stderr)
+            return 1
+    results = {k: round(statistics.median(s[k] for s in samples), 1) for k in samples[0]}
+    print(f"[{'eager' if args.eager else 'deferred'} imports, median of {args.reps}]")
+    for name, ms in results.items():
+        print(f"  {name:12} {ms:10.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"eager": args.eager, "reps": args.reps, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# benchmarks/bench_telemetry.py
+"""
+Telemetry ingest, series loading and analytics benchmark (srs_telemetry.py).
+
+Generates --days of synthetic readings every --interval seconds for every
+module, ending at a fixed time so runs are comparable, then times:
+
+  ingest    one INSERT per reading (autocommit, a --row-sample of rows)
+            against srs_telemetry.ingest (batched multi-row INSERTs plus
+            the set-based rollup refresh), in readings/s
+  load      a day, a week and the whole range, from the rollups
+            (load_series) and by reading the raw rows and aggregating
+            them client-side
+  analytics breach detection as a Python loop over rows against the
+            vectorized breaches(); downsample, rolling_mean, envelope
+
+Run it against a scratch database created from srsms.sql; the readings it
+wrote are deleted at the end unless --keep is given.
+
+  python benchmarks/bench_telemetry.py --database srsbench --days 30 --interval 10
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector  # noqa: E402
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS, TELEMETRY_THRESHOLDS  # noqa: E402
+import srs_telemetry as tm  # noqa: E402
+
+END = datetime(2026, 1, 1)      # fixed, so every run writes and reads the same window
+
+
+def connect(database):
+    return mysql.connector.connect(host=HOST, database=database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+def timed(fn, reps=1):
+    """(median ms, last result) of fn() over reps runs."""
+    samples, out = [], None
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+
+def loop_breaches(frame, thresholds=TELEMETRY_THRESHOLDS):
+    """The row-at-a-time version of tm.breaches(), as a baseline: number of runs."""
+    runs = 0
+    for m, (low, high) in thresholds.items():
+        prev_module, inside = None, False
+        for module, value in zip(frame["ModuleID"].tolist(), frame[m].tolist()):
+            out = (low is not None and value < low) or (high is not None and value > high)
+            if out and not (inside and module == prev_module):
+                runs += 1
+            inside, prev_module = out, module
+    return runs
+
+
+def cleanup(conn, modules, start, end):
+    cur = conn.cursor()
+    marks = ", ".join(["%s"] * len(modules))
+    for table, col in ((tm.READINGS, "ReadAt"), (tm.ROLLUPS, "BucketStart")):
+        while True:
+            cur.execute(f"DELETE FROM {table} WHERE ModuleID IN ({marks}) AND {col} >= %s AND {col} < %s "
+                        "LIMIT 50000", [*modules, start, end + timedelta(days=1)])
+            if cur.rowcount == 0:
+                break
+    cur.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--database", default=DATABASE)
+    ap.add_argument("--days", type=float, default=14)
+    ap.add_argument("--interval", type=int, default=10, help="seconds between readings")
+    ap.add_argument("--row-sample", type=int, default=5000, help="readings inserted one by one")
+    ap.add_argument("--reps", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--keep", action="store_true", help="leave the generated readings in place")
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args(argv)
+
+    conn = connect(args.database)
+    results = {}
+
+    def report(name, ms, rows=None, rate=False):
+        res = {"ms": round(ms, 2)}
+        if rows is not None:
+            res["rows"] = rows
+            if rate:
+                res["rows_per_s"] = round(rows / (ms / 1000)) if ms else None
+        results[name] = res
+        extra = f"{rows:>12,} rows" if rows is not None else ""
+        if rate and ms:
+            extra += f" {rows / (ms / 1000):>12,.0f} rows/s"
+        print(f"  {name:50} {ms:10.1f} ms {extra}")
+
+    start = END - timedelta(days=args.days)
+    frame = tm.simulate(conn, args.days, args.interval, args.seed, end=END)
+    modules = sorted(frame["ModuleID"].unique().tolist())
+    print(f"{len(frame):,} synthetic readings, {len(modules)} modules, {args.days:g} days")
+    try:
+        tm.maintain_partitions(conn, keep_months=None)
+        cleanup(conn, modules, start, END)
+
+        print("[ingest]")
+        sample = frame.head(args.row_sample)
+        cols = ["ModuleID", "ReadAt"] + tm.METRICS
+        sql = f"INSERT INTO {tm.READINGS} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})"
+
+        def row_by_row():
+            cur = conn.cursor()
+            for row in sample.itertuples(index=False):
+                cur.execute(sql, (int(row.ModuleID), row.ReadAt.to_pydatetime(),
+                                  *(float(getattr(row, m)) for m in tm.METRICS)))
+            cur.close()
+        ms, _ = timed(row_by_row)
+        report("row by row INSERT (autocommit)", ms, len(sample), rate=True)
+        cleanup(conn, modules, start, END)
+
+        ms, st = timed(lambda: tm.ingest(conn, frame, update_current=False))
+        report("ingest() batched + rollups", ms, st.inserted, rate=True)
+        report("  of which rollup refresh", st.rollup_seconds * 1000)
+
+        print("[load]")
+        for label, span in (("1 day", timedelta(days=1)), ("7 days", timedelta(days=7)),
+                            (f"{args.days:g} days", END - start)):
+            lo = END - span
+            ms, (series, res) = timed(lambda: tm.load_series(conn, modules, lo, END), args.reps)
+            report(f"load_series {label} ({res}s rollups)", ms, len(series))
+            ms, raw = timed(lambda: tm.downsample(tm.load_series(conn, modules, lo, END, resolution=tm.RAW,
+                                                                 max_points=10 ** 9)[0], f"{res}s"), args.reps)
+            report(f"raw rows + client downsample {label}", ms, len(raw))
+
+        print("[analytics]")
+        raw = frame.rename(columns={"ReadAt": "Time"})
+        raw["Readings"] = 1
+        ms, n = timed(lambda: loop_breaches(raw))
+        report("breaches, Python loop over rows", ms, len(raw))
+        ms, found = timed(lambda: tm.breaches(raw), args.reps)
+        report(f"breaches() vectorized ({len(found)} runs, loop found {n})", ms, len(raw))
+        ms, _ = timed(lambda: tm.downsample(raw, "1h"), args.reps)
+        report("downsample 1h", ms, len(raw))
+        ms, _ = timed(lambda: tm.rolling_mean(raw, "CO2Level", "15min"), args.reps)
+        report("rolling_mean 15min", ms, len(raw))
+        ms, _ = timed(lambda: tm.envelope(raw, "OxygenLevel", "10min"), args.reps)
+        report("envelope 10min across modules", ms, len(raw))
+    finally:
+        if not args.keep:
+            cleanup(conn, modules, start, END)
+        conn.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"days": args.days, "interval": args.interval, "readings": len(frame),
+                       "modules": len(modules), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+# benchmarks/harness.py
+"""
+SRSMS benchmark harness.
+
+Times the GUI's query paths (first and deep pages of every table and view,
+dashboard searches, the example queries), the stored routines and bulk
+export/import against a MySQL database, ideally one filled by
+srs_datagen.py, and writes the results as JSON so versions can be
+compared:
+
+  python srs_datagen.py --database srsbench --scale 1000000
+  python benchmarks/harness.py --database srsbench -o base.json
+  ... change something ...
+  python benchmarks/harness.py --database srsbench --compare base.json
+
+The routines and bulk groups write (tiny allocations, imported rows that
+are deleted again); --read-only skips them. --generate SCALE loads
+synthetic data first and records each table's load as a bulk result.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import mysql.connector  # noqa: E402
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS, TABLES_TO_SHOW, VIEWS  # noqa: E402
+from srs_catalog import SchemaCatalog  # noqa: E402
+from srs_paging import KeysetPager, PAGE_SIZE  # noqa: E402
+from srs_search import build_where  # noqa: E402
+from srs_advisor import GUI_SEARCHES, EXAMPLE_QUERIES  # noqa: E402
+from srs_alloc import allocate_batch  # noqa: E402
+from srs_export import export_query  # noqa: E402
+from srs_import import import_file  # noqa: E402
+from srs_datagen import DataGenerator, DEFAULT_SEED  # noqa: E402
+
+GROUPS = ["pages", "search", "queries", "routines", "bulk"]
+WRITE_GROUPS = {"routines", "bulk"}
+RESULTS_DIR = os.path.join(HERE, "results")
+REGRESSION = 0.20       # slower than this fraction counts as a regression...
+NOISE_MS = 1.0          # ...unless the difference is below this
+TAG = "bench_harness"
+
+
+def connect(database):
+    return mysql.connector.connect(host=HOST, database=database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+
+
+class Harness:
+    def __init__(self, conn, reps, seed, log=print):
+        self.conn = conn
+        self.reps = reps
+        self.rnd = random.Random(seed)
+        self.catalog = SchemaCatalog()
+        self.results = {}
+        self.log = log
+
+    def case(self, group, name, fn, reps=None):
+        """Time fn() (returns rows handled) after one warm-up run."""
+        try:
+            fn()
+            samples, rows = [], 0
+            for _ in range(reps or self.reps):
+                t0 = time.perf_counter()
+                rows = fn() or 0
+                samples.append((time.perf_counter() - t0) * 1000)
+        except Exception as e:
+            self.results[name] = {"group": group, "error": str(e)}
+            self.log(f"  {name:60} ERROR {e}")
+            return
+        self.record(group, name, samples, rows)
+
+    def record(self, group, name, samples, rows=0):
+        samples = sorted(samples)
+        res = {"group": group, "reps": len(samples), "median_ms": round(statistics.median(samples), 3),
+               "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+               "min_ms": round(samples[0], 3), "rows": rows}
+        self.results[name] = res
+        self.log(f"  {name:60} {res['median_ms']:10.2f} ms  ({rows:,} rows)")
+
+    def _query(self, sql, params=()):
+        cur = self.conn.cursor()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+
+    # ---------------- groups ----------------
+    def pages(self):
+        for name in TABLES_TO_SHOW + VIEWS:
+            meta = self.catalog.get(self.conn, name)
+            pager = KeysetPager(name, meta.pk, PAGE_SIZE)
+            self.case("pages", f"page first {name}", lambda: len(pager.fetch_first(self.conn)))
+            if len(meta.pk) == 1:
+                lo, hi = self._query(f"SELECT MIN(`{meta.pk[0]}`), MAX(`{meta.pk[0]}`) FROM `{name}`")[0]
+                if lo is not None:
+                    mid = (lo + hi) // 2
+                    self.case("pages", f"page middle {name}", lambda: len(pager.fetch_after(self.conn, (mid,))))
+            elif not meta.pk:
+                # views page by OFFSET; this is what scrolling deep into one costs
+                self.case("pages", f"page offset 10000 {name}", lambda: len(pager.fetch_after(self.conn, 10000)))
+
+    def search(self):
+        for table, text in GUI_SEARCHES:
+            meta = self.catalog.get(self.conn, table)
+            where, params = build_where(meta, text)
+            pager = KeysetPager(table, meta.pk, PAGE_SIZE, where, params)
+            self.case("search", f"search {table}: {text}", lambda: len(pager.fetch_first(self.conn)))
+        meta = self.catalog.get(self.conn, "Communications")
+        where, params = build_where(meta, "oxygen")
+        pager = KeysetPager("Communications", meta.pk, PAGE_SIZE, where, params)
+        self.case("search", "search Communications: oxygen (fulltext)", lambda: len(pager.fetch_first(self.conn)))
+
+    def queries(self):
+        for label, sql in EXAMPLE_QUERIES.items():
+            self.case("queries", f"query {label}", lambda sql=sql: len(self._query(sql)))
+        for view in VIEWS:
+            self.case("queries", f"count {view}", lambda view=view: self._query(f"SELECT COUNT(*) FROM `{view}`")[0][0])
+
+    def routines(self):
+        missions = [r[0] for r in self._query("SELECT MissionID FROM Missions ORDER BY MissionID LIMIT 1000")]
+        supplies = [r[0] for r in self._query("SELECT SupplyID FROM Supplies WHERE Quantity >= 100 "
+                                              "ORDER BY SupplyID LIMIT 1000")]
+        if not missions or not supplies:
+            self.log("  routines: need Missions and Supplies with stock, skipped")
+            return
+        pick = self.rnd.choice
+        self.case("routines", "fn_mission_duration x100",
+                  lambda: sum(1 for _ in range(100) if self._query("SELECT fn_mission_duration(%s)", (pick(missions),))))
+        self.case("routines", "fn_remaining_supply x100",
+                  lambda: sum(1 for _ in range(100) if self._query("SELECT fn_remaining_supply(%s)", (pick(supplies),))))
+
+        def per_line(n=10):
+            cur = self.conn.cursor()
+            for _ in range(n):
+                cur.callproc("sp_allocate_supply", [pick(missions), pick(supplies), "0.001"])
+            cur.close()
+            return n
+        self.case("routines", "sp_allocate_supply x10", per_line)
+        self.case("routines", "sp_allocate_batch 10 lines",
+                  lambda: allocate_batch(self.conn, [(pick(missions), pick(supplies), "0.001") for _ in range(10)]))
+
+    def bulk(self, rows=50000):
+        tmp = tempfile.mkdtemp(prefix="srs_bench_")
+        out = os.path.join(tmp, "communications.csv.gz")
+        self.case("bulk", f"export Communications {rows:,} rows csv.gz",
+                  lambda: export_query(self.conn, f"SELECT * FROM Communications ORDER BY CommID LIMIT {rows}",
+                                       (), out), reps=3)
+        # a fixed, seeded file so every version imports the same rows
+        src = os.path.join(tmp, "anomalies.csv")
+        modules = [r[0] for r in self._query("SELECT ModuleID FROM StationModules LIMIT 100")]
+        if not modules:
+            return
+        rnd = random.Random(1)
+        with open(src, "w", encoding="utf-8") as f:
+            f.write("ModuleID,DateDetected,Severity,Description\n")
+            for i in range(rows):
+                f.write(f"{rnd.choice(modules)},2026-01-{1 + i % 28:02d},"
+                        f"{rnd.choice(['Low', 'Medium', 'High'])},{TAG}\n")
+        meta = self.catalog.get(self.conn, "Anomalies")
+
+        def load():
+            st = import_file(self.conn, meta, src)
+            cur = self.conn.cursor()
+            while True:
+                cur.execute("DELETE FROM Anomalies WHERE Description = %s LIMIT 10000", (TAG,))
+                if cur.rowcount == 0:
+                    break
+            cur.close()
+            return st.inserted
+        self.case("bulk", f"import Anomalies {rows:,} rows csv (+cleanup)", load, reps=3)
+
+    def generate(self, scale, seed):
+        gen = DataGenerator(self.conn, scale, seed, log=lambda m: self.log("  " + m))
+        for table, (n, dt) in gen.run().items():
+            self.record("bulk", f"generate {table}", [dt * 1000], n)
+
+
+def metadata(conn, database, args):
+    cur = conn.cursor()
+    cur.execute("SELECT VERSION()")
+    version = cur.fetchone()[0]
+    cur.execute("SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'")
+    rows = {t: n for t, n in cur.fetchall()}
+    cur.close()
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                             text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        rev = None
+    return {"started": datetime.datetime.now().isoformat(timespec="seconds"), "git_rev": rev,
+            "mysql": version, "database": database, "python": platform.python_version(),
+            "host": platform.node(), "reps": args.reps, "seed": args.seed, "groups": args.groups,
+            "table_rows_estimate": rows}
+
+
+def compare(new, old, threshold=REGRESSION):
+    """Print median changes against `old`; returns the names that regressed."""
+    regressed = []
+    print(f"\n{'case':60} {'old ms':>10} {'new ms':>10} {'change':>8}")
+    for name, res in new["results"].items():
+        prev = old["results"].get(name)
+        if not prev or "median_ms" not in res or "median_ms" not in prev:
+            continue
+        a, b = prev["median_ms"], res["median_ms"]
+        change = (b - a) / a if a else 0.0
+        flag = ""
+        if change > threshold and b - a > NOISE_MS:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name[:60]:60} {a:10.2f} {b:10.2f} {change:+7.0%}{flag}")
+    print(f"\n{len(regressed)} regression(s) over {threshold:.0%} "
+          f"(against {old['meta'].get('git_rev') or '?'} from {old['meta'].get('started')})")
+    return regressed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--database", default=DATABASE)
+    ap.add_argument("--groups", nargs="*", choices=GROUPS, default=GROUPS)
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("--read-only", action="store_true", help="skip the groups that write")
+    ap.add_argument("--generate", type=int, metavar="SCALE", help="load srs_datagen data first")
+    ap.add_argument("-o", "--output", help="JSON results file (default: benchmarks/results/<time>.json)")
+    ap.add_argument("--compare", help="earlier results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=REGRESSION)
+    args = ap.parse_args(argv)
+    if args.read_only:
+        args.groups = [g for g in args.groups if g not in WRITE_GROUPS]
+
+    conn = connect(args.database)
+    h = Harness(conn, args.reps, args.seed)
+    try:
+        if args.generate:
+            print(f"[generate scale={args.generate:,}]")
+            h.generate(args.generate, args.seed)
+        meta = metadata(conn, args.database, args)
+        h.catalog.load(conn)
+        for group in GROUPS:
+            if group in args.groups:
+                print(f"[{group}]")
+                getattr(h, group)()
+    finally:
+        conn.close()
+
+    doc = {"meta": meta, "results": h.results}
+    out = args.output or os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, default=str)
+    print(f"results written to {out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        return 1 if compare(doc, old, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
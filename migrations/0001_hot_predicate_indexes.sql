@@ -0,0 +1,32 @@
+-- 0001: indexes for the GUI's hot predicates (found with srs_advisor.py)
+--
+-- vw_ActiveMissions          Missions.CurrentStatus IN (...), covering its select list
+-- health / schedule lookups  per-astronaut ranges on CheckupDate / StartTime
+-- anomaly triage             Severity:High DateDetected>...
+-- comms timeline             TimeStamp ranges
+-- expiry                     ExpiryDate < ...
+--
+-- Low stock (Quantity < 50) uses idx_supplies_quantity, which comes with
+-- the mv_* summaries (srsms.sql, migration 0006); it is not this migration's.
+--
+-- The composite AstronautID indexes also serve fk_med_astronaut and
+-- fk_schedules_astronaut, so MySQL drops the single-column FK indexes;
+-- "down" puts them back before removing the composites.
+
+-- up
+CREATE INDEX idx_missions_status ON Missions(CurrentStatus, LaunchDate, MissionName);
+CREATE INDEX idx_med_astronaut_checkup ON MedicalRecords(AstronautID, CheckupDate);
+CREATE INDEX idx_schedules_astronaut_start ON Schedules(AstronautID, StartTime);
+CREATE INDEX idx_anomalies_severity_date ON Anomalies(Severity, DateDetected);
+CREATE INDEX idx_comm_timestamp ON Communications(TimeStamp);
+CREATE INDEX idx_supplies_expiry ON Supplies(ExpiryDate);
+
+-- down
+DROP INDEX idx_missions_status ON Missions;
+CREATE INDEX fk_med_astronaut ON MedicalRecords(AstronautID);
+DROP INDEX idx_med_astronaut_checkup ON MedicalRecords;
+CREATE INDEX fk_schedules_astronaut ON Schedules(AstronautID);
+DROP INDEX idx_schedules_astronaut_start ON Schedules;
+DROP INDEX idx_anomalies_severity_date ON Anomalies;
+DROP INDEX idx_comm_timestamp ON Communications;
+DROP INDEX idx_supplies_expiry ON Supplies;
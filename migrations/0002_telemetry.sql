@@ -0,0 +1,53 @@
+-- 0002: life-support telemetry history (srs_telemetry.py)
+--
+-- LifeSupportReadings   append-only readings, monthly partitions like AuditLog
+-- LifeSupportRollups    per-minute / hour / day count, sum, min, max per module
+--
+-- srs_migrate.py adds partitions up to the current month after applying it;
+-- grant SELECT on both tables as in srsms.sql.
+
+-- up
+CREATE TABLE LifeSupportReadings (
+  ModuleID     INT NOT NULL,
+  ReadAt       DATETIME(3) NOT NULL,
+  OxygenLevel  FLOAT NOT NULL,
+  CO2Level     FLOAT NOT NULL,
+  Pressure     FLOAT NOT NULL,
+  Temperature  FLOAT NOT NULL,
+  PRIMARY KEY (ModuleID, ReadAt)
+) ENGINE=InnoDB
+PARTITION BY RANGE COLUMNS (ReadAt) (
+  PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+  PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+  PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+  PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+  PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+  PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+  PARTITION pmax    VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE LifeSupportRollups (
+  ModuleID        INT NOT NULL,
+  Resolution      INT NOT NULL,
+  BucketStart     DATETIME NOT NULL,
+  Readings        INT NOT NULL,
+  OxygenLevelSum  DOUBLE NOT NULL,
+  OxygenLevelMin  FLOAT NOT NULL,
+  OxygenLevelMax  FLOAT NOT NULL,
+  CO2LevelSum     DOUBLE NOT NULL,
+  CO2LevelMin     FLOAT NOT NULL,
+  CO2LevelMax     FLOAT NOT NULL,
+  PressureSum     DOUBLE NOT NULL,
+  PressureMin     FLOAT NOT NULL,
+  PressureMax     FLOAT NOT NULL,
+  TemperatureSum  DOUBLE NOT NULL,
+  TemperatureMin  FLOAT NOT NULL,
+  TemperatureMax  FLOAT NOT NULL,
+  PRIMARY KEY (ModuleID, Resolution, BucketStart),
+  CONSTRAINT fk_rollup_module FOREIGN KEY (ModuleID) REFERENCES StationModules(ModuleID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- down
+DROP TABLE LifeSupportRollups;
+DROP TABLE LifeSupportReadings;
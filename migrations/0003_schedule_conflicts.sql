@@ -0,0 +1,14 @@
+-- 0003: schedule conflict checks (srs_schedule.py)
+--
+-- Widens the per-astronaut schedule index with EndTime, so both the
+-- overlap probe of trg_schedule_overlap_ins/_upd and the bulk scan read
+-- the index alone. The triggers themselves have semicolons in their
+-- bodies; install them with  python srs_schedule.py install
+
+-- up
+CREATE INDEX idx_schedules_astronaut_span ON Schedules(AstronautID, StartTime, EndTime);
+DROP INDEX idx_schedules_astronaut_start ON Schedules;
+
+-- down
+CREATE INDEX idx_schedules_astronaut_start ON Schedules(AstronautID, StartTime);
+DROP INDEX idx_schedules_astronaut_span ON Schedules;
@@ -0,0 +1,84 @@
+-- 0004: supply depletion forecast (srs_forecast.py)
+--
+-- mv_ResourceDailyUse     allocated quantity per resource and day
+-- mv_MissionResourceUse   allocated quantity per mission and resource
+-- SupplyForecast, ReorderPlan, ForecastRuns   the stored forecast
+--
+-- The trg_mv_alloc_* triggers keeping the two mv_ tables current have
+-- semicolons in their bodies; install them, which also backfills the
+-- tables from ResourceAllocations, with  python srs_forecast.py install
+-- Recreate sp_rebuild_summaries from srsms.sql and grant as there.
+
+-- up
+-- also created by 0006, which came later; srs_forecast.py install stamps it
+CREATE TABLE IF NOT EXISTS mv_RefreshLog (
+  SummaryName   VARCHAR(64) PRIMARY KEY,
+  RebuiltAt     DATETIME NOT NULL,
+  RowsBuilt     INT NOT NULL
+) ENGINE=InnoDB;
+
+CREATE TABLE mv_ResourceDailyUse (
+  ResourceID    INT NOT NULL,
+  UseDate       DATE NOT NULL,
+  Quantity      DECIMAL(18,3) NOT NULL DEFAULT 0,
+  Allocations   INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (ResourceID, UseDate),
+  CONSTRAINT fk_mv_dailyuse_resource FOREIGN KEY (ResourceID) REFERENCES Resources(ResourceID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE mv_MissionResourceUse (
+  MissionID     INT NOT NULL,
+  ResourceID    INT NOT NULL,
+  Quantity      DECIMAL(18,3) NOT NULL DEFAULT 0,
+  PRIMARY KEY (MissionID, ResourceID),
+  CONSTRAINT fk_mv_missionuse_mission FOREIGN KEY (MissionID) REFERENCES Missions(MissionID)
+    ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT fk_mv_missionuse_resource FOREIGN KEY (ResourceID) REFERENCES Resources(ResourceID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE SupplyForecast (
+  SupplyID       INT PRIMARY KEY,
+  ResourceID     INT NOT NULL,
+  StartsOn       DATE,
+  DepletesOn     DATE,
+  ExpiresUnused  DECIMAL(18,3) NOT NULL DEFAULT 0,
+  CONSTRAINT fk_forecast_supply FOREIGN KEY (SupplyID) REFERENCES Supplies(SupplyID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE ReorderPlan (
+  ResourceID       INT PRIMARY KEY,
+  Priority         INT NOT NULL,
+  DailyRate        DECIMAL(18,3) NOT NULL,
+  OnHand           DECIMAL(18,3) NOT NULL,
+  MissionNeed      DECIMAL(18,3) NOT NULL,
+  StockoutOn       DATE,
+  ReorderBy        DATE,
+  ReorderQuantity  DECIMAL(18,3) NOT NULL,
+  INDEX idx_reorder_priority (Priority),
+  CONSTRAINT fk_reorder_resource FOREIGN KEY (ResourceID) REFERENCES Resources(ResourceID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE ForecastRuns (
+  RunID             INT AUTO_INCREMENT PRIMARY KEY,
+  ComputedAt        DATETIME NOT NULL,
+  AsOf              DATE NOT NULL,
+  LastAllocationID  INT NOT NULL,
+  SupplyCount       INT NOT NULL,
+  SupplyStock       DECIMAL(20,3) NOT NULL,
+  Seconds           FLOAT NOT NULL
+) ENGINE=InnoDB;
+
+-- down
+DROP TRIGGER IF EXISTS trg_mv_alloc_ins;
+DROP TRIGGER IF EXISTS trg_mv_alloc_upd;
+DROP TRIGGER IF EXISTS trg_mv_alloc_del;
+DROP TABLE ForecastRuns;
+DROP TABLE ReorderPlan;
+DROP TABLE SupplyForecast;
+DROP TABLE mv_MissionResourceUse;
+DROP TABLE mv_ResourceDailyUse;
+DELETE FROM mv_RefreshLog WHERE SummaryName IN ('mv_ResourceDailyUse', 'mv_MissionResourceUse');
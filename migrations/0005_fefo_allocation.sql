@@ -0,0 +1,16 @@
+-- 0005: first-expired-first-out allocation by resource (sp_allocate_resource)
+--
+-- Replaces the single-column ResourceID index with (ResourceID, ExpiryDate),
+-- which keeps serving fk_supplies_resource and lets sp_allocate_resource
+-- read a resource's lots in expiry order. The procedure itself has
+-- semicolons in its body: recreate it from srsms.sql and grant EXECUTE on it
+-- as there.
+
+-- up
+CREATE INDEX idx_supplies_resource_expiry ON Supplies(ResourceID, ExpiryDate);
+DROP INDEX idx_supplies_resource ON Supplies;
+
+-- down
+CREATE INDEX idx_supplies_resource ON Supplies(ResourceID);
+DROP INDEX idx_supplies_resource_expiry ON Supplies;
+DROP PROCEDURE IF EXISTS sp_allocate_resource;
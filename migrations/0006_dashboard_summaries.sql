@@ -0,0 +1,93 @@
+-- 0006: materialized dashboard summaries (srs_summaries.py)
+--
+-- mv_ModuleAnomalies   anomaly count per module
+-- mv_AstronautHealth   last checkup and checkup count per astronaut
+-- mv_LowStock          supplies below the low-stock threshold (Quantity < 50)
+-- mv_RefreshLog        when each mv_ table was last rebuilt
+--
+-- vw_ModuleAnomalies, vw_AstronautHealth and vw_LowStock are redefined to
+-- read them. The trg_mv_* triggers and sp_rebuild_summaries have semicolons
+-- in their bodies; install them, which also fills the tables, with
+--   python srs_summaries.py install
+-- Grant SELECT on mv_RefreshLog as in srsms.sql.
+
+-- up
+CREATE TABLE mv_ModuleAnomalies (
+  ModuleID      INT PRIMARY KEY,
+  AnomalyCount  INT NOT NULL DEFAULT 0,
+  CONSTRAINT fk_mv_anom_module FOREIGN KEY (ModuleID) REFERENCES StationModules(ModuleID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE mv_AstronautHealth (
+  AstronautID   INT PRIMARY KEY,
+  LastCheckup   DATE,
+  Checkups      INT NOT NULL DEFAULT 0,
+  CONSTRAINT fk_mv_health_astronaut FOREIGN KEY (AstronautID) REFERENCES Astronauts(AstronautID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE mv_LowStock (
+  SupplyID      INT PRIMARY KEY,
+  CONSTRAINT fk_mv_lowstock_supply FOREIGN KEY (SupplyID) REFERENCES Supplies(SupplyID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS mv_RefreshLog (
+  SummaryName   VARCHAR(64) PRIMARY KEY,
+  RebuiltAt     DATETIME NOT NULL,
+  RowsBuilt     INT NOT NULL
+) ENGINE=InnoDB;
+
+-- vw_LowStock's threshold scan and sp_rebuild_summaries (Quantity < 50)
+CREATE INDEX idx_supplies_quantity ON Supplies(Quantity);
+
+CREATE OR REPLACE VIEW vw_LowStock AS
+SELECT s.SupplyID, r.ResourceName, s.Quantity, s.Unit, s.StorageModuleID
+FROM mv_LowStock l
+JOIN Supplies s ON s.SupplyID = l.SupplyID
+JOIN Resources r ON s.ResourceID = r.ResourceID;
+
+CREATE OR REPLACE VIEW vw_ModuleAnomalies AS
+SELECT sm.ModuleID, sm.ModuleName, COALESCE(mv.AnomalyCount, 0) AS AnomalyCount
+FROM StationModules sm
+LEFT JOIN mv_ModuleAnomalies mv ON mv.ModuleID = sm.ModuleID;
+
+CREATE OR REPLACE VIEW vw_AstronautHealth AS
+SELECT a.AstronautID, CONCAT(a.FirstName,' ',a.LastName) AS Name, a.MedicalStatus,
+       mv.LastCheckup
+FROM Astronauts a
+LEFT JOIN mv_AstronautHealth mv ON mv.AstronautID = a.AstronautID;
+
+-- down
+CREATE OR REPLACE VIEW vw_LowStock AS
+SELECT s.SupplyID, r.ResourceName, s.Quantity, s.Unit, s.StorageModuleID
+FROM Supplies s JOIN Resources r ON s.ResourceID = r.ResourceID
+WHERE s.Quantity < 50;
+
+CREATE OR REPLACE VIEW vw_ModuleAnomalies AS
+SELECT sm.ModuleID, sm.ModuleName, COUNT(a.AnomalyID) AS AnomalyCount
+FROM StationModules sm
+LEFT JOIN Anomalies a ON a.ModuleID = sm.ModuleID
+GROUP BY sm.ModuleID, sm.ModuleName;
+
+CREATE OR REPLACE VIEW vw_AstronautHealth AS
+SELECT a.AstronautID, CONCAT(a.FirstName,' ',a.LastName) AS Name, a.MedicalStatus,
+       MAX(mr.CheckupDate) AS LastCheckup
+FROM Astronauts a
+LEFT JOIN MedicalRecords mr ON a.AstronautID = mr.AstronautID
+GROUP BY a.AstronautID, a.FirstName, a.LastName, a.MedicalStatus;
+
+DROP TRIGGER IF EXISTS trg_mv_anomalies_ins;
+DROP TRIGGER IF EXISTS trg_mv_anomalies_upd;
+DROP TRIGGER IF EXISTS trg_mv_anomalies_del;
+DROP TRIGGER IF EXISTS trg_mv_medical_ins;
+DROP TRIGGER IF EXISTS trg_mv_medical_upd;
+DROP TRIGGER IF EXISTS trg_mv_medical_del;
+DROP TRIGGER IF EXISTS trg_mv_supplies_ins;
+DROP TRIGGER IF EXISTS trg_mv_supplies_upd;
+DROP TABLE mv_LowStock;
+DROP TABLE mv_AstronautHealth;
+DROP TABLE mv_ModuleAnomalies;
+DELETE FROM mv_RefreshLog WHERE SummaryName IN ('mv_ModuleAnomalies', 'mv_AstronautHealth', 'mv_LowStock');
+DROP INDEX idx_supplies_quantity ON Supplies;
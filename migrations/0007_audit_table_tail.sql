@@ -0,0 +1,12 @@
+-- 0007: per-table audit tail (srs_audit.AuditTail with a table filter)
+--
+-- The tail asks for TableName = ? AND AuditID > ? ORDER BY AuditID.
+-- idx_audit_table_changedat is ordered by ChangedAt within a table, so that
+-- read scanned and sorted every audit row of the table on each poll; this
+-- index makes it a range read that stops after the new rows.
+
+-- up
+CREATE INDEX idx_audit_table_id ON AuditLog(TableName, AuditID);
+
+-- down
+DROP INDEX idx_audit_table_id ON AuditLog;
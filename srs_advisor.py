@@ -0,0 +1,387 @@
+# srs_advisor.py
+"""
+Index advisor for SRSMS.
+
+Replays the GUI's query paths (first page of every table and view through
+KeysetPager, server-side searches on the hot dashboard columns, the audit
+tail and the example queries) through a recording connection, and can add
+the SELECTs the server has actually been running (performance_schema
+statement digests). Each statement goes through EXPLAIN FORMAT=JSON; full
+table scans, full index scans and filesorts over at least --min-rows rows
+are flagged.
+
+For a flagged table access the proposed index is: the columns the plan
+compares with = / IN, then one range column, then the ORDER BY columns,
+extended with the other columns the query reads when that keeps the index
+narrow enough to cover it. Proposals can be written out as the next
+versioned migration (see srs_migrate.py).
+
+  python srs_advisor.py                       # report on the GUI workload
+  python srs_advisor.py --digests 50          # plus the server's top 50 SELECTs
+  python srs_advisor.py --write-migration     # migrations/NNNN_advisor_indexes.sql
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+
+from srs_config import TABLES_TO_SHOW, VIEWS
+from srs_paging import KeysetPager, PAGE_SIZE
+from srs_search import build_where
+from srs_audit import AuditTail
+from srs_service import EXAMPLE_QUERIES
+
+MIN_SCAN_ROWS = 1000        # smaller scans are cheaper than any index lookup
+MAX_INDEX_COLUMNS = 5       # widest index proposed for covering a query
+UNINDEXABLE = {'tinytext', 'text', 'mediumtext', 'longtext', 'blob', 'mediumblob', 'longblob', 'json'}
+
+# searches people run from the dashboard; values only need to be plausible
+GUI_SEARCHES = [
+    ("Missions", "CurrentStatus:Active"),
+    ("Anomalies", "Severity:High DateDetected>=2026-01-01"),
+    ("Communications", "TimeStamp:2026-01-01..2026-01-31"),
+    ("MedicalRecords", "AstronautID:1 CheckupDate>=2025-01-01"),
+    ("Schedules", "AstronautID:1 StartTime:2026-01-01..2026-12-31"),
+    ("Supplies", "Quantity<50"),
+    ("Supplies", "ExpiryDate<2026-06-01"),
+]
+
+_SOURCE_RE = re.compile(r"\b(?:from|join)\s+\(*\s*(?:`?\w+`?\.)?`?(\w+)`?(?:\s+(?:as\s+)?`?(\w+)`?)?", re.I)
+_NOT_ALIAS = {"where", "on", "join", "left", "right", "inner", "outer", "cross", "straight_join", "natural",
+              "group", "order", "limit", "having", "union", "using", "for", "lock", "window"}
+_COND_RE = re.compile(r"`\w+`\.`(\w+)`\.`(\w+)`\s*(<=>|=|<>|!=|<=|>=|<|>|\bin\b|\bbetween\b|\blike\b)", re.I)
+_ORDER_RE = re.compile(r"\border\s+by\s+(.+?)(?:\blimit\b|\bfor\s+update\b|$)", re.I | re.S)
+_EQ_OPS = {"=", "<=>", "in"}
+
+
+# ---------------- capturing the workload ----------------
+class _RecordingCursor:
+    def __init__(self, cur, log):
+        self._cur = cur
+        self._log = log
+
+    def execute(self, sql, params=()):
+        self._log.append((sql, tuple(params or ())))
+        return self._cur.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class RecordingConnection:
+    """Wraps a connection and records every statement run through its cursors."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.statements = []
+
+    def cursor(self, *args, **kwargs):
+        return _RecordingCursor(self._conn.cursor(*args, **kwargs), self.statements)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def gui_workload(conn, catalog, searches=GUI_SEARCHES):
+    """[(label, sql, params)] for the SELECTs the GUI's code paths issue."""
+    rec = RecordingConnection(conn)
+    out = []
+
+    def capture(label, fn):
+        start = len(rec.statements)
+        fn()
+        for sql, params in rec.statements[start:]:
+            if sql.lstrip().upper().startswith("SELECT") and "information_schema" not in sql:
+                out.append((label, sql, params))
+
+    for name in TABLES_TO_SHOW + VIEWS:
+        meta = catalog.get(conn, name)
+        capture(f"page {name}", lambda: KeysetPager(name, meta.pk, PAGE_SIZE).fetch_first(rec))
+    for table, text in searches:
+        meta = catalog.get(conn, table)
+        where, params = build_where(meta, text)
+        capture(f"search {table}: {text}",
+                lambda: KeysetPager(table, meta.pk, PAGE_SIZE, where, params).fetch_first(rec))
+    capture("audit tail", lambda: AuditTail().poll(rec))
+    for label, sql in EXAMPLE_QUERIES.items():
+        def run(sql=sql):
+            cur = rec.cursor()
+            cur.execute(sql)
+            cur.fetchall()
+            cur.close()
+        capture(label, run)
+    return out
+
+
+def digest_workload(conn, limit=50):
+    """[(label, sql, ())] for the most expensive SELECTs the server has seen in this schema."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT QUERY_SAMPLE_TEXT, COUNT_STAR, SUM_TIMER_WAIT / 1e12
+        FROM performance_schema.events_statements_summary_by_digest
+        WHERE SCHEMA_NAME = DATABASE() AND QUERY_SAMPLE_TEXT LIKE 'SELECT%%'
+          AND QUERY_SAMPLE_TEXT NOT LIKE '%%information_schema%%'
+          AND QUERY_SAMPLE_TEXT NOT LIKE '%%performance_schema%%'
+        ORDER BY SUM_TIMER_WAIT DESC LIMIT %s""", (limit,))
+    rows = cur.fetchall()
+    cur.close()
+    return [(f"digest ({count}x, {total:.1f}s)", sql.decode() if isinstance(sql, bytes) else sql, ())
+            for sql, count, total in rows]
+
+
+# ---------------- plan analysis ----------------
+class TableAccess:
+    def __init__(self, alias, node, sorted_here):
+        self.alias = alias
+        self.access_type = node.get("access_type")
+        self.rows = int(node.get("rows_examined_per_scan") or 0)
+        self.key = node.get("key")
+        self.condition = node.get("attached_condition", "")
+        self.used_columns = node.get("used_columns", [])
+        self.filesort = sorted_here
+        self.table = None       # base table, once the alias is resolved
+
+    @property
+    def full_scan(self):
+        return self.access_type in ("ALL", "index")
+
+
+class Candidate:
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+        self.name = self._name(table, columns)
+        self.reasons = []
+
+    @staticmethod
+    def _name(table, columns):
+        name = "idx_" + table.lower() + "_" + "_".join(c.lower() for c in columns[:3])
+        if len(columns) > 3 or len(name) > 64:
+            # columns dropped or name cut: a hash of the full list keeps two
+            # proposals with the same prefix from sharing a name
+            digest = hashlib.sha1(",".join([table] + list(columns)).lower().encode()).hexdigest()[:8]
+            name = name[:64 - 9] + "_" + digest
+        return name
+
+    @property
+    def create_sql(self):
+        return f"CREATE INDEX {self.name} ON {self.table}({', '.join(self.columns)})"
+
+    @property
+    def drop_sql(self):
+        return f"DROP INDEX {self.name} ON {self.table}"
+
+
+class Report:
+    def __init__(self, label, sql, params):
+        self.label = label
+        self.sql = sql
+        self.params = params
+        self.accesses = []
+        self.filesort = False
+        self.temporary = False
+        self.error = None
+        self.flagged = []       # (TableAccess, Candidate or None, reason)
+
+
+def explain(conn, sql, params=()):
+    cur = conn.cursor()
+    cur.execute("EXPLAIN FORMAT=JSON " + sql, params)
+    doc = cur.fetchone()[0]
+    cur.close()
+    return json.loads(doc)
+
+
+def _walk(node, report, sorted_here=False):
+    if isinstance(node, list):
+        # nested_loop: only the first (driving) table is read in sorted order
+        for i, item in enumerate(node):
+            _walk(item, report, sorted_here and i == 0)
+        return
+    if not isinstance(node, dict):
+        return
+    if node.get("using_filesort"):
+        report.filesort = sorted_here = True
+    if node.get("using_temporary_table"):
+        report.temporary = True
+    if "table_name" in node and "access_type" in node:
+        report.accesses.append(TableAccess(node["table_name"], node, sorted_here))
+        sorted_here = False     # the sort belongs to the first (driving) table only
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            _walk(value, report, sorted_here)
+
+
+def _alias_map(sql, conn, catalog, depth=1):
+    """alias -> base table for `sql`, following view definitions one level down."""
+    out = {}
+    for table, alias in _SOURCE_RE.findall(sql):
+        out[table] = table
+        if alias and alias.lower() not in _NOT_ALIAS:
+            out[alias] = table
+    if depth:
+        for table in set(out.values()):
+            meta = catalog.cached(table)
+            if meta is not None and meta.is_view:
+                cur = conn.cursor()
+                cur.execute("SELECT VIEW_DEFINITION FROM information_schema.VIEWS "
+                            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+                row = cur.fetchone()
+                cur.close()
+                if row:
+                    text = row[0].decode() if isinstance(row[0], bytes) else row[0]
+                    out.update(_alias_map(text, conn, catalog, depth - 1))
+    return out
+
+
+def _order_columns(sql):
+    m = _ORDER_RE.search(sql)
+    if not m:
+        return []
+    cols = []
+    for part in m.group(1).split(","):
+        part = re.sub(r"\s+(asc|desc)\s*$", "", part.strip(), flags=re.I).replace("`", "")
+        cols.append(tuple(part.split(".")[-2:]) if "." in part else (None, part))
+    return cols
+
+
+def propose(access, meta, order_cols):
+    """Index columns for one flagged access, or None if there's nothing to key on."""
+    def indexable(name):
+        col = meta.column(name)
+        return col is not None and col.data_type.lower() not in UNINDEXABLE
+
+    eq, rng = [], []
+    for alias, col, op in _COND_RE.findall(access.condition or ""):
+        if alias != access.alias or not indexable(col):
+            continue
+        (eq if op.lower() in _EQ_OPS else rng).append(col)
+    cols = list(dict.fromkeys(eq))
+    rng = [c for c in dict.fromkeys(rng) if c not in cols]
+    if rng:
+        cols.append(rng[0])
+    if access.filesort:
+        for alias, col in order_cols:
+            if alias in (None, access.alias) and indexable(col) and col not in cols:
+                if rng and col != rng[0]:
+                    break       # an index can't serve a range and a different sort order
+                cols.append(col)
+    # InnoDB secondary indexes already end with the primary key
+    while cols and cols[-1] in meta.pk:
+        cols.pop()
+    if not cols:
+        return None
+    extra = [c for c in access.used_columns if c not in cols and c not in meta.pk]
+    if extra and all(indexable(c) for c in extra) and len(cols) + len(extra) <= MAX_INDEX_COLUMNS:
+        cols += extra
+    return cols
+
+
+def _existing(meta, cols):
+    for ix in meta.indexes.values():
+        if not ix.fulltext and ix.columns[:len(cols)] == cols:
+            return ix.name
+    return None
+
+
+def analyse(conn, catalog, label, sql, params=(), min_rows=MIN_SCAN_ROWS):
+    report = Report(label, sql, params)
+    try:
+        _walk(explain(conn, sql, params), report)
+    except Exception as e:
+        report.error = str(e)
+        return report
+    aliases = _alias_map(sql, conn, catalog)
+    order_cols = _order_columns(sql)
+    for acc in report.accesses:
+        acc.table = aliases.get(acc.alias, acc.alias)
+        if acc.rows < min_rows or not (acc.full_scan or acc.filesort):
+            continue
+        reason = ("full table scan" if acc.access_type == "ALL" else
+                  "full index scan" if acc.access_type == "index" else "filesort")
+        if acc.filesort and acc.full_scan:
+            reason += " + filesort"
+        meta = catalog.cached(acc.table)
+        cand = None
+        if meta is not None and not meta.is_view and not acc.table.startswith("<"):
+            cols = propose(acc, meta, order_cols)
+            have = _existing(meta, cols) if cols else None
+            if have:
+                reason += f" (existing index {have} not chosen)"
+            elif cols:
+                cand = Candidate(acc.table, cols)
+        report.flagged.append((acc, cand, reason))
+    return report
+
+
+def advise(conn, catalog, workload, min_rows=MIN_SCAN_ROWS):
+    """Analyse every (label, sql, params). Returns (reports, candidates deduplicated by table+columns)."""
+    catalog.load(conn)
+    reports = [analyse(conn, catalog, label, sql, params, min_rows) for label, sql, params in workload]
+    candidates = {}
+    for r in reports:
+        for acc, cand, reason in r.flagged:
+            if cand is None:
+                continue
+            cand = candidates.setdefault((cand.table, tuple(cand.columns)), cand)
+            cand.reasons.append(f"{r.label}: {reason} on {acc.alias} (~{acc.rows:,} rows)")
+    return reports, list(candidates.values())
+
+
+def format_report(reports, candidates):
+    lines = []
+    for r in reports:
+        if r.error:
+            lines.append(f"[skip] {r.label}: {r.error}")
+            continue
+        if not r.flagged:
+            continue
+        lines.append(f"[{r.label}]")
+        for acc, cand, reason in r.flagged:
+            lines.append(f"    {acc.table} ({acc.alias}): {reason}, ~{acc.rows:,} rows, key={acc.key or '-'}")
+            if cand:
+                lines.append(f"      -> {cand.create_sql}")
+    if candidates:
+        lines.append("")
+        lines.append(f"{len(candidates)} index(es) proposed:")
+        lines.extend(f"  {c.create_sql};" for c in candidates)
+    else:
+        lines.append("No indexes to propose.")
+    return "\n".join(lines)
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_catalog import SchemaCatalog
+    from srs_pool import checkout
+    from srs_migrate import write_migration
+
+    ap = argparse.ArgumentParser(description="EXPLAIN the GUI's queries and propose indexes.")
+    ap.add_argument("--min-rows", type=int, default=MIN_SCAN_ROWS, help="ignore scans smaller than this")
+    ap.add_argument("--digests", type=int, default=0, metavar="N",
+                    help="also analyse the server's N most expensive SELECTs (performance_schema)")
+    ap.add_argument("--write-migration", action="store_true", help="write proposals as the next migration")
+    ap.add_argument("--name", default="advisor_indexes", help="migration name")
+    args = ap.parse_args(argv)
+
+    conn = checkout("admin", "worker")
+    try:
+        catalog = SchemaCatalog()
+        workload = gui_workload(conn, catalog)
+        if args.digests:
+            workload += digest_workload(conn, args.digests)
+        reports, candidates = advise(conn, catalog, workload, args.min_rows)
+    finally:
+        conn.close()
+    print(format_report(reports, candidates))
+    if args.write_migration and candidates:
+        header = "generated by srs_advisor.py\n\n" + "\n".join(r for c in candidates for r in c.reasons)
+        path = write_migration(args.name, [c.create_sql for c in candidates],
+                               [c.drop_sql for c in reversed(candidates)], header=header)
+        print(f"\nwrote {path}; apply with: python srs_migrate.py up")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
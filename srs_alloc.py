@@ -0,0 +1,144 @@
+# srs_alloc.py
+"""
+Batch resource allocation for SRSMS.
+
+A plan is a list of (MissionID, SupplyID, qty) lines. allocate_batch()
+hands the whole plan to sp_allocate_batch, which locks the affected
+Supplies rows once in ascending SupplyID order, checks their stock and
+commits all lines or none. The debit itself is trg_before_alloc_insert's
+(trigger_sql, part of srsms.sql), for every row whoever inserts it.
+Deadlocks and lock wait timeouts (rare, since all allocators lock in the
+same order) are retried.
+
+allocate_resource() allocates by ResourceID instead: sp_allocate_resource
+splits the quantity across the resource's lots first-expired-first-out
+and hands the resulting plan to sp_allocate_batch, so it locks the same
+way.
+"""
+import json
+import time
+from decimal import Decimal, InvalidOperation
+
+# ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT: the transaction was rolled back, safe to retry
+RETRYABLE_ERRNOS = (1213, 1205)
+RETRIES = 3
+TRIGGER = "trg_before_alloc_insert"
+
+
+class PlanError(ValueError):
+    pass
+
+
+def normalize_plan(plan):
+    """Validate plan lines and return [(mission_id, supply_id, Decimal qty)]."""
+    lines = []
+    for n, line in enumerate(plan, 1):
+        try:
+            mid, sid, qty = line
+            mid, sid, qty = int(mid), int(sid), Decimal(str(qty).strip())
+        except (TypeError, ValueError, InvalidOperation):
+            raise PlanError(f"Line {n}: expected MissionID, SupplyID, quantity; got {line!r}")
+        if qty <= 0:
+            raise PlanError(f"Line {n}: quantity must be positive")
+        lines.append((mid, sid, qty))
+    if not lines:
+        raise PlanError("Allocation plan is empty")
+    return lines
+
+
+def plan_json(lines):
+    # quantities travel as strings so DECIMAL(18,3) never goes through a float
+    return json.dumps([{"mission": m, "supply": s, "qty": str(q)} for m, s, q in lines])
+
+
+def allocate_batch(conn, plan, retries=RETRIES):
+    """Allocate every line of `plan` atomically. Returns the number of lines allocated."""
+    lines = normalize_plan(plan)
+    payload = plan_json(lines)
+    for attempt in range(retries + 1):
+        cur = conn.cursor()
+        try:
+            cur.callproc("sp_allocate_batch", [payload])
+            conn.commit()
+            return len(lines)
+        except Exception as e:
+            conn.rollback()
+            if getattr(e, "errno", None) not in RETRYABLE_ERRNOS or attempt == retries:
+                raise
+            time.sleep(0.01 * 2 ** attempt)
+        finally:
+            cur.close()
+
+
+def allocate_resource(conn, mission_id, resource_id, qty, retries=RETRIES):
+    """
+    Allocate `qty` of a resource to a mission from its soonest-expiring
+    lots. Returns the [(SupplyID, Decimal qty)] lines it was split into.
+    """
+    try:
+        qty = Decimal(str(qty).strip())
+    except InvalidOperation:
+        raise PlanError(f"Not a quantity: {qty!r}")
+    if qty <= 0:
+        raise PlanError("Quantity must be positive")
+    for attempt in range(retries + 1):
+        cur = conn.cursor()
+        try:
+            cur.callproc("sp_allocate_resource", [int(mission_id), int(resource_id), qty])
+            lines = [tuple(r) for res in cur.stored_results() for r in res.fetchall()]
+            conn.commit()
+            return lines
+        except Exception as e:
+            conn.rollback()
+            if getattr(e, "errno", None) not in RETRYABLE_ERRNOS or attempt == retries:
+                raise
+            time.sleep(0.01 * 2 ** attempt)
+        finally:
+            cur.close()
+
+
+# ---------------- trigger ----------------
+def trigger_sql():
+    """CREATE TRIGGER statement (no DELIMITER) checking and debiting stock for every allocation."""
+    return f"""CREATE TRIGGER {TRIGGER}
+BEFORE INSERT ON ResourceAllocations
+FOR EACH ROW
+BEGIN
+  DECLARE cur_qty DECIMAL(18,3);
+  -- every insert is debited here, so ResourceAllocations never outruns stock
+  SELECT Quantity INTO cur_qty FROM Supplies WHERE SupplyID = NEW.SupplyID FOR UPDATE;
+  IF cur_qty IS NULL THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Supply not found (trigger)';
+  END IF;
+  IF cur_qty < NEW.QuantityAllocated THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Not enough supply (trigger)';
+  END IF;
+  UPDATE Supplies SET Quantity = Quantity - NEW.QuantityAllocated WHERE SupplyID = NEW.SupplyID;
+END"""
+
+
+def uninstall(conn):
+    cur = conn.cursor()
+    cur.execute(f"DROP TRIGGER IF EXISTS {TRIGGER}")
+    cur.close()
+
+
+def install(conn, catalog=None):
+    uninstall(conn)
+    sql = trigger_sql()
+    cur = conn.cursor()
+    cur.execute(sql)
+    cur.close()
+    if catalog is not None:
+        catalog.note_statement(sql)
+
+
+def parse_plan_text(text):
+    """'mission, supply, qty' per line (commas or whitespace); blank lines and # comments skipped."""
+    plan = []
+    for raw in text.splitlines():
+        raw = raw.split("#", 1)[0].strip()
+        if not raw or (not plan and not raw[0].isdigit()):
+            continue    # blank, or a CSV header line
+        plan.append(tuple(raw.replace(",", " ").split()))
+    return normalize_plan(plan)
@@ -0,0 +1,496 @@
+# srs_api.py
+"""
+HTTP/JSON API for SRSMS, on top of srs_service.
+
+  python srs_api.py --port 8080
+
+Requests authenticate with HTTP Basic using a role's MySQL account (see
+srs_config.ROLE_CREDENTIALS) and run as that role. Service calls go
+through one QueryExecutor per role drawing from the role's "api"
+connection pool, so the event loop never waits on MySQL, queries get the
+same MAX_EXECUTION_TIME limit as in the GUI and a client that hangs up
+has its running query killed. Reads are cached per role (srs_cache.py);
+writes through the API invalidate for every role, and AuditLog is polled
+for writes made elsewhere.
+
+  GET    /tables                                table and view names
+  GET    /tables/{table}?search=&after=&limit=  one page; pass "next" back as after
+  GET    /tables/{table}/stream?search=         every matching row, as NDJSON
+  POST   /tables/{table}                        {column: value, ...}
+  PATCH  /tables/{table}                        {"key": {...}, "values": {...}}
+  DELETE /tables/{table}                        {"key": {...}}
+  GET    /queries                               example query names
+  GET    /queries/{name}                        run an example query
+  POST   /select                                {"sql": "SELECT ..."}
+  POST   /allocate                              {"mission": 1, "supply": 3, "qty": "2.5"}
+  POST   /allocate/batch                        {"plan": [[mission, supply, qty], ...]}
+  POST   /allocate/resource                     {"mission": 1, "resource": 2, "qty": "40"}; FEFO across lots
+  POST   /experiments                           sp_create_experiment arguments
+  GET    /missions/{id}/duration                fn_mission_duration
+  GET    /supplies/{id}/remaining               fn_remaining_supply
+  GET    /missions/durations?search=&ids=1,2    fn_mission_duration for many missions, one query
+  GET    /supplies/remaining?search=&ids=       fn_remaining_supply for many supplies, one query
+  GET    /schedules/conflicts?astronaut=        double bookings (all, or one astronaut's)
+  POST   /schedules/check                       {"astronaut": 7, "start": "...", "end": "...", "schedule": null}
+  GET    /telemetry?modules=1,2&start=&end=     downsampled life-support series + breaches
+  GET    /forecast?all=0                        the stored reorder list, most urgent first
+  GET    /forecast/supplies?resource=           each supply's projected start / depletion
+  POST   /forecast/refresh                      {"force": false}; recompute if stale
+  GET    /health                                pool and cache statistics (no login)
+  GET    /metrics                               query profile, Prometheus text format (no login)
+
+A stream is one JSON document per line: {"columns": [...]}, then one array
+per row, then {"rows": n} - or {"error": "..."} if the query fails midway.
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import datetime
+import hmac
+import json
+import sys
+import threading
+from decimal import Decimal
+from functools import partial
+
+from aiohttp import web
+from mysql.connector import Error as MySQLError
+from mysql.connector.errors import PoolError
+
+from srs_config import (API_HOST, API_PORT, ROLE_CREDENTIALS, POOL_SIZES, CACHE_AUDIT_POLL_SECONDS,
+                        TELEMETRY_CHART_POINTS)
+from srs_pool import checkout, pool_stats
+from srs_profile import PROFILER
+from srs_executor import QueryExecutor, QueryCancelled
+from srs_paging import PAGE_SIZE
+from srs_service import StationService, ServiceError, NotFound, EXAMPLE_QUERIES, STREAM_CHUNK_ROWS
+from srs_cache import QueryCache, AuditWatcher
+
+API_WORKERS = POOL_SIZES["api"]
+STREAM_BUFFER_CHUNKS = 4        # chunks a stream may run ahead of a slow client
+REALM = "SRSMS"
+
+# MySQL errors that are the caller's fault rather than the server's
+DENIED_ERRNOS = (1044, 1142, 1143, 1227, 1370)
+CONFLICT_ERRNOS = (1062, 1451, 1452, 1644)      # duplicate key, FK, SIGNAL from a trigger/procedure
+TIMEOUT_ERRNOS = (3024,)                        # MAX_EXECUTION_TIME exceeded
+
+
+def _json_default(v):
+    if isinstance(v, Decimal):
+        return str(v)       # keep DECIMAL precision; clients parse as they need
+    if isinstance(v, (datetime.date, datetime.datetime, datetime.time)):
+        return v.isoformat()
+    if isinstance(v, (bytes, bytearray)):
+        return v.decode("utf-8", "replace")
+    if isinstance(v, datetime.timedelta):       # TIME columns
+        return str(v)
+    if isinstance(v, set):                      # SET columns
+        return sorted(v)
+    raise TypeError(f"{type(v).__name__} is not JSON serializable")
+
+
+dumps = partial(json.dumps, default=_json_default)
+
+
+def _reply(data, status=200):
+    return web.json_response(data, status=status, dumps=dumps)
+
+
+def _frame(frame):
+    """A DataFrame as {"columns", "rows"} of plain Python values (NaN as null)."""
+    return {"columns": list(frame.columns),
+            "rows": frame.astype(object).where(frame.notna(), None).values.tolist()}
+
+
+def _status_for(e):
+    if isinstance(e, NotFound):
+        return 404
+    if isinstance(e, ValueError):       # ServiceError, SearchError, PlanError
+        return 400
+    if isinstance(e, PoolError):
+        return 503
+    if isinstance(e, MySQLError):
+        if e.errno in DENIED_ERRNOS:
+            return 403
+        if e.errno in CONFLICT_ERRNOS or e.sqlstate == "45000":
+            return 409
+        if e.errno in TIMEOUT_ERRNOS:
+            return 504
+    return 500
+
+
+def _role_for(header):
+    """The role whose MySQL account matches an Authorization: Basic header, else None."""
+    if not header or not header.startswith("Basic "):
+        return None
+    try:
+        user, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    for role, creds in ROLE_CREDENTIALS.items():
+        if (hmac.compare_digest(user, creds["user"])
+                and hmac.compare_digest(password.encode(), creds["password"].encode())):
+            return role
+    return None
+
+
+class ApiServer:
+    def __init__(self, service=None, workers=API_WORKERS):
+        self.service = service or StationService(cache=QueryCache())
+        self.workers = workers
+        self._executors = {}
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def svc(self, request):
+        """The service for the caller's role: shared catalog and cache, own cache scope."""
+        role = request["role"]
+        with self._lock:
+            svc = self._services.get(role)
+            if svc is None:
+                svc = self._services[role] = self.service.for_scope(role)
+            return svc
+
+    def executor(self, role):
+        with self._lock:
+            ex = self._executors.get(role)
+            if ex is None:
+                ex = self._executors[role] = QueryExecutor(
+                    lambda: checkout(role, "api"), workers=self.workers,
+                    control_connect=lambda: checkout(role, "ui"))
+            return ex
+
+    async def run(self, request, fn, *args, description="api", timeout_ms=None):
+        """fn(conn, *args) on the caller's role executor, awaited without blocking the loop."""
+        handle = self.executor(request["role"]).submit(lambda conn: fn(conn, *args), description, timeout_ms)
+        try:
+            return await asyncio.wrap_future(handle.future)
+        except asyncio.CancelledError:
+            # the client went away: stop the query on the server too
+            handle.cancel()
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            for ex in self._executors.values():
+                ex.shutdown()
+            self._executors.clear()
+
+    # ---------------- middleware ----------------
+    @web.middleware
+    async def auth(self, request, handler):
+        # fingerprints carry no values, so the profile is as public as /health
+        if request.path in ("/health", "/metrics"):
+            return await handler(request)
+        role = _role_for(request.headers.get("Authorization"))
+        if role is None:
+            return web.json_response({"error": "login required"}, status=401,
+                                     headers={"WWW-Authenticate": f'Basic realm="{REALM}"'})
+        request["role"] = role
+        return await handler(request)
+
+    @web.middleware
+    async def errors(self, request, handler):
+        try:
+            return await handler(request)
+        except web.HTTPException:
+            raise
+        except QueryCancelled:
+            return _reply({"error": "query cancelled"}, 503)
+        except Exception as e:
+            return _reply({"error": str(e)}, _status_for(e))
+
+    # ---------------- helpers ----------------
+    @staticmethod
+    async def _body(request):
+        try:
+            body = await request.json()
+        except ValueError:
+            raise ServiceError("request body must be JSON")
+        if not isinstance(body, dict):
+            raise ServiceError("request body must be a JSON object")
+        return body
+
+    @staticmethod
+    def _after(request):
+        raw = request.query.get("after")
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ServiceError("after must be the JSON 'next' value of the previous page")
+
+    # ---------------- handlers ----------------
+    async def health(self, _request):
+        cache = self.service.cache.stats() if self.service.cache is not None else None
+        return _reply({"status": "ok", "pools": pool_stats(), "cache": cache})
+
+    async def metrics(self, _request):
+        return web.Response(body=PROFILER.prometheus().encode(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def tables(self, request):
+        return _reply({"tables": await self.run(request, self.svc(request).tables, description="tables")})
+
+    async def page(self, request):
+        table = request.match_info["table"]
+        try:
+            limit = int(request.query.get("limit", PAGE_SIZE))
+        except ValueError:
+            raise ServiceError("limit must be an integer")
+        res = await self.run(request, self.svc(request).page, table, request.query.get("search", ""),
+                             self._after(request), limit, description=f"page {table}")
+        return _reply(res)
+
+    async def stream(self, request):
+        """NDJSON straight off an unbuffered cursor, with back-pressure from the client."""
+        table = request.match_info["table"]
+        search = request.query.get("search", "")
+        loop = asyncio.get_running_loop()
+        out = asyncio.Queue()
+        slots = threading.Semaphore(STREAM_BUFFER_CHUNKS)
+        stop = threading.Event()
+
+        def emit(item):
+            # worker thread: wait for the client to catch up, unless it has gone
+            while not slots.acquire(timeout=0.5):
+                if stop.is_set():
+                    raise QueryCancelled(f"stream {table}")
+            loop.call_soon_threadsafe(out.put_nowait, item)
+
+        def work(conn):
+            rows = self.svc(request).stream_table(conn, table, search, STREAM_CHUNK_ROWS)
+            try:
+                emit((dumps({"columns": rows.columns}) + "\n").encode())
+                for chunk in rows:
+                    if stop.is_set():
+                        raise QueryCancelled(f"stream {table}")
+                    emit("".join(dumps(r) + "\n" for r in chunk).encode())
+                return rows.rows
+            finally:
+                rows.close()
+
+        def finished(_f):
+            loop.call_soon_threadsafe(out.put_nowait, None)
+
+        handle = self.executor(request["role"]).submit(work, f"stream {table}", timeout_ms=0)
+        handle.future.add_done_callback(finished)
+        resp = None
+        try:
+            while True:
+                item = await out.get()
+                if item is None:
+                    break
+                slots.release()
+                if resp is None:
+                    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+                    resp.enable_chunked_encoding()
+                    await resp.prepare(request)
+                await resp.write(item)
+            err = handle.future.exception()
+            if resp is None:
+                # failed before the header line: a normal error response
+                raise err
+            await resp.write((dumps({"error": str(err)} if err else {"rows": handle.future.result()})
+                              + "\n").encode())
+            await resp.write_eof()
+            return resp
+        except (asyncio.CancelledError, ConnectionResetError):
+            stop.set()
+            handle.cancel()
+            raise
+
+    async def insert(self, request):
+        table = request.match_info["table"]
+        body = await self._body(request)
+        new_id = await self.run(request, self.svc(request).insert_row, table, body, description=f"insert {table}")
+        return _reply({"id": new_id}, 201)
+
+    async def update(self, request):
+        table = request.match_info["table"]
+        body = await self._body(request)
+        n = await self.run(request, self.svc(request).update_row, table, body.get("key") or {},
+                           body.get("values") or {}, description=f"update {table}")
+        return _reply({"updated": n})
+
+    async def delete(self, request):
+        table = request.match_info["table"]
+        body = await self._body(request)
+        n = await self.run(request, self.svc(request).delete_row, table, body.get("key") or {},
+                           description=f"delete {table}")
+        return _reply({"deleted": n})
+
+    async def queries(self, _request):
+        return _reply({"queries": list(EXAMPLE_QUERIES)})
+
+    async def example(self, request):
+        name = request.match_info["name"]
+        cols, rows = await self.run(request, self.svc(request).example, name, description=name)
+        return _reply({"columns": cols, "rows": rows})
+
+    async def select(self, request):
+        body = await self._body(request)
+        cols, rows = await self.run(request, self.svc(request).select, body.get("sql", ""), description="select")
+        return _reply({"columns": cols, "rows": rows})
+
+    async def allocate(self, request):
+        b = await self._body(request)
+        await self.run(request, self.svc(request).allocate_supply, b.get("mission"), b.get("supply"), b.get("qty"),
+                       description="sp_allocate_supply")
+        return _reply({"allocated": 1})
+
+    async def allocate_batch(self, request):
+        plan = (await self._body(request)).get("plan") or []
+        n = await self.run(request, self.svc(request).allocate_batch, plan, description="sp_allocate_batch")
+        return _reply({"allocated": n})
+
+    async def allocate_resource(self, request):
+        b = await self._body(request)
+        lines = await self.run(request, self.svc(request).allocate_resource, b.get("mission"), b.get("resource"),
+                               b.get("qty"), description="sp_allocate_resource")
+        return _reply({"allocated": len(lines), "lines": [{"supply": s, "qty": q} for s, q in lines]})
+
+    async def create_experiment(self, request):
+        b = await self._body(request)
+        new_id = await self.run(request, self.svc(request).create_experiment, b.get("mission"), b.get("title"),
+                                b.get("objective"), b.get("category"), b.get("module"), b.get("lead_astronaut"),
+                                description="sp_create_experiment")
+        return _reply({"id": new_id}, 201)
+
+    async def mission_duration(self, request):
+        mid = request.match_info["id"]
+        days = await self.run(request, self.svc(request).mission_duration, mid, description="fn_mission_duration")
+        return _reply({"mission": int(mid), "days": days})
+
+    async def remaining_supply(self, request):
+        sid = request.match_info["id"]
+        qty = await self.run(request, self.svc(request).remaining_supply, sid, description="fn_remaining_supply")
+        return _reply({"supply": int(sid), "remaining": qty})
+
+    async def mission_durations(self, request):
+        return await self._bulk(request, self.svc(request).mission_durations, "fn_mission_duration")
+
+    async def remaining_supplies(self, request):
+        return await self._bulk(request, self.svc(request).remaining_supplies, "fn_remaining_supply")
+
+    async def _bulk(self, request, fn, description):
+        q = request.query
+        ids = [i for i in q["ids"].split(",") if i.strip()] if "ids" in q else None
+        cols, rows = await self.run(request, fn, q.get("search", ""), ids, description=description)
+        return _reply({"columns": cols, "rows": rows})
+
+    async def schedule_conflicts(self, request):
+        cols, rows = await self.run(request, self.svc(request).schedule_conflicts, request.query.get("astronaut"),
+                                    description="schedule conflicts")
+        return _reply({"columns": cols, "rows": rows})
+
+    async def check_schedule(self, request):
+        b = await self._body(request)
+        cols, rows = await self.run(request, self.svc(request).check_schedule, b.get("astronaut"), b.get("start"),
+                                    b.get("end"), b.get("schedule"), description="schedule check")
+        return _reply({"fits": not rows, "columns": cols, "rows": rows})
+
+    async def telemetry(self, request):
+        q = request.query
+        modules = [m for m in q.get("modules", "").split(",") if m.strip()]
+        end = q.get("end") or datetime.datetime.now()
+        start = q.get("start") or datetime.datetime.now() - datetime.timedelta(days=1)
+        frame, resolution, breaches = await self.run(
+            request, self.svc(request).telemetry, modules, start, end, q.get("points", TELEMETRY_CHART_POINTS),
+            description="telemetry")
+        return _reply({"resolution": resolution, "series": _frame(frame), "breaches": _frame(breaches)})
+
+    async def forecast(self, request):
+        due_only = request.query.get("all", "0").lower() in ("", "0", "false", "no")
+        cols, rows, run = await self.run(request, self.svc(request).reorder_plan, due_only,
+                                         description="reorder plan")
+        return _reply({"run": run, "columns": cols, "rows": rows})
+
+    async def forecast_supplies(self, request):
+        cols, rows = await self.run(request, self.svc(request).supply_outlook, request.query.get("resource"),
+                                    description="supply outlook")
+        return _reply({"columns": cols, "rows": rows})
+
+    async def refresh_forecast(self, request):
+        b = await self._body(request)
+        recomputed, run = await self.run(request, self.svc(request).refresh_forecast, bool(b.get("force")),
+                                         description="forecast refresh")
+        return _reply({"recomputed": recomputed, "run": run})
+
+    # ---------------- app ----------------
+    def app(self):
+        app = web.Application(middlewares=[self.errors, self.auth])
+        app.add_routes([
+            web.get("/health", self.health),
+            web.get("/metrics", self.metrics),
+            web.get("/tables", self.tables),
+            web.get("/tables/{table}", self.page),
+            web.get("/tables/{table}/stream", self.stream),
+            web.post("/tables/{table}", self.insert),
+            web.patch("/tables/{table}", self.update),
+            web.delete("/tables/{table}", self.delete),
+            web.get("/queries", self.queries),
+            web.get("/queries/{name}", self.example),
+            web.post("/select", self.select),
+            web.post("/allocate", self.allocate),
+            web.post("/allocate/batch", self.allocate_batch),
+            web.post("/allocate/resource", self.allocate_resource),
+            web.post("/experiments", self.create_experiment),
+            web.get(r"/missions/{id:\d+}/duration", self.mission_duration),
+            web.get(r"/supplies/{id:\d+}/remaining", self.remaining_supply),
+            web.get("/missions/durations", self.mission_durations),
+            web.get("/supplies/remaining", self.remaining_supplies),
+            web.get("/schedules/conflicts", self.schedule_conflicts),
+            web.post("/schedules/check", self.check_schedule),
+            web.get("/telemetry", self.telemetry),
+            web.get("/forecast", self.forecast),
+            web.get("/forecast/supplies", self.forecast_supplies),
+            web.post("/forecast/refresh", self.refresh_forecast),
+        ])
+
+        async def watch(_app):
+            # the full catalog first: cache invalidation follows its foreign keys
+            admin = self.executor("admin")
+            try:
+                await asyncio.wrap_future(admin.submit(self.service.catalog.load, "catalog").future)
+            except Exception:
+                pass        # loaded table by table on demand instead
+            if self.service.cache is None or not CACHE_AUDIT_POLL_SECONDS:
+                return
+            # other clients' writes, seen through AuditLog (admin can read it)
+            watcher = AuditWatcher(self.service.cache, self.service.catalog)
+            while True:
+                try:
+                    await asyncio.wrap_future(admin.submit(watcher.poll, "cache watch").future)
+                except Exception:
+                    pass        # try again next round; the TTL still bounds staleness
+                await asyncio.sleep(CACHE_AUDIT_POLL_SECONDS)
+
+        async def start(app):
+            app["cache_watch"] = asyncio.create_task(watch(app))
+
+        async def close(app):
+            app["cache_watch"].cancel()
+            self.shutdown()
+        app.on_startup.append(start)
+        app.on_cleanup.append(close)
+        return app
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--host", default=API_HOST)
+    ap.add_argument("--port", type=int, default=API_PORT)
+    ap.add_argument("--workers", type=int, default=API_WORKERS,
+                    help="query workers per role (keep <= POOL_SIZES['api'])")
+    args = ap.parse_args(argv)
+    web.run_app(ApiServer(workers=args.workers).app(), host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# srs_audit.py
+"""
+Incremental AuditLog tail for SRSMS ("tail -f" for the audit panel).
+
+The first read takes the newest rows by primary key; every later poll only
+asks for `AuditID > last seen`, an index range scan that returns nothing
+at all when the log is quiet. Rows are kept in a bounded ring buffer, so a
+busy log never grows the panel past `capacity` rows.
+"""
+from collections import deque
+
+from srs_config import AUDIT_BUFFER_ROWS
+
+AUDIT_COLUMNS = ['AuditID', 'TableName', 'Operation', 'KeyData', 'NewRow', 'ChangedAt']
+
+
+class AuditTail:
+    def __init__(self, capacity=AUDIT_BUFFER_ROWS, table=None):
+        self.capacity = capacity
+        self.table = table or None      # only this TableName (a range of idx_audit_table_id)
+        self.rows = deque(maxlen=capacity)
+        self.last_id = None
+
+    def _select(self, conn, where, params, order, limit):
+        cols = ", ".join(f"`{c}`" for c in AUDIT_COLUMNS)
+        if self.table:
+            where = f"TableName = %s AND ({where})" if where else "TableName = %s"
+            params = (self.table,) + tuple(params)
+        sql = f"SELECT {cols} FROM AuditLog{' WHERE ' + where if where else ''} ORDER BY AuditID {order} LIMIT {int(limit)}"
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+
+    def _prime(self, conn):
+        rows = self._select(conn, "", (), "DESC", self.capacity)
+        rows.reverse()
+        self.rows.clear()
+        self.rows.extend(rows)
+        self.last_id = rows[-1][0] if rows else 0
+        return rows
+
+    def poll(self, conn):
+        """
+        Fetch rows newer than the last poll. Returns (new_rows, reset): when
+        reset is True the buffer was reloaded from scratch (first poll, or
+        more than `capacity` rows arrived since the last one) and callers
+        should redraw everything from `rows`; otherwise new_rows, oldest
+        first, are just appended.
+        """
+        if self.last_id is None:
+            return self._prime(conn), True
+        rows = self._select(conn, "AuditID > %s", (self.last_id,), "ASC", self.capacity)
+        if len(rows) >= self.capacity:
+            # fell too far behind to be worth replaying; jump to the newest rows
+            return self._prime(conn), True
+        if rows:
+            self.rows.extend(rows)
+            self.last_id = rows[-1][0]
+        return rows, False
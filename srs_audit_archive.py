@@ -0,0 +1,392 @@
+# srs_audit_archive.py
+"""
+AuditLog retention for SRSMS: monthly partitions, archive, combined search.
+
+AuditLog is RANGE-partitioned by month on ChangedAt (see srsms.sql). The
+retention job keeps AUDIT_RETENTION_MONTHS months in MySQL. Each older
+month is streamed to a compressed JSONL or Parquet file in
+AUDIT_ARCHIVE_DIR, verified by row count, and then removed with
+`ALTER TABLE ... DROP PARTITION`, a metadata-only operation, not a
+row-by-row DELETE. The job also creates partitions for the coming months.
+
+search_audit() answers one query over the live table and the archive
+files (via archive_dir/manifest.json), so the GUI does not care where a
+row currently lives.
+
+The partition helpers take the table as an argument; srs_telemetry.py
+uses them for LifeSupportReadings, which is partitioned the same way.
+
+Nightly, from cron:
+  python srs_audit_archive.py                    # archive as .jsonl.gz
+  python srs_audit_archive.py --format parquet --keep-months 6
+  python srs_audit_archive.py --drop-only        # expire without archiving
+  python srs_audit_archive.py --init             # partition an existing AuditLog once
+"""
+import argparse
+import gzip
+import heapq
+import json
+import os
+import shlex
+import sys
+from datetime import date, datetime, timedelta
+
+from srs_config import (AUDIT_ARCHIVE_DIR, AUDIT_BUFFER_ROWS, AUDIT_PARTITIONS_AHEAD,
+                        AUDIT_RETENTION_MONTHS)
+from srs_export import export_query
+from srs_search import LIKE_ESCAPE, SearchError, like_literal
+
+ARCHIVE_FORMATS = {"jsonl": ".jsonl.gz", "parquet": ".parquet"}
+MANIFEST = "manifest.json"
+SEARCH_COLUMNS = ['AuditID', 'TableName', 'Operation', 'KeyData', 'OldRow', 'NewRow', 'ChangedAt']
+
+
+class ArchiveError(Exception):
+    pass
+
+
+# ---------------- months & partitions ----------------
+def month_start(d):
+    return date(d.year, d.month, 1)
+
+
+def add_months(d, n):
+    y, m = divmod(d.year * 12 + d.month - 1 + n, 12)
+    return date(y, m + 1, 1)
+
+
+def partition_name(month):
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+class Partition:
+    def __init__(self, name, upper, rows):
+        self.name = name
+        self.upper = upper      # exclusive upper bound (date), None for MAXVALUE
+        self.rows = rows        # InnoDB estimate, for display only
+
+
+def list_partitions(conn, table="AuditLog"):
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY PARTITION_ORDINAL_POSITION""", (table,))
+    rows = cur.fetchall()
+    cur.close()
+    parts = []
+    for name, desc, nrows in rows:
+        if name is None:
+            raise ArchiveError(f"{table} is not partitioned yet; run srs_audit_archive.py --init once"
+                               if table == "AuditLog" else f"{table} is not partitioned")
+        desc = desc.decode() if isinstance(desc, (bytes, bytearray)) else desc
+        upper = None if desc.upper() == "MAXVALUE" else date.fromisoformat(desc.strip("'")[:10])
+        parts.append(Partition(name.decode() if isinstance(name, bytes) else name, upper, nrows))
+    return parts
+
+
+def _partition_defs(first, last):
+    """PARTITION clauses for months first..last (inclusive) followed by pmax."""
+    defs, m = [], first
+    while m <= last:
+        defs.append(f"PARTITION {partition_name(m)} VALUES LESS THAN ('{add_months(m, 1).isoformat()}')")
+        m = add_months(m, 1)
+    defs.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return ", ".join(defs)
+
+
+def _ddl(cur, sql, catalog):
+    cur.execute(sql)
+    if catalog is not None:
+        catalog.note_statement(sql)
+
+
+def init_partitions(conn, ahead=AUDIT_PARTITIONS_AHEAD, today=None, catalog=None):
+    """One-off: partition an AuditLog created before partitioning (rebuilds the table)."""
+    today = today or date.today()
+    cur = conn.cursor()
+    cur.execute("SELECT MIN(ChangedAt) FROM AuditLog")
+    oldest = cur.fetchone()[0]
+    first = month_start(oldest.date() if oldest else today)
+    last = add_months(month_start(today), ahead)
+    cur.execute("UPDATE AuditLog SET ChangedAt = NOW() WHERE ChangedAt IS NULL")
+    _ddl(cur, "ALTER TABLE AuditLog MODIFY ChangedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+              "DROP PRIMARY KEY, ADD PRIMARY KEY (AuditID, ChangedAt)", catalog)
+    _ddl(cur, f"ALTER TABLE AuditLog PARTITION BY RANGE COLUMNS (ChangedAt) ({_partition_defs(first, last)})",
+         catalog)
+    cur.close()
+
+
+def ensure_partitions(conn, ahead=AUDIT_PARTITIONS_AHEAD, today=None, table="AuditLog", catalog=None):
+    """Split pmax so every month up to `ahead` months from now has its own partition."""
+    today = today or date.today()
+    parts = list_partitions(conn, table)
+    if not parts:
+        raise ArchiveError(f"{table} does not exist")
+    bounded = [p for p in parts if p.upper]
+    target = add_months(month_start(today), ahead)
+    first = bounded[-1].upper if bounded else month_start(today)
+    if first > target:
+        return []
+    cur = conn.cursor()
+    # pmax holds every row dated past the last bound. Kept ahead of the clock
+    # (srs_migrate.py up, the nightly job) it is empty and this is metadata
+    # only; otherwise those rows are copied into the new months here.
+    _ddl(cur, f"ALTER TABLE `{table}` REORGANIZE PARTITION pmax INTO ({_partition_defs(first, target)})", catalog)
+    cur.close()
+    created, m = [], first
+    while m <= target:
+        created.append(partition_name(m))
+        m = add_months(m, 1)
+    return created
+
+
+def expired_partitions(conn, keep_months=AUDIT_RETENTION_MONTHS, today=None, table="AuditLog"):
+    cutoff = add_months(month_start(today or date.today()), -keep_months)
+    bounded = [p for p in list_partitions(conn, table) if p.upper]
+    # RANGE needs at least one partition below pmax: never drop the newest bounded one
+    return [p for p in bounded[:-1] if p.upper <= cutoff]
+
+
+# ---------------- manifest ----------------
+def load_manifest(archive_dir):
+    path = os.path.join(archive_dir, MANIFEST)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("files", [])
+
+
+def _save_manifest(archive_dir, entries):
+    path = os.path.join(archive_dir, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"files": sorted(entries, key=lambda e: e["from"])}, f, indent=1)
+    os.replace(tmp, path)
+
+
+# ---------------- retention ----------------
+def archive_partition(conn, part, archive_dir=AUDIT_ARCHIVE_DIR, fmt="jsonl"):
+    """Write one partition to archive_dir and record it in the manifest. Returns rows written."""
+    os.makedirs(archive_dir, exist_ok=True)
+    cur = conn.cursor()
+    cur.execute(f"SELECT COUNT(*), MIN(AuditID), MAX(AuditID), MIN(ChangedAt) FROM AuditLog PARTITION ({part.name})")
+    count, min_id, max_id, oldest = cur.fetchone()
+    cur.close()
+    if not count:
+        return 0
+    fname = f"AuditLog_{part.name}{ARCHIVE_FORMATS[fmt]}"
+    path = os.path.join(archive_dir, fname)
+    written = export_query(conn, f"SELECT * FROM AuditLog PARTITION ({part.name}) ORDER BY AuditID", (), path,
+                           "jsonl.gz" if fmt == "jsonl" else fmt)
+    if written != count:
+        os.remove(path)
+        raise ArchiveError(f"{part.name}: wrote {written} rows but the partition has {count}; kept in MySQL")
+    entries = [e for e in load_manifest(archive_dir) if e["partition"] != part.name]
+    entries.append({"partition": part.name, "file": fname, "format": fmt, "rows": count,
+                    "from": oldest.isoformat(), "to": part.upper.isoformat(),
+                    "min_id": min_id, "max_id": max_id, "archived_at": datetime.now().isoformat(timespec="seconds")})
+    _save_manifest(archive_dir, entries)
+    return count
+
+
+def drop_partition(conn, part, table="AuditLog", catalog=None):
+    cur = conn.cursor()
+    _ddl(cur, f"ALTER TABLE `{table}` DROP PARTITION {part.name}", catalog)
+    cur.close()
+
+
+def apply_retention(conn, keep_months=AUDIT_RETENTION_MONTHS, archive_dir=AUDIT_ARCHIVE_DIR, fmt="jsonl",
+                    drop_only=False, dry_run=False, ahead=AUDIT_PARTITIONS_AHEAD, log=print, catalog=None):
+    created = [] if dry_run else ensure_partitions(conn, ahead, catalog=catalog)
+    if created:
+        log(f"created partitions: {', '.join(created)}")
+    for part in expired_partitions(conn, keep_months):
+        if dry_run:
+            log(f"would {'drop' if drop_only else 'archive and drop'} {part.name} (~{part.rows} rows)")
+            continue
+        n = 0 if drop_only else archive_partition(conn, part, archive_dir, fmt)
+        drop_partition(conn, part, catalog=catalog)
+        log(f"{part.name}: {'dropped' if drop_only else f'archived {n:,} rows and dropped'}")
+
+
+# ---------------- combined search ----------------
+class AuditQuery:
+    """table:Supplies op:UPDATE since:2025-01-01 until:2025-03-31 id:42 free words"""
+
+    def __init__(self, text):
+        self.table = self.op = self.since = self.until = self.audit_id = None
+        self.words = []
+        try:
+            tokens = shlex.split(text or "")
+        except ValueError as e:
+            raise SearchError(str(e))
+        for tok in tokens:
+            key, sep, val = tok.partition(":")
+            key = key.lower()
+            try:
+                if sep and key == "table":
+                    self.table = val
+                elif sep and key == "op":
+                    self.op = val.upper()
+                elif sep and key == "since":
+                    self.since = datetime.fromisoformat(val)
+                elif sep and key == "until":
+                    # a bare date means the whole day
+                    u = datetime.fromisoformat(val)
+                    self.until = u + timedelta(days=1) if len(val) == 10 else u
+                elif sep and key == "id":
+                    self.audit_id = int(val)
+                else:
+                    self.words.append(tok.lower())
+            except ValueError:
+                raise SearchError(f"Bad value in '{tok}'")
+
+    def live_sql(self, limit):
+        parts, params = [], []
+        if self.table:
+            parts.append("TableName = %s")
+            params.append(self.table)
+        if self.op:
+            parts.append("Operation = %s")
+            params.append(self.op)
+        if self.since:
+            parts.append("ChangedAt >= %s")
+            params.append(self.since)
+        if self.until:
+            parts.append("ChangedAt < %s")
+            params.append(self.until)
+        if self.audit_id is not None:
+            parts.append("AuditID = %s")
+            params.append(self.audit_id)
+        for w in self.words:
+            pattern = "%" + like_literal(w) + "%"
+            parts.append("(" + " OR ".join(f"{expr} LIKE %s {LIKE_ESCAPE}" for expr in
+                                           ("LOWER(KeyData)", "LOWER(CAST(OldRow AS CHAR))",
+                                            "LOWER(CAST(NewRow AS CHAR))")) + ")")
+            params.extend([pattern] * 3)
+        cols = ", ".join(SEARCH_COLUMNS)
+        where = (" WHERE " + " AND ".join(parts)) if parts else ""
+        # the ChangedAt range lets MySQL prune partitions
+        return f"SELECT {cols} FROM AuditLog{where} ORDER BY ChangedAt DESC, AuditID DESC LIMIT {int(limit)}", params
+
+    def overlaps(self, entry):
+        lo = datetime.fromisoformat(entry["from"])
+        hi = datetime.fromisoformat(entry["to"])
+        if self.since and hi <= self.since:
+            return False
+        if self.until and lo >= self.until:
+            return False
+        if self.audit_id is not None and not (entry["min_id"] <= self.audit_id <= entry["max_id"]):
+            return False
+        return True
+
+    def matches(self, row):
+        if self.table and row["TableName"] != self.table:
+            return False
+        if self.op and (row["Operation"] or "").upper() != self.op:
+            return False
+        if self.since and row["ChangedAt"] < self.since:
+            return False
+        if self.until and row["ChangedAt"] >= self.until:
+            return False
+        if self.audit_id is not None and row["AuditID"] != self.audit_id:
+            return False
+        if self.words:
+            hay = " ".join([row["KeyData"] or "", json.dumps(row.get("OldRow")),
+                            json.dumps(row.get("NewRow"))]).lower()
+            return all(w in hay for w in self.words)
+        return True
+
+
+def _read_archive(path, fmt):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                for c in ("OldRow", "NewRow"):
+                    if isinstance(row.get(c), str):
+                        row[c] = json.loads(row[c])
+                yield row
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            row["ChangedAt"] = datetime.fromisoformat(row["ChangedAt"])
+            yield row
+
+
+def search_audit(conn, text, archive_dir=AUDIT_ARCHIVE_DIR, limit=AUDIT_BUFFER_ROWS):
+    """
+    Newest `limit` audit rows matching `text` from the live table and the
+    archive together. Returns (rows, live_count, archived_count); rows are
+    dicts with SEARCH_COLUMNS plus 'Source' ('live' or the archive file).
+    """
+    q = AuditQuery(text)
+    sql, params = q.live_sql(limit)
+    cur = conn.cursor(dictionary=True)
+    cur.execute(sql, params)
+    found = {}
+    for r in cur.fetchall():
+        r["Source"] = "live"
+        found[r["AuditID"]] = r
+    cur.close()
+
+    newest_first = sorted((e for e in load_manifest(archive_dir) if q.overlaps(e)), key=lambda e: e["to"], reverse=True)
+    for entry in newest_first:
+        if len(found) >= limit:
+            floor = heapq.nlargest(limit, (r["ChangedAt"] for r in found.values()))[-1]
+            if datetime.fromisoformat(entry["to"]) <= floor:
+                break   # everything older than what we already have
+        path = os.path.join(archive_dir, entry["file"])
+        if not os.path.exists(path):
+            continue
+        for row in _read_archive(path, entry["format"]):
+            if row["AuditID"] not in found and q.matches(row):
+                row["Source"] = entry["file"]
+                found[row["AuditID"]] = row
+
+    rows = heapq.nlargest(limit, found.values(), key=lambda r: (r["ChangedAt"], r["AuditID"]))
+    live = sum(1 for r in rows if r["Source"] == "live")
+    return rows, live, len(rows) - live
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description="Partition maintenance, retention and archiving for AuditLog.")
+    ap.add_argument("--keep-months", type=int, default=AUDIT_RETENTION_MONTHS)
+    ap.add_argument("--archive-dir", default=AUDIT_ARCHIVE_DIR)
+    ap.add_argument("--format", choices=sorted(ARCHIVE_FORMATS), default="jsonl")
+    ap.add_argument("--drop-only", action="store_true", help="drop expired months without archiving them")
+    ap.add_argument("--dry-run", action="store_true", help="show what would be archived/dropped")
+    ap.add_argument("--ahead", type=int, default=AUDIT_PARTITIONS_AHEAD, help="future months to pre-create")
+    ap.add_argument("--init", action="store_true", help="partition an existing, unpartitioned AuditLog")
+    ap.add_argument("--search", help="search live + archived audit rows and print them")
+    args = ap.parse_args(argv)
+
+    conn = checkout("admin", "worker")
+    try:
+        if args.init:
+            init_partitions(conn, args.ahead)
+            print("AuditLog partitioned:", ", ".join(p.name for p in list_partitions(conn)))
+        elif args.search is not None:
+            rows, live, archived = search_audit(conn, args.search, args.archive_dir)
+            for r in rows:
+                print(r["ChangedAt"], r["AuditID"], r["TableName"], r["Operation"], r["KeyData"], r["Source"])
+            print(f"{live} live + {archived} archived rows", file=sys.stderr)
+        else:
+            apply_retention(conn, args.keep_months, args.archive_dir, args.format,
+                            args.drop_only, args.dry_run, args.ahead)
+    except (ArchiveError, SearchError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# srs_audit_triggers.py
+"""
+Generated audit triggers for SRSMS.
+
+For every table in TABLES_TO_SHOW this builds AFTER INSERT / UPDATE /
+DELETE triggers from the schema catalog: KeyData is the primary key
+('SupplyID=5', 'AstronautID=1,MissionID=2'), OldRow / NewRow are
+JSON_OBJECTs of all columns, and UPDATEs that change nothing are skipped.
+
+Two modes:
+  direct  triggers insert straight into AuditLog (default)
+  staged  triggers append to AuditStaging, a narrow table with no
+          secondary indexes; AuditDrainer moves rows into AuditLog in
+          batches (one INSERT ... SELECT + one DELETE per batch)
+
+  python srs_audit_triggers.py install [--mode staged]
+  python srs_audit_triggers.py uninstall
+  python srs_audit_triggers.py sql > audit_triggers.sql
+  python srs_audit_triggers.py drain [--interval 1]   # run the drainer
+"""
+import argparse
+import sys
+import threading
+import time
+
+from srs_config import TABLES_TO_SHOW
+
+MODES = {"direct": "AuditLog", "staged": "AuditStaging"}
+OPS = (("INSERT", "ins"), ("UPDATE", "upd"), ("DELETE", "del"))
+DRAIN_BATCH = 5000
+DRAIN_INTERVAL = 1.0
+
+STAGING_DDL = """
+CREATE TABLE IF NOT EXISTS AuditStaging (
+  StageID    BIGINT AUTO_INCREMENT PRIMARY KEY,
+  TableName  VARCHAR(200) NOT NULL,
+  Operation  VARCHAR(10) NOT NULL,
+  KeyData    VARCHAR(500),
+  OldRow     JSON,
+  NewRow     JSON,
+  ChangedAt  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB"""
+
+
+def trigger_name(table, suffix):
+    return f"trg_audit_{table}_{suffix}"
+
+
+def _json_object(meta, alias):
+    return "JSON_OBJECT(" + ", ".join(f"'{c}', {alias}.`{c}`" for c in meta.column_names) + ")"
+
+
+def _key_data(meta, alias):
+    cols = meta.pk or meta.column_names[:1]
+    return "CONCAT_WS(','" + "".join(f", CONCAT('{c}=', {alias}.`{c}`)" for c in cols) + ")"
+
+
+def trigger_body(meta, op, mode="direct"):
+    """CREATE TRIGGER statement (no DELIMITER) for one table and operation."""
+    target = MODES[mode]
+    suffix = dict(OPS)[op]
+    old = _json_object(meta, "OLD") if op != "INSERT" else "NULL"
+    new = _json_object(meta, "NEW") if op != "DELETE" else "NULL"
+    key = _key_data(meta, "OLD" if op == "DELETE" else "NEW")
+    insert = (f"INSERT INTO {target} (TableName, Operation, KeyData, OldRow, NewRow)\n"
+              f"    VALUES ('{meta.name}', '{op}', {key},\n"
+              f"            {old},\n"
+              f"            {new});")
+    if op == "UPDATE":
+        # no-op updates (same values written back) leave no audit row
+        same = " AND ".join(f"OLD.`{c}` <=> NEW.`{c}`" for c in meta.column_names)
+        insert = "IF NOT ({}) THEN\n    {}\n  END IF;".format(same, insert.replace("\n", "\n  "))
+    return (f"CREATE TRIGGER {trigger_name(meta.name, suffix)}\n"
+            f"AFTER {op} ON `{meta.name}`\nFOR EACH ROW\nBEGIN\n  {insert}\nEND")
+
+
+def script(metas, mode="direct"):
+    """mysql-client script (with DELIMITER) recreating every audit trigger for `metas`."""
+    out = []
+    if mode == "staged":
+        out.append(STAGING_DDL.strip() + ";\n")
+    for meta in metas:
+        for op, suffix in OPS:
+            out.append(f"DROP TRIGGER IF EXISTS {trigger_name(meta.name, suffix)};\n"
+                       f"DELIMITER $$\n{trigger_body(meta, op, mode)}$$\nDELIMITER ;\n")
+    return "\n".join(out)
+
+
+def _audited(catalog, conn, tables):
+    metas = [catalog.get(conn, t) for t in tables]
+    return [m for m in metas if not m.is_view]
+
+
+def uninstall(conn, tables=TABLES_TO_SHOW):
+    cur = conn.cursor()
+    # the hand-written trigger this generator replaces
+    cur.execute("DROP TRIGGER IF EXISTS trg_audit_supplies_after")
+    for t in tables:
+        for _op, suffix in OPS:
+            cur.execute(f"DROP TRIGGER IF EXISTS {trigger_name(t, suffix)}")
+    cur.close()
+
+
+def install(conn, catalog, mode="direct", tables=TABLES_TO_SHOW):
+    """(Re)create the audit triggers for `tables`. Returns the number of triggers created."""
+    metas = _audited(catalog, conn, tables)
+    cur = conn.cursor()
+    if mode == "staged":
+        cur.execute(STAGING_DDL)
+        catalog.note_statement(STAGING_DDL)
+    uninstall(conn, [m.name for m in metas])
+    for meta in metas:
+        for op, _suffix in OPS:
+            sql = trigger_body(meta, op, mode)
+            cur.execute(sql)
+            catalog.note_statement(sql)
+    cur.close()
+    return len(metas) * len(OPS)
+
+
+def installed_mode(conn):
+    """'direct', 'staged', 'mixed' or None, from the trigger bodies on the server."""
+    cur = conn.cursor()
+    cur.execute("SELECT ACTION_STATEMENT FROM information_schema.TRIGGERS "
+                "WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME LIKE 'trg\\_audit\\_%'")
+    bodies = [r[0].decode() if isinstance(r[0], bytes) else r[0] for r in cur.fetchall()]
+    cur.close()
+    modes = {"staged" if "INTO AuditStaging" in b else "direct" for b in bodies}
+    return None if not modes else modes.pop() if len(modes) == 1 else "mixed"
+
+
+# ---------------- staged mode: drainer ----------------
+def drain_once(conn, batch=DRAIN_BATCH):
+    """Move up to `batch` staged rows into AuditLog in one transaction. Returns rows moved."""
+    conn.start_transaction()
+    try:
+        cur = conn.cursor()
+        # locking read: waits for in-flight trigger inserts inside the range and
+        # gap-locks it, so the copy and the delete below see exactly the same rows
+        cur.execute("SELECT StageID FROM AuditStaging ORDER BY StageID LIMIT %s FOR UPDATE", (batch,))
+        ids = [r[0] for r in cur.fetchall()]
+        if not ids:
+            cur.close()
+            conn.commit()
+            return 0
+        lo, hi = ids[0], ids[-1]
+        cur.execute("INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow, ChangedAt) "
+                    "SELECT TableName, Operation, KeyData, OldRow, NewRow, ChangedAt FROM AuditStaging "
+                    "WHERE StageID BETWEEN %s AND %s ORDER BY StageID", (lo, hi))
+        cur.execute("DELETE FROM AuditStaging WHERE StageID BETWEEN %s AND %s", (lo, hi))
+        cur.close()
+        conn.commit()
+        return len(ids)
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def drain_all(conn, batch=DRAIN_BATCH):
+    total = 0
+    while True:
+        n = drain_once(conn, batch)
+        total += n
+        if n < batch:
+            return total
+
+
+class AuditDrainer:
+    """Background thread that keeps AuditStaging empty. connect() returns a connection."""
+
+    def __init__(self, connect, interval=DRAIN_INTERVAL, batch=DRAIN_BATCH):
+        self.connect = connect
+        self.interval = interval
+        self.batch = batch
+        self.moved = 0
+        self.errors = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="srs-audit-drainer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                conn = self.connect()
+                try:
+                    self.moved += drain_all(conn, self.batch)
+                finally:
+                    conn.close()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+            self._stop.wait(self.interval)
+        # final flush so nothing staged is left behind on shutdown
+        try:
+            conn = self.connect()
+            try:
+                self.moved += drain_all(conn, self.batch)
+            finally:
+                conn.close()
+        except Exception as e:
+            self.last_error = e
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_catalog import SchemaCatalog
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description="Generate / install SRSMS audit triggers and run the staging drainer.")
+    ap.add_argument("action", choices=["install", "uninstall", "sql", "status", "drain"])
+    ap.add_argument("--mode", choices=sorted(MODES), default="direct")
+    ap.add_argument("--tables", nargs="*", default=TABLES_TO_SHOW)
+    ap.add_argument("--interval", type=float, default=DRAIN_INTERVAL, help="drain: seconds between passes")
+    ap.add_argument("--batch", type=int, default=DRAIN_BATCH)
+    args = ap.parse_args(argv)
+
+    conn = checkout("admin", "worker")
+    try:
+        if args.action == "sql":
+            print(script(_audited(SchemaCatalog(), conn, args.tables), args.mode))
+        elif args.action == "install":
+            n = install(conn, SchemaCatalog(), args.mode, args.tables)
+            print(f"installed {n} {args.mode} audit triggers", file=sys.stderr)
+            if args.mode == "staged":
+                print("run 'srs_audit_triggers.py drain' to move staged rows into AuditLog", file=sys.stderr)
+        elif args.action == "uninstall":
+            uninstall(conn, args.tables)
+        elif args.action == "status":
+            print(installed_mode(conn) or "no audit triggers")
+    finally:
+        conn.close()
+
+    if args.action == "drain":
+        drainer = AuditDrainer(lambda: checkout("admin", "worker"), args.interval, args.batch).start()
+        try:
+            while True:
+                time.sleep(10)
+                print(f"moved {drainer.moved:,} rows, {drainer.errors} errors"
+                      + (f" (last: {drainer.last_error})" if drainer.last_error else ""), file=sys.stderr)
+        except KeyboardInterrupt:
+            drainer.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+# srs_cache.py
+"""
+Query result cache for SRSMS.
+
+An LRU of SELECT results keyed by normalized SQL text plus parameters,
+bounded by entry count, total cached rows and age (TTL). Each entry
+remembers the tables it read: the names after FROM / JOIN, with views
+followed to the tables in their definition. A write invalidates by
+table. The service layer reports every INSERT / UPDATE / DELETE, import
+and procedure call, widened by affected_tables() to what the station's
+triggers and cascading foreign keys change along with it. An AuditWatcher
+does the same for other clients' writes, from new AuditLog rows.
+
+  cache = QueryCache()
+  columns, rows = cache.fetch(conn, "SELECT * FROM vw_LowStock LIMIT 200")
+  cache.invalidate(affected_tables(catalog, "Supplies"))
+  cache.stats()       # hits, misses, evictions, invalidations, ...
+
+Entries are scoped (e.g. by role), so a result is only served to callers
+that could have read it themselves; invalidation applies to all scopes.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from srs_config import CACHE_MAX_ENTRIES, CACHE_MAX_ROWS, CACHE_MAX_RESULT_ROWS, CACHE_TTL
+from srs_summaries import SUMMARIES
+
+ANY_TABLE = "*"     # dependency of results whose sources could not be resolved
+_ANY_WRITE = "*write"
+
+_TOKEN_RE = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)|\s+")
+# a name (last part of a qualified one), a bracket / comma / semicolon, or anything else
+_SQL_TOKEN_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|(`[^`]*`|\w+)(?:\s*\.\s*(`[^`]*`|\w+))?"
+                           r"|([(),;])|\S", re.S)
+_FROM_WORDS = {"from", "join", "straight_join"}
+# words that end a FROM list (commas after them are not more tables)
+_FROM_END = {"where", "group", "having", "order", "limit", "union", "except", "intersect", "window", "for",
+             "lock", "into", "procedure"}
+_NOT_TABLES = {"dual", "json_table"}
+_SELECT_RE = re.compile(r"^\s*\(?\s*(select|with)\b", re.I)
+
+
+def normalize_sql(sql):
+    """Collapse whitespace outside quoted strings / identifiers."""
+    return _TOKEN_RE.sub(lambda m: m.group(1) or " ", sql.strip())
+
+
+def source_tables(sql):
+    """
+    Lower-cased names read after FROM / JOIN / STRAIGHT_JOIN, every entry of
+    a comma-separated FROM list included, in subqueries too. Contains
+    ANY_TABLE when a table position holds something that is neither a name
+    nor a parenthesised subquery or join, so the sources are not all known.
+    """
+    found = set()
+    depth = 0
+    expect = {0: False}     # per bracket depth: the next name is a table
+    listing = {0: False}    # per bracket depth: inside a FROM list, where ',' adds a table
+    for m in _SQL_TOKEN_RE.finditer(sql):
+        name, last, punct = m.groups()
+        if punct == "(":
+            depth += 1
+            # a subquery or bracketed join in table position: its first name is a table too
+            expect[depth] = listing[depth] = expect.get(depth - 1, False)
+            expect[depth - 1] = False
+        elif punct == ")":
+            depth = max(0, depth - 1)
+        elif punct == ",":
+            if listing.get(depth):
+                expect[depth] = True
+        elif punct == ";":
+            depth, expect, listing = 0, {0: False}, {0: False}
+        elif name is not None:
+            word = None if last or name.startswith("`") else name.lower()
+            if word in _FROM_WORDS:
+                expect[depth] = listing[depth] = True
+            elif word == "select":
+                expect[depth] = listing[depth] = False
+            elif expect.get(depth):
+                if word != "lateral":
+                    found.add((last or name).strip("`").lower())
+                    expect[depth] = False
+            elif word in _FROM_END:
+                listing[depth] = False
+        elif expect.get(depth):
+            found.add(ANY_TABLE)
+            expect[depth] = False
+    return found - _NOT_TABLES
+
+
+# writes the station's own triggers make along with a write to the key table
+# (AuditLog aside): trg_before_alloc_insert debits Supplies, trg_mv_alloc_*
+# bucket allocations for srs_forecast, trg_mv_* follow the summaries' base tables
+USAGE_TABLES = ("mv_ResourceDailyUse", "mv_MissionResourceUse")
+TRIGGER_WRITES = {"resourceallocations": {"supplies"} | {t.lower() for t in USAGE_TABLES}}
+for _s in SUMMARIES.values():
+    for _t in source_tables(_s.live_sql):
+        TRIGGER_WRITES.setdefault(_t, set()).add(_s.table.lower())
+
+# tables each stored procedure writes
+PROCEDURE_WRITES = {
+    "sp_allocate_supply": ("ResourceAllocations", "Supplies"),
+    "sp_allocate_batch": ("ResourceAllocations", "Supplies"),
+    "sp_allocate_resource": ("ResourceAllocations", "Supplies"),
+    "sp_create_experiment": ("Experiments",),
+    "sp_rebuild_summaries": tuple(s.table for s in SUMMARIES.values()) + USAGE_TABLES + ("mv_RefreshLog",),
+}
+
+
+def affected_tables(catalog, table):
+    """
+    `table` plus every table a write to it can change: trigger side effects
+    and, through the catalog's foreign keys, the referencing tables that
+    ON DELETE / UPDATE CASCADE or SET NULL may rewrite.
+    """
+    children = {}
+    for name in catalog.table_names():
+        meta = catalog.cached(name)
+        for col in (meta.columns if meta is not None else ()):
+            if col.fk_table:
+                children.setdefault(col.fk_table.lower(), set()).add(name.lower())
+    out, todo = set(), [table.lower()]
+    while todo:
+        t = todo.pop()
+        if t in out:
+            continue
+        out.add(t)
+        todo.extend(TRIGGER_WRITES.get(t, ()))
+        todo.extend(children.get(t, ()))
+    return out
+
+
+class CacheStats:
+    FIELDS = ("hits", "misses", "stores", "uncached", "evictions", "expired", "invalidations")
+
+    def __init__(self):
+        for f in self.FIELDS:
+            setattr(self, f, 0)
+
+    def snapshot(self):
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+
+class _Entry:
+    __slots__ = ("columns", "rows", "deps", "stored_at")
+
+    def __init__(self, columns, rows, deps):
+        self.columns = columns
+        self.rows = rows
+        self.deps = deps
+        self.stored_at = time.monotonic()
+
+
+class QueryCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_rows=CACHE_MAX_ROWS, ttl=CACHE_TTL,
+                 max_result_rows=CACHE_MAX_RESULT_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.max_result_rows = max_result_rows
+        self.stats_ = CacheStats()
+        self._entries = OrderedDict()   # key -> _Entry, least recently used first
+        self._rows = 0
+        self._views = {}                # view -> its tables (ANY_TABLE if unreadable)
+        self._lock = threading.Lock()
+        # invalidation clock: a result whose query started before one of its
+        # tables was last invalidated may already be stale and is not stored
+        self._clock = 0
+        self._touched = {}
+
+    # ---------------- reading ----------------
+    def fetch(self, conn, sql, params=(), scope=None):
+        """(columns, rows) for a SELECT, from the cache when fresh."""
+        if not _SELECT_RE.match(sql):
+            raise ValueError("only SELECT results are cached")
+        key = (scope, normalize_sql(sql), tuple(tuple(p) if isinstance(p, list) else p for p in params))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.stored_at > self.ttl:
+                self._drop(key)
+                self.stats_.expired += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats_.hits += 1
+                return entry.columns, list(entry.rows)
+            self.stats_.misses += 1
+            started = self._clock
+
+        deps = self._dependencies(conn, sql)
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        columns = list(cur.column_names)
+        cur.close()
+        self._store(key, columns, rows, deps, started)
+        return columns, rows
+
+    def _dependencies(self, conn, sql):
+        deps = set()
+        for t in source_tables(sql):
+            if t.startswith("vw_"):
+                deps |= self._view_tables(conn, t)
+            else:
+                deps.add(t)
+        return frozenset(deps) if deps else frozenset([ANY_TABLE])
+
+    def _view_tables(self, conn, view, depth=0):
+        with self._lock:
+            known = self._views.get(view)
+        if known is not None:
+            return known
+        cur = conn.cursor()
+        cur.execute("SELECT VIEW_DEFINITION FROM information_schema.VIEWS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (view,))
+        row = cur.fetchone()
+        cur.close()
+        definition = row[0] if row else ""
+        if isinstance(definition, (bytes, bytearray)):
+            definition = definition.decode()
+        tables = source_tables(definition or "")
+        if not tables:
+            # the definition is hidden without SHOW VIEW: any write may matter
+            tables = {ANY_TABLE}
+        if depth < 3:
+            for t in [t for t in tables if t.startswith("vw_")]:
+                tables |= self._view_tables(conn, t, depth + 1)
+        tables = frozenset(tables | {view})
+        with self._lock:
+            self._views[view] = tables
+        return tables
+
+    def _store(self, key, columns, rows, deps, started):
+        with self._lock:
+            if len(rows) > self.max_result_rows:
+                self.stats_.uncached += 1
+                return
+            last = [self._touched.get(d, 0) for d in deps]
+            last.append(self._touched.get(ANY_TABLE, 0))       # clear() or a wildcard invalidation
+            if ANY_TABLE in deps:
+                last.append(self._touched.get(_ANY_WRITE, 0))  # unknown sources: any write counts
+            if max(last) > started:
+                self.stats_.uncached += 1       # written while we were reading
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(columns, tuple(rows), deps)
+            self._rows += len(rows)
+            self.stats_.stores += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+                self._drop(next(iter(self._entries)))
+                self.stats_.evictions += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._rows -= len(entry.rows)
+
+    # ---------------- invalidation ----------------
+    def invalidate(self, tables):
+        """Drop every entry that read one of `tables` (lower-case names). Returns entries dropped."""
+        tables = {t.lower() for t in tables}
+        with self._lock:
+            self._clock += 1
+            for t in tables:
+                self._touched[t] = self._clock
+            self._touched[_ANY_WRITE] = self._clock
+            stale = [k for k, e in self._entries.items()
+                     if ANY_TABLE in e.deps or ANY_TABLE in tables or not e.deps.isdisjoint(tables)]
+            for k in stale:
+                self._drop(k)
+            self.stats_.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._clock += 1
+            self._touched[_ANY_WRITE] = self._touched[ANY_TABLE] = self._clock
+            self._entries.clear()
+            self._rows = 0
+            self._views.clear()
+
+    # ---------------- reporting ----------------
+    def stats(self):
+        with self._lock:
+            out = self.stats_.snapshot()
+            out.update(entries=len(self._entries), rows=self._rows)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 3) if lookups else 0.0
+        return out
+
+    def describe(self):
+        s = self.stats()
+        return f"cache {s['hits']}/{s['hits'] + s['misses']} hits, {s['entries']} entries"
+
+
+class AuditWatcher:
+    """
+    Invalidates `cache` for tables that show up in new AuditLog rows, so
+    writes by other clients (or straight SQL) are noticed before the TTL.
+    Schema changes (migrations, partitioning, ...) drop the catalog and
+    clear the cache. Needs SELECT on AuditLog; poll() raises what MySQL
+    raises without it.
+    """
+
+    def __init__(self, cache, catalog):
+        self.cache = cache
+        self.catalog = catalog
+        self.last_id = None
+
+    def poll(self, conn):
+        """Returns the set of tables invalidated by this poll."""
+        if self.catalog.changed(conn):
+            self.cache.clear()
+        cur = conn.cursor()
+        if self.last_id is None:
+            cur.execute("SELECT COALESCE(MAX(AuditID), 0) FROM AuditLog")
+            self.last_id = cur.fetchone()[0]
+            cur.close()
+            return set()
+        cur.execute("SELECT TableName, MAX(AuditID) FROM AuditLog WHERE AuditID > %s GROUP BY TableName",
+                    (self.last_id,))
+        rows = cur.fetchall()
+        cur.close()
+        tables = set()
+        for name, last in rows:
+            name = name.decode() if isinstance(name, (bytes, bytearray)) else name
+            tables |= affected_tables(self.catalog, name)
+            self.last_id = max(self.last_id, last)
+        if tables:
+            self.cache.invalidate(tables)
+        return tables
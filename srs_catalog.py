@@ -0,0 +1,248 @@
+# srs_catalog.py
+"""
+Schema metadata cache for SRSMS.
+
+One information_schema query at login loads columns, types, primary keys,
+foreign keys, indexes and auto_increment flags for every table and view in
+the database. CRUD dialogs, delete and paging read from here instead of issuing
+DESCRIBE / SHOW KEYS on every open and submit. Entries expire after
+CATALOG_TTL seconds and are dropped when DDL touching them is seen:
+note_statement() for DDL run in this process, changed() for DDL run by
+other clients (a checksum of the database's columns and indexes).
+"""
+import re
+import threading
+import time
+
+from srs_config import CATALOG_TTL
+
+CATALOG_SQL = """
+SELECT c.TABLE_NAME, t.TABLE_TYPE, c.COLUMN_NAME, c.ORDINAL_POSITION, c.DATA_TYPE,
+       c.COLUMN_TYPE, c.IS_NULLABLE, c.COLUMN_KEY, c.EXTRA, c.COLUMN_DEFAULT,
+       pk.ORDINAL_POSITION, fk.REFERENCED_TABLE_NAME, fk.REFERENCED_COLUMN_NAME,
+       s.INDEX_NAME, s.SEQ_IN_INDEX, s.INDEX_TYPE, s.NON_UNIQUE
+FROM information_schema.COLUMNS c
+JOIN information_schema.TABLES t
+  ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+LEFT JOIN information_schema.KEY_COLUMN_USAGE pk
+  ON pk.TABLE_SCHEMA = c.TABLE_SCHEMA AND pk.TABLE_NAME = c.TABLE_NAME
+ AND pk.COLUMN_NAME = c.COLUMN_NAME AND pk.CONSTRAINT_NAME = 'PRIMARY'
+LEFT JOIN information_schema.KEY_COLUMN_USAGE fk
+  ON fk.TABLE_SCHEMA = c.TABLE_SCHEMA AND fk.TABLE_NAME = c.TABLE_NAME
+ AND fk.COLUMN_NAME = c.COLUMN_NAME AND fk.REFERENCED_TABLE_NAME IS NOT NULL
+LEFT JOIN information_schema.STATISTICS s
+  ON s.TABLE_SCHEMA = c.TABLE_SCHEMA AND s.TABLE_NAME = c.TABLE_NAME
+ AND s.COLUMN_NAME = c.COLUMN_NAME
+WHERE c.TABLE_SCHEMA = DATABASE() {filter}
+ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+"""
+
+# one row, cheap next to CATALOG_SQL; any column or index change moves it
+STAMP_SQL = """
+SELECT (SELECT CONCAT(COUNT(*), '/', COALESCE(SUM(CRC32(CONCAT_WS('|', TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION,
+                                                                  COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, EXTRA))), 0))
+        FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE()),
+       (SELECT CONCAT(COUNT(*), '/', COALESCE(SUM(CRC32(CONCAT_WS('|', TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX,
+                                                                  COLUMN_NAME, NON_UNIQUE))), 0))
+        FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE())
+"""
+
+_DDL_RE = re.compile(r"^\s*(CREATE|ALTER|DROP|RENAME|TRUNCATE)\b", re.I)
+# a trigger is not cached, but CREATE TRIGGER drops the table it fires on;
+# DROP TRIGGER names no table and changes nothing cached
+_DDL_SKIP_RE = re.compile(r"^\s*DROP\s+TRIGGER\b", re.I)
+_DDL_TABLE_RE = re.compile(r"\b(?:TABLE|VIEW|INDEX\s+\S+\s+ON|TRIGGER\s+\S+\s+(?:BEFORE|AFTER)\s+\w+\s+ON)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?`?(\w+)`?", re.I)
+
+
+def _text(v):
+    # some connector versions hand information_schema TEXT columns back as bytes
+    return v.decode() if isinstance(v, (bytes, bytearray)) else v
+
+
+class ColumnMeta:
+    def __init__(self, name, position, data_type, column_type, nullable, key, extra, default,
+                 fk_table=None, fk_column=None):
+        self.name = name
+        self.position = position
+        self.data_type = data_type          # e.g. 'int', 'decimal', 'date'
+        self.column_type = column_type      # e.g. 'decimal(18,3)', "enum('Low','High')"
+        self.nullable = nullable
+        self.key = key                      # 'PRI', 'UNI', 'MUL' or ''
+        self.extra = extra or ""
+        self.default = default
+        self.fk_table = fk_table
+        self.fk_column = fk_column
+
+    @property
+    def auto_increment(self):
+        return 'auto_increment' in self.extra.lower()
+
+    @property
+    def primary(self):
+        return self.key == 'PRI'
+
+
+class IndexMeta:
+    def __init__(self, name, index_type, unique):
+        self.name = name
+        self.index_type = index_type        # 'BTREE' or 'FULLTEXT'
+        self.unique = unique
+        self.columns = []                   # in index order
+
+    @property
+    def fulltext(self):
+        return self.index_type == 'FULLTEXT'
+
+
+class TableMeta:
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind                    # 'BASE TABLE' or 'VIEW'
+        self.columns = []
+        self.pk = []
+        self.indexes = {}
+        self.loaded_at = time.monotonic()
+
+    @property
+    def is_view(self):
+        return self.kind == 'VIEW'
+
+    @property
+    def column_names(self):
+        return [c.name for c in self.columns]
+
+    def column(self, name):
+        for c in self.columns:
+            if c.name == name:
+                return c
+        return None
+
+    @property
+    def foreign_keys(self):
+        return [(c.name, c.fk_table, c.fk_column) for c in self.columns if c.fk_table]
+
+    def fulltext_indexes(self):
+        return [ix for ix in self.indexes.values() if ix.fulltext]
+
+    def leading_indexed(self, column):
+        """True if some B-tree index starts with `column` (usable for ORDER BY / ranges)."""
+        return any(not ix.fulltext and ix.columns and ix.columns[0] == column
+                   for ix in self.indexes.values())
+
+
+class SchemaCatalog:
+    def __init__(self, ttl=CATALOG_TTL):
+        self.ttl = ttl
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._stamp = None
+        self.loads = 0      # information_schema round trips, for the curious
+
+    # ---------------- loading ----------------
+    def _query(self, conn, tables=None):
+        params = ()
+        flt = ""
+        if tables:
+            flt = "AND c.TABLE_NAME IN (" + ", ".join(["%s"] * len(tables)) + ")"
+            params = tuple(tables)
+        cur = conn.cursor()
+        cur.execute(CATALOG_SQL.format(filter=flt), params)
+        rows = cur.fetchall()
+        cur.close()
+        self.loads += 1
+
+        found = {}
+        pk_pos = {}
+        ix_pos = {}
+        for row in rows:
+            (tname, kind, cname, pos, dtype, ctype, nullable, key, extra, default,
+             pk_seq, ref_table, ref_col, ix_name, ix_seq, ix_type, non_unique) = [_text(v) for v in row]
+            meta = found.get(tname)
+            if meta is None:
+                meta = found[tname] = TableMeta(tname, kind)
+            col = meta.column(cname)
+            if col is None:
+                col = ColumnMeta(cname, pos, dtype, ctype, nullable == 'YES', key, extra, default)
+                meta.columns.append(col)
+            # a column in several FKs yields several rows; keep the first reference
+            if ref_table and not col.fk_table:
+                col.fk_table, col.fk_column = ref_table, ref_col
+            if pk_seq is not None:
+                pk_pos.setdefault(tname, {})[cname] = pk_seq
+            if ix_name is not None:
+                ix = meta.indexes.get(ix_name)
+                if ix is None:
+                    ix = meta.indexes[ix_name] = IndexMeta(ix_name, ix_type, not int(non_unique))
+                ix_pos.setdefault((tname, ix_name), {})[cname] = ix_seq
+        for tname, cols in pk_pos.items():
+            found[tname].pk = sorted(cols, key=cols.get)
+        for (tname, ix_name), cols in ix_pos.items():
+            found[tname].indexes[ix_name].columns = sorted(cols, key=cols.get)
+        return found
+
+    def load(self, conn):
+        """Load every table and view of the current database in one query."""
+        found = self._query(conn)
+        with self._lock:
+            self._tables = found
+        return self.table_names()
+
+    def get(self, conn, table):
+        meta = self.cached(table)
+        if meta is None:
+            found = self._query(conn, [table])
+            meta = found.get(table)
+            if meta is None:
+                raise KeyError(f"Unknown table or view: {table}")
+            with self._lock:
+                self._tables[table] = meta
+        return meta
+
+    def cached(self, table):
+        """The cached entry if present and fresh, else None (never queries)."""
+        with self._lock:
+            meta = self._tables.get(table)
+        if meta is not None and time.monotonic() - meta.loaded_at > self.ttl:
+            self.invalidate(table)
+            return None
+        return meta
+
+    # ---------------- invalidation ----------------
+    def invalidate(self, table=None):
+        with self._lock:
+            if table is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(table, None)
+
+    def note_statement(self, sql):
+        """Call with any statement the app runs; DDL drops the affected entries."""
+        if not _DDL_RE.match(sql or "") or _DDL_SKIP_RE.match(sql):
+            return
+        m = _DDL_TABLE_RE.search(sql)
+        self.invalidate(m.group(1) if m else None)
+
+    def changed(self, conn):
+        """
+        Compare the schema checksum with the last call's; on a change drop
+        every entry and return True. The first call only records it.
+        """
+        cur = conn.cursor()
+        cur.execute(STAMP_SQL)
+        stamp = tuple(_text(v) for v in cur.fetchone())
+        cur.close()
+        previous, self._stamp = self._stamp, stamp
+        if previous is None or previous == stamp:
+            return False
+        self.invalidate()
+        return True
+
+    # ---------------- lookups ----------------
+    def table_names(self, kind=None):
+        with self._lock:
+            metas = list(self._tables.values())
+        return sorted(m.name for m in metas if kind is None or m.kind == kind)
+
+    def is_loaded(self):
+        with self._lock:
+            return bool(self._tables)
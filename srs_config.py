@@ -0,0 +1,108 @@
+# srs_config.py
+"""
+Shared SRSMS configuration (DB location, role credentials, table lists).
+Kept free of GUI imports so headless tools can use it.
+"""
+
+# ---------- CONFIG ----------
+HOST = "localhost"
+DATABASE = "srsdb"
+
+# Map roles -> DB credentials (match your created users)
+ROLE_CREDENTIALS = {
+    "admin":    {"user": "admin_srs",    "password": "Admin@123"},
+    "operator": {"user": "operator_srs", "password": "Op@123"},
+    "viewer":   {"user": "viewer_srs",   "password": "View@123"}
+}
+
+# Default tables to list in dropdown (you can modify if you added/removed tables)
+TABLES_TO_SHOW = [
+    'Astronauts','AstronautSkills','Missions','StationModules','Resources','Supplies',
+    'LifeSupportSystems','Spacecrafts','Experiments','Schedules','MedicalRecords',
+    'ResourceAllocations','Communications','Anomalies','Astronaut_Missions',
+    'Mission_Spacecraft','Mission_Modules','Experiment_Astronauts'
+]
+
+VIEWS = ['vw_LowStock','vw_ActiveMissions','vw_ExperimentSummary','vw_ModuleAnomalies','vw_AstronautHealth']
+
+# Connection pools per role: one for the UI (login probe, KILL QUERY), one
+# for the background query workers (size it to QUERY_WORKERS) and one for
+# the HTTP API's workers (srs_api.py)
+POOL_SIZES = {"ui": 2, "worker": 3, "api": 8}
+POOL_CHECKOUT_TIMEOUT = 10.0   # seconds to wait for a free pooled connection
+
+# HTTP/JSON API (srs_api.py)
+API_HOST = "127.0.0.1"
+API_PORT = 8080
+
+# Schema catalog entries are reloaded after this many seconds (or on DDL)
+CATALOG_TTL = 300
+
+# Query result cache (srs_cache.py): LRU bounds, how long an entry may be
+# served, results too large to keep, and how often AuditLog is polled for
+# other clients' writes (0 = rely on the TTL)
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_ROWS = 200000
+CACHE_MAX_RESULT_ROWS = 20000
+CACHE_TTL = 60
+CACHE_AUDIT_POLL_SECONDS = 5
+
+# Audit panel: rows kept in its ring buffer and default live-refresh interval
+AUDIT_BUFFER_ROWS = 500
+AUDIT_REFRESH_SECONDS = 5
+
+# AuditLog retention (srs_audit_archive.py): months kept in the live table,
+# where expired months are archived to, and how many future months get a partition
+AUDIT_RETENTION_MONTHS = 12
+AUDIT_ARCHIVE_DIR = "audit_archive"
+AUDIT_PARTITIONS_AHEAD = 3
+
+# Life-support telemetry (srs_telemetry.py). Safe ranges per metric as
+# (low, high), None = unbounded, in LifeSupportSystems' units: O2 in
+# thousandths of a percent, CO2 in ppm, pressure in kPa, temperature in C.
+TELEMETRY_THRESHOLDS = {
+    "OxygenLevel": (19500, 23500),
+    "CO2Level": (None, 5000),
+    "Pressure": (97.0, 104.0),
+    "Temperature": (18.0, 27.0),
+}
+# months of raw readings kept (rollups are kept for good), charts' point
+# budget per module, and the longest span a chart reads raw readings for
+TELEMETRY_RETENTION_MONTHS = 3
+TELEMETRY_CHART_POINTS = 1500
+TELEMETRY_RAW_SPAN_HOURS = 2
+
+# Supply depletion forecast (srs_forecast.py): days of allocation history a
+# consumption rate is taken from and the half-life (days) of its weighting,
+# how far ahead stock is projected, supplier lead time plus safety margin
+# and the days of use a reorder should cover (all in days); a forecast older
+# than FORECAST_MAX_AGE seconds is recomputed even without new allocations
+FORECAST_WINDOW_DAYS = 180
+FORECAST_HALFLIFE_DAYS = 30
+FORECAST_HORIZON_DAYS = 365
+FORECAST_LEAD_DAYS = 30
+FORECAST_SAFETY_DAYS = 14
+FORECAST_COVER_DAYS = 90
+FORECAST_MISSION_DAYS = 30     # planned missions without a ReturnDate
+FORECAST_MAX_AGE = 900
+
+# Local read mirror (srs_mirror.py): one SQLite file per database and role on
+# each console, how often queued writes are replayed and AuditLog changes
+# pulled, how long a hole in the AuditIDs is re-checked for a transaction
+# that committed late, and AuditLog rows applied per SQLite transaction.
+# Syncing reads AuditLog, so only roles granted SELECT on it get a mirror.
+MIRROR_PATH = "srs_mirror_{database}_{role}.sqlite3"
+MIRROR_SYNC_SECONDS = 5
+MIRROR_GAP_SECONDS = 120
+MIRROR_BATCH = 5000
+
+# Query profiler (srs_profile.py): every statement run on a pooled
+# connection is timed per SQL fingerprint. Fingerprints kept (the rest are
+# counted under one "other" entry), and the optional Prometheus exports:
+# a local HTTP port serving /metrics (0 = off) and/or a text file rewritten
+# every PROFILE_METRICS_SECONDS ("" = off), e.g. for node_exporter's textfile
+# collector. {pid} in the path is replaced, so several consoles don't clash.
+PROFILE_MAX_STATEMENTS = 500
+PROFILE_METRICS_PORT = 0
+PROFILE_METRICS_FILE = ""
+PROFILE_METRICS_SECONDS = 15
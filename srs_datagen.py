@@ -0,0 +1,489 @@
+# srs_datagen.py
+"""
+Deterministic synthetic data for SRSMS at benchmark scale.
+
+--scale is the number of Communications rows, the largest table; every
+other table is sized from it (PROFILE), so --scale 1000000 fills roughly
+1.8 million rows and --scale 50000000 about 90 million. The same --seed
+always produces the same rows: each table draws from its own
+random.Random(f"{seed}:{table}"), so regenerating one table does not shift
+the others.
+
+Rows respect every FK (parents are loaded first and children pick from
+their IDs, skewed so a few parents are busy and most are quiet), the
+astronaut DOB >= 22 years triggers, the UNIQUE names and the Anomalies
+severity enum. ResourceAllocations are loaded with the stock trigger
+dropped (srs_alloc.install puts it back), so the generated
+Supplies.Quantity is taken as the stock left after them.
+Schedules are loaded with the overlap triggers dropped (srs_schedule.install
+puts them back), so the history contains double bookings for
+srs_schedule.py to find.
+
+Load into a scratch database created from srsms.sql, not the live one:
+
+  python srs_datagen.py --database srsbench --scale 1000000 --seed 42
+"""
+import argparse
+import datetime
+import math
+import random
+import sys
+import time
+from array import array
+
+import srs_alloc as alloc
+import srs_schedule as schedule
+
+PROFILE = {
+    # table: (rows per Communications row, minimum)
+    "StationModules":     (1 / 10000, 10),
+    "Astronauts":         (1 / 1000, 20),
+    "Missions":           (1 / 1000, 10),
+    "Resources":          (1 / 10000, 10),
+    "Spacecrafts":        (1 / 20000, 5),
+    "AstronautSkills":    (3 / 1000, 60),
+    "LifeSupportSystems": (1 / 10000, 10),
+    "Supplies":           (1 / 10, 50),
+    "Experiments":        (1 / 100, 20),
+    "Schedules":          (1 / 2, 100),
+    "MedicalRecords":     (1 / 20, 50),
+    "ResourceAllocations": (1 / 10, 50),
+    "Communications":     (1, 100),
+    "Anomalies":          (1 / 20, 50),
+    "Astronaut_Missions": (4 / 1000, 40),
+    "Mission_Spacecraft": (3 / 2000, 15),
+    "Mission_Modules":    (2 / 1000, 20),
+    "Experiment_Astronauts": (2 / 100, 40),
+}
+# parents before children
+LOAD_ORDER = list(PROFILE)
+
+BATCH_ROWS = 5000
+DEFAULT_SEED = 42
+TODAY = datetime.date(2026, 1, 1)     # fixed, so output does not depend on the run date
+
+FIRST = ["Anil", "Sara", "James", "Mina", "Liu", "Olga", "Kenji", "Amara", "Lucas", "Ines", "Noah", "Priya",
+         "Mateo", "Yara", "Elena", "Tariq", "Hana", "Felix", "Zoe", "Ivan", "Chen", "Aisha", "Diego", "Freya"]
+LAST = ["Sharma", "Lopez", "Owen", "Khan", "Wei", "Petrova", "Sato", "Okafor", "Silva", "Garcia", "Muller",
+        "Nair", "Rossi", "Haddad", "Novak", "Kim", "Larsen", "Dubois", "Moreau", "Tanaka", "Reyes", "Berg"]
+NATIONS = ["USA", "India", "China", "Russia", "Japan", "France", "Germany", "Spain", "Brazil", "Canada",
+           "Italy", "Pakistan", "Nigeria", "UAE", "Korea"]
+JOBS = [("Flight Engineer", 5), ("Mission Specialist", 5), ("Scientist", 4), ("Technician", 4),
+        ("Commander", 1), ("Pilot", 2), ("Medical Officer", 1)]
+MED_STATUS = [("Fit", 85), ("Under Observation", 10), ("Restricted", 4), ("Unfit", 1)]
+SKILLS = ["EVA", "Robotics", "Piloting", "Medicine", "Botany", "Geology", "Electronics", "Plumbing",
+          "Software", "Photography", "Navigation", "Welding", "Chemistry", "Communications"]
+MISSION_TYPES = [("Research", 5), ("Supply", 3), ("Maintenance", 3), ("Test", 1), ("Crew Rotation", 2)]
+MISSION_STATUS = [("Completed", 60), ("Active", 10), ("Planned", 25), ("Aborted", 5)]
+MODULE_TYPES = ["Habitat", "Research", "Engineering", "Storage", "Node", "Airlock", "Power"]
+RESOURCES = [("Oxygen", "Liters"), ("Water", "Liters"), ("Food", "Kg"), ("Nitrogen", "Liters"),
+             ("SpareParts", "Units"), ("ScienceKits", "Units"), ("Medical", "Units"), ("Propellant", "Kg"),
+             ("Filters", "Units"), ("Batteries", "Units")]
+SUPPLIERS = ["SpaceSupplyCo", "HydroSupplies", "FoodForSpace", "OrbitalParts", "LabKitsInc", "AeroMed",
+             "CryoGas Ltd", "StellarLogistics"]
+CRAFT_TYPES = [("Crew", 4, 6), ("Cargo", 0, 0), ("Crew", 8, 4)]
+EXP_CATEGORIES = ["Biology", "Materials", "Physics", "Medicine", "Engineering", "Geology", "Astronomy"]
+EXP_STATUS = [("Completed", 50), ("Running", 20), ("Planned", 25), ("Cancelled", 5)]
+TASK_TYPES = [("Maintenance", 4), ("Experiment", 4), ("Exercise", 3), ("EVA", 1), ("Communication", 2),
+              ("Inspection", 2)]
+MSG_TYPES = [("Telemetry", 6), ("Status", 3), ("Voice", 2), ("Email", 2), ("Alert", 1)]
+MSG_TEXT = ["routine status report from {m}", "oxygen level nominal in {m}", "requesting resupply window",
+            "experiment data uplink complete", "pressure drop detected near {m}", "crew exercise log attached",
+            "solar array alignment adjusted", "thermal loop check passed", "water recycler filter replaced",
+            "docking approach confirmed"]
+SEVERITY = [("Low", 55), ("Medium", 30), ("High", 12), ("Critical", 3)]
+ANOMALY_TEXT = ["oxygen leak in {m}", "pressure drop in {m}", "coolant loop fault", "sensor drift on {m}",
+                "power bus overcurrent", "CO2 scrubber degraded", "hatch seal wear", "software watchdog reset",
+                "radiation spike recorded", "water recycler clog"]
+CONDITIONS = [("Healthy", 70), ("Minor injury", 10), ("Bone density loss", 8), ("Vision change", 5),
+              ("Sleep disorder", 5), ("Infection", 2)]
+
+
+def plan_sizes(scale):
+    return {t: max(int(round(scale * ratio)), minimum) for t, (ratio, minimum) in PROFILE.items()}
+
+
+def _weighted(rnd, choices):
+    # [(value, weight)] -> value; cumulative weights computed once per list
+    cum = _weighted.cache.get(id(choices))
+    if cum is None:
+        total, cum = 0, []
+        for _v, w in choices:
+            total += w
+            cum.append(total)
+        _weighted.cache[id(choices)] = cum
+    x = rnd.random() * cum[-1]
+    lo, hi = 0, len(cum) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if cum[mid] > x:
+            hi = mid
+        else:
+            lo = mid + 1
+    return choices[lo][0]
+
+
+_weighted.cache = {}
+
+
+def _skewed(rnd, ids):
+    # a few parents get most children (x**2 leans toward the front of the list)
+    return ids[int(len(ids) * rnd.random() ** 2)]
+
+
+def _date(rnd, start, days):
+    return start + datetime.timedelta(days=rnd.randrange(max(days, 1)))
+
+
+def _stamp(rnd, day):
+    return datetime.datetime.combine(day, datetime.time(rnd.randrange(24), rnd.randrange(60), rnd.randrange(60)))
+
+
+class DataGenerator:
+    """Generates and loads every table in LOAD_ORDER. `conn` should have autocommit on."""
+
+    def __init__(self, conn, scale, seed=DEFAULT_SEED, batch=BATCH_ROWS, log=None):
+        self.conn = conn
+        self.sizes = plan_sizes(scale)
+        self.seed = seed
+        self.batch = batch
+        self.log = log or (lambda _msg: None)
+        self.ids = {}           # table -> array of generated primary keys
+        self.missions = {}      # MissionID -> (launch, return) for dated children
+        self.timings = {}       # table -> (rows, seconds)
+
+    # ---------------- plumbing ----------------
+    def _rnd(self, table):
+        return random.Random(f"{self.seed}:{table}")
+
+    def _load(self, table, columns, rows):
+        sql = (f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        cur = self.conn.cursor()
+        n = 0
+        t0 = time.perf_counter()
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.batch:
+                cur.executemany(sql, chunk)
+                n += len(chunk)
+                chunk = []
+        if chunk:
+            cur.executemany(sql, chunk)
+            n += len(chunk)
+        cur.close()
+        dt = time.perf_counter() - t0
+        self.timings[table] = (n, dt)
+        self.log(f"{table:22} {n:>12,} rows {dt:8.1f}s {n / dt if dt else 0:>10,.0f} rows/s")
+
+    def _fetch_ids(self, table, pk, where=""):
+        cur = self.conn.cursor(raw=True)
+        cur.execute(f"SELECT `{pk}` FROM `{table}` {where} ORDER BY `{pk}`")
+        ids = array("l")
+        while True:
+            rows = cur.fetchmany(50000)
+            if not rows:
+                break
+            ids.extend(int(r[0]) for r in rows)
+        cur.close()
+        self.ids[table] = ids
+        return ids
+
+    def _max_id(self, table, pk):
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT COALESCE(MAX(`{pk}`), 0) FROM `{table}`")
+        v = cur.fetchone()[0]
+        cur.close()
+        return v
+
+    def run(self, tables=None):
+        """Load `tables` (default all, always in LOAD_ORDER). Returns {table: (rows, seconds)}."""
+        wanted = set(tables or LOAD_ORDER)
+        for table in LOAD_ORDER:
+            if table in wanted:
+                getattr(self, f"_gen_{table}")(self.sizes[table], self._rnd(table))
+        return self.timings
+
+    # parents that a child table needs but that were not generated in this run
+    def _parent(self, table, pk):
+        return self.ids.get(table) or self._fetch_ids(table, pk)
+
+    def _mission_windows(self):
+        if not self.missions:
+            cur = self.conn.cursor()
+            cur.execute("SELECT MissionID, LaunchDate, ReturnDate FROM Missions WHERE LaunchDate IS NOT NULL")
+            for mid, launch, ret in cur.fetchall():
+                self.missions[mid] = (launch, ret or launch + datetime.timedelta(days=180))
+            cur.close()
+            self.ids["Missions"] = array("l", sorted(self.missions))
+        return self.missions
+
+    # ---------------- strong entities ----------------
+    def _gen_StationModules(self, n, rnd):
+        start = self._max_id("StationModules", "ModuleID")
+        self._load("StationModules", ["ModuleName", "ModuleType", "Capacity", "CurrentStatus", "Location"],
+                   ((f"GEN-{rnd.choice(MODULE_TYPES)}-{start + i + 1:06d}", rnd.choice(MODULE_TYPES),
+                     rnd.randint(1, 12), "Operational" if rnd.random() < 0.9 else "Maintenance",
+                     f"Node-{chr(65 + rnd.randrange(26))}{rnd.randrange(100)}") for i in range(n)))
+        self._fetch_ids("StationModules", "ModuleID")
+
+    def _gen_Astronauts(self, n, rnd):
+        def rows():
+            for _ in range(n):
+                # 23..65 years old on TODAY; trg_check_astronaut_dob_* want >= 22 on CURDATE()
+                dob = TODAY - datetime.timedelta(days=rnd.randint(23 * 366, 65 * 365))
+                yield (rnd.choice(FIRST), rnd.choice(LAST), dob, rnd.choice(NATIONS),
+                       _weighted(rnd, JOBS), _weighted(rnd, MED_STATUS))
+        self._load("Astronauts", ["FirstName", "LastName", "DOB", "Nationality", "JobTitle", "MedicalStatus"], rows())
+        self._fetch_ids("Astronauts", "AstronautID")
+
+    def _gen_Missions(self, n, rnd):
+        start = self._max_id("Missions", "MissionID")
+
+        def rows():
+            for i in range(n):
+                launch = _date(rnd, datetime.date(2018, 1, 1), 12 * 365)
+                status = _weighted(rnd, MISSION_STATUS)
+                ret = launch + datetime.timedelta(days=rnd.randint(7, 400)) if status == "Completed" else None
+                yield (f"GEN-{start + i + 1:07d}", launch, ret, _weighted(rnd, MISSION_TYPES), status)
+        self._load("Missions", ["MissionName", "LaunchDate", "ReturnDate", "MissionType", "CurrentStatus"], rows())
+        self.missions = {}
+        self._mission_windows()
+
+    def _gen_Resources(self, n, rnd):
+        def rows():
+            for i in range(n):
+                name, unit = RESOURCES[i % len(RESOURCES)]
+                grade = i // len(RESOURCES)
+                yield (f"{name}-{grade}" if grade else name, unit, f"{name} stock")
+        self._load("Resources", ["ResourceName", "Unit", "Description"], rows())
+        self._fetch_ids("Resources", "ResourceID")
+
+    def _gen_Spacecrafts(self, n, rnd):
+        start = self._max_id("Spacecrafts", "SpacecraftID")
+
+        def rows():
+            for i in range(n):
+                kind, crew, cargo_k = rnd.choice(CRAFT_TYPES)
+                yield (f"GEN-Craft-{start + i + 1:05d}", kind, crew, round(rnd.uniform(500, 3000) * (cargo_k or 2), 2),
+                       _date(rnd, datetime.date(2015, 1, 1), 14 * 365), rnd.choice(["Docked", "Ready", "InTransit"]))
+        self._load("Spacecrafts", ["Name", "SystemType", "CrewCapacity", "CargoCapacity", "LaunchDate",
+                                   "CurrentStatus"], rows())
+        self._fetch_ids("Spacecrafts", "SpacecraftID")
+
+    def _gen_AstronautSkills(self, n, rnd):
+        astronauts = self._parent("Astronauts", "AstronautID")
+        per = max(1, min(len(SKILLS), math.ceil(n / len(astronauts))))
+        self._load("AstronautSkills", ["AstronautID", "Skill"],
+                   ((a, s) for a in astronauts for s in rnd.sample(SKILLS, rnd.randint(1, per))))
+
+    def _gen_LifeSupportSystems(self, n, rnd):
+        # one system per module (ModuleID is UNIQUE); modules that already have one are skipped
+        cur = self.conn.cursor()
+        cur.execute("SELECT ModuleID FROM LifeSupportSystems")
+        taken = {r[0] for r in cur.fetchall()}
+        cur.close()
+        modules = [m for m in self._parent("StationModules", "ModuleID") if m not in taken][:n]
+        self._load("LifeSupportSystems", ["ModuleID", "SystemType", "OxygenLevel", "Pressure", "Temperature",
+                                          "CO2Level", "CurrentStatus"],
+                   ((m, rnd.choice(["ECLSS", "OGS", "CDRA"]), round(rnd.gauss(20.9, 0.4), 3),
+                     round(rnd.gauss(101.3, 0.8), 3), round(rnd.gauss(22, 1.5), 2), round(abs(rnd.gauss(0.4, 0.15)), 3),
+                     "Nominal" if rnd.random() < 0.92 else "Degraded") for m in modules))
+
+    # ---------------- dependent entities ----------------
+    def _gen_Supplies(self, n, rnd):
+        resources = self._parent("Resources", "ResourceID")
+        modules = self._parent("StationModules", "ModuleID")
+        cur = self.conn.cursor()
+        cur.execute("SELECT ResourceID, Unit FROM Resources")
+        units = dict(cur.fetchall())
+        cur.close()
+
+        def rows():
+            for _ in range(n):
+                rid = _skewed(rnd, resources)
+                # log-normal stock: most rows comfortable, a tail below the 50 low-stock line
+                qty = round(min(rnd.lognormvariate(6, 1.3), 1e6), 3)
+                expiry = _date(rnd, datetime.date(2024, 1, 1), 8 * 365) if rnd.random() < 0.7 else None
+                yield (rid, qty, units.get(rid) or "Units", expiry,
+                       rnd.choice(SUPPLIERS), rnd.choice(modules) if rnd.random() < 0.9 else None)
+        self._load("Supplies", ["ResourceID", "Quantity", "Unit", "ExpiryDate", "SupplierName", "StorageModuleID"],
+                   rows())
+        self._fetch_ids("Supplies", "SupplyID")
+
+    def _gen_Experiments(self, n, rnd):
+        self._mission_windows()
+        mids = self.ids["Missions"]
+        modules = self._parent("StationModules", "ModuleID")
+        astronauts = self._parent("Astronauts", "AstronautID")
+
+        def rows():
+            for i in range(n):
+                cat = rnd.choice(EXP_CATEGORIES)
+                yield (_skewed(rnd, mids), f"{cat} study {i + 1}", f"Measure {cat.lower()} effects in microgravity",
+                       cat, _weighted(rnd, EXP_STATUS), rnd.choice(modules) if rnd.random() < 0.8 else None,
+                       rnd.choice(astronauts) if rnd.random() < 0.9 else None)
+        self._load("Experiments", ["MissionID", "Title", "Objective", "Category", "CurrentStatus", "ModuleID",
+                                   "LeadAstronautID"], rows())
+        self._fetch_ids("Experiments", "ExperimentID")
+
+    def _gen_Schedules(self, n, rnd):
+        missions = self._mission_windows()
+        mids = self.ids["Missions"]
+        astronauts = self._parent("Astronauts", "AstronautID")
+
+        def rows():
+            for _ in range(n):
+                mid = _skewed(rnd, mids)
+                launch, ret = missions[mid]
+                start = _stamp(rnd, _date(rnd, launch, (ret - launch).days))
+                task = _weighted(rnd, TASK_TYPES)
+                yield (mid, f"{task} task", task, start, start + datetime.timedelta(minutes=rnd.randrange(30, 480, 15)),
+                       rnd.choice(astronauts) if rnd.random() < 0.95 else None,
+                       "Done" if start.date() < TODAY else "Scheduled")
+        # random history double-books crews on purpose (srs_schedule.py scan finds
+        # them); the overlap triggers would refuse it
+        schedule.uninstall(self.conn)
+        try:
+            self._load("Schedules", ["MissionID", "TaskDescription", "TaskType", "StartTime", "EndTime",
+                                     "AstronautID", "CurrentStatus"], rows())
+        finally:
+            schedule.install(self.conn)
+
+    def _gen_MedicalRecords(self, n, rnd):
+        astronauts = self._parent("Astronauts", "AstronautID")
+        doctors = astronauts[:max(1, len(astronauts) // 20)]
+
+        def rows():
+            for _ in range(n):
+                cond = _weighted(rnd, CONDITIONS)
+                yield (_skewed(rnd, astronauts), _date(rnd, datetime.date(2016, 1, 1), 10 * 365), cond,
+                       "None" if cond == "Healthy" else f"Treatment plan for {cond.lower()}", rnd.choice(doctors))
+        self._load("MedicalRecords", ["AstronautID", "CheckupDate", "HealthCondition", "Treatment", "DoctorID"], rows())
+
+    def _gen_ResourceAllocations(self, n, rnd):
+        missions = self._mission_windows()
+        mids = self.ids["Missions"]
+        supplies = self._parent("Supplies", "SupplyID")
+
+        def rows():
+            for _ in range(n):
+                mid = _skewed(rnd, mids)
+                yield (mid, _skewed(rnd, supplies), round(rnd.uniform(0.5, 50), 3), _stamp(rnd, missions[mid][0]))
+        # historical allocations: Supplies.Quantity is already the remaining stock
+        alloc.uninstall(self.conn)
+        try:
+            self._load("ResourceAllocations", ["MissionID", "SupplyID", "QuantityAllocated", "AllocationDate"], rows())
+        finally:
+            alloc.install(self.conn)
+
+    def _gen_Communications(self, n, rnd):
+        missions = self._mission_windows()
+        mids = self.ids["Missions"]
+        astronauts = self._parent("Astronauts", "AstronautID")
+
+        def rows():
+            for _ in range(n):
+                mid = _skewed(rnd, mids)
+                launch, ret = missions[mid]
+                yield (mid, rnd.choice(astronauts) if rnd.random() < 0.85 else None, _weighted(rnd, MSG_TYPES),
+                       _stamp(rnd, _date(rnd, launch, (ret - launch).days)),
+                       rnd.choice(MSG_TEXT).format(m=f"module {rnd.randrange(1, 40)}"),
+                       rnd.choice(["Ground Control", "Mission Ops", "Flight Surgeon", "Crew"]))
+        self._load("Communications", ["MissionID", "AstronautID", "MessageType", "TimeStamp", "MessageContent",
+                                      "Recipient"], rows())
+
+    def _gen_Anomalies(self, n, rnd):
+        modules = self._parent("StationModules", "ModuleID")
+        astronauts = self._parent("Astronauts", "AstronautID")
+
+        def rows():
+            for _ in range(n):
+                detected = _date(rnd, datetime.date(2018, 1, 1), 8 * 365)
+                resolved = rnd.random() < 0.8
+                yield (_skewed(rnd, modules), detected, _weighted(rnd, SEVERITY),
+                       rnd.choice(ANOMALY_TEXT).format(m=f"module {rnd.randrange(1, 40)}"),
+                       rnd.choice(astronauts) if resolved else None,
+                       detected + datetime.timedelta(days=rnd.randint(0, 30)) if resolved else None)
+        self._load("Anomalies", ["ModuleID", "DateDetected", "Severity", "Description", "ResolvedByAstronautID",
+                                 "ResolutionDate"], rows())
+
+    # ---------------- mapping tables (distinct pairs per parent) ----------------
+    def _pairs(self, table, columns, parents, children, n, rnd, extra):
+        per = max(1, round(n / len(parents)))
+        k = min(per, len(children))
+        self._load(table, columns,
+                   ((p, c) + extra(rnd, p, c) for p in parents for c in rnd.sample(children, k)))
+
+    def _gen_Astronaut_Missions(self, n, rnd):
+        self._mission_windows()
+        self._pairs("Astronaut_Missions", ["MissionID", "AstronautID", "Role", "HoursWorked"],
+                    self.ids["Missions"], self._parent("Astronauts", "AstronautID"), n, rnd,
+                    lambda r, _p, _c: (r.choice(["Commander", "Pilot", "Engineer", "Scientist", "Medic"]),
+                                       round(r.uniform(10, 2000), 2)))
+
+    def _gen_Mission_Spacecraft(self, n, rnd):
+        missions = self._mission_windows()
+        self._pairs("Mission_Spacecraft", ["MissionID", "SpacecraftID", "AssignmentDate"],
+                    self.ids["Missions"], self._parent("Spacecrafts", "SpacecraftID"), n, rnd,
+                    lambda r, p, _c: (missions[p][0] - datetime.timedelta(days=r.randint(1, 60)),))
+
+    def _gen_Mission_Modules(self, n, rnd):
+        missions = self._mission_windows()
+        self._pairs("Mission_Modules", ["MissionID", "ModuleID", "AssignmentDate"],
+                    self.ids["Missions"], self._parent("StationModules", "ModuleID"), n, rnd,
+                    lambda r, p, _c: (missions[p][0] + datetime.timedelta(days=r.randint(0, 5)),))
+
+    def _gen_Experiment_Astronauts(self, n, rnd):
+        self._pairs("Experiment_Astronauts", ["ExperimentID", "AstronautID", "Role"],
+                    self._parent("Experiments", "ExperimentID"), self._parent("Astronauts", "AstronautID"), n, rnd,
+                    lambda r, _p, _c: (r.choice(["Principal Investigator", "Technician", "Support", "Lead"]),))
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    import mysql.connector
+    from srs_config import HOST, DATABASE, ROLE_CREDENTIALS
+    import srs_audit_triggers as audit
+
+    ap = argparse.ArgumentParser(description="Fill an SRSMS database with seeded synthetic data.")
+    ap.add_argument("--scale", type=int, default=100000, help="Communications rows; other tables scale from it")
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("--database", default=DATABASE)
+    ap.add_argument("--tables", nargs="*", choices=LOAD_ORDER, help="only these tables (parents must exist)")
+    ap.add_argument("--batch", type=int, default=BATCH_ROWS)
+    ap.add_argument("--audit", action="store_true", help="keep audit triggers on while loading (much slower)")
+    ap.add_argument("--plan", action="store_true", help="print table sizes and exit")
+    args = ap.parse_args(argv)
+
+    sizes = plan_sizes(args.scale)
+    if args.plan:
+        for t in LOAD_ORDER:
+            print(f"{t:22} {sizes[t]:>12,}")
+        print(f"{'total':22} {sum(sizes.values()):>12,}")
+        return 0
+
+    conn = mysql.connector.connect(host=HOST, database=args.database, autocommit=True, **ROLE_CREDENTIALS["admin"])
+    mode = audit.installed_mode(conn)
+    try:
+        if not args.audit and mode:
+            audit.uninstall(conn)
+        gen = DataGenerator(conn, args.scale, args.seed, args.batch, log=print)
+        t0 = time.perf_counter()
+        timings = gen.run(args.tables)
+        total = sum(n for n, _dt in timings.values())
+        print(f"{'total':22} {total:>12,} rows {time.perf_counter() - t0:8.1f}s")
+        cur = conn.cursor()
+        cur.callproc("sp_rebuild_summaries")
+        cur.close()
+    finally:
+        if not args.audit and mode:
+            from srs_catalog import SchemaCatalog
+            audit.install(conn, SchemaCatalog(), "staged" if mode == "staged" else "direct")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
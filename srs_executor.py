@@ -0,0 +1,139 @@
+# srs_executor.py
+"""
+Background query executor for SRSMS.
+
+Work functions take a pooled connection and run on a small thread pool, so
+the Tk main loop never waits on MySQL. Each submission returns a
+QueryHandle (a future) that can be cancelled: queued work is simply
+dropped, running work is interrupted server-side with `KILL QUERY`.
+Per-query timeouts use MySQL's MAX_EXECUTION_TIME, which aborts runaway
+SELECTs on the server without touching the connection.
+"""
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from srs_profile import task
+
+DEFAULT_TIMEOUT_MS = 30000
+
+
+class QueryCancelled(Exception):
+    pass
+
+
+class QueryHandle:
+    _ids = itertools.count(1)
+
+    def __init__(self, executor, description):
+        self.id = next(self._ids)
+        self.description = description
+        self.executor = executor
+        self.future = None
+        self.connection_id = None   # server thread id while a query is running
+        self.cancelled = False
+        # held while connection_id is set or cleared and the connection handed
+        # back, and by the kill thread from its id check through KILL QUERY, so
+        # a late kill never reaches a connection another handle has taken over
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None and self.future.cancel():
+            return
+        if self.connection_id is not None:
+            self.executor._kill(self)
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def add_done_callback(self, fn):
+        self.future.add_done_callback(lambda _f: fn(self))
+
+
+class QueryExecutor:
+    def __init__(self, connect, workers=3, timeout_ms=DEFAULT_TIMEOUT_MS, control_connect=None):
+        # connect() returns a (pooled) connection; close() hands it back.
+        # control_connect() is used for KILL QUERY and defaults to connect().
+        self.connect = connect
+        self.control_connect = control_connect or connect
+        self.timeout_ms = timeout_ms
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="srs-query")
+        self._timeouts = {}   # server connection id -> MAX_EXECUTION_TIME currently set
+        self._lock = threading.Lock()
+
+    # ---------------- worker connections ----------------
+    def _apply_timeout(self, conn, timeout_ms):
+        # only round-trip when the session value actually changes; keyed by the
+        # server thread id so a reconnected session is set again
+        cid = conn.connection_id
+        with self._lock:
+            if self._timeouts.get(cid) == timeout_ms:
+                return
+        cur = conn.cursor()
+        cur.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(timeout_ms)}")
+        cur.close()
+        with self._lock:
+            self._timeouts[cid] = timeout_ms
+
+    def _kill(self, handle):
+        def kill():
+            conn = self.control_connect()
+            try:
+                with handle._lock:
+                    if handle.connection_id is None:
+                        return      # finished (and its connection returned) meanwhile
+                    cur = conn.cursor()
+                    cur.execute(f"KILL QUERY {int(handle.connection_id)}")
+                    cur.close()
+            finally:
+                conn.close()
+        # never block the caller (usually the UI thread) on the kill itself
+        threading.Thread(target=kill, daemon=True).start()
+
+    # ---------------- submission ----------------
+    def _run(self, handle, work, timeout_ms):
+        if handle.cancelled:
+            raise QueryCancelled(handle.description)
+        conn = self.connect()
+        with handle._lock:
+            handle.connection_id = conn.connection_id
+        try:
+            if handle.cancelled:
+                raise QueryCancelled(handle.description)
+            self._apply_timeout(conn, timeout_ms)
+            # the profiler files what work() runs under this task's description
+            with task(handle.description):
+                return work(conn)
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            if handle.cancelled:
+                raise QueryCancelled(handle.description)
+            raise
+        finally:
+            with handle._lock:
+                handle.connection_id = None
+                conn.close()
+
+    def submit(self, work, description="query", timeout_ms=None):
+        """Run work(conn) on a worker. timeout_ms=0 disables the limit."""
+        handle = QueryHandle(self, description)
+        if timeout_ms is None:
+            timeout_ms = self.timeout_ms
+        handle.future = self._pool.submit(self._run, handle, work, timeout_ms)
+        return handle
+
+    def call(self, fn, *args, description="task"):
+        """Run a plain callable (no connection) on a worker, e.g. a login probe."""
+        handle = QueryHandle(self, description)
+        handle.future = self._pool.submit(fn, *args)
+        return handle
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
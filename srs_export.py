@@ -0,0 +1,293 @@
+# srs_export.py
+"""
+Streaming export engine for SRSMS.
+
+Reads a whole table (optionally filtered, see srs_search) or any SELECT
+through an unbuffered cursor in fixed-size chunks and writes CSV, gzip'd
+CSV, JSONL (optionally gzip'd), Parquet or Arrow IPC in constant memory. Values are written as
+MySQL returned them, not as Tk display strings.
+
+GUI: the "Export" button. Headless (e.g. nightly dumps from cron):
+  python srs_export.py --role admin --table Communications -o comms.parquet
+  python srs_export.py --role viewer --query "SELECT * FROM vw_LowStock" -o low.csv.gz
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+from mysql.connector.constants import FieldType
+
+CHUNK_ROWS = 5000
+PARQUET_ROW_GROUP = 64 * 1024
+FORMATS = ("csv", "csv.gz", "jsonl", "jsonl.gz", "parquet", "arrow")
+# exports stream for as long as they need to; keep the server from giving up
+# on a slow reader while we compress/encode a chunk
+EXPORT_NET_WRITE_TIMEOUT = 600
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def format_for(path):
+    p = path.lower()
+    if p.endswith((".jsonl.gz", ".ndjson.gz")):
+        return "jsonl.gz"
+    if p.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if p.endswith((".csv.gz", ".gz")):
+        return "csv.gz"
+    if p.endswith((".parquet", ".pq")):
+        return "parquet"
+    if p.endswith((".arrow", ".feather", ".ipc")):
+        return "arrow"
+    return "csv"
+
+
+# ---------------- writers ----------------
+class CsvWriter:
+    def __init__(self, path, columns, compress=False, **_kw):
+        if compress:
+            self.f = gzip.open(path, "wt", newline="", encoding="utf-8")
+        else:
+            self.f = open(path, "w", newline="", encoding="utf-8")
+        self.w = csv.writer(self.f)
+        self.w.writerow(columns)
+
+    def write(self, rows):
+        # None -> empty cell, like the old Treeview export
+        self.w.writerows([("" if v is None else v) for v in r] for r in rows)
+
+    def close(self):
+        self.f.close()
+
+
+class JsonlWriter:
+    """One JSON object per row; JSON columns are embedded as objects, not strings."""
+
+    def __init__(self, path, columns, description=None, compress=False, **_kw):
+        if compress:
+            self.f = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self.f = open(path, "w", encoding="utf-8")
+        self.columns = columns
+        self._json_idx = [i for i, d in enumerate(description or []) if d[1] == FieldType.JSON]
+
+    def write(self, rows):
+        for r in rows:
+            r = list(r)
+            for i in self._json_idx:
+                if r[i] is not None:
+                    r[i] = json.loads(_text(r[i]))
+            self.f.write(json.dumps(dict(zip(self.columns, r)), default=str) + "\n")
+
+    def close(self):
+        self.f.close()
+
+
+def _arrow_type(pa, field_type, col_meta=None):
+    if field_type in (FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG,
+                      FieldType.INT24, FieldType.YEAR, FieldType.BIT):
+        return pa.int64()
+    if field_type in (FieldType.FLOAT, FieldType.DOUBLE):
+        return pa.float64()
+    if field_type in (FieldType.DECIMAL, FieldType.NEWDECIMAL):
+        # exact decimals when the catalog knows precision/scale, else float
+        m = re.match(r"decimal\((\d+),(\d+)\)", (col_meta.column_type if col_meta else "") or "")
+        return pa.decimal128(int(m.group(1)), int(m.group(2))) if m else pa.float64()
+    if field_type in (FieldType.DATE, FieldType.NEWDATE):
+        return pa.date32()
+    if field_type in (FieldType.DATETIME, FieldType.TIMESTAMP):
+        return pa.timestamp("us")
+    if field_type in (FieldType.TINY_BLOB, FieldType.MEDIUM_BLOB, FieldType.LONG_BLOB,
+                      FieldType.BLOB, FieldType.GEOMETRY) and not (col_meta and "text" in col_meta.data_type):
+        return pa.binary()
+    return pa.string()
+
+
+def _text(v):
+    if isinstance(v, (bytes, bytearray)):
+        return v.decode("utf-8", "replace")
+    return v if v is None or isinstance(v, str) else str(v)
+
+
+class ArrowWriter:
+    """Parquet (row groups of PARQUET_ROW_GROUP rows) or Arrow IPC file."""
+
+    def __init__(self, path, columns, description=None, meta=None, fmt="parquet"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet/Arrow export needs pyarrow (pip install pyarrow)")
+        self.pa = pa
+        fields = []
+        for i, name in enumerate(columns):
+            ftype = description[i][1] if description else None
+            fields.append(pa.field(name, _arrow_type(pa, ftype, meta.column(name) if meta else None)))
+        self.schema = pa.schema(fields)
+        self._pending = []
+        self._pending_rows = 0
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            self._write = self._writer.write_table
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+            self._write = self._writer.write_table
+
+    def _column(self, values, field):
+        pa = self.pa
+        if pa.types.is_string(field.type):
+            values = [_text(v) for v in values]
+        elif pa.types.is_floating(field.type):
+            values = [None if v is None else float(v) for v in values]
+        return pa.array(values, type=field.type)
+
+    def write(self, rows):
+        cols = list(zip(*rows))
+        arrays = [self._column(cols[i], f) for i, f in enumerate(self.schema)]
+        self._pending.append(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        self._pending_rows += len(rows)
+        if self._pending_rows >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._write(self.pa.concat_tables(self._pending).combine_chunks())
+            self._pending, self._pending_rows = [], 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        if hasattr(self, "_sink"):
+            self._sink.close()
+
+
+def open_writer(fmt, path, columns, description=None, meta=None):
+    if fmt == "csv":
+        return CsvWriter(path, columns)
+    if fmt == "csv.gz":
+        return CsvWriter(path, columns, compress=True)
+    if fmt in ("jsonl", "jsonl.gz"):
+        return JsonlWriter(path, columns, description, compress=fmt == "jsonl.gz")
+    if fmt in ("parquet", "arrow"):
+        return ArrowWriter(path, columns, description, meta, fmt)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+# ---------------- engine ----------------
+def export_query(conn, sql, params, path, fmt=None, meta=None, chunk_rows=CHUNK_ROWS,
+                 progress=None, cancel=None):
+    """
+    Stream `sql` into `path`. progress(rows_so_far) is called after every
+    chunk; set the `cancel` threading.Event to stop. Returns rows written.
+    A cancelled or failed export leaves no partial file behind.
+    """
+    fmt = fmt or format_for(path)
+    cur = conn.cursor()
+    cur.execute(f"SET SESSION net_write_timeout = {EXPORT_NET_WRITE_TIMEOUT}")
+    cur.close()
+
+    # unbuffered cursor: rows arrive from the server as we fetch them
+    cur = conn.cursor(buffered=False)
+    cur.execute(sql, tuple(params or ()))
+    writer = None
+    written = 0
+    finished = False
+    try:
+        writer = open_writer(fmt, path, list(cur.column_names), cur.description, meta)
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled(f"Export to {path} cancelled after {written} rows")
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            writer.write(rows)
+            written += len(rows)
+            if progress:
+                progress(written)
+        writer.close()
+        finished = True
+        cur.close()
+        return written
+    finally:
+        if not finished:
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+            if os.path.exists(path):
+                os.remove(path)
+            # the rest of the result set is still on the wire; dropping the
+            # session is far cheaper than reading millions of rows to discard them
+            try:
+                conn.disconnect()
+            except Exception:
+                pass
+
+
+def table_export_sql(meta, where="", params=()):
+    sql = f"SELECT * FROM `{meta.name}`"
+    if where:
+        sql += f" WHERE {where}"
+    if meta.pk:
+        # primary-key order streams straight off the clustered index
+        sql += " ORDER BY " + ", ".join(f"`{c}`" for c in meta.pk)
+    return sql, list(params)
+
+
+def export_table(conn, catalog, table, path, search="", **kw):
+    from srs_search import build_where
+    meta = catalog.get(conn, table)
+    where, params = build_where(meta, search) if search else ("", [])
+    sql, params = table_export_sql(meta, where, params)
+    return export_query(conn, sql, params, path, meta=meta, **kw)
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_catalog import SchemaCatalog
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description="Stream an SRSMS table or query to CSV / JSONL (.gz) / Parquet / Arrow.")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--table", help="table or view to export")
+    src.add_argument("--query", help="SELECT statement to export")
+    ap.add_argument("--search", default="", help="filter for --table, same syntax as the GUI search box")
+    ap.add_argument("--role", default="viewer", help="DB role to connect as (default: viewer)")
+    ap.add_argument("-o", "--output", required=True, help="output file; format from extension unless --format")
+    ap.add_argument("--format", choices=FORMATS)
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = ap.parse_args(argv)
+
+    if args.query and not args.query.strip().lower().startswith("select"):
+        ap.error("--query must be a SELECT")
+
+    t0 = time.perf_counter()
+
+    def progress(n):
+        dt = time.perf_counter() - t0
+        print(f"\r{n:,} rows  {n / dt if dt else 0:,.0f} rows/s", end="", file=sys.stderr)
+
+    conn = checkout(args.role)
+    try:
+        kw = dict(fmt=args.format, chunk_rows=args.chunk_rows, progress=progress)
+        if args.table:
+            n = export_table(conn, SchemaCatalog(), args.table, args.output, args.search, **kw)
+        else:
+            n = export_query(conn, args.query, (), args.output, **kw)
+    finally:
+        conn.close()
+    print(f"\nExported {n:,} rows to {args.output} in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
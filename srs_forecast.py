@@ -0,0 +1,491 @@
+# srs_forecast.py
+"""
+Supply depletion forecast and reorder planner for SRSMS.
+
+vw_LowStock only flags supplies under a fixed 50; this projects when each
+supply and each resource actually runs out.
+
+  history     mv_ResourceDailyUse (quantity allocated per resource and
+              day) and mv_MissionResourceUse (per mission and resource),
+              kept current by the trg_mv_alloc_* triggers on
+              ResourceAllocations: each allocation is added to its bucket
+              once, as it is written, so planning never rescans years of
+              allocations. sp_rebuild_summaries() recomputes both.
+  rates       the exponentially weighted mean daily use of the last
+              FORECAST_WINDOW_DAYS, for every resource in one pass
+  missions    Planned missions launching within the horizon draw their
+              expected need on launch day: past missions' use per
+              mission-day times the duration, less what is already
+              allocated to them
+  projection  each resource's supplies are used first-expiry-first-out;
+              stock still left on its ExpiryDate is written off. Gives the
+              day each supply runs dry and each resource's stockout day,
+              and from that a reorder-by date and quantity
+  output      SupplyForecast, ReorderPlan and a ForecastRuns row, which the
+              dashboard reads as they are. refresh() recomputes only when
+              allocations or stock changed, the day rolled over or the last
+              run is older than FORECAST_MAX_AGE.
+
+  python srs_forecast.py refresh [--force]
+  python srs_forecast.py plan [--all]            # the reorder list
+  python srs_forecast.py supplies [--resource 3]
+  python srs_forecast.py install                 # triggers + backfill (after migration 0004)
+  python srs_forecast.py sql                     # the triggers as a mysql-client script
+"""
+import argparse
+import sys
+import textwrap
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from srs_config import (FORECAST_COVER_DAYS, FORECAST_HALFLIFE_DAYS, FORECAST_HORIZON_DAYS, FORECAST_LEAD_DAYS,
+                        FORECAST_MAX_AGE, FORECAST_MISSION_DAYS, FORECAST_SAFETY_DAYS, FORECAST_WINDOW_DAYS)
+
+TRIGGERS = {"INSERT": "trg_mv_alloc_ins", "UPDATE": "trg_mv_alloc_upd", "DELETE": "trg_mv_alloc_del"}
+PLAN_COLUMNS = ["Priority", "ResourceID", "ResourceName", "Unit", "DailyRate", "OnHand", "MissionNeed",
+                "StockoutOn", "ReorderBy", "ReorderQuantity"]
+SUPPLY_COLUMNS = ["SupplyID", "ResourceID", "Quantity", "ExpiryDate", "StartsOn", "DepletesOn", "ExpiresUnused"]
+
+# (table, statement refilling it from ResourceAllocations), as in sp_rebuild_summaries
+BACKFILL = (
+    ("mv_ResourceDailyUse",
+     "INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations) "
+     "SELECT s.ResourceID, DATE(ra.AllocationDate), SUM(ra.QuantityAllocated), COUNT(*) "
+     "FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID "
+     "WHERE ra.AllocationDate IS NOT NULL GROUP BY s.ResourceID, DATE(ra.AllocationDate)"),
+    ("mv_MissionResourceUse",
+     "INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity) "
+     "SELECT ra.MissionID, s.ResourceID, SUM(ra.QuantityAllocated) "
+     "FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID GROUP BY ra.MissionID, s.ResourceID"),
+)
+
+Run = namedtuple("Run", "run_id computed_at as_of last_allocation_id supply_count supply_stock seconds")
+
+
+class Forecast:
+    """One projection: the reorder plan (one row per resource) and every supply's outlook."""
+
+    def __init__(self, as_of, plan, supplies, fingerprint=None, seconds=0.0):
+        self.as_of = as_of
+        self.plan = plan            # DataFrame, PLAN_COLUMNS without the names
+        self.supplies = supplies    # DataFrame, SUPPLY_COLUMNS
+        self.fingerprint = fingerprint
+        self.seconds = seconds
+
+
+# ---------------- projection ----------------
+def consumption_rates(usage, resources, as_of, window=FORECAST_WINDOW_DAYS, halflife=FORECAST_HALFLIFE_DAYS):
+    """
+    Daily use per resource (array aligned with `resources`) from `usage`
+    (ResourceID, UseDate, Quantity): the mean over the `window` days before
+    as_of, each day weighted 0.5 ** (age / halflife), so days without
+    allocations count as zero and recent weeks count most.
+    """
+    rates = np.zeros(len(resources))
+    if usage.empty:
+        return rates
+    age = (pd.Timestamp(as_of) - pd.to_datetime(usage["UseDate"])).dt.days.to_numpy()
+    pos = pd.Index(resources).get_indexer(usage["ResourceID"])
+    keep = (age >= 1) & (age <= window) & (pos >= 0)
+    weights = 0.5 ** (age[keep] / halflife)
+    rates += np.bincount(pos[keep], weights=weights * usage["Quantity"].to_numpy(float)[keep],
+                         minlength=len(resources))
+    return rates / (0.5 ** (np.arange(1, window + 1) / halflife)).sum()
+
+
+def mission_lumps(per_mission_day, upcoming, allocated, resources, as_of, horizon=FORECAST_HORIZON_DAYS,
+                  default_days=FORECAST_MISSION_DAYS):
+    """
+    (resources x horizon) quantities drawn on launch days. per_mission_day
+    is aligned with `resources`; upcoming has MissionID, LaunchDate, Days
+    (NaN: default_days); allocated has MissionID, ResourceID, Quantity
+    already set aside for those missions.
+    """
+    lumps = np.zeros((len(resources), horizon))
+    if upcoming.empty:
+        return lumps
+    days = upcoming["Days"].fillna(default_days).to_numpy(float)
+    need = np.outer(per_mission_day, days)                         # resources x missions
+    if not allocated.empty:
+        r = pd.Index(resources).get_indexer(allocated["ResourceID"])
+        m = pd.Index(upcoming["MissionID"]).get_indexer(allocated["MissionID"])
+        ok = (r >= 0) & (m >= 0)
+        np.subtract.at(need, (r[ok], m[ok]), allocated["Quantity"].to_numpy(float)[ok])
+    launch = (pd.to_datetime(upcoming["LaunchDate"]) - pd.Timestamp(as_of)).dt.days.to_numpy()
+    ok = (launch >= 0) & (launch < horizon)
+    for col, day in zip(np.flatnonzero(ok), launch[ok]):
+        lumps[:, day] += np.clip(need[:, col], 0, None)
+    return lumps
+
+
+def cumulative_demand(rates, lumps):
+    """cum[r, d]: what resource r is expected to use in the first d days (d = 0 .. horizon)."""
+    cum = np.zeros((len(rates), lumps.shape[1] + 1))
+    np.cumsum(rates[:, None] + lumps, axis=1, out=cum[:, 1:])
+    return cum
+
+
+def _walk(cum_r, qty, expires):
+    """
+    First-expiry-first-out through one resource's supplies (sorted by
+    expiry): the demand level each starts and stops serving at, and the
+    quantity written off. Vectorized unless some supply expires before
+    it is used up, since that shifts every later one.
+    """
+    horizon = len(cum_r) - 1
+    cap = np.where(np.isnan(expires), np.inf,
+                   cum_r[np.clip(np.nan_to_num(expires, nan=0), 0, horizon).astype(int)])
+    cap[~np.isnan(expires) & (expires > horizon)] = np.inf
+    ends = np.cumsum(qty)
+    starts = ends - qty
+    if (cap >= ends).all():
+        return starts, ends, np.zeros(len(qty))
+    stops, waste = np.empty(len(qty)), np.zeros(len(qty))
+    level = 0.0
+    for i in range(len(qty)):
+        starts[i] = level
+        stops[i] = min(max(cap[i], level), level + qty[i])
+        waste[i] = level + qty[i] - stops[i]
+        level = stops[i]
+    return starts, stops, waste
+
+
+def _days(cum_r, levels, side):
+    """Day offset at which demand first reaches (side "left") or passes ("right") each level; NaN past the horizon."""
+    d = np.searchsorted(cum_r, levels, side=side).astype(float)
+    d[d >= len(cum_r)] = np.nan
+    return np.maximum(d - 1, 0)
+
+
+def _dates(as_of, days):
+    out = np.full(len(days), np.datetime64("NaT"), dtype="datetime64[D]")
+    inside = ~np.isnan(days)
+    out[inside] = np.datetime64(as_of, "D") + days[inside].astype(int)
+    return out
+
+
+def project(resources, rates, lumps, supplies, as_of, lead=FORECAST_LEAD_DAYS, safety=FORECAST_SAFETY_DAYS,
+            cover=FORECAST_COVER_DAYS):
+    """
+    (plan, outlook) for `resources` (their IDs), given their daily rates,
+    the mission lumps and `supplies` (SupplyID, ResourceID, Quantity,
+    ExpiryDate). The plan ranks resources by how soon stock must be
+    reordered; resources lasting the horizon come last without dates.
+    """
+    horizon = lumps.shape[1]
+    cum = cumulative_demand(rates, lumps)
+    index = pd.Index(resources)
+    sup = supplies.assign(Quantity=supplies["Quantity"].astype(float),
+                          ExpiryDate=pd.to_datetime(supplies["ExpiryDate"]))
+    sup = sup[index.get_indexer(sup["ResourceID"]) >= 0].sort_values(
+        ["ResourceID", "ExpiryDate", "SupplyID"], na_position="last").reset_index(drop=True)
+    expires = (sup["ExpiryDate"] - pd.Timestamp(as_of)).dt.days.to_numpy(float)
+    qty = sup["Quantity"].to_numpy()
+    starts_on = np.full(len(sup), np.nan)
+    depletes_on = np.full(len(sup), np.nan)
+    waste = np.zeros(len(sup))
+    served = np.zeros(len(resources))      # demand each resource's stock can meet
+    pos = index.get_indexer(sup["ResourceID"])
+    bounds = np.flatnonzero(np.diff(pos, prepend=-1, append=-1))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        r = pos[lo]
+        starts, stops, waste[lo:hi] = _walk(cum[r], qty[lo:hi], expires[lo:hi])
+        drawn = stops > starts
+        starts_on[lo:hi] = np.where(drawn, _days(cum[r], starts, "right"), np.nan)
+        depletes_on[lo:hi] = np.where(waste[lo:hi] == 0, _days(cum[r], stops, "left"), np.nan)
+        served[r] = stops[-1]
+    outlook = sup.assign(StartsOn=_dates(as_of, starts_on), DepletesOn=_dates(as_of, depletes_on),
+                         ExpiresUnused=waste)
+
+    stockout = np.array([_days(cum[r], [served[r]], "right")[0] for r in range(len(resources))])
+    reorder_qty = rates * cover
+    for r in np.flatnonzero(~np.isnan(stockout)):
+        first = int(stockout[r])
+        reorder_qty[r] += lumps[r, first:min(first + cover, horizon)].sum()
+    plan = pd.DataFrame({
+        "ResourceID": resources,
+        "DailyRate": rates,
+        "OnHand": sup.groupby("ResourceID")["Quantity"].sum().reindex(index, fill_value=0).to_numpy(),
+        "MissionNeed": lumps.sum(axis=1),
+        "StockoutOn": _dates(as_of, stockout),
+        "ReorderBy": _dates(as_of, stockout - (lead + safety)),
+        "ReorderQuantity": np.where(np.isnan(stockout), 0.0, reorder_qty),
+    })
+    plan = plan.sort_values(["ReorderBy", "DailyRate"], ascending=[True, False], na_position="last")
+    plan.insert(0, "Priority", np.arange(1, len(plan) + 1))
+    return plan.reset_index(drop=True), outlook[SUPPLY_COLUMNS]
+
+
+# ---------------- database ----------------
+def _frame(cur, sql, params, columns):
+    cur.execute(sql, params)
+    return pd.DataFrame(cur.fetchall(), columns=columns)
+
+
+def fingerprint(conn):
+    """What a forecast depends on besides the date: (newest AllocationID, supplies, total stock)."""
+    cur = conn.cursor()
+    cur.execute("SELECT COALESCE(MAX(AllocationID), 0) FROM ResourceAllocations")
+    last = cur.fetchone()[0]
+    cur.execute("SELECT COUNT(*), COALESCE(SUM(Quantity), 0) FROM Supplies")
+    count, stock = cur.fetchone()
+    cur.close()
+    return int(last), int(count), float(stock)
+
+
+def compute(conn, as_of=None, horizon=FORECAST_HORIZON_DAYS, window=FORECAST_WINDOW_DAYS):
+    """
+    A Forecast from the maintained buckets: a window of daily use, the
+    per-mission totals, current stock and the Planned missions ahead.
+    """
+    t0 = time.perf_counter()
+    as_of = as_of or date.today()
+    fp = fingerprint(conn)
+    cur = conn.cursor()
+    cur.execute("SELECT ResourceID FROM Resources ORDER BY ResourceID")
+    resources = [r[0] for r in cur.fetchall()]
+    usage = _frame(cur, "SELECT ResourceID, UseDate, Quantity FROM mv_ResourceDailyUse "
+                        "WHERE UseDate >= %s AND UseDate < %s", (as_of - timedelta(days=window), as_of),
+                   ["ResourceID", "UseDate", "Quantity"])
+    # use per mission-day over missions that have come back
+    past = _frame(cur, "SELECT MissionID, DATEDIFF(ReturnDate, LaunchDate) FROM Missions "
+                       "WHERE LaunchDate IS NOT NULL AND ReturnDate > LaunchDate AND ReturnDate <= %s", (as_of,),
+                  ["MissionID", "Days"])
+    used = _frame(cur, "SELECT mru.ResourceID, SUM(mru.Quantity) FROM mv_MissionResourceUse mru "
+                       "JOIN Missions m ON m.MissionID = mru.MissionID "
+                       "WHERE m.LaunchDate IS NOT NULL AND m.ReturnDate > m.LaunchDate AND m.ReturnDate <= %s "
+                       "GROUP BY mru.ResourceID", (as_of,), ["ResourceID", "Quantity"])
+    upcoming = _frame(cur, "SELECT MissionID, LaunchDate, DATEDIFF(ReturnDate, LaunchDate) FROM Missions "
+                           "WHERE CurrentStatus = 'Planned' AND LaunchDate >= %s AND LaunchDate < %s",
+                      (as_of, as_of + timedelta(days=horizon)), ["MissionID", "LaunchDate", "Days"])
+    allocated = pd.DataFrame(columns=["MissionID", "ResourceID", "Quantity"])
+    if not upcoming.empty:
+        ids = upcoming["MissionID"].tolist()
+        allocated = _frame(cur, "SELECT MissionID, ResourceID, Quantity FROM mv_MissionResourceUse "
+                                f"WHERE MissionID IN ({', '.join(['%s'] * len(ids))})", ids,
+                           ["MissionID", "ResourceID", "Quantity"])
+    supplies = _frame(cur, "SELECT SupplyID, ResourceID, Quantity, ExpiryDate FROM Supplies WHERE Quantity > 0", (),
+                      ["SupplyID", "ResourceID", "Quantity", "ExpiryDate"])
+    cur.close()
+
+    mission_days = past["Days"].astype(float).sum()
+    per_mission_day = np.zeros(len(resources))
+    if mission_days > 0 and not used.empty:
+        per_mission_day = (used.set_index("ResourceID")["Quantity"].astype(float)
+                           .reindex(resources, fill_value=0).to_numpy() / mission_days)
+    default_days = float(past["Days"].median()) if not past.empty else FORECAST_MISSION_DAYS
+    upcoming["Days"] = pd.to_numeric(upcoming["Days"], errors="coerce")
+    rates = consumption_rates(usage, resources, as_of, window)
+    lumps = mission_lumps(per_mission_day, upcoming, allocated, resources, as_of, horizon, default_days)
+    plan, outlook = project(resources, rates, lumps, supplies, as_of)
+    return Forecast(as_of, plan, outlook, fp, time.perf_counter() - t0)
+
+
+def _rows(frame):
+    """Plain Python rows for executemany: NaN / NaT become NULL, dates become date."""
+    out = []
+    for row in frame.itertuples(index=False):
+        out.append(tuple(None if pd.isna(v) else v.date() if isinstance(v, pd.Timestamp)
+                         else round(float(v), 3) if isinstance(v, float) else int(v) if isinstance(v, np.integer)
+                         else v for v in row))
+    return out
+
+
+def save(conn, forecast):
+    """Replace SupplyForecast and ReorderPlan with `forecast` and log the run, in one transaction."""
+    plan_cols = [c for c in PLAN_COLUMNS if c not in ("ResourceName", "Unit")]
+    supply_cols = ["SupplyID", "ResourceID", "StartsOn", "DepletesOn", "ExpiresUnused"]
+    conn.start_transaction()
+    try:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM SupplyForecast")
+        cur.executemany(f"INSERT INTO SupplyForecast ({', '.join(supply_cols)}) "
+                        f"VALUES ({', '.join(['%s'] * len(supply_cols))})", _rows(forecast.supplies[supply_cols]))
+        cur.execute("DELETE FROM ReorderPlan")
+        cur.executemany(f"INSERT INTO ReorderPlan ({', '.join(plan_cols)}) "
+                        f"VALUES ({', '.join(['%s'] * len(plan_cols))})", _rows(forecast.plan[plan_cols]))
+        last, count, stock = forecast.fingerprint
+        cur.execute("INSERT INTO ForecastRuns (ComputedAt, AsOf, LastAllocationID, SupplyCount, SupplyStock, Seconds) "
+                    "VALUES (NOW(), %s, %s, %s, %s, %s)", (forecast.as_of, last, count, stock, forecast.seconds))
+        cur.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def last_run(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT RunID, ComputedAt, AsOf, LastAllocationID, SupplyCount, SupplyStock, Seconds "
+                "FROM ForecastRuns ORDER BY RunID DESC LIMIT 1")
+    row = cur.fetchone()
+    cur.close()
+    return Run(*row) if row else None
+
+
+def is_current(run, fp, as_of=None, now=None, max_age=FORECAST_MAX_AGE):
+    """Whether `run` still stands: same day, nothing allocated or restocked since and not too old."""
+    if run is None:
+        return False
+    now = now or datetime.now()
+    return (run.as_of == (as_of or now.date()) and (run.last_allocation_id, run.supply_count) == fp[:2]
+            and abs(float(run.supply_stock) - fp[2]) < 0.0005
+            and (now - run.computed_at).total_seconds() < max_age)
+
+
+def refresh(conn, force=False, as_of=None):
+    """Recompute and store the forecast unless the stored one is current. Returns the Run in effect."""
+    run = last_run(conn)
+    if not force and is_current(run, fingerprint(conn), as_of):
+        return run
+    save(conn, compute(conn, as_of))
+    return last_run(conn)
+
+
+def reorder_plan(conn, due_only=True):
+    """The stored reorder list (PLAN_COLUMNS rows), most urgent first; due_only drops resources that last the horizon."""
+    cur = conn.cursor()
+    cur.execute("SELECT rp.Priority, rp.ResourceID, r.ResourceName, r.Unit, rp.DailyRate, rp.OnHand, rp.MissionNeed, "
+                "rp.StockoutOn, rp.ReorderBy, rp.ReorderQuantity FROM ReorderPlan rp "
+                "JOIN Resources r ON r.ResourceID = rp.ResourceID"
+                + (" WHERE rp.StockoutOn IS NOT NULL" if due_only else "") + " ORDER BY rp.Priority")
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+
+def supply_outlook(conn, resource_id=None):
+    """The stored per-supply forecast (SUPPLY_COLUMNS rows), soonest to run dry first."""
+    sql = ("SELECT sf.SupplyID, sf.ResourceID, s.Quantity, s.ExpiryDate, sf.StartsOn, sf.DepletesOn, sf.ExpiresUnused "
+           "FROM SupplyForecast sf JOIN Supplies s ON s.SupplyID = sf.SupplyID")
+    params = ()
+    if resource_id is not None:
+        sql += " WHERE sf.ResourceID = %s"
+        params = (resource_id,)
+    cur = conn.cursor()
+    cur.execute(sql + " ORDER BY sf.DepletesOn IS NULL, sf.DepletesOn, sf.SupplyID", params)
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+
+# ---------------- triggers ----------------
+def _apply(row, op):
+    """Statements adding (op "+") or taking back ("-") one allocation, read from NEW or OLD."""
+    sign = "" if op == "+" else "-"
+    return f"""SET v_resource = (SELECT ResourceID FROM Supplies WHERE SupplyID = {row}.SupplyID);
+IF v_resource IS NOT NULL THEN
+  IF {row}.AllocationDate IS NOT NULL THEN
+    INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations)
+      VALUES (v_resource, DATE({row}.AllocationDate), {sign}{row}.QuantityAllocated, {sign}1)
+      ON DUPLICATE KEY UPDATE Quantity = Quantity {op} {row}.QuantityAllocated, Allocations = Allocations {op} 1;
+  END IF;
+  INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity)
+    VALUES ({row}.MissionID, v_resource, {sign}{row}.QuantityAllocated)
+    ON DUPLICATE KEY UPDATE Quantity = Quantity {op} {row}.QuantityAllocated;
+END IF;
+"""
+
+
+def trigger_sql(op):
+    """CREATE TRIGGER statement (no DELIMITER) keeping the usage buckets in step with ResourceAllocations."""
+    if op == "INSERT":
+        body = _apply("NEW", "+")
+    elif op == "DELETE":
+        body = _apply("OLD", "-")
+    else:
+        body = ("IF NOT (OLD.MissionID <=> NEW.MissionID AND OLD.SupplyID <=> NEW.SupplyID\n"
+                "        AND OLD.QuantityAllocated <=> NEW.QuantityAllocated "
+                "AND OLD.AllocationDate <=> NEW.AllocationDate) THEN\n"
+                + textwrap.indent(_apply("OLD", "-") + _apply("NEW", "+"), "  ") + "END IF;\n")
+    return f"""CREATE TRIGGER {TRIGGERS[op]}
+AFTER {op} ON ResourceAllocations
+FOR EACH ROW
+BEGIN
+  DECLARE v_resource INT;
+{textwrap.indent(body, "  ")}END"""
+
+
+def script():
+    """mysql-client script (with DELIMITER) recreating the triggers."""
+    return "\n".join(f"DROP TRIGGER IF EXISTS {name};\nDELIMITER $$\n{trigger_sql(op)}$$\nDELIMITER ;\n"
+                     for op, name in TRIGGERS.items())
+
+
+def backfill(conn):
+    """Refill both usage tables from ResourceAllocations (what sp_rebuild_summaries does for them)."""
+    conn.start_transaction()
+    try:
+        cur = conn.cursor()
+        for table, sql in BACKFILL:
+            cur.execute(f"DELETE FROM {table}")
+            cur.execute(sql)
+            cur.execute("REPLACE INTO mv_RefreshLog VALUES (%s, NOW(), %s)", (table, cur.rowcount))
+        cur.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def install(conn, catalog=None):
+    """(Re)create the triggers, then backfill what they would have recorded so far."""
+    cur = conn.cursor()
+    for op, name in TRIGGERS.items():
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+        sql = trigger_sql(op)
+        cur.execute(sql)
+        if catalog is not None:
+            catalog.note_statement(sql)
+    cur.close()
+    backfill(conn)
+
+
+# ---------------- command line ----------------
+def _print(columns, rows):
+    print("\t".join(columns))
+    for r in rows:
+        print("\t".join("" if v is None else str(v) for v in r))
+
+
+def main(argv=None):
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("action", choices=["refresh", "plan", "supplies", "install", "sql"])
+    ap.add_argument("--force", action="store_true", help="refresh: recompute even if the stored forecast is current")
+    ap.add_argument("--all", action="store_true", help="plan: also resources that last the horizon")
+    ap.add_argument("--resource", type=int, help="supplies: one resource's")
+    args = ap.parse_args(argv)
+
+    if args.action == "sql":
+        print(script())
+        return 0
+    conn = checkout("admin", "worker")
+    try:
+        if args.action == "install":
+            install(conn)
+            print(f"installed {', '.join(TRIGGERS.values())}; usage tables backfilled", file=sys.stderr)
+        elif args.action == "refresh":
+            before = last_run(conn)
+            run = refresh(conn, args.force)
+            what = "recomputed" if before is None or run.run_id != before.run_id else "already current"
+            print(f"forecast as of {run.as_of} {what} (run {run.run_id}, {run.seconds * 1000:.0f} ms)",
+                  file=sys.stderr)
+        elif args.action == "plan":
+            refresh(conn)
+            _print(PLAN_COLUMNS, reorder_plan(conn, not args.all))
+        else:
+            refresh(conn)
+            _print(SUPPLY_COLUMNS, supply_outlook(conn, args.resource))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
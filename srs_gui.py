@@ -7,47 +7,59 @@ Run:
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import ttkbootstrap as tb
-import mysql.connector
-from mysql.connector import Error
-import csv
-from datetime import datetime
+import tkinter.font as tkfont
+import os
+import queue
+import shlex
+import threading
+import time
+from datetime import datetime, timedelta
+from srs_config import (ROLE_CREDENTIALS, TABLES_TO_SHOW, VIEWS, POOL_SIZES, AUDIT_REFRESH_SECONDS,
+                        CACHE_AUDIT_POLL_SECONDS, TELEMETRY_THRESHOLDS)
+from srs_catalog import SchemaCatalog
+from srs_search import build_where, SearchError
+from srs_executor import QueryExecutor, QueryCancelled, DEFAULT_TIMEOUT_MS
+from srs_import import write_rejects
+from srs_alloc import parse_plan_text, PlanError
+from srs_audit import AuditTail, AUDIT_COLUMNS
+from srs_summaries import SUMMARIES, status as summary_status
+from srs_cache import QueryCache, AuditWatcher
+from srs_profile import PROFILER, start_exporter
 
 # ---------- CONFIG ----------
-HOST = "localhost"
-DATABASE = "srsdb"
-
-# Map roles -> DB credentials (match your created users)
-ROLE_CREDENTIALS = {
-    "admin":    {"user": "admin_srs",    "password": "Admin@123"},
-    "operator": {"user": "operator_srs", "password": "Op@123"},
-    "viewer":   {"user": "viewer_srs",   "password": "View@123"}
-}
-
-# Default tables to list in dropdown (you can modify if you added/removed tables)
-TABLES_TO_SHOW = [
-    'Astronauts','AstronautSkills','Missions','StationModules','Resources','Supplies',
-    'LifeSupportSystems','Spacecrafts','Experiments','Schedules','MedicalRecords',
-    'ResourceAllocations','Communications','Anomalies','Astronaut_Missions',
-    'Mission_Spacecraft','Mission_Modules','Experiment_Astronauts'
-]
-
-VIEWS = ['vw_LowStock','vw_ActiveMissions','vw_ExperimentSummary','vw_ModuleAnomalies','vw_AstronautHealth']
+# (connection settings, roles and table lists live in srs_config.py)
+# Background query workers and how often the Tk loop collects their results
+QUERY_WORKERS = POOL_SIZES["worker"]
+UI_POLL_MS = 30
+AUDIT_ALL_TABLES = "(all tables)"
+# Static results go into the grid this many ms at a time, the event loop
+# running in between; column widths are measured on a sample of the rows
+RENDER_SLICE_MS = 15
+COLUMN_SAMPLE_ROWS = 200
+COLUMN_WIDTH_RANGE = (60, 360)
+
+# ---------- Deferred imports ----------
+# mysql.connector (via srs_pool / srs_export / srs_mirror) and ttkbootstrap
+# are most of the start-up time. SRSApp imports them on a helper thread while
+# the login window paints; nothing that runs before login may use these names.
+backend_ready = threading.Event()
+
+
+def _import_backend():
+    global tb, checkout, export_query, table_export_sql, format_for, ExportCancelled
+    global search_audit, StationService, ServiceError, EXAMPLE_QUERIES, Mirror, MirrorSync, mirror_path, is_offline
+    import ttkbootstrap as tb
+    from srs_pool import checkout
+    from srs_export import export_query, table_export_sql, format_for, ExportCancelled
+    from srs_audit_archive import search_audit
+    from srs_service import StationService, ServiceError, EXAMPLE_QUERIES
+    from srs_mirror import Mirror, MirrorSync, mirror_path, is_offline
+    backend_ready.set()
 
 # ---------- Helper DB functions ----------
-def create_conn_for_role(role):
-    creds = {
-        "admin": ("admin_srs", "Admin@123"),
-        "operator": ("operator_srs", "Operator@123"),
-        "viewer": ("viewer_srs", "Viewer@123"),
-    }
-    user, pwd = creds[role.lower()]
-    return mysql.connector.connect(
-        host="localhost",
-        user=user,
-        password=pwd,
-        database="srsdb"
-    )
+def create_conn_for_role(role, purpose="ui"):
+    # pooled: close() hands the connection back instead of disconnecting
+    return checkout(role, purpose)
 
 
 def test_connect_for_role(role):
@@ -58,35 +70,464 @@ def test_connect_for_role(role):
     except Exception as e:
         return False, str(e)
 
+# ---------- Virtual table ----------
+class VirtualTable:
+    """
+    Keeps only a window of a (possibly huge) table inside a ttk.Treeview.
+
+    The Treeview holds at most `window_pages` pages: the visible rows plus a
+    prefetch buffer. Scrolling near the bottom fetches the next page by
+    keyset and drops pages from the top (and vice versa), so memory use and
+    time-to-first-paint stay flat whatever the table size.
+
+    Clicking a heading sorts: paged tables are reopened through on_sort(table,
+    column, descending) so the server pages them in that order; static
+    results are sorted in memory and re-rendered in time slices.
+    """
+    PREFETCH_AT = 0.85   # fetch once the view is this far into the buffer
+
+    def __init__(self, tree, scrollbar, run, window_pages=3, on_sort=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        # run(work, on_done, on_error) executes work(conn) off the UI thread
+        self.run = run
+        self.window_pages = window_pages
+        self.on_sort = on_sort
+        self.pager = None
+        self.keys = []          # key of every row currently in the tree, in order
+        self.rows = None        # the static result shown (show_rows), for sorting
+        self.sort = None        # (column, descending) the grid is ordered by
+        self.at_start = True
+        self.at_end = True
+        self._busy = False
+        self._render_job = None
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+    @property
+    def max_rows(self):
+        return self.pager.page_size * self.window_pages if self.pager else 0
+
+    def _set_columns(self, cols, rows):
+        self._cancel_render()
+        self.tree.delete(*self.tree.get_children())
+        self.tree['columns'] = cols
+        widths = self._column_widths(cols, rows)
+        for c, w in zip(cols, widths):
+            self.tree.heading(c, command=lambda c=c: self._heading_clicked(c))
+            self.tree.column(c, width=w, anchor='center')
+        self._show_sort()
+
+    @staticmethod
+    def _column_widths(cols, rows):
+        # longest text per column in an evenly spread sample, measured once per column
+        step = max(1, len(rows) // COLUMN_SAMPLE_ROWS)
+        sample = rows[::step][:COLUMN_SAMPLE_ROWS]
+        body, head = tkfont.nametofont("TkDefaultFont"), tkfont.nametofont("TkHeadingFont")
+        lo, hi = COLUMN_WIDTH_RANGE
+        widths = []
+        for i, c in enumerate(cols):
+            longest = max((str(r[i]) for r in sample if r[i] is not None), key=len, default="")
+            w = max(body.measure(longest), head.measure(f"{c} ▲")) + 16
+            widths.append(min(hi, max(lo, w)))
+        return widths
+
+    def _show_sort(self):
+        col, desc = self.sort or (None, False)
+        for c in self.tree['columns']:
+            self.tree.heading(c, text=f"{c} {'▼' if desc else '▲'}" if c == col else c)
+
+    def _heading_clicked(self, col):
+        # first click ascending, the next ones flip
+        desc = self.sort == (col, False)
+        if self.pager is not None:
+            if self.on_sort is not None and not self._busy:
+                self.on_sort(self.pager.table, col, desc)
+            return
+        if not self.rows:
+            return
+        i = list(self.tree['columns']).index(col)
+        # NULLs lowest, as the server sorts them
+        self.rows.sort(key=lambda r: (r[i] is not None, r[i]), reverse=desc)
+        self.sort = (col, desc)
+        self._show_sort()
+        self.tree.delete(*self.tree.get_children())
+        self._render(self.rows)
+        self.tree.yview_moveto(0)
+
+    # ---------------- chunked rendering ----------------
+    def _render(self, rows):
+        """Insert rows RENDER_SLICE_MS at a time; the rest follows via after_idle."""
+        self._cancel_render()
+        insert, display, pos = self.tree.insert, self._display, 0
+
+        def step():
+            nonlocal pos
+            deadline = time.perf_counter() + RENDER_SLICE_MS / 1000
+            end = len(rows)
+            while pos < end:
+                for r in rows[pos:pos + 64]:
+                    insert('', 'end', values=display(r))
+                pos += 64
+                if time.perf_counter() >= deadline:
+                    break
+            self._render_job = self.tree.after_idle(step) if pos < end else None
+        step()
+
+    def _cancel_render(self):
+        if self._render_job is not None:
+            self.tree.after_cancel(self._render_job)
+            self._render_job = None
+
+    @property
+    def rendering(self):
+        return self._render_job is not None
+
+    @staticmethod
+    def _display(row):
+        # convert None to empty string for display
+        return [("" if v is None else v) for v in row]
+
+    def open(self, pager, page):
+        # page = pager.fetch_first(conn), already fetched by the caller's worker
+        self.pager = pager
+        self.keys = []
+        self.rows = None
+        self._busy = False
+        self.sort = (pager.sort, pager.descending) if pager.sort else None
+        self._set_columns(pager.columns, [r for _k, r in page])
+        self.at_start = True
+        self.at_end = len(page) < pager.page_size
+        self._append(page)
+        self.tree.yview_moveto(0)
+
+    def show_rows(self, cols, rows):
+        # static result (ad-hoc query): no paging
+        self.pager = None
+        self.keys = []
+        self.rows = list(rows)
+        self.sort = None
+        self.at_start = self.at_end = True
+        self._set_columns(cols, self.rows)
+        self._render(self.rows)
+
+    def clear(self):
+        self._cancel_render()
+        self.pager = None
+        self.keys = []
+        self.rows = None
+        self.tree.delete(*self.tree.get_children())
+
+    # ---------------- buffer maintenance ----------------
+    def _append(self, page):
+        for key, row in page:
+            self.tree.insert('', 'end', values=self._display(row))
+            self.keys.append(key)
+
+    def _prepend(self, page):
+        for key, row in reversed(page):
+            self.tree.insert('', 0, values=self._display(row))
+            self.keys.insert(0, key)
+
+    def _top_index(self):
+        first, _ = self.tree.yview()
+        return int(round(float(first) * len(self.keys)))
+
+    def _trim_top(self):
+        extra = len(self.keys) - self.max_rows
+        if extra <= 0:
+            return
+        top = self._top_index()
+        children = self.tree.get_children()
+        self.tree.delete(*children[:extra])
+        del self.keys[:extra]
+        self.at_start = False
+        self.tree.yview_moveto(max(0, top - extra) / max(1, len(self.keys)))
+
+    def _trim_bottom(self):
+        extra = len(self.keys) - self.max_rows
+        if extra <= 0:
+            return
+        children = self.tree.get_children()
+        self.tree.delete(*children[-extra:])
+        del self.keys[-extra:]
+        self.at_end = False
+
+    def _next_page(self):
+        pager, last = self.pager, self.keys[-1]
+
+        def done(page):
+            self.at_end = len(page) < pager.page_size
+            self._append(page)
+            self._trim_top()
+        self._fetch(pager, lambda conn: pager.fetch_after(conn, last), done)
+
+    def _prev_page(self):
+        pager, first = self.pager, self.keys[0]
+
+        def done(page):
+            top = self._top_index()
+            self.at_start = len(page) < pager.page_size
+            self._prepend(page)
+            self._trim_bottom()
+            self.tree.yview_moveto((top + len(page)) / max(1, len(self.keys)))
+        self._fetch(pager, lambda conn: pager.fetch_before(conn, first), done)
+
+    def _fetch(self, pager, work, apply):
+        self._busy = True
+
+        def done(page):
+            # ignore pages for a table that has been replaced meanwhile
+            if pager is self.pager:
+                self._busy = False
+                apply(page)
+
+        def failed(e):
+            if pager is self.pager:
+                self._busy = False
+            messagebox.showerror("Load error", str(e))
+        self.run(work, done, failed)
+
+    # ---------------- scrolling ----------------
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.pager is None or self._busy or not self.keys:
+            return
+        first, last = float(first), float(last)
+        if last - first >= 1.0:
+            # whole buffer visible (or tree not mapped yet): nothing to prefetch
+            return
+        if last >= self.PREFETCH_AT and not self.at_end:
+            self._next_page()
+        elif first <= 1 - self.PREFETCH_AT and not self.at_start:
+            self._prev_page()
+
 # ---------- Main GUI ----------
 class SRSApp:
-    def __init__(self, role=None):
-        # Create themed window
-        self.root = tb.Window(themename="cyborg")
+    def __init__(self, role=None, run=True):
+        # a plain Tk root maps the login window straight away; the cyborg theme
+        # is applied once the helper thread has imported ttkbootstrap
+        self.root = tk.Tk()
         self.root.title("SRSMS - Space Research Station")
         self.root.geometry("1200x780")
-        self.conn = None
         self.role = None
         self.current_table = tk.StringVar()
         self.search_var = tk.StringVar()
+        # what the grid currently shows, so Export can re-run it on the server
+        self.export_source = None
+        # (table, column, descending) of the last heading clicked, see _sort_table
+        self._sort = None
+        # audit panel: incremental tail + optional live refresh
+        self.audit_tail = AuditTail()
+        self.audit_live = tk.BooleanVar(value=False)
+        self.audit_interval = tk.IntVar(value=AUDIT_REFRESH_SECONDS)
+        self.audit_filter = tk.StringVar(value=AUDIT_ALL_TABLES)
+        self.audit_search_var = tk.StringVar()
+        self._audit_handle = None
+        self._audit_job = None
+
+        # every DB call runs on the executor; results come back through _ui_queue
+        self.executor = QueryExecutor(lambda: create_conn_for_role(self.role, "worker"), workers=QUERY_WORKERS,
+                                      control_connect=lambda: create_conn_for_role(self.role))
+        self._ui_queue = queue.Queue()
+        self._active = {}
+        self.root.after(UI_POLL_MS, self._poll_ui_queue)
+        # columns / PKs / FKs for every table, loaded once at login
+        self.catalog = SchemaCatalog()
+        # all data access goes through the service layer (shared with srs_api.py);
+        # its reads are cached until a write touches their tables or the TTL runs out
+        self.cache = QueryCache()
+        # built at login (_open_mirror), once the backend modules are in
+        self.service = None
+        self.cache_watcher = None
+        self._cache_job = None
+        # local SQLite copy of the tables, kept current in the background (see _open_mirror)
+        self.mirror = None
+        self.mirror_sync = None
+        self._mirror_job = None
+
+        # every statement on a pooled connection is profiled (srs_profile); optional Prometheus export
+        try:
+            self.metrics = start_exporter()
+        except OSError as e:
+            self.metrics = None
+            messagebox.showwarning("Metrics", f"Cannot export query metrics: {e}")
 
+        self._backend_error = None
+        if not backend_ready.is_set():
+            threading.Thread(target=self._load_backend, name="srs-imports", daemon=True).start()
+        self.root.after(UI_POLL_MS, self._backend_tick)
+
+        self._build_login_ui()
         # If role passed (for direct start) else show login
         if role:
-            ok, msg = test_connect_for_role(role)
-            if not ok:
-                messagebox.showerror("Connection failed", msg)
-                self._build_login_ui()
+            self._probe_login(role)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        if run:
+            self.root.mainloop()
+
+    # ---------------- deferred imports ----------------
+    def _load_backend(self):
+        # helper thread: imports only, no Tk calls
+        try:
+            _import_backend()
+        except Exception as e:
+            self._backend_error = e
+
+    def _backend_tick(self):
+        if self._backend_error is not None:
+            messagebox.showerror("Startup error", f"Cannot load the database modules: {self._backend_error}")
+            return
+        if not backend_ready.is_set():
+            self.root.after(UI_POLL_MS, self._backend_tick)
+            return
+        tb.Style(theme="cyborg")
+
+    def when_ready(self, fn):
+        """Call fn() on the Tk thread once the backend modules are imported."""
+        if self._backend_error is not None:
+            messagebox.showerror("Startup error", f"Cannot load the database modules: {self._backend_error}")
+            return
+        if not backend_ready.is_set():
+            self._set_status_text("Loading database drivers…")
+            self.root.after(UI_POLL_MS, lambda: self.when_ready(fn))
+            return
+        fn()
+
+    # ---------------- background execution ----------------
+    def run_async(self, work, on_done=None, error_title="DB Error", on_error=None,
+                  description="Running query", timeout_ms=None):
+        """Run work(conn) on a worker; on_done/on_error are called on the Tk thread."""
+        handle = self.executor.submit(work, description, timeout_ms)
+        return self._track(handle, on_done, error_title, on_error)
+
+    def call_async(self, fn, *args, on_done=None, error_title="Error", on_error=None, description="Working"):
+        handle = self.executor.call(fn, *args, description=description)
+        return self._track(handle, on_done, error_title, on_error)
+
+    def _track(self, handle, on_done, error_title, on_error):
+        self._active[handle.id] = (handle, on_done, error_title, on_error)
+        self._update_status()
+        # called on the worker thread: only hand over to the Tk thread here
+        handle.add_done_callback(self._ui_queue.put)
+        return handle
+
+    def _poll_ui_queue(self):
+        try:
+            while True:
+                self._finish(self._ui_queue.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(UI_POLL_MS, self._poll_ui_queue)
+
+    def _finish(self, handle):
+        _, on_done, error_title, on_error = self._active.pop(handle.id, (handle, None, "Error", None))
+        self._update_status()
+        if handle.cancelled or handle.future.cancelled():
+            self._set_status_text(f"Aborted: {handle.description}")
+            return
+        err = handle.future.exception()
+        if isinstance(err, QueryCancelled):
+            self._set_status_text(f"Aborted: {handle.description}")
+            return
+        if err is not None:
+            if on_error:
+                on_error(err)
+            else:
+                messagebox.showerror(error_title, str(err))
+            return
+        if on_done:
+            on_done(handle.future.result())
+
+    def with_table_meta(self, table, on_meta, error_title="DB Error", on_error=None):
+        # cached catalog entries are handed over directly: no query, no worker hop
+        meta = self.catalog.cached(table)
+        if meta is not None:
+            on_meta(meta)
+            return
+        if self._offline() and self.service.local(table):
+            on_meta(self.mirror.meta(table))
+            return
+        self.run_async(lambda conn: self.catalog.get(conn, table), on_meta, error_title,
+                       on_error=on_error, description=f"Reading schema of {table}")
+
+    def read_async(self, table, work, on_done, on_error=None, description="Reading"):
+        """
+        run_async for a read of `table`. When the mirror holds it (and has no
+        write of ours to catch up on first, or can't) work(None) runs
+        without taking a MySQL connection.
+        """
+        if self.service.local(table) and (not self.mirror.behind or self._offline()):
+            return self.call_async(work, None, on_done=on_done, on_error=on_error, description=description)
+        return self.run_async(work, on_done, on_error=on_error, description=description)
+
+    def write_async(self, table, op, work, on_done, error_title, description, key=None, values=None):
+        """
+        run_async for a write of one row. While MySQL can't be reached the
+        change can be queued on the mirror instead (on_done then gets None).
+        """
+        def queue_it():
+            if not messagebox.askyesno("Offline", "The station database can't be reached.\n\n"
+                                                  "Queue this change and send it when the link is back?"):
+                return
+            try:
+                entry = self.service.queue_write(table, op, key, values)
+            except ValueError as e:
+                messagebox.showerror(error_title, str(e))
+                return
+            self.mirror_sync.poke()
+            self._set_status_text(f"Queued change #{entry} to {table}")
+            on_done(None)
+
+        def failed(e):
+            if self.service.local(table) and is_offline(e):
+                queue_it()
             else:
-                self._login(role)
+                messagebox.showerror(error_title, str(e))
+        if self.service.local(table) and self._offline():
+            queue_it()
+            return
+        self.run_async(work, on_done, on_error=failed, description=description)
+
+    def _abort_all(self):
+        for handle, *_ in list(self._active.values()):
+            handle.cancel()
+
+    # ---------------- status bar (progress / abort) ----------------
+    def _build_status_bar(self):
+        bar = ttk.Frame(self.root, padding=(6,2))
+        bar.pack(side='bottom', fill='x')
+        self.status_lbl = ttk.Label(bar, text="Ready")
+        self.status_lbl.pack(side='left')
+        self.mirror_lbl = ttk.Label(bar, text="")
+        self.mirror_lbl.pack(side='right', padx=8)
+        self.btn_abort = ttk.Button(bar, text="Abort", command=self._abort_all, state='disabled')
+        self.btn_abort.pack(side='right', padx=4)
+        self.progress = ttk.Progressbar(bar, mode='indeterminate', length=160)
+        self.progress.pack(side='right', padx=4)
+
+    def _set_status_text(self, text):
+        if getattr(self, "status_lbl", None) is not None and self.status_lbl.winfo_exists():
+            self.status_lbl.configure(text=text)
+
+    def _update_status(self):
+        if getattr(self, "progress", None) is None or not self.progress.winfo_exists():
+            return
+        if self._active:
+            running = [h.description for h, *_ in self._active.values()]
+            more = f" (+{len(running) - 1} more)" if len(running) > 1 else ""
+            self._set_status_text(f"{running[0]}…{more}")
+            self.progress.start(12)
+            self.btn_abort.configure(state='normal')
         else:
-            self._build_login_ui()
-        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
-        self.root.mainloop()
+            self._set_status_text(f"Ready  ·  {self.cache.describe()}")
+            self.progress.stop()
+            self.btn_abort.configure(state='disabled')
 
     # ---------------- Login ----------------
     def _build_login_ui(self):
         for w in self.root.winfo_children():
             w.destroy()
+        self._build_status_bar()
 
         frm = ttk.Frame(self.root, padding=20)
         frm.pack(expand=True)
@@ -105,45 +546,104 @@ class SRSApp:
         ttk.Button(btn_frame, text="Quit", command=self.on_close).grid(row=0,column=2,padx=6)
 
     def _test_conn(self):
+        self.when_ready(self._test_conn_now)
+
+    def _test_conn_now(self):
         role = self.role_cb.get()
-        ok, msg = test_connect_for_role(role)
-        if ok:
-            messagebox.showinfo("Connection", f"Connection OK for {role}")
-        else:
-            messagebox.showerror("Connection failed", msg)
+
+        def done(res):
+            ok, msg = res
+            if ok:
+                messagebox.showinfo("Connection", f"Connection OK for {role}")
+            else:
+                messagebox.showerror("Connection failed", msg)
+        self.call_async(test_connect_for_role, role, on_done=done, description=f"Testing {role} connection")
 
     def _on_login(self):
-        role = self.role_cb.get()
-        try:
-            conn = create_conn_for_role(role)
-            # quick test
-            cur = conn.cursor()
-            cur.execute("SELECT 1")
-            cur.fetchone()
-            cur.close()
-        except Exception as e:
-            messagebox.showerror("Login failed", str(e))
-            return
-        self._login(role, conn)
+        self._probe_login(self.role_cb.get())
+
+    def _probe_login(self, role):
+        self.when_ready(lambda: self._probe_login_now(role))
+
+    def _probe_login_now(self, role):
+        def done(res):
+            ok, msg = res
+            if not ok:
+                if os.path.exists(mirror_path(role)) and messagebox.askyesno(
+                        "Login failed", f"{msg}\n\nWork from this console's local mirror until the link is back?"):
+                    self._login(role)
+                    return
+                messagebox.showerror("Login failed", msg)
+                return
+            self._login(role)
+        self.call_async(test_connect_for_role, role, on_done=done, description=f"Logging in as {role}")
 
-    def _login(self, role, conn=None):
+    def _login(self, role):
         self.role = role.lower()
-        try:
-            if conn is None:
-                self.conn = create_conn_for_role(self.role)
-            else:
-                self.conn = conn
-        except Exception as e:
-            messagebox.showerror("DB Error", str(e))
-            self._build_login_ui()
-            return
+        # nothing cached under another role's privileges survives a login
+        self.cache.clear()
+        self.cache_watcher = AuditWatcher(self.cache, self.catalog)
+        self._open_mirror()
         # build main UI
         self._build_main_ui()
+        self._schedule_cache_watch()
+        self._mirror_tick()
+
+    # ---------------- local mirror ----------------
+    def _open_mirror(self):
+        self._close_mirror()
+        # syncing reads AuditLog, which viewers can't
+        if self.role != "viewer":
+            self.mirror = Mirror(mirror_path(self.role))
+            self.mirror_sync = MirrorSync(self.mirror, lambda: create_conn_for_role(self.role), self.catalog).start()
+        self.service = StationService(self.catalog, self.cache, mirror=self.mirror)
+
+    def _close_mirror(self):
+        if self.mirror_sync is not None:
+            self.mirror_sync.stop(timeout=2)
+        if self.mirror is not None:
+            self.mirror.close()
+        self.mirror = self.mirror_sync = None
+
+    def _offline(self):
+        return self.mirror_sync is not None and self.mirror_sync.online is False
+
+    def _mirror_tick(self):
+        if self._mirror_job is not None:
+            self.root.after_cancel(self._mirror_job)
+            self._mirror_job = None
+        if getattr(self, "mirror_lbl", None) is None or not self.mirror_lbl.winfo_exists():
+            return
+        sync = self.mirror_sync
+        self.mirror_lbl.configure(text=sync.describe() if sync is not None else "",
+                                  foreground="#e74c3c" if self._offline() else "")
+        self._mirror_job = self.root.after(1000, self._mirror_tick)
+
+    # ---------------- query cache ----------------
+    def _schedule_cache_watch(self):
+        if self._cache_job is not None:
+            self.root.after_cancel(self._cache_job)
+            self._cache_job = None
+        # viewers can't read AuditLog; for them the TTL alone bounds staleness
+        if CACHE_AUDIT_POLL_SECONDS and self.role != "viewer" and self.cache_watcher is not None:
+            self._cache_job = self.root.after(CACHE_AUDIT_POLL_SECONDS * 1000, self._cache_tick)
+
+    def _cache_tick(self):
+        self._cache_job = None
+        watcher = self.cache_watcher
+
+        def failed(_e):
+            # stop polling (e.g. no SELECT on AuditLog); cached entries still expire
+            if watcher is self.cache_watcher:
+                self.cache_watcher = None
+        self.run_async(watcher.poll, lambda _tables: self._schedule_cache_watch(), on_error=failed,
+                       description="Checking for changes")
 
     # ---------------- Main UI ----------------
     def _build_main_ui(self):
         for w in self.root.winfo_children():
             w.destroy()
+        self._build_status_bar()
 
         topbar = ttk.Frame(self.root, padding=(8,8))
         topbar.pack(fill='x')
@@ -171,12 +671,15 @@ class SRSApp:
         self.btn_update.grid(row=0, column=1, padx=4, pady=2)
         self.btn_delete = ttk.Button(grp_crud, text="Delete", command=self._delete)
         self.btn_delete.grid(row=0, column=2, padx=4, pady=2)
-        ttk.Button(grp_crud, text="Refresh", command=self.load_table).grid(row=0, column=3, padx=4)
-        ttk.Button(grp_crud, text="Export CSV", command=self._export_csv).grid(row=0, column=4, padx=4)
+        ttk.Button(grp_crud, text="Refresh", command=lambda: self.load_table(self.search_var.get().strip())).grid(row=0, column=3, padx=4)
+        ttk.Button(grp_crud, text="Export", command=self._export).grid(row=0, column=4, padx=4)
+        self.btn_import = ttk.Button(grp_crud, text="Import", command=self._import)
+        self.btn_import.grid(row=0, column=5, padx=4)
 
         # <-- ADD HERE -->
         if self.role == "viewer":
             self.btn_insert.configure(state="disabled")
+            self.btn_import.configure(state="disabled")
             self.btn_update.configure(state="disabled")
             self.btn_delete.configure(state="disabled")
         elif self.role == "operator":
@@ -196,6 +699,7 @@ class SRSApp:
         ttk.Button(grp_pf, text="fn_mission_duration", command=self._open_fn_mission_ui).grid(row=1, column=0, padx=4, pady=2)
         ttk.Button(grp_pf, text="fn_remaining_supply", command=self._open_fn_supply_ui).grid(row=1, column=1, padx=4, pady=2)
         ttk.Button(grp_pf, text="Audit Log (refresh)", command=self._refresh_audit).grid(row=2, column=0, padx=4, pady=2)
+        ttk.Button(grp_pf, text="sp_allocate_batch", command=self._open_batch_allocate_ui).grid(row=2, column=1, padx=4, pady=2)
 
         # Queries group
         grp_q = ttk.Labelframe(ribbon, text="Queries", padding=6)
@@ -203,12 +707,23 @@ class SRSApp:
         ttk.Button(grp_q, text="Join: Astronaut assignments", command=self._run_join).grid(row=0,column=0,padx=4,pady=2)
         ttk.Button(grp_q, text="Aggregate: Avg Oxygen", command=self._run_aggregate).grid(row=0,column=1,padx=4,pady=2)
         ttk.Button(grp_q, text="Nested: Above-average experiments", command=self._run_nested).grid(row=0,column=2,padx=4,pady=2)
+        ttk.Button(grp_q, text="Schedule conflicts", command=self._run_schedule_conflicts).grid(row=1,column=0,padx=4,pady=2)
+
+        # Telemetry group
+        grp_tm = ttk.Labelframe(ribbon, text="Telemetry", padding=6)
+        grp_tm.pack(side='left', padx=6)
+        ttk.Button(grp_tm, text="Life support chart", command=self._open_telemetry_ui).pack(pady=2)
+        ttk.Button(grp_tm, text="Supply forecast", command=self._open_forecast_ui).pack(pady=2)
+        ttk.Button(grp_tm, text="Performance", command=self._open_performance_ui).pack(pady=2)
 
         # Custom SQL
         grp_sql = ttk.Labelframe(ribbon, text="Custom SELECT (read-only)", padding=6)
         grp_sql.pack(side='left', padx=6)
         self.custom_sql_entry = ttk.Entry(grp_sql, width=60)
         self.custom_sql_entry.pack(side='left', padx=4, pady=4)
+        ttk.Label(grp_sql, text="Timeout (s)").pack(side='left', padx=(4,2))
+        self.sql_timeout = tk.IntVar(value=DEFAULT_TIMEOUT_MS // 1000)
+        ttk.Spinbox(grp_sql, from_=1, to=3600, width=5, textvariable=self.sql_timeout).pack(side='left')
         ttk.Button(grp_sql, text="Run SELECT", command=self._run_custom_sql).pack(side='left', padx=4)
 
 
@@ -216,11 +731,16 @@ class SRSApp:
         # Search bar
         searchbar = ttk.Frame(self.root, padding=(6,6))
         searchbar.pack(fill='x')
-        ttk.Label(searchbar, text="Search (simple substring filter):").pack(side='left', padx=(4,6))
+        ttk.Label(searchbar, text="Search (col:value, col<x, col:a..b, words):").pack(side='left', padx=(4,6))
         self.search_entry = ttk.Entry(searchbar, textvariable=self.search_var, width=40)
         self.search_entry.pack(side='left', padx=4)
+        self.search_entry.bind("<Return>", lambda _e: self._apply_search())
         ttk.Button(searchbar, text="Apply", command=self._apply_search).pack(side='left', padx=4)
         ttk.Button(searchbar, text="Clear", command=self._clear_search).pack(side='left', padx=4)
+        # freshness of materialized dashboard views (shown while one is loaded)
+        self.btn_rebuild = ttk.Button(searchbar, text="Rebuild summaries", command=self._rebuild_summaries)
+        self.summary_lbl = ttk.Label(searchbar, text="")
+        self.summary_lbl.pack(side='right', padx=4)
 
         # Main content: left=table tree, right=audit/log/details
         content = ttk.Panedwindow(self.root, orient='horizontal')
@@ -233,22 +753,20 @@ class SRSApp:
         self.tree = ttk.Treeview(left, show='headings')
         self.tree.pack(fill='both', expand=True, side='left')
         self.tree_scroll = ttk.Scrollbar(left, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=self.tree_scroll.set)
         self.tree_scroll.pack(side='right', fill='y')
         self.tree.bind("<<TreeviewSelect>>", self._on_row_select)
+        self.vtable = VirtualTable(self.tree, self.tree_scroll, self._run_page, on_sort=self._sort_table)
 
-        # Right: audit / details panel
-        right = ttk.Frame(content, width=360)
-        content.add(right, weight=1)
-        ttk.Label(right, text="Audit / Details", font=("Helvetica", 12)).pack(anchor='w', padx=6, pady=(6,2))
-        self.audit_tree = ttk.Treeview(right, columns=['AuditID','TableName','Operation','KeyData','NewRow','ChangedAt'], show='headings', height=12)
-        for c in ['AuditID','TableName','Operation','KeyData','NewRow','ChangedAt']:
-            self.audit_tree.heading(c, text=c)
-            self.audit_tree.column(c, width=100)
-        self.audit_tree.pack(fill='both', expand=True, padx=6, pady=6)
+        # Right: audit / details panel (its widgets are built on first use)
+        self.audit_pane = ttk.Frame(content, width=360)
+        content.add(self.audit_pane, weight=1)
+        ttk.Label(self.audit_pane, text="Audit / Details", font=("Helvetica", 12)).pack(anchor='w', padx=6, pady=(6,2))
+        self.audit_tree = None
+        self._audit_placeholder = ttk.Button(self.audit_pane, text="Show audit log", command=self._reset_audit)
+        self._audit_placeholder.pack(anchor='w', padx=6, pady=6)
 
-        # load default table list into combobox
-        self._reload_table_list()
+        # load schema catalog + default table list into combobox, after the first paint
+        self.root.after_idle(self._reload_table_list, False)
 
         # optional: initial load first table
         if TABLES_TO_SHOW:
@@ -256,100 +774,122 @@ class SRSApp:
             # don't auto-load to avoid slow start; user presses Load Table
 
     # ---------------- utility UI helpers ----------------
-    def _reload_table_list(self):
-        # try to read tables from DB to keep list current
-        try:
-            cur = self.conn.cursor()
-            cur.execute("SHOW TABLES")
-            rows = cur.fetchall()
-            tables = [r[0] for r in rows]
+    def _reload_table_list(self, force=True):
+        # (re)load the schema catalog; one information_schema query covers the
+        # table list plus the metadata every CRUD dialog needs later
+        if force:
+            self.catalog.invalidate()
+
+        def done(tables):
             # keep only tables we want (or show all)
             # we prefer to show the original TABLES_TO_SHOW order if present
             ordered = [t for t in TABLES_TO_SHOW if t in tables]
             # append any extra ones at end
             extras = [t for t in tables if t not in ordered]
-            final = ordered + extras
-            self.tbl_combo['values'] = final
-            cur.close()
-        except Exception:
+            self.tbl_combo['values'] = ordered + extras
+
+        def failed(_e):
             # fallback to static list
             self.tbl_combo['values'] = TABLES_TO_SHOW
+        self.run_async(self.service.tables, done, on_error=failed, description="Loading schema catalog")
+
+    def _run_page(self, work, done, failed):
+        # pages of a mirrored table come from the local copy, no connection needed
+        pager = self.vtable.pager
+        if self.mirror is not None and pager is not None and pager.fetch == self.mirror.fetch:
+            self.call_async(work, None, on_done=done, on_error=failed, description="Fetching rows")
+        else:
+            self.run_async(work, done, on_error=failed, description="Fetching rows")
 
     def _on_row_select(self, _ev):
         # display selected row details in audit panel or do nothing
         pass
 
     # ---------------- Load table ----------------
-    def load_table(self):
+    def load_table(self, search=""):
         tbl = self.current_table.get()
         if not tbl:
             messagebox.showwarning("Select table", "Please select a table to load.")
             return
+        # a heading clicked on this table keeps its order through searches and refreshes
+        sort, desc = self._sort[1:] if self._sort and self._sort[0] == tbl else (None, False)
+
+        def work(conn):
+            # filtered where the rows are (MySQL or the mirror), paged by primary key (or the sort column)
+            pager, first = self.service.open_table(conn, tbl, search, sort=sort, descending=desc)
+            return pager, first, self._summary_status(conn, tbl)
+
+        def done(res):
+            pager, first, summary = res
+            self.vtable.open(pager, first)
+            self._show_summary_status(summary)
+            meta = self.catalog.cached(tbl)
+            if sort and meta is not None and not self.service.local(tbl) and not meta.leading_indexed(sort):
+                self._set_status_text(f"No index starts with {sort}: every page of {tbl} sorts on the server")
+            self.export_source = ("table", tbl, search)
+            if not search:
+                # clear search field
+                self.search_var.set("")
+
+        def failed(e):
+            if isinstance(e, (SearchError, ServiceError)):
+                messagebox.showwarning("Search", str(e))
+            else:
+                messagebox.showerror("Load error", str(e))
+        self.read_async(tbl, work, done, on_error=failed,
+                        description=f"Searching {tbl}" if search else f"Loading {tbl}")
+
+    def _sort_table(self, table, column, descending):
+        # reopen the shown table (and its filter) ordered by `column` on the server
+        self._sort = (table, column, descending)
+        source = self.export_source
+        self.current_table.set(table)
+        self.load_table(source[2] if source and source[0] == "table" and source[1] == table else "")
+
+    # ---------------- Materialized summaries ----------------
+    def _summary_status(self, conn, tbl):
+        # runs in the worker; None for plain tables and when the role can't tell
+        if tbl not in SUMMARIES:
+            return None
         try:
-            cur = self.conn.cursor(dictionary=True)
-            cur.execute(f"SELECT * FROM `{tbl}` LIMIT 2000")
-            rows = cur.fetchall()
-            cols = list(rows[0].keys()) if rows else []
-            # configure tree
-            self.tree.delete(*self.tree.get_children())
-            self.tree['columns'] = cols
-            for c in cols:
-                self.tree.heading(c, text=c)
-                self.tree.column(c, width=130, anchor='center')
-            for r in rows:
-                vals = [r[c] for c in cols]
-                # convert None to empty string for display
-                vals = [("" if v is None else v) for v in vals]
-                self.tree.insert("", "end", values=vals)
-            cur.close()
-            # clear search field
-            self.search_var.set("")
-        except Exception as e:
-            messagebox.showerror("Load error", str(e))
+            return summary_status(conn, [tbl])[tbl]
+        except Exception:
+            return None
+
+    def _show_summary_status(self, st):
+        if st is None:
+            self.summary_lbl.configure(text="")
+            self.btn_rebuild.pack_forget()
+            return
+        self.summary_lbl.configure(text=st.describe(), foreground="#e74c3c" if st.stale else "")
+        if self.role == "admin":
+            self.btn_rebuild.pack(side='right', padx=4)
+
+    def _rebuild_summaries(self):
+        def done(_):
+            self._set_status_text("Summaries rebuilt")
+            self.load_table(self.search_var.get().strip())
+        self.run_async(self.service.rebuild_summaries, done, "Rebuild error", description="Rebuilding summaries",
+                       timeout_ms=0)
 
     # ---------------- Search ----------------
     def _apply_search(self):
-        q = self.search_var.get().strip().lower()
+        q = self.search_var.get().strip()
         if not q:
-            messagebox.showinfo("Search", "Type a substring to filter rows.")
-            return
-        # simple client-side filter: hide rows that don't contain substring in any column text
-        for iid in self.tree.get_children():
-            values = self.tree.item(iid, 'values')
-            joined = " ".join([str(v).lower() for v in values])
-            if q in joined:
-                self.tree.reattach(iid, '', 'end')
-            else:
-                self.tree.detach(iid)
+            messagebox.showinfo("Search", "Type search terms, e.g. Severity:High  Quantity<50  oxygen")
+            return
+        self.load_table(q)
 
     def _clear_search(self):
         self.search_var.set("")
-        # reattach all children (works if filtered previously)
-        for iid in self.tree.get_children(''):
-            pass
-        # simplest approach: reload the table
         self.load_table()
 
-    # ---------------- Export CSV ----------------
-    def _export_csv(self):
-        cols = self.tree['columns']
-        if not cols:
+    # ---------------- Export ----------------
+    def _export(self):
+        if not self.export_source:
             messagebox.showinfo("Export", "No data to export")
             return
-        rows = [self.tree.item(iid)['values'] for iid in self.tree.get_children()]
-        default_name = f"{self.current_table.get() or 'export'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        fn = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files","*.csv")], initialfile=default_name)
-        if not fn:
-            return
-        try:
-            with open(fn, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(cols)
-                for r in rows:
-                    writer.writerow(r)
-            messagebox.showinfo("Exported", f"Saved to {fn}")
-        except Exception as e:
-            messagebox.showerror("Export error", str(e))
+        ExportWindow(self, self.export_source)
 
     # ---------------- CRUD operations ----------------
     def _insert(self):
@@ -360,7 +900,35 @@ class SRSApp:
         if not tbl:
             messagebox.showwarning("Select table", "Choose a table first.")
             return
-        InsertWindow(self.conn, tbl, self.load_table)
+        InsertWindow(self, tbl, self.load_table)
+
+    def _import(self):
+        if self.role == "viewer":
+            messagebox.showwarning("Permission", "Viewer cannot insert.")
+            return
+        tbl = self.current_table.get()
+        if not tbl or tbl in VIEWS:
+            messagebox.showwarning("Select table", "Choose a table to import into.")
+            return
+        fn = filedialog.askopenfilename(title=f"Import into {tbl}",
+                                        filetypes=[("CSV / JSONL", "*.csv *.jsonl *.ndjson *.gz"), ("All files", "*.*")])
+        if not fn:
+            return
+
+        def work(conn):
+            return self.service.import_file(conn, tbl, fn)
+
+        def done(st):
+            msg = str(st)
+            if st.rejects:
+                out = fn + ".rejects.jsonl"
+                write_rejects(st, out)
+                first = "\n".join(f"line {line}: {reason}" for line, reason, _raw in st.rejects[:5])
+                msg += f"\n\n{first}\n\nAll rejects written to {out}"
+            messagebox.showinfo("Import", msg)
+            self.load_table()
+        # batches commit as they go; a large file is allowed to take its time
+        self.run_async(work, done, "Import error", description=f"Importing into {tbl}", timeout_ms=0)
 
     def _update(self):
         if self.role not in ("admin","operator"):
@@ -372,7 +940,7 @@ class SRSApp:
             return
         values = self.tree.item(sel[0])['values']
         tbl = self.current_table.get()
-        UpdateWindow(self.conn, tbl, values, self.load_table)
+        UpdateWindow(self, tbl, values, self.load_table)
 
     def _delete(self):
         if self.role != "admin":
@@ -384,152 +952,246 @@ class SRSApp:
             return
         values = self.tree.item(sel[0])['values']
         tbl = self.current_table.get()
-        # determine primary key(s)
-        try:
-            cur = self.conn.cursor()
-            cur.execute(f"SHOW KEYS FROM `{tbl}` WHERE Key_name = 'PRIMARY'")
-            pk_rows = cur.fetchall()
-            if not pk_rows:
+
+        # determine primary key(s) from the catalog (no query when cached)
+        def confirm(meta):
+            if not meta.pk:
                 messagebox.showwarning("No PK", "Table has no primary key; cannot safely delete via GUI.")
-                cur.close()
                 return
-            # pk_rows may contain multiple columns (composite)
-            pk_cols = [r[4] for r in pk_rows]  # Column_name is index 4 in SHOW KEYS result
-            # build WHERE using first N values from displayed row (assumes order in tree matches DESCRIBE)
-            # safer: fetch column order via DESCRIBE
-            cur.execute(f"DESCRIBE `{tbl}`")
-            desc = cur.fetchall()
-            col_names = [r[0] for r in desc]
-            # map pk column to value using column index
-            where_parts = []
-            params = []
-            for pk in pk_cols:
-                if pk in col_names:
-                    idx = col_names.index(pk)
-                    val = values[idx]
-                    where_parts.append(f"`{pk}` = %s")
-                    params.append(val)
-                else:
-                    messagebox.showerror("Error", f"Primary key column {pk} not found in table columns.")
-                    cur.close()
-                    return
-            sql = f"DELETE FROM `{tbl}` WHERE " + " AND ".join(where_parts)
+            # grid values are in column order
+            key = self.service.key_of(meta, values)
             ok = messagebox.askyesno("Confirm", f"Delete selected row from {tbl}?")
             if not ok:
-                cur.close(); return
-            cur.execute(sql, params)
-            self.conn.commit()
-            cur.close()
-            messagebox.showinfo("Deleted", "Row deleted.")
-            self.load_table()
-        except Exception as e:
-            messagebox.showerror("Delete failed", str(e))
+                return
+
+            def deleted(_res):
+                messagebox.showinfo("Deleted", "Row deleted.")
+                self.load_table()
+            self.write_async(tbl, "DELETE", lambda conn: self.service.delete_row(conn, tbl, key), deleted,
+                             "Delete failed", f"Deleting from {tbl}", key=key)
+        self.with_table_meta(tbl, confirm, "Delete failed")
 
     # ---------------- Procedures / functions UIs ----------------
     def _open_allocate_ui(self):
         if self.role == "viewer":
             messagebox.showwarning("Permission", "Viewer cannot call procedures.")
             return
-        AllocateWindow(self.conn, self.load_table)
+        AllocateWindow(self, self.load_table)
+
+    def _open_batch_allocate_ui(self):
+        if self.role == "viewer":
+            messagebox.showwarning("Permission", "Viewer cannot call procedures.")
+            return
+        BatchAllocateWindow(self, self.load_table)
 
     def _open_createexp_ui(self):
         if self.role == "viewer":
             messagebox.showwarning("Permission", "Viewer cannot call procedures.")
             return
-        CreateExperimentWindow(self.conn, self.load_table)
+        CreateExperimentWindow(self, self.load_table)
 
     def _open_fn_mission_ui(self):
-        FnMissionWindow(self.conn)
+        FnMissionWindow(self)
 
     def _open_fn_supply_ui(self):
-        FnSupplyWindow(self.conn)
+        FnSupplyWindow(self)
+
+    def _open_telemetry_ui(self):
+        TelemetryWindow(self)
+
+    def _open_forecast_ui(self):
+        ForecastWindow(self)
+
+    def _open_performance_ui(self):
+        PerformanceWindow(self)
 
     # ---------------- trigger demos & audit ----------------
+    def _ensure_audit_panel(self):
+        if self.audit_tree is not None:
+            return
+        self._audit_placeholder.destroy()
+        right = self.audit_pane
+        audit_bar = ttk.Frame(right)
+        audit_bar.pack(fill='x', padx=6)
+        ttk.Checkbutton(audit_bar, text="Live", variable=self.audit_live, command=self._schedule_audit).pack(side='left')
+        ttk.Label(audit_bar, text="every (s)").pack(side='left', padx=(6,2))
+        ttk.Spinbox(audit_bar, from_=1, to=300, width=4, textvariable=self.audit_interval,
+                    command=self._schedule_audit).pack(side='left')
+        self.audit_filter_combo = ttk.Combobox(audit_bar, textvariable=self.audit_filter, state='readonly', width=18,
+                                               values=[AUDIT_ALL_TABLES] + TABLES_TO_SHOW)
+        self.audit_filter_combo.pack(side='right')
+        self.audit_filter_combo.bind("<<ComboboxSelected>>", lambda _e: self._reset_audit())
+        audit_search = ttk.Frame(right)
+        audit_search.pack(fill='x', padx=6, pady=(4,0))
+        self.audit_search_entry = ttk.Entry(audit_search, textvariable=self.audit_search_var)
+        self.audit_search_entry.pack(side='left', fill='x', expand=True)
+        self.audit_search_entry.bind("<Return>", lambda _e: self._search_audit())
+        ttk.Button(audit_search, text="Search", command=self._search_audit).pack(side='left', padx=(4,0))
+        ttk.Button(audit_search, text="Tail", command=self._reset_audit).pack(side='left', padx=(4,0))
+        self.audit_tree = ttk.Treeview(right, columns=AUDIT_COLUMNS, show='headings', height=12)
+        for c in AUDIT_COLUMNS:
+            self.audit_tree.heading(c, text=c)
+            self.audit_tree.column(c, width=100)
+        self.audit_tree.pack(fill='both', expand=True, padx=6, pady=6)
+
     def _refresh_audit(self):
-        try:
-            cur = self.conn.cursor(dictionary=True)
-            cur.execute("SELECT AuditID, TableName, Operation, KeyData, NewRow, ChangedAt FROM AuditLog ORDER BY ChangedAt DESC LIMIT 200")
-            rows = cur.fetchall()
-            self.audit_tree.delete(*self.audit_tree.get_children())
+        self._ensure_audit_panel()
+        # incremental: only rows newer than the last one shown are fetched
+        if self._audit_handle is not None and not self._audit_handle.done():
+            return      # previous poll still running (or queued)
+        tail = self.audit_tail
+
+        def done(res):
+            if tail is not self.audit_tail:
+                return      # filter changed while this poll was running
+            rows, reset = res
+            if reset:
+                self.audit_tree.delete(*self.audit_tree.get_children())
             for r in rows:
-                self.audit_tree.insert('', 'end', values=(r['AuditID'], r['TableName'], r['Operation'], r['KeyData'], str(r['NewRow']), str(r['ChangedAt'])))
-            cur.close()
-        except Exception as e:
+                # newest on top, same as before
+                self.audit_tree.insert('', 0, values=self._audit_values(r))
+            # ring buffer: drop what fell off the end
+            extra = self.audit_tree.get_children()[tail.capacity:]
+            if extra:
+                self.audit_tree.delete(*extra)
+
+        def failed(e):
+            if self.audit_live.get():
+                # don't pop a dialog every few seconds; stop and say why once
+                self.audit_live.set(False)
+                self._schedule_audit()
             messagebox.showerror("Audit error", str(e))
+        self._audit_handle = self.run_async(tail.poll, done, on_error=failed, description="Reading audit log")
+
+    @staticmethod
+    def _audit_values(r):
+        return [("" if v is None else v.decode() if isinstance(v, (bytes, bytearray)) else str(v)) for v in r]
+
+    def _reset_audit(self):
+        table = self.audit_filter.get()
+        self.audit_tail = AuditTail(table=None if table == AUDIT_ALL_TABLES else table)
+        self._audit_handle = None
+        self._refresh_audit()
+
+    def _search_audit(self):
+        self._ensure_audit_panel()
+        # live table + archived months in one result (see srs_audit_archive)
+        text = self.audit_search_var.get().strip()
+        table = self.audit_filter.get()
+        if table != AUDIT_ALL_TABLES and "table:" not in text.lower():
+            text = f"table:{shlex.quote(table)} {text}"
+        if self.audit_live.get():
+            self.audit_live.set(False)
+            self._schedule_audit()
+
+        def done(res):
+            rows, live, archived = res
+            # the tail starts over when the user goes back to it
+            self.audit_tail = AuditTail(table=None if table == AUDIT_ALL_TABLES else table)
+            self._audit_handle = None
+            self.audit_tree.delete(*self.audit_tree.get_children())
+            for r in rows:
+                self.audit_tree.insert('', 'end', values=self._audit_values([r[c] for c in AUDIT_COLUMNS]))
+            self._set_status_text(f"Audit search: {live} live + {archived} archived rows")
+
+        def failed(e):
+            if isinstance(e, SearchError):
+                messagebox.showwarning("Audit search", str(e))
+            else:
+                messagebox.showerror("Audit error", str(e))
+        self.run_async(lambda conn: search_audit(conn, text), done, on_error=failed,
+                       description="Searching audit log and archive")
+
+    def _schedule_audit(self):
+        if self._audit_job is not None:
+            self.root.after_cancel(self._audit_job)
+            self._audit_job = None
+        if self.audit_live.get():
+            try:
+                secs = max(1, int(self.audit_interval.get()))
+            except (tk.TclError, ValueError):
+                secs = AUDIT_REFRESH_SECONDS
+            self._audit_job = self.root.after(secs * 1000, self._audit_tick)
+
+    def _audit_tick(self):
+        self._audit_job = None
+        self._refresh_audit()
+        self._schedule_audit()
 
     # ---------------- Example queries (join/aggregate/nested) ----------------
     def _run_join(self):
-        sql = """
-        SELECT A.AstronautID, CONCAT(A.FirstName,' ',A.LastName) AS Name, M.MissionName, AM.Role
-        FROM Astronauts A
-        JOIN Astronaut_Missions AM ON A.AstronautID = AM.AstronautID
-        JOIN Missions M ON M.MissionID = AM.MissionID
-        LIMIT 500
-        """
-        self._run_query_and_show(sql)
+        self._run_query_and_show(EXAMPLE_QUERIES["join: astronaut assignments"])
 
     def _run_aggregate(self):
-        sql = """
-        SELECT SM.ModuleName, AVG(LSS.OxygenLevel) AS AvgOxygen
-        FROM LifeSupportSystems LSS
-        JOIN StationModules SM ON SM.ModuleID = LSS.ModuleID
-        GROUP BY SM.ModuleName
-        """
-        self._run_query_and_show(sql)
+        self._run_query_and_show(EXAMPLE_QUERIES["aggregate: avg oxygen"])
 
     def _run_nested(self):
-        sql = """
-        SELECT m.MissionID, m.MissionName, COUNT(e.ExperimentID) AS expCount
-        FROM Missions m
-        LEFT JOIN Experiments e ON m.MissionID = e.MissionID
-        GROUP BY m.MissionID, m.MissionName
-        HAVING COUNT(e.ExperimentID) > (
-            SELECT AVG(t.cnt) FROM (
-                SELECT COUNT(*) AS cnt FROM Experiments GROUP BY MissionID
-            ) AS t
-        ) LIMIT 500
-        """
-        self._run_query_and_show(sql)
+        self._run_query_and_show(EXAMPLE_QUERIES["nested: above-average experiments"])
+
+    def _run_schedule_conflicts(self):
+        def done(res):
+            cols, rows = res
+            if not rows:
+                messagebox.showinfo("Schedule conflicts", "No astronaut is double-booked.")
+                return
+            self.vtable.show_rows(cols, rows)
+            self.export_source = None
+            self._set_status_text(f"{len(rows):,} schedule conflict(s)")
+        self.run_async(self.service.schedule_conflicts, done, "Schedule conflicts",
+                       description="Scanning schedules for conflicts")
 
     def _run_custom_sql(self):
         s = self.custom_sql_entry.get().strip()
         if not s:
             messagebox.showwarning("No SQL", "Type a SELECT query to run.")
             return
-        # safety: only allow SELECT queries
-        if not s.lower().startswith("select"):
-            messagebox.showwarning("Only SELECT", "Only read-only SELECT queries are allowed here.")
-            return
-        self._run_query_and_show(s)
-
-    def _run_query_and_show(self, sql):
         try:
-            cur = self.conn.cursor(dictionary=True)
-            cur.execute(sql)
-            rows = cur.fetchall()
-            cur.close()
+            timeout_ms = max(1, int(self.sql_timeout.get())) * 1000
+        except (tk.TclError, ValueError):
+            timeout_ms = DEFAULT_TIMEOUT_MS
+        # MAX_EXECUTION_TIME makes the server abort a runaway SELECT on its own
+        self._run_query_and_show(s, timeout_ms)
+
+    def show_bulk(self, work, function):
+        """Run a set-based function query (work(conn) -> (columns, rows)) and show its result in the grid."""
+        def done(res):
+            cols, rows = res
+            self.vtable.show_rows(cols, rows)
+            self.export_source = None
+            self._set_status_text(f"{function}: {len(rows):,} row(s)")
+
+        def failed(e):
+            if isinstance(e, (SearchError, ServiceError)):
+                messagebox.showwarning(function, str(e))
+            else:
+                messagebox.showerror("Function error", str(e))
+        self.run_async(work, done, on_error=failed, description=f"Calling {function} for every matching row")
+
+    def _run_query_and_show(self, sql, timeout_ms=None):
+        def done(res):
+            cols, rows = res
             if not rows:
                 messagebox.showinfo("Query", "No rows returned.")
                 return
-            cols = list(rows[0].keys())
-            # set tree
-            self.tree.delete(*self.tree.get_children())
-            self.tree['columns'] = cols
-            for c in cols:
-                self.tree.heading(c, text=c)
-                self.tree.column(c, width=140)
-            for r in rows:
-                vals = [r[c] for c in cols]
-                vals = [("" if v is None else v) for v in vals]
-                self.tree.insert('', 'end', values=vals)
-        except Exception as e:
-            messagebox.showerror("Query error", str(e))
+            self.vtable.show_rows(cols, rows)
+            self.export_source = ("query", sql)
+
+        def failed(e):
+            # the service only runs read-only SELECTs here
+            if isinstance(e, ServiceError):
+                messagebox.showwarning("Only SELECT", str(e))
+            else:
+                messagebox.showerror("Query error", str(e))
+        self.run_async(lambda conn: self.service.select(conn, sql), done, on_error=failed, timeout_ms=timeout_ms)
 
     # ---------------- Close ----------------
     def on_close(self):
         try:
-            if self.conn:
-                self.conn.close()
+            self._abort_all()
+            self.executor.shutdown()
+            self._close_mirror()
+            if self.metrics is not None:
+                self.metrics.stop()
         except:
             pass
         self.root.destroy()
@@ -537,28 +1199,27 @@ class SRSApp:
 
 # ---------- Insert / Update windows ----------
 class InsertWindow(tk.Toplevel):
-    def __init__(self, conn, table, refresh_callback):
+    def __init__(self, app, table, refresh_callback):
         super().__init__()
-        self.conn = conn
+        self.app = app
         self.table = table
         self.refresh_callback = refresh_callback
         self.title(f"Insert into {table}")
         self.geometry("560x580")
         self.configure(bg="#0a0f14")
 
-        try:
-            # get column metadata
-            cur = self.conn.cursor()
-            cur.execute(f"DESCRIBE `{table}`")
-            cols = cur.fetchall()
-            cur.close()
-        except Exception as e:
-            messagebox.showerror("Error", f"Cannot describe table: {e}")
-            self.destroy()
-            return
+        # get column metadata (from the schema catalog)
+        self.app.with_table_meta(table, self._build_form, on_error=self._describe_failed)
+
+    def _describe_failed(self, e):
+        messagebox.showerror("Error", f"Cannot describe table: {e}")
+        self.destroy()
 
-        # store column descriptors: (Field, Type, Null, Key, Default, Extra)
-        self.cols = cols
+    def _build_form(self, meta):
+        if not self.winfo_exists():
+            return
+        # store column descriptors (srs_catalog.ColumnMeta)
+        self.cols = cols = meta.columns
         self.entries = {}
         frame = ttk.Frame(self)
         frame.pack(padx=8, pady=8, fill='both', expand=True)
@@ -573,9 +1234,8 @@ class InsertWindow(tk.Toplevel):
         # Build form: skip auto_increment primary keys (don't insert them)
         r = 0
         for col in cols:
-            fname = col[0]
-            fextra = col[5]  # extra contains 'auto_increment' if present
-            if fextra and 'auto_increment' in fextra.lower():
+            fname = col.name
+            if col.auto_increment:
                 # show as read-only label (empty)
                 ttk.Label(inner, text=f"{fname} (auto)", width=30).grid(row=r, column=0, sticky='w', padx=6, pady=4)
                 ttk.Label(inner, text="(auto)", width=30).grid(row=r, column=1, sticky='w', padx=6, pady=4)
@@ -593,31 +1253,21 @@ class InsertWindow(tk.Toplevel):
         ttk.Button(self, text="Insert", command=self._submit).pack(pady=8)
 
     def _submit(self):
-        try:
-            cols = list(self.entries.keys())
-            vals = [self.entries[c].get().strip() or None for c in cols]
-            placeholders = ", ".join(["%s"] * len(cols))
-            col_sql = ", ".join([f"`{c}`" for c in cols])
-            sql = f"INSERT INTO `{self.table}` ({col_sql}) VALUES ({placeholders})"
-            cur = self.conn.cursor()
-            cur.execute(sql, vals)
-            self.conn.commit()
-            cur.close()
+        values = {c: ent.get().strip() or None for c, ent in self.entries.items()}
+
+        def done(_res):
             messagebox.showinfo("Inserted", "Row inserted successfully.")
             self.refresh_callback()
             self.destroy()
-        except Exception as e:
-            try:
-                self.conn.rollback()
-            except:
-                pass
-            messagebox.showerror("Insert failed", str(e))
+        # the executor rolls back on failure
+        self.app.write_async(self.table, "INSERT", lambda conn: self.app.service.insert_row(conn, self.table, values),
+                             done, "Insert failed", f"Inserting into {self.table}", values=values)
 
 
 class UpdateWindow(tk.Toplevel):
-    def __init__(self, conn, table, row_values, refresh_callback):
+    def __init__(self, app, table, row_values, refresh_callback):
         super().__init__()
-        self.conn = conn
+        self.app = app
         self.table = table
         self.row_values = row_values
         self.refresh_callback = refresh_callback
@@ -625,19 +1275,18 @@ class UpdateWindow(tk.Toplevel):
         self.geometry("560x620")
         self.configure(bg="#0a0f14")
 
-        try:
-            cur = self.conn.cursor()
-            cur.execute(f"DESCRIBE `{table}`")
-            cols = cur.fetchall()
-            cur.close()
-        except Exception as e:
-            messagebox.showerror("Error", f"Cannot describe table: {e}")
-            self.destroy()
-            return
+        self.app.with_table_meta(table, self._build_form, on_error=self._describe_failed)
+
+    def _describe_failed(self, e):
+        messagebox.showerror("Error", f"Cannot describe table: {e}")
+        self.destroy()
 
-        self.cols = cols
-        # create a mapping of column order -> col name (DESCRIBE order)
-        col_names = [c[0] for c in cols]
+    def _build_form(self, meta):
+        if not self.winfo_exists():
+            return
+        row_values = self.row_values
+        self.meta = meta
+        self.cols = cols = meta.columns
         self.entries = {}
         frame = ttk.Frame(self)
         frame.pack(padx=8, pady=8, fill='both', expand=True)
@@ -651,8 +1300,7 @@ class UpdateWindow(tk.Toplevel):
 
         r = 0
         for idx, col in enumerate(cols):
-            fname = col[0]
-            fextra = col[5]
+            fname = col.name
             ttk.Label(inner, text=fname, width=28).grid(row=r, column=0, sticky='w', padx=6, pady=4)
             ent = ttk.Entry(inner, width=44)
             # populate from row_values using position: row_values align with tree column order.
@@ -663,7 +1311,7 @@ class UpdateWindow(tk.Toplevel):
             ent.insert(0, "" if ent_val is None else str(ent_val))
             ent.grid(row=r, column=1, padx=6, pady=4)
             # Make PK (Key) columns read-only
-            if col[3] == 'PRI' or (fextra and 'auto_increment' in fextra.lower()):
+            if col.primary or col.auto_increment:
                 ent.configure(state='readonly')
             self.entries[fname] = ent
             r += 1
@@ -674,107 +1322,223 @@ class UpdateWindow(tk.Toplevel):
         ttk.Button(self, text="Update", command=self._submit).pack(pady=8)
 
     def _submit(self):
-        try:
-            # Build update statement excluding read-only PK columns
-            # Find primary key columns
-            cur = self.conn.cursor()
-            cur.execute(f"SHOW KEYS FROM `{self.table}` WHERE Key_name = 'PRIMARY'")
-            pk_rows = cur.fetchall()
-            pk_cols = [r[4] for r in pk_rows] if pk_rows else []
-            cur.close()
-
-            # columns to set: those with state != readonly
-            set_cols = []
-            params = []
-            pk_params = []
-
-            # DESCRIBE gives order - we'll use entries order
-            for col in self.cols:
-                name = col[0]
-                ent = self.entries[name]
-                # detect if readonly (PK or auto)
-                state = ent.cget('state')
-                if state == 'readonly':
-                    # this is PK value for WHERE clause
-                    pk_params.append(ent.get())
-                else:
-                    set_cols.append(name)
-                    params.append(ent.get() or None)
-
-            if not pk_cols:
-                messagebox.showwarning("No PK", "Table has no primary key defined; update not supported.")
-                return
+        # read-only entries (PK / auto) identify the row, the rest are set
+        key, values = {}, {}
+        for col in self.cols:
+            ent = self.entries[col.name]
+            if ent.cget('state') == 'readonly':
+                key[col.name] = ent.get()
+            else:
+                values[col.name] = ent.get() or None
+        if not self.meta.pk:
+            messagebox.showwarning("No PK", "Table has no primary key defined; update not supported.")
+            return
+        # PK columns the form left editable still identify the row
+        for pk in self.meta.pk:
+            key.setdefault(pk, self.entries[pk].get())
 
-            if len(pk_cols) != len(pk_params):
-                # fallback: derive pk params by looking up col positions in DESCRIBE
-                # This tries to pair pk_cols with their values via entries
-                pk_params = []
-                for pk in pk_cols:
-                    pk_params.append(self.entries[pk].get())
-
-            # build SQL
-            set_sql = ", ".join([f"`{c}` = %s" for c in set_cols])
-            where_sql = " AND ".join([f"`{c}` = %s" for c in pk_cols])
-            sql = f"UPDATE `{self.table}` SET {set_sql} WHERE {where_sql}"
-            cur = self.conn.cursor()
-            cur.execute(sql, params + pk_params)
-            self.conn.commit()
-            cur.close()
+        def done(_res):
             messagebox.showinfo("Updated", "Row updated.")
             self.refresh_callback()
             self.destroy()
-        except Exception as e:
-            try:
-                self.conn.rollback()
-            except:
-                pass
-            messagebox.showerror("Update failed", str(e))
+        self.app.write_async(self.table, "UPDATE",
+                             lambda conn: self.app.service.update_row(conn, self.table, key, values), done,
+                             "Update failed", f"Updating {self.table}", key=key, values=values)
+
+
+# ---------- Export window ----------
+class ExportWindow(tk.Toplevel):
+    """Streams the current table (with its search) or query to a file on a worker."""
+    PROGRESS_MS = 200
+
+    def __init__(self, app, source):
+        super().__init__()
+        self.app = app
+        self.source = source
+        self.title("Export")
+        self.geometry("460x140")
+        self.cancel_event = threading.Event()
+        self.handle = None
+        self.rows = 0
+        frm = ttk.Frame(self, padding=10)
+        frm.pack(fill='both', expand=True)
+        what = f"{source[1]}" + (f"  [{source[2]}]" if source[0] == "table" and source[2] else "")
+        ttk.Label(frm, text=what if source[0] == "table" else "Query result").pack(anchor='w')
+        self.lbl = ttk.Label(frm, text="Choose a file…")
+        self.lbl.pack(anchor='w', pady=6)
+        self.btn = ttk.Button(frm, text="Cancel", command=self._cancel)
+        self.btn.pack(anchor='e')
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+        self.after(10, self._start)
+
+    def _start(self):
+        base = self.source[1] if self.source[0] == "table" else "query"
+        default_name = f"{base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        fn = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".csv", initialfile=default_name,
+            filetypes=[("CSV files", "*.csv"), ("Gzipped CSV", "*.csv.gz"), ("JSON lines", "*.jsonl *.jsonl.gz"),
+                       ("Parquet", "*.parquet"), ("Arrow IPC", "*.arrow")])
+        if not fn:
+            self.destroy()
+            return
+        self.path = fn
+        self.t0 = datetime.now()
+
+        def progress(n):
+            # worker thread: just publish the count, _tick paints it
+            self.rows = n
+
+        def work(conn):
+            if self.source[0] == "table":
+                meta = self.app.catalog.get(conn, self.source[1])
+                where, params = build_where(meta, self.source[2]) if self.source[2] else ("", [])
+                sql, params = table_export_sql(meta, where, params)
+            else:
+                meta, sql, params = None, self.source[1], ()
+            return export_query(conn, sql, params, fn, format_for(fn), meta=meta,
+                                progress=progress, cancel=self.cancel_event)
+
+        def failed(e):
+            if isinstance(e, ExportCancelled):
+                self.app._set_status_text(f"Export cancelled after {self.rows:,} rows")
+            else:
+                messagebox.showerror("Export error", str(e))
+            if self.winfo_exists():
+                self.destroy()
+
+        # no MAX_EXECUTION_TIME: a full dump takes as long as it takes
+        self.handle = self.app.run_async(work, self._done, on_error=failed,
+                                         description=f"Exporting to {fn}", timeout_ms=0)
+        self._tick()
+
+    def _tick(self):
+        if not self.winfo_exists() or self.handle is None:
+            return
+        if self.handle.done():
+            # a killed export finishes as "Aborted" without calling back
+            if self.cancel_event.is_set():
+                self.destroy()
+            return
+        secs = max((datetime.now() - self.t0).total_seconds(), 0.001)
+        self.lbl.config(text=f"{self.rows:,} rows written  ({self.rows / secs:,.0f} rows/s)")
+        self.after(self.PROGRESS_MS, self._tick)
+
+    def _done(self, n):
+        messagebox.showinfo("Exported", f"Saved {n:,} rows to {self.path}")
+        if self.winfo_exists():
+            self.destroy()
+
+    def _cancel(self):
+        if self.handle is None or self.handle.done():
+            self.destroy()
+            return
+        self.cancel_event.set()
+        # also interrupt a fetch that is blocked on the server
+        self.handle.cancel()
+        self.btn.configure(state='disabled')
+        self.lbl.config(text="Cancelling…")
 
 
 # ---------- Procedure / Function windows ----------
 class AllocateWindow(tk.Toplevel):
-    def __init__(self, conn, refresh_callback):
+    def __init__(self, app, refresh_callback):
         super().__init__()
-        self.conn = conn
+        self.app = app
         self.refresh = refresh_callback
         self.title("Call sp_allocate_supply")
-        self.geometry("420x180")
+        self.geometry("420x210")
         frm = ttk.Frame(self, padding=10)
         frm.pack(fill='both', expand=True)
-        ttk.Label(frm, text="MissionID").grid(row=0,column=0,padx=6,pady=6)
-        ttk.Label(frm, text="SupplyID").grid(row=1,column=0,padx=6,pady=6)
-        ttk.Label(frm, text="Qty").grid(row=2,column=0,padx=6,pady=6)
-        self.e_mid = ttk.Entry(frm); self.e_mid.grid(row=0,column=1,padx=6)
-        self.e_sid = ttk.Entry(frm); self.e_sid.grid(row=1,column=1,padx=6)
-        self.e_qty = ttk.Entry(frm); self.e_qty.grid(row=2,column=1,padx=6)
-        ttk.Button(frm, text="Call", command=self._call).grid(row=3,column=0,columnspan=2,pady=8)
+        # by lot: sp_allocate_supply; by resource: sp_allocate_resource picks the lots (FEFO)
+        self.by_resource = tk.BooleanVar(value=False)
+        ttk.Radiobutton(frm, text="One supply lot", variable=self.by_resource, value=False,
+                        command=self._mode).grid(row=0,column=0,padx=6,pady=4)
+        ttk.Radiobutton(frm, text="Resource, soonest expiry first", variable=self.by_resource, value=True,
+                        command=self._mode).grid(row=0,column=1,padx=6,pady=4,sticky='w')
+        ttk.Label(frm, text="MissionID").grid(row=1,column=0,padx=6,pady=6)
+        self.lbl_id = ttk.Label(frm, text="SupplyID")
+        self.lbl_id.grid(row=2,column=0,padx=6,pady=6)
+        ttk.Label(frm, text="Qty").grid(row=3,column=0,padx=6,pady=6)
+        self.e_mid = ttk.Entry(frm); self.e_mid.grid(row=1,column=1,padx=6)
+        self.e_sid = ttk.Entry(frm); self.e_sid.grid(row=2,column=1,padx=6)
+        self.e_qty = ttk.Entry(frm); self.e_qty.grid(row=3,column=1,padx=6)
+        ttk.Button(frm, text="Call", command=self._call).grid(row=4,column=0,columnspan=2,pady=8)
+
+    def _mode(self):
+        by_resource = self.by_resource.get()
+        self.lbl_id.config(text="ResourceID" if by_resource else "SupplyID")
+        self.title("Call sp_allocate_resource" if by_resource else "Call sp_allocate_supply")
+
+    def _call(self):
+        mid, sid, qty = self.e_mid.get(), self.e_sid.get(), self.e_qty.get()
+        by_resource = self.by_resource.get()
+        proc = "sp_allocate_resource" if by_resource else "sp_allocate_supply"
+
+        def done(lines):
+            if by_resource:
+                split = ", ".join(f"{q} from SupplyID {s}" for s, q in lines)
+                messagebox.showinfo("OK", f"{proc} allocated {split}.")
+            else:
+                messagebox.showinfo("OK", f"{proc} executed successfully.")
+            self.refresh()
+            self.destroy()
+        def failed(e):
+            if isinstance(e, ServiceError):
+                messagebox.showerror("Input", f"Provide numeric MissionID, {self.lbl_id.cget('text')} and Qty: {e}",
+                                     parent=self)
+            else:
+                messagebox.showerror("Procedure error", str(e))
+        call = self.app.service.allocate_resource if by_resource else self.app.service.allocate_supply
+        self.app.run_async(lambda conn: call(conn, mid, sid, qty), done, on_error=failed,
+                           description=f"Calling {proc}")
+
+
+class BatchAllocateWindow(tk.Toplevel):
+    def __init__(self, app, refresh_callback):
+        super().__init__()
+        self.app = app
+        self.refresh = refresh_callback
+        self.title("Call sp_allocate_batch")
+        self.geometry("460x360")
+        frm = ttk.Frame(self, padding=10)
+        frm.pack(fill='both', expand=True)
+        ttk.Label(frm, text="One allocation per line: MissionID, SupplyID, Qty").pack(anchor='w')
+        self.txt = tk.Text(frm, height=12, width=50)
+        self.txt.pack(fill='both', expand=True, pady=6)
+        bar = ttk.Frame(frm)
+        bar.pack(fill='x')
+        ttk.Button(bar, text="Load CSV…", command=self._load_file).pack(side='left')
+        ttk.Button(bar, text="Allocate all", command=self._call).pack(side='right')
+        self.lbl = ttk.Label(frm, text="All lines commit together or not at all.")
+        self.lbl.pack(anchor='w', pady=4)
+
+    def _load_file(self):
+        fn = filedialog.askopenfilename(parent=self, filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if fn:
+            with open(fn, encoding='utf-8') as f:
+                self.txt.delete('1.0', 'end')
+                self.txt.insert('1.0', f.read())
 
     def _call(self):
         try:
-            mid = int(self.e_mid.get().strip())
-            sid = int(self.e_sid.get().strip())
-            qty = float(self.e_qty.get().strip())
-        except Exception:
-            messagebox.showerror("Input", "Provide numeric MissionID, SupplyID and numeric Qty")
+            plan = parse_plan_text(self.txt.get('1.0', 'end'))
+        except PlanError as e:
+            messagebox.showerror("Input", str(e), parent=self)
             return
-        try:
-            cur = self.conn.cursor()
-            cur.callproc('sp_allocate_supply', [mid, sid, qty])
-            self.conn.commit()
-            cur.close()
-            messagebox.showinfo("OK", "sp_allocate_supply executed successfully.")
+
+        def done(n):
+            messagebox.showinfo("OK", f"Allocated {n} line(s) in one transaction.")
             self.refresh()
-            self.destroy()
-        except Exception as e:
-            try: self.conn.rollback()
-            except: pass
-            messagebox.showerror("Procedure error", str(e))
+            if self.winfo_exists():
+                self.destroy()
+        self.app.run_async(lambda conn: self.app.service.allocate_batch(conn, plan), done, "Procedure error",
+                           description=f"Allocating {len(plan)} line(s)")
 
 
 class CreateExperimentWindow(tk.Toplevel):
-    def __init__(self, conn, refresh_callback):
+    def __init__(self, app, refresh_callback):
         super().__init__()
-        self.conn = conn
+        self.app = app
         self.refresh = refresh_callback
         self.title("Call sp_create_experiment")
         self.geometry("640x220")
@@ -802,32 +1566,24 @@ class CreateExperimentWindow(tk.Toplevel):
         except Exception:
             messagebox.showerror("Input", "Provide valid values")
             return
-        try:
-            cur = self.conn.cursor()
-            # MySQL stored proc with OUT param: call and then SELECT @var
-            cur.execute("CALL sp_create_experiment(%s,%s,%s,%s,%s,%s,@outexpid)",
-                        (mid, title, obj, cat, mod, lead))
-            cur.execute("SELECT @outexpid")
-            out = cur.fetchone()
-            newid = out[0] if out else None
-            self.conn.commit()
+
+        def work(conn):
+            return self.app.service.create_experiment(conn, mid, title, obj, cat, mod, lead)
+
+        def done(newid):
             self.lbl_res.config(text=f"New ExperimentID: {newid}")
-            cur.close()
             messagebox.showinfo("OK", f"Experiment created: {newid}")
             self.refresh()
             self.destroy()
-        except Exception as e:
-            try: self.conn.rollback()
-            except: pass
-            messagebox.showerror("Procedure error", str(e))
+        self.app.run_async(work, done, "Procedure error", description="Calling sp_create_experiment")
 
 
 class FnMissionWindow(tk.Toplevel):
-    def __init__(self, conn):
+    def __init__(self, app):
         super().__init__()
-        self.conn = conn
+        self.app = app
         self.title("fn_mission_duration")
-        self.geometry("420x120")
+        self.geometry("420x240")
         frm = ttk.Frame(self, padding=10)
         frm.pack(fill='both', expand=True)
         ttk.Label(frm, text="MissionID").grid(row=0,column=0,padx=6,pady=6)
@@ -835,6 +1591,12 @@ class FnMissionWindow(tk.Toplevel):
         ttk.Button(frm, text="Call", command=self._call).grid(row=1,column=0,columnspan=2,pady=8)
         self.lbl = ttk.Label(frm, text="Duration: -")
         self.lbl.grid(row=2,column=0,columnspan=2)
+        # every mission (or those matching a search) in one set-based query, shown in the grid
+        ttk.Separator(frm).grid(row=3,column=0,columnspan=2,sticky='ew',pady=8)
+        ttk.Label(frm, text="Missions search").grid(row=4,column=0,padx=6,pady=6)
+        self.e_search = ttk.Entry(frm); self.e_search.grid(row=4,column=1,padx=6)
+        self.e_search.bind("<Return>", lambda _e: self._call_bulk())
+        ttk.Button(frm, text="All / matching", command=self._call_bulk).grid(row=5,column=0,columnspan=2,pady=8)
 
     def _call(self):
         try:
@@ -842,22 +1604,23 @@ class FnMissionWindow(tk.Toplevel):
         except Exception:
             messagebox.showerror("Input", "Provide MissionID")
             return
-        try:
-            cur = self.conn.cursor()
-            cur.execute("SELECT fn_mission_duration(%s)", (mid,))
-            r = cur.fetchone()
-            cur.close()
-            self.lbl.config(text=f"Duration: {r[0]}")
-        except Exception as e:
-            messagebox.showerror("Function error", str(e))
+
+        def done(days):
+            if self.winfo_exists():
+                self.lbl.config(text=f"Duration: {days}")
+        self.app.run_async(lambda conn: self.app.service.mission_duration(conn, mid), done, "Function error", description="Calling fn_mission_duration")
+
+    def _call_bulk(self):
+        search = self.e_search.get().strip()
+        self.app.show_bulk(lambda conn: self.app.service.mission_durations(conn, search), "fn_mission_duration")
 
 
 class FnSupplyWindow(tk.Toplevel):
-    def __init__(self, conn):
+    def __init__(self, app):
         super().__init__()
-        self.conn = conn
+        self.app = app
         self.title("fn_remaining_supply")
-        self.geometry("420x120")
+        self.geometry("420x240")
         frm = ttk.Frame(self, padding=10)
         frm.pack(fill='both', expand=True)
         ttk.Label(frm, text="SupplyID").grid(row=0,column=0,padx=6,pady=6)
@@ -865,6 +1628,12 @@ class FnSupplyWindow(tk.Toplevel):
         ttk.Button(frm, text="Call", command=self._call).grid(row=1,column=0,columnspan=2,pady=8)
         self.lbl = ttk.Label(frm, text="Remaining: -")
         self.lbl.grid(row=2,column=0,columnspan=2)
+        # every supply (or those matching a search) in one set-based query, shown in the grid
+        ttk.Separator(frm).grid(row=3,column=0,columnspan=2,sticky='ew',pady=8)
+        ttk.Label(frm, text="Supplies search").grid(row=4,column=0,padx=6,pady=6)
+        self.e_search = ttk.Entry(frm); self.e_search.grid(row=4,column=1,padx=6)
+        self.e_search.bind("<Return>", lambda _e: self._call_bulk())
+        ttk.Button(frm, text="All / matching", command=self._call_bulk).grid(row=5,column=0,columnspan=2,pady=8)
 
     def _call(self):
         try:
@@ -872,14 +1641,301 @@ class FnSupplyWindow(tk.Toplevel):
         except Exception:
             messagebox.showerror("Input", "Provide SupplyID")
             return
+
+        def done(remaining):
+            if self.winfo_exists():
+                self.lbl.config(text=f"Remaining: {remaining}")
+        self.app.run_async(lambda conn: self.app.service.remaining_supply(conn, sid), done, "Function error", description="Calling fn_remaining_supply")
+
+    def _call_bulk(self):
+        search = self.e_search.get().strip()
+        self.app.show_bulk(lambda conn: self.app.service.remaining_supplies(conn, search), "fn_remaining_supply")
+
+
+class TelemetryWindow(tk.Toplevel):
+    """Life-support history per module, read pre-downsampled from the rollups (srs_telemetry)."""
+    RANGES = {"2 hours": timedelta(hours=2), "1 day": timedelta(days=1), "7 days": timedelta(days=7),
+              "30 days": timedelta(days=30), "1 year": timedelta(days=365)}
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.title("Life support telemetry")
+        self.geometry("1000x620")
+        # matplotlib is only needed here, so it is imported when the window opens
         try:
-            cur = self.conn.cursor()
-            cur.execute("SELECT fn_remaining_supply(%s)", (sid,))
-            r = cur.fetchone()
-            cur.close()
-            self.lbl.config(text=f"Remaining: {r[0]}")
-        except Exception as e:
-            messagebox.showerror("Function error", str(e))
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        except ImportError:
+            messagebox.showerror("Telemetry", "The chart needs matplotlib (pip install matplotlib)")
+            self.destroy()
+            return
+        self.modules = []
+        self.frame = self.breaches = None
+        self.resolution = None
+
+        bar = ttk.Frame(self, padding=6)
+        bar.pack(fill='x')
+        ttk.Label(bar, text="Metric").pack(side='left')
+        self.metric = tk.StringVar(value="OxygenLevel")
+        cb = ttk.Combobox(bar, values=list(TELEMETRY_THRESHOLDS), state='readonly', width=14, textvariable=self.metric)
+        cb.pack(side='left', padx=4)
+        cb.bind("<<ComboboxSelected>>", lambda _e: self._draw())
+        ttk.Label(bar, text="Range").pack(side='left', padx=(10,0))
+        self.range = tk.StringVar(value="1 day")
+        ttk.Combobox(bar, values=list(self.RANGES), state='readonly', width=9, textvariable=self.range).pack(side='left', padx=4)
+        ttk.Button(bar, text="Load", command=self._load).pack(side='left', padx=6)
+        self.lbl = ttk.Label(bar, text="")
+        self.lbl.pack(side='left', padx=10)
+
+        body = ttk.Frame(self)
+        body.pack(fill='both', expand=True)
+        side = ttk.Frame(body, padding=6)
+        side.pack(side='left', fill='y')
+        ttk.Label(side, text="Modules (none = all)").pack(anchor='w')
+        self.lst = tk.Listbox(side, selectmode='extended', width=14, exportselection=False)
+        self.lst.pack(fill='y', expand=True)
+
+        self.fig = Figure(figsize=(8, 5), dpi=100)
+        self.ax = self.fig.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=body)
+        self.canvas.get_tk_widget().pack(side='left', fill='both', expand=True)
+
+        def listed(ids):
+            if not self.winfo_exists():
+                return
+            self.modules = ids
+            for mid in ids:
+                self.lst.insert('end', f"Module {mid}")
+            if ids:
+                self._load()
+            else:
+                self.lbl.config(text="No telemetry yet (srs_telemetry.py ingest / simulate)")
+        self.app.run_async(self.app.service.telemetry_modules, listed, "Telemetry error",
+                           description="Listing telemetry modules")
+
+    def _load(self):
+        chosen = [self.modules[i] for i in self.lst.curselection()] or self.modules
+        if not chosen:
+            return
+        end = datetime.now()
+        start = end - self.RANGES[self.range.get()]
+        self.lbl.config(text="Loading…")
+
+        def done(result):
+            if not self.winfo_exists():
+                return
+            self.frame, self.resolution, self.breaches = result
+            self._draw()
+        self.app.run_async(lambda conn: self.app.service.telemetry(conn, chosen, start, end), done,
+                           "Telemetry error", description="Loading telemetry")
+
+    def _draw(self):
+        if self.frame is None:
+            return
+        m = self.metric.get()
+        ax = self.ax
+        ax.clear()
+        for mid, rows in self.frame.groupby("ModuleID"):
+            line, = ax.plot(rows["Time"], rows[m], linewidth=1, label=f"Module {mid}")
+            if f"{m}Min" in rows:
+                ax.fill_between(rows["Time"], rows[f"{m}Min"], rows[f"{m}Max"], color=line.get_color(),
+                                alpha=0.2, linewidth=0)
+        for limit in TELEMETRY_THRESHOLDS.get(m, ()):
+            if limit is not None:
+                ax.axhline(limit, color="red", linestyle="--", linewidth=0.8)
+        res = "raw readings" if not self.resolution else f"{self.resolution}s buckets, min-max shaded"
+        ax.set_title(f"{m} ({res})", fontsize=10)
+        if len(self.frame):
+            ax.legend(loc="upper left", fontsize=8)
+        self.fig.autofmt_xdate()
+        self.canvas.draw_idle()
+        runs = self.breaches[self.breaches["Metric"] == m]
+        self.lbl.config(text=f"{len(self.frame):,} points · {len(runs)} breach run(s) of {m}"
+                        + (f", last at {runs['Start'].max():%Y-%m-%d %H:%M}" if len(runs) else ""))
+
+
+class ForecastWindow(tk.Toplevel):
+    """The stored reorder list and, for the selected resource, each supply's outlook (srs_forecast)."""
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.title("Supply depletion forecast")
+        self.geometry("1000x600")
+        self.resources = {}
+        from srs_forecast import PLAN_COLUMNS, SUPPLY_COLUMNS     # pandas: only loaded once the window opens
+
+        bar = ttk.Frame(self, padding=6)
+        bar.pack(fill='x')
+        # recomputing writes the forecast tables, which viewers may only read
+        btn = ttk.Button(bar, text="Recompute", command=lambda: self._refresh(True))
+        btn.pack(side='left')
+        if self.app.role == "viewer":
+            btn.state(["disabled"])
+        self.show_all = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="Resources that last the horizon too", variable=self.show_all,
+                        command=self._load_plan).pack(side='left', padx=8)
+        self.lbl = ttk.Label(bar, text="")
+        self.lbl.pack(side='left', padx=10)
+
+        self.plan = self._tree(PLAN_COLUMNS, 10)
+        self.plan.bind("<<TreeviewSelect>>", self._on_resource)
+        ttk.Label(self, text="Supplies of the selected resource, first-expiry-first-out").pack(anchor='w', padx=6)
+        self.supplies = self._tree(SUPPLY_COLUMNS, 10)
+        self._refresh(False)
+
+    def _tree(self, columns, height):
+        tree = ttk.Treeview(self, columns=columns, show='headings', height=height)
+        for c in columns:
+            tree.heading(c, text=c)
+            tree.column(c, width=95)
+        tree.pack(fill='both', expand=True, padx=6, pady=4)
+        return tree
+
+    def _refresh(self, force):
+        if self.app.role == "viewer":
+            self._load_plan()
+            return
+        self.lbl.config(text="Recomputing…" if force else "Checking…")
+
+        def done(_result):
+            if self.winfo_exists():
+                self._load_plan()
+        self.app.run_async(lambda conn: self.app.service.refresh_forecast(conn, force), done, "Forecast error",
+                           description="Refreshing the supply forecast")
+
+    def _load_plan(self):
+        def done(result):
+            if not self.winfo_exists():
+                return
+            _cols, rows, run = result
+            self.plan.delete(*self.plan.get_children())
+            self.resources = {}
+            for row in rows:
+                self.resources[self.plan.insert('', 'end', values=["" if v is None else v for v in row])] = row[1]
+            if run is None:
+                self.lbl.config(text="Never computed" + ("" if self.app.role == "viewer" else "; press Recompute"))
+            else:
+                self.lbl.config(text=f"As of {run['as_of']}, computed {run['computed_at']:%H:%M} "
+                                     f"in {run['seconds'] * 1000:.0f} ms · {len(rows)} resource(s)")
+        self.app.run_async(lambda conn: self.app.service.reorder_plan(conn, not self.show_all.get()), done,
+                           "Forecast error", description="Loading the reorder plan")
+
+    def _on_resource(self, _event=None):
+        sel = self.plan.selection()
+        if not sel:
+            return
+        rid = self.resources.get(sel[0])
+
+        def done(result):
+            if not self.winfo_exists():
+                return
+            self.supplies.delete(*self.supplies.get_children())
+            for row in result[1]:
+                self.supplies.insert('', 'end', values=["" if v is None else v for v in row])
+        self.app.run_async(lambda conn: self.app.service.supply_outlook(conn, rid), done, "Forecast error",
+                           description="Loading supply outlook")
+
+
+class PerformanceWindow(tk.Toplevel):
+    """Every statement this console has run (srs_profile), slowest first, with EXPLAIN for the selected one."""
+    COLUMNS = ("Calls", "p50 ms", "p95 ms", "p99 ms", "Max ms", "Total ms", "Rows", "KB", "Errors",
+               "Task", "Caller", "Statement")
+    REFRESH_MS = 2000
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.title("Performance")
+        self.geometry("1200x640")
+        self._job = None
+
+        bar = ttk.Frame(self, padding=6)
+        bar.pack(fill='x')
+        ttk.Label(bar, text="Slowest by").pack(side='left')
+        self.order = tk.StringVar(value="p95")
+        cb = ttk.Combobox(bar, textvariable=self.order, values=list(PROFILER.ORDERS), state='readonly', width=7)
+        cb.pack(side='left', padx=4)
+        cb.bind("<<ComboboxSelected>>", lambda _e: self._refresh())
+        self.live = tk.BooleanVar(value=True)
+        ttk.Checkbutton(bar, text="Live", variable=self.live, command=self._refresh).pack(side='left', padx=8)
+        ttk.Button(bar, text="Refresh", command=self._refresh).pack(side='left', padx=2)
+        ttk.Button(bar, text="Reset", command=self._reset).pack(side='left', padx=2)
+        ttk.Button(bar, text="EXPLAIN", command=self._explain).pack(side='left', padx=2)
+        exporter = self.app.metrics
+        self.lbl = ttk.Label(bar, text="")
+        self.lbl.pack(side='left', padx=10)
+        ttk.Label(bar, text=f"Metrics: {exporter.describe() if exporter is not None else 'off'}").pack(side='right')
+
+        self.stmts = ttk.Treeview(self, columns=self.COLUMNS, show='headings', height=14)
+        for c in self.COLUMNS:
+            self.stmts.heading(c, text=c)
+            self.stmts.column(c, width=70, anchor='e')
+        for c, w in (("Task", 150), ("Caller", 200), ("Statement", 480)):
+            self.stmts.column(c, width=w, anchor='w')
+        self.stmts.pack(fill='both', expand=True, padx=6, pady=4)
+        self.stmts.bind("<Double-1>", lambda _e: self._explain())
+        self.plan_lbl = ttk.Label(self, text="EXPLAIN (double-click a statement)")
+        self.plan_lbl.pack(anchor='w', padx=6)
+        self.plan = ttk.Treeview(self, show='headings', height=6)
+        self.plan.pack(fill='both', expand=True, padx=6, pady=4)
+        self._refresh()
+
+    def _refresh(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        if not self.winfo_exists():
+            return
+        selected = self.stmts.selection()
+        self.stmts.delete(*self.stmts.get_children())
+        stats = PROFILER.statements(self.order.get())
+        for st in stats:
+            self.stmts.insert('', 'end', iid=st.id, values=(
+                st.calls, f"{st.percentile(50):.1f}", f"{st.percentile(95):.1f}", f"{st.percentile(99):.1f}",
+                f"{st.max_ms:.1f}", f"{st.total_ms:.0f}", st.rows, f"{st.bytes / 1024:.0f}", st.errors,
+                st.task, st.caller, st.fingerprint))
+        keep = [i for i in selected if self.stmts.exists(i)]
+        if keep:
+            self.stmts.selection_set(keep)
+        calls = sum(st.calls for st in stats)
+        self.lbl.config(text=f"{len(stats)} statement(s), {calls:,} call(s) since "
+                             f"{datetime.fromtimestamp(PROFILER.started):%H:%M:%S}")
+        if self.live.get():
+            self._job = self.after(self.REFRESH_MS, self._refresh)
+
+    def _reset(self):
+        PROFILER.reset()
+        self._refresh()
+
+    def _explain(self):
+        sel = self.stmts.selection()
+        if not sel:
+            messagebox.showwarning("EXPLAIN", "Select a statement first.")
+            return
+        statement_id = sel[0]
+
+        def done(res):
+            if not self.winfo_exists():
+                return
+            cols, rows = res
+            self.plan.delete(*self.plan.get_children())
+            self.plan['columns'] = cols
+            for c in cols:
+                self.plan.heading(c, text=c)
+                self.plan.column(c, width=90)
+            for r in rows:
+                self.plan.insert('', 'end', values=["" if v is None else v for v in r])
+            self.plan_lbl.config(text=f"EXPLAIN of statement {statement_id} (its last call)")
+
+        def failed(e):
+            if isinstance(e, ValueError):
+                messagebox.showwarning("EXPLAIN", str(e))
+            else:
+                messagebox.showerror("EXPLAIN", str(e))
+        self.app.run_async(lambda conn: self.app.service.explain(conn, statement_id), done, on_error=failed,
+                           description="Running EXPLAIN")
 
 
 # ------------------ Run the app ------------------
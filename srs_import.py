@@ -0,0 +1,431 @@
+# srs_import.py
+"""
+Bulk loader for SRSMS (cargo manifests, comms logs, ...).
+
+Rows from CSV or JSONL files (optionally .gz) are checked against the
+table's column metadata from the schema catalog, then inserted in batches:
+one multi-row INSERT (executemany) per transaction, or LOAD DATA LOCAL
+INFILE with --load-data. A batch the server refuses is replayed row by row
+so only the offending rows are rejected. Rejects are reported per input
+line with the reason; nothing is silently dropped.
+
+Several files load parents before children (FK order from the catalog):
+  python srs_import.py --role operator Supplies=cargo.csv Communications=comms.jsonl
+  python srs_import.py --role admin Resources.csv Supplies.csv --load-data
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from srs_search import INT_TYPES, DATE_TYPES, DATETIME_TYPES, TEXT_TYPES
+
+BATCH_ROWS = 1000
+LOAD_DATA_ROWS = 50000
+REJECT_SAMPLE = 20      # rejects echoed to stderr by the CLI; all of them go to the rejects file
+
+
+class BulkImportError(Exception):
+    pass
+
+
+class RowReject(ValueError):
+    pass
+
+
+class ImportStats:
+    def __init__(self, table, source):
+        self.table = table
+        self.source = source
+        self.read = 0
+        self.inserted = 0
+        self.batches = 0
+        self.replayed = 0           # batches that had to be retried row by row
+        self.rejects = []           # (line, reason, raw row)
+        self.seconds = 0.0
+
+    @property
+    def rejected(self):
+        return len(self.rejects)
+
+    @property
+    def rate(self):
+        return self.inserted / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.table}: {self.inserted:,}/{self.read:,} rows inserted, {self.rejected:,} rejected, "
+                f"{self.batches} batches ({self.replayed} replayed) in {self.seconds:.2f}s "
+                f"= {self.rate:,.0f} rows/s")
+
+
+# ---------------- reading ----------------
+def _open_text(path):
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8-sig")
+    return open(path, newline="", encoding="utf-8-sig")
+
+
+def read_rows(path):
+    """Yield (line_number, dict) from a CSV (header row) or JSONL file."""
+    base = path.lower()[:-3] if path.lower().endswith(".gz") else path.lower()
+    with _open_text(path) as f:
+        if base.endswith((".jsonl", ".ndjson", ".json")):
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                except ValueError as e:
+                    yield n, e
+                    continue
+                yield n, obj if isinstance(obj, dict) else ValueError("line is not a JSON object")
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+# ---------------- validation ----------------
+_LEN_RE = re.compile(r"^\w+\((\d+)\)")
+_DEC_RE = re.compile(r"^decimal\((\d+),(\d+)\)")
+_ENUM_RE = re.compile(r"'((?:[^']|'')*)'")
+
+
+class RowValidator:
+    """Turns raw CSV/JSON values into typed tuples for `columns` of `meta`."""
+
+    def __init__(self, meta, columns):
+        self.meta = meta
+        self.cols = [meta.column(c) for c in columns]
+        required = [c.name for c in meta.columns
+                    if not c.nullable and c.default is None and not c.auto_increment
+                    and "generated" not in c.extra.lower() and c.name not in columns]
+        if required:
+            raise BulkImportError(f"{meta.name}: file lacks required column(s) {', '.join(required)}")
+
+    def _value(self, col, v):
+        dtype = col.data_type.lower()
+        if isinstance(v, str) and v == "" and not (dtype in TEXT_TYPES and not col.nullable):
+            v = None
+        if v is None:
+            if not col.nullable and col.default is None and not col.auto_increment:
+                raise RowReject(f"{col.name} cannot be empty")
+            return None
+        ctype = (col.column_type or "").lower()
+        try:
+            if dtype in INT_TYPES:
+                if isinstance(v, str) and v.strip().lower() in ("true", "false"):
+                    v = v.strip().lower() == "true"
+                if isinstance(v, float) and not v.is_integer():
+                    raise ValueError
+                v = int(v)
+                if v < 0 and "unsigned" in ctype:
+                    raise RowReject(f"{col.name} must not be negative")
+                return v
+            if dtype in ("decimal", "numeric"):
+                v = Decimal(str(v).strip())
+                m = _DEC_RE.match(ctype)
+                if m and not v.is_nan() and abs(v) >= Decimal(10) ** (int(m.group(1)) - int(m.group(2))):
+                    raise RowReject(f"{col.name}: {v} does not fit {col.column_type}")
+                return v
+            if dtype in ("float", "double", "real"):
+                return float(v)
+            if dtype in DATE_TYPES:
+                return v if isinstance(v, date) else date.fromisoformat(str(v).strip()[:10])
+            if dtype in DATETIME_TYPES:
+                return v if isinstance(v, datetime) else datetime.fromisoformat(str(v).strip())
+        except (ValueError, TypeError, InvalidOperation):
+            raise RowReject(f"{col.name}: '{v}' is not a valid {col.column_type} value")
+        if dtype == "json":
+            return v if isinstance(v, str) else json.dumps(v)
+        if dtype == "enum":
+            allowed = [a.replace("''", "'") for a in _ENUM_RE.findall(col.column_type)]
+            match = next((a for a in allowed if a.lower() == str(v).lower()), None)
+            if match is None:
+                raise RowReject(f"{col.name}: '{v}' is not one of {', '.join(allowed)}")
+            return match
+        v = v if isinstance(v, str) else str(v)
+        m = _LEN_RE.match(ctype)
+        if m and dtype in ("char", "varchar") and len(v) > int(m.group(1)):
+            raise RowReject(f"{col.name}: {len(v)} characters, column holds {m.group(1)}")
+        return v
+
+    def row(self, values):
+        return tuple(self._value(col, v) for col, v in zip(self.cols, values))
+
+
+def resolve_columns(meta, header):
+    """Map file field names onto table columns (case-insensitive); unknown names are an error."""
+    by_lower = {c.name.lower(): c.name for c in meta.columns}
+    cols, unknown = [], []
+    for h in header:
+        name = by_lower.get((h or "").strip().lower())
+        (cols if name else unknown).append(name or h)
+    if unknown:
+        raise BulkImportError(f"{meta.name} has no column(s): {', '.join(map(str, unknown))}")
+    return cols
+
+
+# ---------------- FK ordering ----------------
+def fk_order(metas):
+    """Order table metas so every FK parent in the set loads before its children."""
+    names = list(dict.fromkeys(m.name for m in metas))
+    deps = {m.name: {t for _c, t, _rc in m.foreign_keys if t in names and t != m.name} for m in metas}
+    ordered = []
+    while deps:
+        ready = [n for n in names if n in deps and not deps[n]]
+        if not ready:
+            # cycle: keep the caller's order for what is left
+            ready = [n for n in names if n in deps]
+        for n in ready:
+            ordered.append(n)
+            del deps[n]
+        for d in deps.values():
+            d.difference_update(ready)
+    by_name = {m.name: m for m in metas}
+    return [by_name[n] for n in ordered]
+
+
+class ParentKeys:
+    """Checks FK values against the parent tables, a batch at a time, remembering hits."""
+
+    def __init__(self, meta, columns):
+        self.fks = [(columns.index(c), t, rc) for c, t, rc in meta.foreign_keys if c in columns]
+        self.known = {i: set() for i, _t, _rc in self.fks}
+
+    def missing(self, conn, rows):
+        """Set of row indexes (into `rows`) with an FK value not present in the parent."""
+        bad = set()
+        for i, table, col in self.fks:
+            wanted = {r[i] for r in rows if r[i] is not None} - self.known[i]
+            if wanted:
+                marks = ", ".join(["%s"] * len(wanted))
+                cur = conn.cursor()
+                cur.execute(f"SELECT `{col}` FROM `{table}` WHERE `{col}` IN ({marks})", tuple(wanted))
+                self.known[i].update(v for (v,) in cur.fetchall())
+                cur.close()
+            bad.update(n for n, r in enumerate(rows) if r[i] is not None and r[i] not in self.known[i])
+        return bad
+
+
+# ---------------- loading ----------------
+def _insert_sql(table, columns):
+    cols = ", ".join(f"`{c}`" for c in columns)
+    return f"INSERT INTO `{table}` ({cols}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+
+def _executemany(conn, sql, rows):
+    conn.start_transaction()
+    try:
+        cur = conn.cursor()
+        # the connector rewrites INSERT ... VALUES + executemany into one multi-row INSERT
+        cur.executemany(sql, rows)
+        cur.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _replay(conn, sql, batch, stats):
+    """Insert a refused batch row by row so only the bad rows are rejected."""
+    stats.replayed += 1
+    conn.start_transaction()
+    cur = conn.cursor()
+    for line, raw, values in batch:
+        try:
+            cur.execute("SAVEPOINT srs_row")
+            cur.execute(sql, values)
+            stats.inserted += 1
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT srs_row")
+            stats.rejects.append((line, getattr(e, "msg", None) or str(e), raw))
+    cur.close()
+    conn.commit()
+
+
+def _tsv_value(v):
+    if v is None:
+        return r"\N"
+    s = v.isoformat(" ") if isinstance(v, datetime) else str(v)
+    return s.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _load_data(conn, table, columns, batch):
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8", newline="") as f:
+        for _line, _raw, values in batch:
+            f.write("\t".join(_tsv_value(v) for v in values) + "\n")
+        tmp = f.name
+    try:
+        cols = ", ".join(f"`{c}`" for c in columns)
+        conn.start_transaction()
+        try:
+            cur = conn.cursor()
+            cur.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` CHARACTER SET utf8mb4 "
+                        f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({cols})",
+                        (tmp,))
+            cur.close()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        os.remove(tmp)
+
+
+def import_file(conn, meta, path, batch_rows=BATCH_ROWS, load_data=False, progress=None, dry_run=False):
+    """
+    Load `path` into the table described by `meta` (a catalog TableMeta).
+    `conn` should be in autocommit mode (pooled connections are); each batch
+    is its own transaction. load_data=True needs a connection opened with
+    allow_local_infile=True. Returns an ImportStats.
+    """
+    if meta.is_view:
+        raise BulkImportError(f"{meta.name} is a view")
+    stats = ImportStats(meta.name, path)
+    t0 = time.perf_counter()
+    validator = sql = parents = columns = header = None
+    batch = []
+    size = LOAD_DATA_ROWS if load_data else batch_rows
+
+    def flush():
+        if not batch:
+            return
+        bad = parents.missing(conn, [v for _l, _r, v in batch])
+        good = []
+        for n, item in enumerate(batch):
+            if n in bad:
+                stats.rejects.append((item[0], "foreign key value not found in parent table", item[1]))
+            else:
+                good.append(item)
+        stats.batches += 1
+        if good and not dry_run:
+            try:
+                if load_data:
+                    _load_data(conn, meta.name, columns, good)
+                else:
+                    _executemany(conn, sql, [v for _l, _r, v in good])
+                stats.inserted += len(good)
+            except Exception:
+                _replay(conn, sql, good, stats)
+        elif dry_run:
+            stats.inserted += len(good)
+        batch.clear()
+        if progress:
+            progress(stats)
+
+    for line, raw in read_rows(path):
+        stats.read += 1
+        if isinstance(raw, Exception):
+            stats.rejects.append((line, f"unreadable line: {raw}", None))
+            continue
+        if validator is None:
+            # the first row fixes the field list (CSV header / first JSON object)
+            header = list(raw.keys())
+            columns = resolve_columns(meta, header)
+            validator = RowValidator(meta, columns)
+            sql = _insert_sql(meta.name, columns)
+            parents = ParentKeys(meta, columns)
+        try:
+            extra = [k for k in raw if k not in header]
+            if extra:
+                raise RowReject("unexpected field(s): " + ", ".join(
+                    "(extra CSV fields)" if k is None else str(k) for k in extra))
+            batch.append((line, raw, validator.row([raw.get(h) for h in header])))
+        except RowReject as e:
+            stats.rejects.append((line, str(e), raw))
+        if len(batch) >= size:
+            flush()
+    if validator is not None:
+        flush()
+    stats.seconds = time.perf_counter() - t0
+    return stats
+
+
+def import_files(conn, catalog, jobs, **kw):
+    """jobs: [(table, path)]. Loads parents before children; returns [ImportStats]."""
+    metas = [catalog.get(conn, t) for t, _p in jobs]
+    paths = {}
+    for t, p in jobs:
+        paths.setdefault(t, []).append(p)
+    results = []
+    for meta in fk_order(metas):
+        for p in paths.pop(meta.name, []):
+            results.append(import_file(conn, meta, p, **kw))
+    return results
+
+
+def write_rejects(stats, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for line, reason, raw in stats.rejects:
+            f.write(json.dumps({"line": line, "error": reason, "row": raw}, default=str) + "\n")
+
+
+# ---------------- command line ----------------
+def _job(arg):
+    if "=" in arg:
+        table, path = arg.split("=", 1)
+        return table, path
+    # Supplies.csv / Supplies.jsonl.gz -> Supplies
+    return os.path.basename(arg).split(".")[0], arg
+
+
+def main(argv=None):
+    import mysql.connector
+    from srs_catalog import SchemaCatalog
+    from srs_config import HOST, DATABASE, ROLE_CREDENTIALS
+
+    ap = argparse.ArgumentParser(description="Bulk-load CSV/JSONL files into SRSMS tables.")
+    ap.add_argument("files", nargs="+", help="Table=path, or a path named after its table (Supplies.csv)")
+    ap.add_argument("--role", default="operator", help="DB role to connect as (default: operator)")
+    ap.add_argument("--batch", type=int, default=BATCH_ROWS, help="rows per INSERT transaction")
+    ap.add_argument("--load-data", action="store_true", help="use LOAD DATA LOCAL INFILE (server needs local_infile=ON)")
+    ap.add_argument("--dry-run", action="store_true", help="validate and FK-check only, insert nothing")
+    ap.add_argument("--rejects-dir", help="write <file>.rejects.jsonl here (default: next to each input)")
+    args = ap.parse_args(argv)
+
+    if args.role not in ROLE_CREDENTIALS:
+        ap.error(f"unknown role {args.role}")
+    # a plain connection: pooled ones can't enable LOCAL INFILE
+    conn = mysql.connector.connect(host=HOST, database=DATABASE, autocommit=True,
+                                   allow_local_infile=args.load_data, **ROLE_CREDENTIALS[args.role])
+
+    def progress(st):
+        print(f"\r{st.table}: {st.read:,} read, {st.inserted:,} inserted, {st.rejected:,} rejected",
+              end="", file=sys.stderr)
+
+    try:
+        results = import_files(conn, SchemaCatalog(), [_job(a) for a in args.files], batch_rows=args.batch,
+                               load_data=args.load_data, progress=progress, dry_run=args.dry_run)
+    except BulkImportError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        conn.close()
+
+    print(file=sys.stderr)
+    status = 0
+    for st in results:
+        print(st)
+        if st.rejects:
+            status = 1
+            out = st.source + ".rejects.jsonl"
+            if args.rejects_dir:
+                out = os.path.join(args.rejects_dir, os.path.basename(out))
+            write_rejects(st, out)
+            for line, reason, _raw in st.rejects[:REJECT_SAMPLE]:
+                print(f"  line {line}: {reason}", file=sys.stderr)
+            more = st.rejected - REJECT_SAMPLE
+            print(f"  {'… ' + str(more) + ' more, ' if more > 0 else ''}all rejects in {out}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# srs_migrate.py
+"""
+Versioned schema migrations for SRSMS databases created from srsms.sql.
+
+Migrations live in migrations/NNNN_name.sql, each with an "-- up" and a
+"-- down" section of ';'-terminated statements (no DELIMITER blocks).
+Applied versions are recorded in SchemaMigrations; srsms.sql records the
+ones it already includes, so a fresh install starts up to date. Run `up`
+once after installing anyway: every upgrade also splits the pmax partition
+of the monthly-partitioned tables up to AUDIT_PARTITIONS_AHEAD months from
+now, since the script and migrations ship a fixed range of months.
+
+"Already exists" / "doesn't exist" errors on index and column DDL are
+treated as done, so a migration can be re-run against a database that
+picked up part of it by hand.
+
+  python srs_migrate.py status
+  python srs_migrate.py up [--to 3]
+  python srs_migrate.py down --to 0
+"""
+import argparse
+import os
+import re
+import sys
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# ER_TABLE_EXISTS_ERROR, ER_DUP_FIELDNAME, ER_DUP_KEYNAME
+UP_IDEMPOTENT = (1050, 1060, 1061)
+# ER_CANT_DROP_FIELD_OR_KEY, ER_BAD_TABLE_ERROR, and ER_DUP_KEYNAME for indexes
+# a "down" section restores (e.g. an FK index MySQL never dropped)
+DOWN_IDEMPOTENT = (1091, 1051, 1061)
+
+# RANGE-partitioned by month, with pmax catching everything past the last one
+PARTITIONED_TABLES = ("AuditLog", "LifeSupportReadings")
+
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_SECTION_RE = re.compile(r"^--\s*(up|down)\s*$", re.I | re.M)
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS SchemaMigrations (
+  Version    INT PRIMARY KEY,
+  Name       VARCHAR(200) NOT NULL,
+  AppliedAt  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _statements(text):
+    # drop comment lines first so a ';' inside a comment can't split a statement
+    code = "\n".join(ln for ln in text.splitlines() if ln.strip() and not ln.strip().startswith("--"))
+    return [s.strip() for s in code.split(";") if s.strip()]
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        parts = _SECTION_RE.split(text)
+        sections = {parts[i].lower(): parts[i + 1] for i in range(1, len(parts) - 1, 2)}
+        if "up" not in sections:
+            raise MigrationError(f"{os.path.basename(path)}: no '-- up' section")
+        self.up = _statements(sections["up"])
+        self.down = _statements(sections.get("down", ""))
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    found = []
+    for fn in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        m = _FILE_RE.match(fn)
+        if m:
+            found.append(Migration(int(m.group(1)), m.group(2), os.path.join(directory, fn)))
+    versions = [m.version for m in found]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions in {directory}")
+    return found
+
+
+def next_version(directory=MIGRATIONS_DIR):
+    return max((m.version for m in load_migrations(directory)), default=0) + 1
+
+
+def write_migration(name, up, down, directory=MIGRATIONS_DIR, header=""):
+    """Write the next NNNN_name.sql from lists of statements; returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"\W+", "_", name).strip("_")
+    path = os.path.join(directory, f"{next_version(directory):04d}_{slug}.sql")
+    with open(path, "w", encoding="utf-8") as f:
+        if header:
+            f.write("".join(f"-- {ln}\n" if ln else "--\n" for ln in header.splitlines()) + "\n")
+        f.write("-- up\n" + "".join(s.rstrip(";") + ";\n" for s in up))
+        f.write("\n-- down\n" + "".join(s.rstrip(";") + ";\n" for s in down))
+    return path
+
+
+def applied(conn):
+    cur = conn.cursor()
+    cur.execute(CREATE_TABLE_SQL)
+    cur.execute("SELECT Version, AppliedAt FROM SchemaMigrations")
+    done = dict(cur.fetchall())
+    cur.close()
+    return done
+
+
+def _run(conn, statements, tolerated, log, catalog=None):
+    cur = conn.cursor()
+    try:
+        for stmt in statements:
+            try:
+                cur.execute(stmt)
+            except Exception as e:
+                if getattr(e, "errno", None) not in tolerated:
+                    raise MigrationError(f"{stmt.splitlines()[0]} ...: {e}") from e
+                log(f"  already done: {stmt.splitlines()[0]}")
+            if catalog is not None:
+                catalog.note_statement(stmt)
+    finally:
+        cur.close()
+
+
+def upgrade(conn, target=None, directory=MIGRATIONS_DIR, log=print, catalog=None):
+    """
+    Apply pending migrations up to `target` (default: all). Returns the
+    versions applied; `catalog` (a SchemaCatalog) drops what they change.
+    """
+    done = applied(conn)
+    ran = []
+    for m in load_migrations(directory):
+        if m.version in done or (target is not None and m.version > target):
+            continue
+        log(f"applying {m!r}")
+        _run(conn, m.up, UP_IDEMPOTENT, log, catalog)
+        cur = conn.cursor()
+        cur.execute("INSERT INTO SchemaMigrations (Version, Name) VALUES (%s, %s)", (m.version, m.name))
+        cur.close()
+        conn.commit()
+        ran.append(m.version)
+    extend_partitions(conn, log, catalog)
+    return ran
+
+
+def extend_partitions(conn, log=print, catalog=None):
+    """Give each of PARTITIONED_TABLES its own partition per month up to AUDIT_PARTITIONS_AHEAD ahead."""
+    from srs_audit_archive import ArchiveError, ensure_partitions
+
+    for table in PARTITIONED_TABLES:
+        try:
+            created = ensure_partitions(conn, table=table, catalog=catalog)
+        except ArchiveError as e:
+            log(f"  {e}; partitions left as they are")
+            continue
+        if created:
+            log(f"{table}: created partitions {', '.join(created)}")
+
+
+def downgrade(conn, target, directory=MIGRATIONS_DIR, log=print, catalog=None):
+    """Revert applied migrations newer than `target`, newest first. Returns the versions reverted."""
+    done = applied(conn)
+    ran = []
+    for m in reversed(load_migrations(directory)):
+        if m.version not in done or m.version <= target:
+            continue
+        log(f"reverting {m!r}")
+        _run(conn, m.down, DOWN_IDEMPOTENT, log, catalog)
+        cur = conn.cursor()
+        cur.execute("DELETE FROM SchemaMigrations WHERE Version = %s", (m.version,))
+        cur.close()
+        conn.commit()
+        ran.append(m.version)
+    return ran
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description="Apply or revert SRSMS schema migrations.")
+    ap.add_argument("action", choices=["status", "up", "down"])
+    ap.add_argument("--to", type=int, help="target version (up: default latest; down: required)")
+    ap.add_argument("--dir", default=MIGRATIONS_DIR)
+    args = ap.parse_args(argv)
+    if args.action == "down" and args.to is None:
+        ap.error("down needs --to VERSION")
+
+    conn = checkout("admin", "worker")
+    try:
+        if args.action == "up":
+            ran = upgrade(conn, args.to, args.dir)
+            print(f"{len(ran)} migration(s) applied")
+        elif args.action == "down":
+            ran = downgrade(conn, args.to, args.dir)
+            print(f"{len(ran)} migration(s) reverted")
+        else:
+            done = applied(conn)
+            for m in load_migrations(args.dir):
+                print(f"{m!r:40} {done[m.version]:%Y-%m-%d %H:%M}" if m.version in done else f"{m!r:40} pending")
+    except MigrationError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
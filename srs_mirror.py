@@ -0,0 +1,909 @@
+# srs_mirror.py
+"""
+Local-first read mirror of the station database for one console.
+
+An SQLite file next to the GUI holds a copy of the station tables
+(TABLES_TO_SHOW) and of the views, so browsing and searching keep working,
+in microseconds, when the link to MySQL is slow or down:
+
+  snapshot  copies every table the role can read, plus the schema the
+            service layer needs offline (columns, keys, FK rules, view
+            sources), and notes the AuditLog position it started from
+  sync      applies AuditLog rows past that position in AuditID order: the
+            audit triggers' NewRow / OldRow images are upserted / deleted,
+            and the ON DELETE / UPDATE rules of the foreign keys (cascades
+            fire no triggers in MySQL) are re-applied locally. AuditIDs are
+            handed out before commit, so a hole in the sequence is re-checked
+            for MIRROR_GAP_SECONDS in case its transaction commits late. Views
+            are re-copied when a table they read from changed.
+  reads     KeysetPager's fetch hook runs the service's (MySQL dialect)
+            paging and search SQL against the local tables
+  writes    made while MySQL is unreachable are applied to the mirror and
+            queued with the row as it was; replay() sends them in order,
+            locking each row and comparing it with that image first. A row
+            somebody else changed meanwhile (a column this write also sets,
+            or any column for a delete) is left alone and the write marked
+            as a conflict, to be discarded or forced with resolve()
+
+The connection's account needs SELECT on AuditLog (admin by default).
+
+  python srs_mirror.py snapshot --role admin
+  python srs_mirror.py sync
+  python srs_mirror.py status
+  python srs_mirror.py replay
+  python srs_mirror.py conflicts
+  python srs_mirror.py resolve 12 --force        # or --discard
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from mysql.connector import errors
+
+from srs_cache import source_tables
+from srs_catalog import ColumnMeta, TableMeta, _text
+from srs_config import (DATABASE, TABLES_TO_SHOW, VIEWS, MIRROR_PATH, MIRROR_SYNC_SECONDS, MIRROR_GAP_SECONDS,
+                        MIRROR_BATCH)
+
+COPY_CHUNK = 2000
+MAX_GAPS = 10000
+SNAPSHOT_LOOKBACK = 1000    # AuditIDs below the snapshot's mark checked for late commits
+# client-side errors meaning the server could not be reached (as opposed to refusing a statement)
+OFFLINE_ERRNOS = {2002, 2003, 2005, 2006, 2013, 2055}
+DENIED_ERRNOS = {1044, 1142}     # no access to the database / to AuditLog
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS _mirror_tables (
+  name      TEXT PRIMARY KEY,
+  kind      TEXT NOT NULL,
+  columns   TEXT NOT NULL,
+  pk        TEXT NOT NULL,
+  fks       TEXT NOT NULL,
+  sources   TEXT NOT NULL,
+  copied_at TEXT
+);
+CREATE TABLE IF NOT EXISTS _mirror_state (
+  name  TEXT PRIMARY KEY,
+  value TEXT
+);
+CREATE TABLE IF NOT EXISTS _mirror_outbox (
+  id        INTEGER PRIMARY KEY AUTOINCREMENT,
+  tbl       TEXT NOT NULL,
+  op        TEXT NOT NULL,
+  key       TEXT,
+  vals      TEXT,
+  base      TEXT,
+  local_key TEXT,
+  status    TEXT NOT NULL DEFAULT 'pending',
+  error     TEXT,
+  queued_at TEXT NOT NULL,
+  done_at   TEXT
+);
+"""
+
+AFFINITY = {"tinyint": "INTEGER", "smallint": "INTEGER", "mediumint": "INTEGER", "int": "INTEGER",
+            "bigint": "INTEGER", "bit": "INTEGER", "year": "INTEGER",
+            "decimal": "NUMERIC", "float": "REAL", "double": "REAL"}
+DATETIME_TYPES = {"datetime", "timestamp"}
+
+FK_SQL = """
+SELECT k.TABLE_NAME, k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME,
+       r.DELETE_RULE, r.UPDATE_RULE
+FROM information_schema.KEY_COLUMN_USAGE k
+JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+  ON r.CONSTRAINT_SCHEMA = k.TABLE_SCHEMA AND r.TABLE_NAME = k.TABLE_NAME
+ AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+WHERE k.TABLE_SCHEMA = DATABASE() AND k.REFERENCED_TABLE_NAME IS NOT NULL
+ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION
+"""
+VIEW_SQL = "SELECT TABLE_NAME, VIEW_DEFINITION FROM information_schema.VIEWS WHERE TABLE_SCHEMA = DATABASE()"
+AUDIT_SQL = "SELECT AuditID, TableName, Operation, OldRow, NewRow FROM AuditLog"
+GONE = "the row was deleted on the server"
+
+
+class MirrorError(ValueError):
+    """The mirror can't do that (no snapshot yet, row not mirrored, unknown outbox entry...)."""
+
+
+def mirror_path(role, database=DATABASE):
+    return MIRROR_PATH.format(database=database, role=role.lower())
+
+
+def is_offline(exc):
+    """True when `exc` says MySQL could not be reached, rather than that it refused something."""
+    if isinstance(exc, errors.PoolError):
+        return True
+    return isinstance(exc, errors.Error) and getattr(exc, "errno", None) in OFFLINE_ERRNOS
+
+
+# ---------------- values ----------------
+def _local(v):
+    """A MySQL / Python value as stored in SQLite (dates as ISO text, DECIMAL as REAL)."""
+    if isinstance(v, Decimal):
+        return float(v)
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ")
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, timedelta):        # TIME columns
+        return str(v)
+    if isinstance(v, bytearray):
+        return bytes(v)
+    if isinstance(v, (dict, list)):     # JSON columns inside an audit image
+        return json.dumps(v)
+    return v
+
+
+def _from_image(col, v):
+    # audit images are JSON_OBJECTs: DATETIME comes back with microseconds
+    if isinstance(v, str) and col.data_type.lower() in DATETIME_TYPES:
+        try:
+            return _local(datetime.fromisoformat(v))
+        except ValueError:
+            return v
+    return _local(v)
+
+
+def _same(col, a, b):
+    """Equal as values of `col`, whatever mix of MySQL, SQLite and form text they come in."""
+    a, b = _local(a), _local(b)
+    if a is None or b is None:
+        return a is None and b is None
+    dtype = col.data_type.lower()
+    try:
+        if dtype in AFFINITY:
+            return Decimal(str(a)) == Decimal(str(b))
+        if dtype in DATETIME_TYPES or dtype == "date":
+            return datetime.fromisoformat(str(a)) == datetime.fromisoformat(str(b))
+    except (ValueError, ArithmeticError):
+        pass
+    return str(a) == str(b)
+
+
+def _quote(name):
+    return f'"{name}"'
+
+
+def _now():
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+class SyncStats:
+    def __init__(self):
+        self.fetched = 0
+        self.applied = 0            # audit rows for mirrored tables
+        self.late = 0               # of which filled a gap
+        self.gaps = 0               # still open after this sync
+        self.views = []
+        self.snapshot = False       # the mirror had to be rebuilt
+        self.seconds = 0.0
+
+    def __str__(self):
+        what = "snapshot taken" if self.snapshot else f"{self.applied:,}/{self.fetched:,} audit rows applied"
+        return (f"{what} ({self.late} late), {self.gaps} open gap(s), "
+                f"{len(self.views)} view(s) refreshed in {self.seconds * 1000:.1f} ms")
+
+
+class ReplayStats:
+    def __init__(self):
+        self.applied = 0
+        self.conflicts = 0
+        self.failed = 0
+
+    def __str__(self):
+        return f"{self.applied} applied, {self.conflicts} conflict(s), {self.failed} failed"
+
+
+# ---------------- the mirror ----------------
+class Mirror:
+    """
+    One SQLite file in WAL mode, opened twice: snapshot, sync, replay and
+    queued writes take turns on the writer connection, reads go through
+    their own and see the last committed state meanwhile, so a sync (or a
+    whole snapshot) never holds up the grid.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+        self._reader = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()          # the writer connection
+        self._read_lock = threading.Lock()      # the reader connection
+        self._ready = False
+        self._metas = {}
+        self._fks = {}          # child table (lower) -> its FK dicts
+        self._sources = {}      # view (lower) -> lower-cased tables it reads
+        # set by the service after a write through MySQL, so the next read syncs first
+        self.behind = False
+        self._load_schema()
+
+    def close(self):
+        with self._lock, self._read_lock:
+            self._reader.close()
+            self.db.close()
+
+    # ---------------- schema ----------------
+    def _load_schema(self):
+        metas, fks, sources = {}, {}, {}
+        for name, kind, columns, pk, fk, src in self.db.execute(
+                "SELECT name, kind, columns, pk, fks, sources FROM _mirror_tables"):
+            meta = TableMeta(name, kind)
+            meta.columns = [ColumnMeta(c[0], n + 1, c[1], c[2], c[3], c[4], c[5], None, c[6], c[7])
+                            for n, c in enumerate(json.loads(columns))]
+            meta.pk = json.loads(pk)
+            metas[name.lower()] = meta
+            fks[name.lower()] = json.loads(fk)
+            sources[name.lower()] = set(json.loads(src))
+        self._metas, self._fks, self._sources = metas, fks, sources
+        self._ready = self._state("last_audit_id") is not None
+
+    @property
+    def ready(self):
+        """True once a snapshot has completed."""
+        return self._ready
+
+    def has(self, table):
+        return self.ready and table.lower() in self._metas
+
+    def meta(self, table):
+        """
+        The TableMeta the snapshot saw. It lists no indexes, so srs_search
+        builds LIKE filters instead of MATCH ... AGAINST, which SQLite lacks.
+        """
+        meta = self._metas.get(table.lower())
+        if meta is None:
+            raise MirrorError(f"{table} is not in the local mirror")
+        return meta
+
+    def table_names(self):
+        return sorted(m.name for m in self._metas.values())
+
+    def _children(self, table):
+        table = table.lower()
+        for child, fks in self._fks.items():
+            for fk in fks:
+                if fk["parent"].lower() == table:
+                    yield self._metas[child], fk
+
+    # ---------------- state ----------------
+    def _state(self, name, default=None):
+        with self._lock:
+            row = self.db.execute("SELECT value FROM _mirror_state WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_state(self, **values):
+        self.db.executemany("INSERT INTO _mirror_state (name, value) VALUES (?, ?) "
+                            "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                            [(k, json.dumps(v)) for k, v in values.items()])
+
+    def _begin(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def _commit(self):
+        self.db.execute("COMMIT")
+
+    def _rollback(self):
+        if self.db.in_transaction:
+            self.db.execute("ROLLBACK")
+
+    # ---------------- snapshot ----------------
+    def snapshot(self, conn, catalog, tables=TABLES_TO_SHOW, views=VIEWS):
+        """
+        (Re)build the mirror from MySQL. Tables the account can't read are
+        left out and stay on MySQL. Returns {table: rows copied}.
+        """
+        cur = conn.cursor()
+        cur.execute("SELECT COALESCE(MAX(AuditID), 0) FROM AuditLog")
+        mark = int(cur.fetchone()[0])
+        # AuditIDs just below the mark may belong to transactions that
+        # commit after their table is copied; treat the holes as gaps
+        cur.execute("SELECT AuditID FROM AuditLog WHERE AuditID > %s AND AuditID <= %s",
+                    (mark - SNAPSHOT_LOOKBACK, mark))
+        seen = {r[0] for r in cur.fetchall()}
+        cur.execute(FK_SQL)
+        fk_rows = [[_text(v) for v in r] for r in cur.fetchall()]
+        cur.execute(VIEW_SQL)
+        definitions = {_text(name).lower(): _text(sql) or "" for name, sql in cur.fetchall()}
+        cur.close()
+
+        fks = {}
+        for child, constraint, col, parent, parent_col, on_delete, on_update in fk_rows:
+            fk = fks.setdefault(child.lower(), {}).setdefault(constraint, {
+                "columns": [], "parent": parent, "parent_columns": [],
+                "on_delete": on_delete, "on_update": on_update})
+            fk["columns"].append(col)
+            fk["parent_columns"].append(parent_col)
+
+        copied = {}
+        with self._lock:
+            self.db.execute("DELETE FROM _mirror_state WHERE name = 'last_audit_id'")
+            self._ready = False
+            for name in list(tables) + list(views):
+                try:
+                    meta = catalog.get(conn, name)
+                    sources = sorted(source_tables(definitions.get(name.lower(), ""))) if meta.is_view else []
+                    copied[name] = self._copy(conn, meta, list(fks.get(name.lower(), {}).values()), sources)
+                except (KeyError, errors.ProgrammingError):
+                    # not there, or no SELECT on it for this account: reads stay on MySQL
+                    self.db.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+                    self.db.execute("DELETE FROM _mirror_tables WHERE name = ?", (name,))
+            now = time.time()
+            self._begin()
+            self._set_state(last_audit_id=mark, snapshot_at=_now(), synced_at=_now(),
+                            gaps={str(i): now for i in range(max(1, mark - SNAPSHOT_LOOKBACK + 1), mark + 1)
+                                  if i not in seen})
+            self._commit()
+            self._load_schema()
+        return copied
+
+    def _copy(self, conn, meta, fks, sources):
+        """Replace the local copy of one table or view; returns the rows copied."""
+        names = meta.column_names
+        cols = ", ".join(f"`{c}`" for c in names)
+        marks = ", ".join(["?"] * len(names))
+        defs = [f"{_quote(c.name)} {AFFINITY.get(c.data_type.lower(), 'TEXT')}" for c in meta.columns]
+        if meta.pk and not meta.is_view:
+            defs.append("PRIMARY KEY (" + ", ".join(_quote(c) for c in meta.pk) + ")")
+        described = json.dumps([[c.name, c.data_type, c.column_type, c.nullable, c.key, c.extra,
+                                 c.fk_table, c.fk_column] for c in meta.columns])
+        q = _quote(meta.name)
+
+        cur = conn.cursor(buffered=False)
+        cur.execute(f"SELECT {cols} FROM `{meta.name}`")
+        n = 0
+        with self._lock:
+            self._begin()
+            try:
+                self.db.execute(f"DROP TABLE IF EXISTS {q}")
+                self.db.execute(f"CREATE TABLE {q} ({', '.join(defs)})")
+                insert = f"INSERT INTO {q} VALUES ({marks})"
+                while True:
+                    rows = cur.fetchmany(COPY_CHUNK)
+                    if not rows:
+                        break
+                    self.db.executemany(insert, [[_local(v) for v in r] for r in rows])
+                    n += len(rows)
+                # the B-tree indexes searches and FK cascades lean on
+                for ix in meta.indexes.values():
+                    if ix.fulltext or ix.name == "PRIMARY" or not ix.columns:
+                        continue
+                    self.db.execute(f"CREATE INDEX {_quote(f'{meta.name}__{ix.name}')} ON {q} ("
+                                    + ", ".join(_quote(c) for c in ix.columns) + ")")
+                self.db.execute(
+                    "INSERT OR REPLACE INTO _mirror_tables (name, kind, columns, pk, fks, sources, copied_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (meta.name, meta.kind, described, json.dumps(meta.pk), json.dumps(fks), json.dumps(sources),
+                     _now()))
+                self._commit()
+            except BaseException:
+                self._rollback()
+                raise
+            finally:
+                cur.close()
+        return n
+
+    # ---------------- applying row images ----------------
+    def _match(self, meta, row):
+        cols = meta.pk or meta.column_names
+        return " AND ".join(f"{_quote(c)} IS ?" for c in cols), [row.get(c) for c in cols]
+
+    def _rows(self, meta, where, params):
+        cur = self.db.execute(f"SELECT * FROM {_quote(meta.name)} WHERE {where}", params)
+        return [dict(zip(meta.column_names, r)) for r in cur.fetchall()]
+
+    def _put(self, meta, row):
+        cols = [c for c in meta.column_names if c in row]
+        sql = (f"INSERT INTO {_quote(meta.name)} (" + ", ".join(_quote(c) for c in cols) + ") VALUES ("
+               + ", ".join(["?"] * len(cols)) + ")")
+        if meta.pk:
+            rest = [c for c in cols if c not in meta.pk]
+            sql += " ON CONFLICT (" + ", ".join(_quote(c) for c in meta.pk) + ") DO " + (
+                "UPDATE SET " + ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in rest) if rest else "NOTHING")
+        self.db.execute(sql, [row[c] for c in cols])
+
+    def _delete(self, meta, row, cascade=True):
+        for child, fk in (self._children(meta.name) if cascade else ()):
+            self._cascade(child, fk, row, None)
+        where, params = self._match(meta, row)
+        self.db.execute(f"DELETE FROM {_quote(meta.name)} WHERE {where}", params)
+
+    def _update(self, meta, old, new, cascade=True):
+        for child, fk in (self._children(meta.name) if cascade else ()):
+            self._cascade(child, fk, old, new)
+        where, params = self._match(meta, old)
+        cols = [c for c in meta.column_names if c in new]
+        cur = self.db.execute(f"UPDATE {_quote(meta.name)} SET " + ", ".join(f"{_quote(c)} = ?" for c in cols)
+                              + f" WHERE {where}", [new[c] for c in cols] + params)
+        if not cur.rowcount:
+            self._put(meta, new)
+
+    def _cascade(self, child, fk, old, new):
+        """What MySQL's ON DELETE / ON UPDATE did to `child` without firing its audit triggers."""
+        before = [old.get(c) for c in fk["parent_columns"]]
+        if any(v is None for v in before):
+            return
+        if new is None:
+            rule = fk["on_delete"]
+        else:
+            after = [new.get(c, old.get(c)) for c in fk["parent_columns"]]
+            if after == before:
+                return
+            rule = fk["on_update"]
+        where = " AND ".join(f"{_quote(c)} = ?" for c in fk["columns"])
+        if rule == "CASCADE" and new is None:
+            for row in self._rows(child, where, before):
+                self._delete(child, row)
+        elif rule == "CASCADE":
+            for row in self._rows(child, where, before):
+                self._update(child, row, dict(row, **dict(zip(fk["columns"], after))))
+        elif rule == "SET NULL":
+            for row in self._rows(child, where, before):
+                self._update(child, row, dict(row, **{c: None for c in fk["columns"]}))
+
+    def _apply(self, table, op, old, new):
+        """One audit row; False if its table isn't mirrored."""
+        meta = self._metas.get((table or "").lower())
+        if meta is None or meta.is_view:
+            return False
+        old = {c.name: _from_image(c, old[c.name]) for c in meta.columns if c.name in old} if old else None
+        new = {c.name: _from_image(c, new[c.name]) for c in meta.columns if c.name in new} if new else None
+        if op == "DELETE" and old:
+            self._delete(meta, old)
+        elif op == "UPDATE" and old and new:
+            self._update(meta, old, new)
+        elif new:
+            self._put(meta, new)
+        return True
+
+    # ---------------- sync ----------------
+    def sync(self, conn, catalog=None, batch=MIRROR_BATCH):
+        """
+        Bring the mirror up to date with AuditLog. When the rows it would
+        need have been archived away (srs_audit_archive) the mirror is
+        rebuilt instead, which needs `catalog`. Returns SyncStats.
+        """
+        with self._lock:
+            return self._sync(conn, catalog, batch)
+
+    def _sync(self, conn, catalog, batch):
+        t0 = time.perf_counter()
+        st = SyncStats()
+        last = self._state("last_audit_id")
+        if last is None:
+            raise MirrorError("The mirror has no snapshot yet")
+        now = time.time()
+        gaps = {int(k): t for k, t in self._state("gaps", {}).items() if now - t < MIRROR_GAP_SECONDS}
+        cur = conn.cursor()
+        cur.execute("SELECT MIN(AuditID) FROM AuditLog")
+        lowest = cur.fetchone()[0]
+        if lowest is not None and lowest > last + 1 and last:
+            cur.close()
+            if catalog is None:
+                raise MirrorError("AuditLog no longer reaches back to the mirror; take a new snapshot")
+            self.snapshot(conn, catalog)
+            st.snapshot = True
+            st.seconds = time.perf_counter() - t0
+            return st
+
+        touched = set()
+        if gaps:
+            ids = sorted(gaps)
+            cur.execute(f"{AUDIT_SQL} WHERE AuditID IN ({', '.join(['%s'] * len(ids))}) ORDER BY AuditID", ids)
+            late = cur.fetchall()
+            if late:
+                # a late row can't be older than a change to the same row we
+                # already applied: that change would have waited for its lock
+                self._apply_batch(late, touched, st, gaps, last)
+                st.late = len(late)
+        while True:
+            cur.execute(f"{AUDIT_SQL} WHERE AuditID > %s ORDER BY AuditID LIMIT {int(batch)}", (last,))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            expected = last + 1
+            for audit_id, *_ in rows:
+                for missing in range(expected, audit_id):
+                    gaps[missing] = now
+                expected = audit_id + 1
+            last = rows[-1][0]
+            self._apply_batch(rows, touched, st, gaps, last)
+            if len(rows) < batch:
+                break
+        cur.close()
+        if len(gaps) > MAX_GAPS:
+            # e.g. a burst of rolled-back inserts; the newest holes are the ones that may still fill
+            gaps = dict(sorted(gaps.items())[-MAX_GAPS:])
+        self._set_state(gaps={str(k): t for k, t in gaps.items()}, synced_at=_now())
+        st.gaps = len(gaps)
+
+        if touched:
+            st.views = self._refresh_views(conn, catalog, touched)
+        self.behind = False
+        st.seconds = time.perf_counter() - t0
+        return st
+
+    def _apply_batch(self, rows, touched, st, gaps, last):
+        self._begin()
+        try:
+            for audit_id, table, op, old, new in rows:
+                st.fetched += 1
+                gaps.pop(audit_id, None)
+                if self._apply(table, op, json.loads(old) if old else None, json.loads(new) if new else None):
+                    st.applied += 1
+                    touched.add(table.lower())
+            # the position moves in the same transaction as the rows it covers
+            self._set_state(last_audit_id=last)
+            self._commit()
+        except BaseException:
+            self._rollback()
+            raise
+
+    def _refresh_views(self, conn, catalog, touched):
+        refreshed = []
+        for key, meta in list(self._metas.items()):
+            sources = self._sources.get(key) or {"*"}   # unparsed definition: after any change
+            if not meta.is_view or not ("*" in sources or sources & touched):
+                continue
+            fresh = catalog.get(conn, meta.name) if catalog is not None else meta
+            self._copy(conn, fresh, [], sorted(self._sources.get(key, ())))
+            refreshed.append(meta.name)
+        if refreshed:
+            self._load_schema()
+        return refreshed
+
+    # ---------------- reading ----------------
+    def fetch(self, _conn, sql, params=()):
+        """KeysetPager / QueryCache-style fetch: (columns, rows) of MySQL-dialect SQL, run locally."""
+        with self._read_lock:
+            cur = self._reader.execute(sql.replace("%s", "?"), [_local(p) for p in params])
+            rows = cur.fetchall()
+        return [d[0] for d in cur.description], rows
+
+    # ---------------- queued writes ----------------
+    def enqueue(self, table, op, key=None, values=None):
+        """
+        Queue an INSERT / UPDATE / DELETE for MySQL and apply it to the
+        mirror right away. `key` is the primary key dict (UPDATE, DELETE),
+        `values` the columns set. A new row whose AUTO_INCREMENT key is left
+        to MySQL shows up locally under a negative placeholder key until
+        replay. Returns the outbox id.
+        """
+        op = op.upper()
+        meta = self.meta(table)
+        if meta.is_view or not meta.pk:
+            raise MirrorError(f"{table} can't be changed offline")
+        values = {c: _local(v) for c, v in (values or {}).items()}
+        key = {c: _local(v) for c, v in (key or {}).items()}
+        for c in list(values) + list(key):
+            if meta.column(c) is None:
+                raise MirrorError(f"{table} has no column {c!r}")
+        with self._lock:
+            self._begin()
+            try:
+                base = None
+                if op in ("UPDATE", "DELETE"):
+                    missing = [c for c in meta.pk if c not in key]
+                    if missing:
+                        raise MirrorError(f"Missing primary key value(s): {', '.join(missing)}")
+                    found = self._rows(meta, *self._match(meta, key))
+                    if not found:
+                        raise MirrorError(f"No {table} row with {key} in the local mirror")
+                    base = found[0]
+                elif op != "INSERT":
+                    raise MirrorError(f"Unknown operation {op}")
+                cur = self.db.execute(
+                    "INSERT INTO _mirror_outbox (tbl, op, key, vals, base, queued_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (meta.name, op, json.dumps(key), json.dumps(values), json.dumps(base), _now()))
+                entry = cur.lastrowid
+                if op == "INSERT":
+                    row = dict(values)
+                    auto = [c for c in meta.pk if meta.column(c).auto_increment and row.get(c) is None]
+                    if auto:
+                        row[auto[0]] = -entry
+                        self.db.execute("UPDATE _mirror_outbox SET local_key = ? WHERE id = ?",
+                                        (json.dumps({c: row[c] for c in meta.pk}), entry))
+                    self._put(meta, row)
+                # no local cascades: MySQL's own come back through sync once this is replayed
+                elif op == "UPDATE":
+                    self._update(meta, base, dict(base, **{c: v for c, v in values.items() if c not in meta.pk}),
+                                 cascade=False)
+                else:
+                    self._delete(meta, base, cascade=False)
+                self._commit()
+            except BaseException:
+                self._rollback()
+                raise
+        return entry
+
+    def outbox(self, status=None):
+        """Queued writes as dicts, oldest first; all of them or those with `status`."""
+        sql = "SELECT id, tbl, op, key, vals, base, local_key, status, error, queued_at, done_at FROM _mirror_outbox"
+        params = ()
+        if status:
+            sql += " WHERE status = ?"
+            params = (status,)
+        with self._read_lock:
+            rows = self._reader.execute(sql + " ORDER BY id", params).fetchall()
+        out = []
+        for r in rows:
+            entry = dict(zip(("id", "table", "op", "key", "values", "base", "local_key", "status", "error",
+                              "queued_at", "done_at"), r))
+            for k in ("key", "values", "base", "local_key"):
+                entry[k] = json.loads(entry[k]) if entry[k] else None
+            out.append(entry)
+        return out
+
+    def pending(self):
+        with self._read_lock:
+            return self._reader.execute("SELECT COUNT(*) FROM _mirror_outbox WHERE status = 'pending'").fetchone()[0]
+
+    def _finish(self, entry, status, error=None, server_row=None):
+        """
+        Close an outbox entry. Unless it went through, the local row goes
+        back to what the server has (or had, as far as we know).
+        """
+        meta = self.meta(entry["table"])
+        with self._lock:
+            self._begin()
+            try:
+                if entry["local_key"]:
+                    self._delete(meta, entry["local_key"], cascade=False)
+                if status != "applied":
+                    if server_row is not None:
+                        self._put(meta, server_row)
+                    elif entry["op"] == "INSERT":
+                        if all(entry["values"].get(c) is not None for c in meta.pk):
+                            self._delete(meta, entry["values"], cascade=False)
+                    elif error == GONE:
+                        self._delete(meta, entry["key"], cascade=False)
+                    elif entry["base"]:
+                        self._put(meta, entry["base"])
+                self.db.execute("UPDATE _mirror_outbox SET status = ?, error = ?, done_at = ? WHERE id = ?",
+                                (status, error, _now(), entry["id"]))
+                self._commit()
+            except BaseException:
+                self._rollback()
+                raise
+
+    def replay(self, conn):
+        """
+        Send pending writes to MySQL, oldest first, each in its own
+        transaction. Stops at the first sign the link is down, leaving the
+        rest queued. Returns ReplayStats.
+        """
+        with self._lock:
+            return self._replay(conn)
+
+    def _replay(self, conn):
+        st = ReplayStats()
+        for entry in self.outbox("pending"):
+            try:
+                status, error, server_row = self._replay_one(conn, entry)
+            except errors.Error as e:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                if is_offline(e):
+                    raise
+                status, error, server_row = "failed", str(e), None
+            if status == "applied":
+                st.applied += 1
+            elif status == "conflict":
+                st.conflicts += 1
+            else:
+                st.failed += 1
+            self._finish(entry, status, error, server_row)
+        if st.applied:
+            self.behind = True
+        return st
+
+    def _replay_one(self, conn, entry):
+        meta = self.meta(entry["table"])
+        values, key, base = entry["values"] or {}, entry["key"] or {}, entry["base"]
+        cur = conn.cursor()
+        try:
+            current = None
+            lock_key = key if entry["op"] != "INSERT" else {c: values.get(c) for c in meta.pk}
+            if all(lock_key.get(c) is not None for c in meta.pk):
+                where = " AND ".join(f"`{c}` = %s" for c in meta.pk)
+                cur.execute(f"SELECT * FROM `{meta.name}` WHERE {where} FOR UPDATE", [lock_key[c] for c in meta.pk])
+                found = cur.fetchone()
+                current = {c: _local(v) for c, v in zip(cur.column_names, found)} if found else None
+
+            if entry["op"] == "INSERT":
+                if current is not None:
+                    conn.rollback()
+                    return "conflict", "a row with this key already exists on the server", current
+                cols = list(values)
+                cur.execute(f"INSERT INTO `{meta.name}` (" + ", ".join(f"`{c}`" for c in cols) + ") VALUES ("
+                            + ", ".join(["%s"] * len(cols)) + ")", [values[c] for c in cols])
+            elif current is None:
+                conn.rollback()
+                if entry["op"] == "DELETE":
+                    return "applied", "already deleted on the server", None
+                return "conflict", GONE, None
+            else:
+                # base None: forced through resolve(), no check
+                check = (values if entry["op"] == "UPDATE" else current) if base is not None else {}
+                changed = [c for c in check if c in current and not _same(meta.column(c), current[c], base.get(c))]
+                if changed:
+                    conn.rollback()
+                    return "conflict", f"changed on the server meanwhile: {', '.join(changed)}", current
+                where = " AND ".join(f"`{c}` = %s" for c in meta.pk)
+                params = [key[c] for c in meta.pk]
+                if entry["op"] == "DELETE":
+                    cur.execute(f"DELETE FROM `{meta.name}` WHERE {where}", params)
+                else:
+                    cols = [c for c in values if c not in meta.pk]
+                    cur.execute(f"UPDATE `{meta.name}` SET " + ", ".join(f"`{c}` = %s" for c in cols)
+                                + f" WHERE {where}", [values[c] for c in cols] + params)
+            conn.commit()
+            return "applied", None, None
+        finally:
+            cur.close()
+
+    def resolve(self, entry_id, force=False):
+        """
+        Settle a conflicting or failed write: force=True queues it again
+        without the conflict check (last writer wins), otherwise it is
+        discarded.
+        """
+        with self._lock:
+            row = self.db.execute("SELECT status FROM _mirror_outbox WHERE id = ?", (entry_id,)).fetchone()
+            if row is None or row[0] not in ("conflict", "failed"):
+                raise MirrorError(f"No conflicting or failed write #{entry_id}")
+            if force:
+                self.db.execute("UPDATE _mirror_outbox SET status = 'pending', base = NULL, error = NULL, "
+                                "done_at = NULL WHERE id = ?", (entry_id,))
+            else:
+                self.db.execute("UPDATE _mirror_outbox SET status = 'discarded', done_at = ? WHERE id = ?",
+                                (_now(), entry_id))
+
+    # ---------------- status ----------------
+    def status(self):
+        with self._read_lock:
+            counts = dict(self._reader.execute("SELECT status, COUNT(*) FROM _mirror_outbox GROUP BY status"))
+            rows = {m.name: self._reader.execute(f"SELECT COUNT(*) FROM {_quote(m.name)}").fetchone()[0]
+                    for m in list(self._metas.values())}
+        return {"path": self.path, "ready": self.ready, "last_audit_id": self._state("last_audit_id"),
+                "snapshot_at": self._state("snapshot_at"), "synced_at": self._state("synced_at"),
+                "open_gaps": len(self._state("gaps", {})), "tables": rows, "outbox": counts}
+
+
+class MirrorSync:
+    """
+    Background thread keeping a Mirror current: every `interval` seconds
+    it replays queued writes, then syncs (taking the first snapshot if
+    there is none). connect() returns a connection; `online` is None until
+    the first attempt, then whether MySQL answered. An account that may
+    not read AuditLog stops the thread and sets `unavailable`.
+    """
+
+    def __init__(self, mirror, connect, catalog, interval=MIRROR_SYNC_SECONDS):
+        self.mirror = mirror
+        self.connect = connect
+        self.catalog = catalog
+        self.interval = interval
+        self.online = None
+        self.unavailable = False
+        self.last_sync = None       # time.time() of the last successful round
+        self.last_stats = None
+        self.errors = 0
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="srs-mirror-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def poke(self):
+        """Run a round now instead of at the next interval."""
+        self._wake.set()
+
+    def run_once(self):
+        conn = self.connect()
+        try:
+            if not self.mirror.ready:
+                self.mirror.snapshot(conn, self.catalog)
+            self.mirror.replay(conn)
+            self.last_stats = self.mirror.sync(conn, self.catalog)
+        finally:
+            conn.close()
+        self.last_sync = time.time()
+        return self.last_stats
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.online = True
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                self.online = not is_offline(e)
+                if getattr(e, "errno", None) in DENIED_ERRNOS:
+                    self.unavailable = True
+                    return
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def describe(self):
+        if self.unavailable:
+            return "mirror: not available to this role"
+        pending = self.mirror.pending()
+        queued = f", {pending} queued" if pending else ""
+        if self.online is None:
+            return "mirror: starting"
+        if not self.online:
+            return f"mirror: OFFLINE{queued}"
+        if self.last_sync is None:
+            return f"mirror: error ({self.last_error}){queued}"
+        return f"mirror: synced {time.time() - self.last_sync:.0f}s ago{queued}"
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_pool import checkout
+    from srs_catalog import SchemaCatalog
+
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("action", choices=["snapshot", "sync", "status", "replay", "conflicts", "resolve"])
+    ap.add_argument("entry", nargs="?", type=int, help="resolve: the outbox id")
+    ap.add_argument("--role", default="admin")
+    ap.add_argument("--path", help=f"default: {MIRROR_PATH}")
+    grp = ap.add_mutually_exclusive_group()
+    grp.add_argument("--force", action="store_true", help="resolve: send it anyway")
+    grp.add_argument("--discard", action="store_true", help="resolve: drop it")
+    args = ap.parse_args(argv)
+
+    mirror = Mirror(args.path or mirror_path(args.role))
+    try:
+        if args.action == "status":
+            print(json.dumps(mirror.status(), indent=2, default=str))
+            return 0
+        if args.action == "conflicts":
+            for e in mirror.outbox("conflict") + mirror.outbox("failed"):
+                print(f"#{e['id']}\t{e['status']}\t{e['op']} {e['table']} {e['key'] or e['values']}\t{e['error']}")
+            return 0
+        if args.action == "resolve":
+            if args.entry is None or not (args.force or args.discard):
+                ap.error("resolve needs an outbox id and --force or --discard")
+            mirror.resolve(args.entry, force=args.force)
+            return 0
+        conn = checkout(args.role, "worker")
+        try:
+            if args.action == "snapshot":
+                t0 = time.perf_counter()
+                copied = mirror.snapshot(conn, SchemaCatalog())
+                for name, n in copied.items():
+                    print(f"{name}\t{n}")
+                print(f"{sum(copied.values()):,} rows in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+            elif args.action == "replay":
+                print(mirror.replay(conn), file=sys.stderr)
+            else:
+                print(mirror.sync(conn, SchemaCatalog()), file=sys.stderr)
+        finally:
+            conn.close()
+    finally:
+        mirror.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
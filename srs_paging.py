@@ -0,0 +1,151 @@
+# srs_paging.py
+"""
+Keyset (primary-key cursor) pagination for SRSMS tables.
+
+Instead of `SELECT * ... LIMIT 2000` every page is fetched as
+`WHERE (pk...) > (last key) ORDER BY pk LIMIT n`, so fetching page 10 000
+costs the same index range scan as fetching page 1. Sources without a
+primary key (views) fall back to LIMIT/OFFSET paging.
+
+A pager can also be ordered by another column (`sort`): the cursor is then
+(sort value, pk...), the primary key breaking ties, so each page is still a
+range read of an index that starts with that column. MySQL and SQLite both
+sort NULL lowest, which the cursor predicates follow.
+"""
+
+PAGE_SIZE = 200
+
+
+class KeysetPager:
+    """
+    Fetches pages of `table` in primary-key order (or `sort` order).
+
+    Every fetch returns a list of (key, values) pairs. `key` is the tuple of
+    (sort value and) primary key values for keyset sources, or the absolute
+    row position for OFFSET sources; callers hand it back to `fetch_after` /
+    `fetch_before` without needing to know which mode is in use.
+    """
+
+    def __init__(self, table, key_cols, page_size=PAGE_SIZE, where="", params=(), fetch=None,
+                 sort=None, descending=False, nullable=True):
+        self.table = table
+        # ordered by `sort` (ties by key), else by the key alone
+        self.sort = sort
+        self.descending = descending
+        self.nullable = nullable            # whether `sort` can hold NULL
+        self.key_cols = list(key_cols or [])
+        if sort and self.key_cols:
+            self.key_cols = [sort] + [c for c in self.key_cols if c != sort]
+        self.page_size = page_size
+        # optional server-side filter (see srs_search), ANDed with the key cursor
+        self.where = where
+        self.params = tuple(params)
+        # optional fetch(conn, sql, params) -> (columns, rows), e.g. a QueryCache
+        self.fetch = fetch
+        self.columns = []
+        self._key_idx = []
+
+    @property
+    def keyset(self):
+        return bool(self.key_cols)
+
+    # ---------------- SQL builders ----------------
+    def _order_sql(self, reverse=False):
+        direction = " DESC" if self.descending != reverse else ""
+        if self.key_cols:
+            return ", ".join(f"`{c}`{direction}" for c in self.key_cols)
+        return f"`{self.sort}`{direction}"
+
+    def _step(self, forward):
+        # comparison that moves along the pager's order (or against it)
+        return ">" if forward != self.descending else "<"
+
+    @staticmethod
+    def _compare(cols, op):
+        if len(cols) == 1:
+            return f"`{cols[0]}` {op} %s"
+        return "(" + ", ".join(f"`{c}`" for c in cols) + f") {op} (" + ", ".join(["%s"] * len(cols)) + ")"
+
+    def _key_predicate(self, op, key):
+        """(sql, params) for the rows past `key` in direction `op`."""
+        key = tuple(key)
+        if not self.sort or not self.nullable:
+            return self._compare(self.key_cols, op), key
+        col, rest = self.sort, self.key_cols[1:]
+        # a NULL sort value sorts below everything and compares to nothing
+        if key[0] is None:
+            if op == ">":
+                return f"(`{col}` IS NOT NULL OR (`{col}` IS NULL AND {self._compare(rest, '>')}))", key[1:]
+            return f"`{col}` IS NULL AND {self._compare(rest, '<')}", key[1:]
+        if op == ">":
+            return self._compare(self.key_cols, ">"), key
+        return f"({self._compare(self.key_cols, '<')} OR `{col}` IS NULL)", key
+
+    def _where_sql(self, key_sql=None):
+        parts = []
+        if self.where:
+            parts.append(f"({self.where})")
+        if key_sql:
+            parts.append(key_sql)
+        return (" WHERE " + " AND ".join(parts)) if parts else ""
+
+    def _offset_order(self):
+        return f" ORDER BY {self._order_sql()}" if self.sort else ""
+
+    # ---------------- fetching ----------------
+    def _run(self, conn, sql, params=()):
+        if self.fetch is not None:
+            columns, rows = self.fetch(conn, sql, params)
+        else:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            columns = list(cur.column_names)
+            cur.close()
+        if not self.columns:
+            self.columns = columns
+            self._key_idx = [self.columns.index(c) for c in self.key_cols if c in self.columns]
+            if len(self._key_idx) != len(self.key_cols):
+                # key not visible in the select list -> can't build cursors from rows
+                self.key_cols = []
+                self._key_idx = []
+        return rows
+
+    def _with_keys(self, rows, start=0):
+        if self.keyset:
+            return [(tuple(r[i] for i in self._key_idx), r) for r in rows]
+        return [(start + n, r) for n, r in enumerate(rows)]
+
+    def fetch_first(self, conn):
+        if self.keyset:
+            sql = (f"SELECT * FROM `{self.table}`{self._where_sql()} "
+                   f"ORDER BY {self._order_sql()} LIMIT {self.page_size}")
+        else:
+            sql = f"SELECT * FROM `{self.table}`{self._where_sql()}{self._offset_order()} LIMIT {self.page_size}"
+        return self._with_keys(self._run(conn, sql, self.params))
+
+    def fetch_after(self, conn, key):
+        if self.keyset:
+            key_sql, key_params = self._key_predicate(self._step(True), key)
+            sql = (f"SELECT * FROM `{self.table}`{self._where_sql(key_sql)} "
+                   f"ORDER BY {self._order_sql()} LIMIT {self.page_size}")
+            return self._with_keys(self._run(conn, sql, self.params + key_params))
+        start = key + 1
+        sql = (f"SELECT * FROM `{self.table}`{self._where_sql()}{self._offset_order()} "
+               f"LIMIT {self.page_size} OFFSET {start}")
+        return self._with_keys(self._run(conn, sql, self.params), start)
+
+    def fetch_before(self, conn, key):
+        if self.keyset:
+            key_sql, key_params = self._key_predicate(self._step(False), key)
+            sql = (f"SELECT * FROM `{self.table}`{self._where_sql(key_sql)} "
+                   f"ORDER BY {self._order_sql(reverse=True)} LIMIT {self.page_size}")
+            rows = self._run(conn, sql, self.params + key_params)
+            rows.reverse()
+            return self._with_keys(rows)
+        if key <= 0:
+            return []
+        start = max(0, key - self.page_size)
+        sql = (f"SELECT * FROM `{self.table}`{self._where_sql()}{self._offset_order()} "
+               f"LIMIT {key - start} OFFSET {start}")
+        return self._with_keys(self._run(conn, sql, self.params), start)
@@ -0,0 +1,151 @@
+# srs_pool.py
+"""
+Per-role MySQL connection pools for SRSMS.
+
+Built on mysql.connector.pooling.MySQLConnectionPool, with a few things the
+stock pool does not do:
+  * connections are opened lazily, so login costs one handshake, not pool_size
+  * checkout waits (bounded) for a free connection instead of failing at once
+  * each checkout is validated by the pool's ping, reconnects are counted
+  * UI and background workers draw from separate pools
+  * checkouts / waits / reconnects are exposed via pool_stats()
+  * cursors are profiled per statement (srs_profile.py)
+"""
+import threading
+import time
+
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+from srs_config import HOST, DATABASE, ROLE_CREDENTIALS, POOL_SIZES, POOL_CHECKOUT_TIMEOUT
+from srs_profile import PROFILER, ProfiledCursor
+
+
+class PoolStats:
+    FIELDS = ("checkouts", "waits", "wait_ms", "timeouts", "reconnects", "failures",
+              "opened", "in_use", "peak_in_use")
+
+    def __init__(self):
+        for f in self.FIELDS:
+            setattr(self, f, 0)
+
+    def snapshot(self):
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+
+class _Checkout:
+    """A pooled connection; close() returns it to the pool (once)."""
+
+    def __init__(self, pool, cnx):
+        self._pool = pool
+        self._cnx = cnx
+
+    def __getattr__(self, attr):
+        return getattr(self._cnx, attr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def cursor(self, *args, **kwargs):
+        # every statement is timed per fingerprint (srs_profile.py)
+        cur = self._cnx.cursor(*args, **kwargs)
+        return ProfiledCursor(cur) if PROFILER.enabled else cur
+
+    def close(self):
+        cnx, self._cnx = self._cnx, None
+        if cnx is not None:
+            self._pool._checkin(cnx)
+
+
+class RolePool:
+    def __init__(self, role, purpose, size, **conn_args):
+        creds = ROLE_CREDENTIALS[role]
+        self.role = role
+        self.purpose = purpose
+        self.size = size
+        self.stats = PoolStats()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._server_ids = {}   # id(raw connection) -> server thread id at checkin
+        # no connection args to the constructor: that would open `size` connections up front
+        self._pool = pooling.MySQLConnectionPool(pool_name=f"srs_{role}_{purpose}", pool_size=size,
+                                                 pool_reset_session=False)
+        self._pool.set_config(host=HOST, database=DATABASE, user=creds["user"],
+                              password=creds["password"], autocommit=True, **conn_args)
+
+    def _count(self, field, n=1):
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + n)
+
+    def checkout(self, timeout=POOL_CHECKOUT_TIMEOUT):
+        if not self._slots.acquire(blocking=False):
+            self._count("waits")
+            t0 = time.perf_counter()
+            got = self._slots.acquire(timeout=timeout)
+            self._count("wait_ms", int((time.perf_counter() - t0) * 1000))
+            if not got:
+                self._count("timeouts")
+                raise PoolError(f"No free {self.purpose} connection for role {self.role} after {timeout}s")
+        try:
+            cnx = self._get()
+        except Exception:
+            self._slots.release()
+            self._count("failures")
+            raise
+        with self._lock:
+            self.stats.checkouts += 1
+            self.stats.in_use += 1
+            self.stats.peak_in_use = max(self.stats.peak_in_use, self.stats.in_use)
+        return _Checkout(self, cnx)
+
+    def _get(self):
+        try:
+            # get_connection() pings the connection and reconnects if it went away
+            pooled = self._pool.get_connection()
+        except PoolError:
+            # a slot is free but nothing idle in the queue: open a new connection lazily
+            self._pool.add_connection()
+            self._count("opened")
+            pooled = self._pool.get_connection()
+        cnx = pooled._cnx
+        pooled._cnx = None   # we hand the raw connection back ourselves in _checkin
+        before = self._server_ids.get(id(cnx))
+        if before is not None and before != cnx.connection_id:
+            self._count("reconnects")
+        return cnx
+
+    def _checkin(self, cnx):
+        try:
+            self._server_ids[id(cnx)] = cnx.connection_id
+            self._pool.add_connection(cnx)
+        finally:
+            with self._lock:
+                self.stats.in_use -= 1
+            self._slots.release()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(role, purpose="ui"):
+    role = role.lower()
+    key = (role, purpose)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = RolePool(role, purpose, POOL_SIZES[purpose])
+        return pool
+
+
+def checkout(role, purpose="ui", timeout=POOL_CHECKOUT_TIMEOUT):
+    return get_pool(role, purpose).checkout(timeout)
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {f"{p.role}/{p.purpose}": p.stats.snapshot() for p in pools}
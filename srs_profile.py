@@ -0,0 +1,455 @@
+# srs_profile.py
+"""
+Query profiler for SRSMS.
+
+Connections checked out of srs_pool hand out ProfiledCursors: every
+execute, executemany and callproc is timed, fetches included, and recorded
+under its SQL fingerprint. The fingerprint is the statement with literals
+and parameters replaced by ?, and IN / VALUES lists folded. Each record
+carries the rows returned (or affected), an estimate of their size, and
+the caller: the QueryExecutor task the statement ran for and the first
+public function outside the plumbing that issued it. Latencies go into a
+log-bucket histogram per fingerprint, so p50/p95/p99 cost constant memory
+however many calls there are.
+
+  PROFILER.statements("p95")  # StatementStats, slowest first
+  PROFILER.prometheus()       # Prometheus text exposition format
+  explain(conn, stats)        # EXPLAIN of a statement's last sample
+
+The GUI's Performance window reads the same data. The HTTP API serves it
+at /metrics. For the GUI (or a script), start_exporter() serves or writes
+it as PROFILE_METRICS_PORT / PROFILE_METRICS_FILE in srs_config.py say.
+"""
+import hashlib
+import math
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from srs_config import PROFILE_MAX_STATEMENTS, PROFILE_METRICS_PORT, PROFILE_METRICS_FILE, PROFILE_METRICS_SECONDS
+
+# histogram: bucket i holds latencies up to BUCKET_BASE_MS * BUCKET_GROWTH ** i,
+# i.e. four buckets per doubling, so a percentile is off by at most ~19%
+BUCKET_BASE_MS = 0.01
+BUCKET_GROWTH = 2 ** 0.25
+# Prometheus histogram bounds, in seconds
+EXPORT_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_SAMPLE_ROWS = 20       # rows measured per fetch; the rest are assumed alike
+OTHER = "(other statements)"
+
+_TOKEN_RE = re.compile(r"(`[^`]*`)|'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|%s|\?|\b\d+(?:\.\d+)?\b|(\s+)")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS_RE = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_EXPLAINABLE_RE = re.compile(r"^\s*\(?\s*(select|with|insert|update|delete|replace|table)\b", re.I)
+# frames skipped when naming the caller: the connection plumbing itself
+_PLUMBING = {"srs_profile", "srs_pool", "srs_executor", "srs_cache", "mysql", "concurrent", "threading",
+             "functools", "contextlib"}
+
+_local = threading.local()
+
+
+class ProfileError(ValueError):
+    pass
+
+
+def _token(m):
+    if m.group(1):
+        return m.group(1)           # `identifier`
+    if m.group(2):
+        return " "
+    return "?"
+
+
+def fingerprint(sql):
+    """`sql` with literals / parameters as ?, IN lists as (?+), whitespace collapsed."""
+    fp = _TOKEN_RE.sub(_token, sql.strip())
+    fp = _LIST_RE.sub("(?+)", fp)
+    return _ROWS_RE.sub("(?+)+", fp)
+
+
+@contextmanager
+def task(description):
+    """Statements issued inside are attributed to `description` (a QueryExecutor task)."""
+    outer = getattr(_local, "task", None)
+    _local.task = description
+    try:
+        yield
+    finally:
+        _local.task = outer
+
+
+def _caller():
+    f = sys._getframe(2)
+    while f is not None:
+        module = f.f_globals.get("__name__", "")
+        name = f.f_code.co_name
+        if module.split(".")[0] not in _PLUMBING and not name.startswith("_"):
+            return f"{module}.{name}:{f.f_lineno}"
+        f = f.f_back
+    return "?"
+
+
+def _size(row):
+    values = row.values() if isinstance(row, dict) else row
+    return sum(len(v) if isinstance(v, (str, bytes, bytearray)) else 1 if v is None else 8 for v in values)
+
+
+class StatementStats:
+    """Everything recorded for one fingerprint."""
+
+    def __init__(self, fp):
+        self.fingerprint = fp
+        self.id = hashlib.blake2s(fp.encode(), digest_size=4).hexdigest()
+        self.kind = (fp.split(None, 1) or ["?"])[0].upper()
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.buckets = {}                           # histogram bucket -> calls
+        self.exported = [0] * len(EXPORT_BOUNDS)    # calls <= each EXPORT_BOUNDS
+        self.caller = ""
+        self.task = ""
+        self.last_at = 0.0
+        self.last_error = ""
+        self.sample = None                          # (sql, params) of the last call, for EXPLAIN
+
+    def _add(self, ms, rows, nbytes, caller, task_name, sample, error):
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += rows
+        self.bytes += nbytes
+        b = max(0, math.ceil(math.log(max(ms, BUCKET_BASE_MS) / BUCKET_BASE_MS, BUCKET_GROWTH)))
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+        secs = ms / 1000
+        for i, bound in enumerate(EXPORT_BOUNDS):
+            if secs <= bound:
+                self.exported[i] += 1
+        self.caller = caller
+        self.task = task_name or ""
+        self.last_at = time.time()
+        self.sample = sample
+        if error is not None:
+            self.errors += 1
+            self.last_error = str(error)
+
+    def percentile(self, q):
+        """Upper bound (ms) of the bucket holding the q-th percentile latency."""
+        if not self.calls:
+            return 0.0
+        rank, seen = q / 100 * self.calls, 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= rank:
+                return min(self.max_ms, BUCKET_BASE_MS * BUCKET_GROWTH ** b)
+        return self.max_ms
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    @property
+    def explainable(self):
+        return self.sample is not None and bool(_EXPLAINABLE_RE.match(self.sample[0]))
+
+    def as_dict(self):
+        return {"id": self.id, "statement": self.fingerprint, "calls": self.calls, "errors": self.errors,
+                "p50_ms": round(self.percentile(50), 3), "p95_ms": round(self.percentile(95), 3),
+                "p99_ms": round(self.percentile(99), 3), "max_ms": round(self.max_ms, 3),
+                "total_ms": round(self.total_ms, 3), "rows": self.rows, "bytes": self.bytes,
+                "caller": self.caller, "task": self.task}
+
+
+class Profiler:
+    ORDERS = {
+        "p95": lambda s: s.percentile(95),
+        "p99": lambda s: s.percentile(99),
+        "max": lambda s: s.max_ms,
+        "total": lambda s: s.total_ms,
+        "calls": lambda s: s.calls,
+    }
+
+    def __init__(self, max_statements=PROFILE_MAX_STATEMENTS):
+        self.enabled = True
+        self.max_statements = max_statements
+        self.started = time.time()
+        self._stats = {}
+        self._fps = {}              # raw SQL -> fingerprint, so repeats skip the regexes
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, sql):
+        fp = self._fps.get(sql)
+        if fp is None:
+            fp = fingerprint(sql)
+            if len(self._fps) < 4 * self.max_statements:
+                self._fps[sql] = fp
+        return fp
+
+    def record(self, sql, params, ms, rows=0, nbytes=0, caller="", error=None):
+        fp = self._fingerprint(sql)
+        with self._lock:
+            st = self._stats.get(fp)
+            if st is None:
+                if len(self._stats) >= self.max_statements:
+                    fp = OTHER
+                    st = self._stats.get(fp)
+                if st is None:
+                    st = self._stats[fp] = StatementStats(fp)
+            st._add(ms, rows, nbytes, caller, getattr(_local, "task", None), (sql, params), error)
+
+    def statements(self, order="p95"):
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted(stats, key=self.ORDERS[order], reverse=True)
+
+    def get(self, statement_id):
+        with self._lock:
+            for st in self._stats.values():
+                if st.id == statement_id:
+                    return st
+        raise ProfileError(f"No statement {statement_id} recorded")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+        self.started = time.time()
+
+    # ---------------- Prometheus ----------------
+    def prometheus(self):
+        """All statements in the Prometheus text exposition format (version 0.0.4)."""
+        out = []
+
+        def family(name, kind, help_text):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        stats = self.statements("total")
+        labels = {st.id: f'statement="{st.id}",kind="{_label(st.kind)}"' for st in stats}
+        family("srs_db_statement_seconds", "histogram", "Time per SQL statement (execute plus fetch), by fingerprint.")
+        for st in stats:
+            lb = labels[st.id]
+            for bound, n in zip(EXPORT_BOUNDS, st.exported):
+                out.append(f'srs_db_statement_seconds_bucket{{{lb},le="{bound}"}} {n}')
+            out.append(f'srs_db_statement_seconds_bucket{{{lb},le="+Inf"}} {st.calls}')
+            out.append(f"srs_db_statement_seconds_sum{{{lb}}} {st.total_ms / 1000:.6f}")
+            out.append(f"srs_db_statement_seconds_count{{{lb}}} {st.calls}")
+        for name, attr, help_text in (
+                ("srs_db_statement_rows_total", "rows", "Rows returned (or affected) by the statement."),
+                ("srs_db_statement_bytes_total", "bytes", "Estimated size of the rows returned."),
+                ("srs_db_statement_errors_total", "errors", "Calls of the statement that raised.")):
+            family(name, "counter", help_text)
+            out.extend(f"{name}{{{labels[st.id]}}} {getattr(st, attr)}" for st in stats)
+        family("srs_db_statement_info", "gauge", "The fingerprint behind each statement id.")
+        out.extend(f'srs_db_statement_info{{statement="{st.id}",sql="{_label(st.fingerprint[:300])}"}} 1'
+                   for st in stats)
+        family("srs_db_profile_start_time_seconds", "gauge", "When the profiler was started or last reset.")
+        out.append(f"srs_db_profile_start_time_seconds {self.started:.3f}")
+        return "\n".join(out) + "\n"
+
+
+def _label(v):
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+PROFILER = Profiler()
+
+
+# ---------------- cursors ----------------
+class ProfiledCursor:
+    """
+    Wraps a mysql.connector cursor. A statement's record is completed at the
+    next execute or at close(), so the time spent fetching its rows counts.
+    """
+
+    def __init__(self, cursor, profiler=PROFILER):
+        self._cur = cursor
+        self._profiler = profiler
+        self._pending = None        # [sql, params, ms, rows, bytes, caller, error]
+
+    def __getattr__(self, attr):
+        return getattr(self._cur, attr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def _flush(self):
+        p, self._pending = self._pending, None
+        if p is not None:
+            self._profiler.record(*p)
+
+    def _timed(self, fn, sql, params, *args, **kwargs):
+        self._flush()
+        caller = _caller()
+        t0 = time.perf_counter()
+        try:
+            out = fn(*args, **kwargs)
+        except Exception as e:
+            self._profiler.record(sql, params, (time.perf_counter() - t0) * 1000, 0, 0, caller, e)
+            raise
+        ms = (time.perf_counter() - t0) * 1000
+        rows = 0 if getattr(self._cur, "with_rows", False) else max(0, getattr(self._cur, "rowcount", 0) or 0)
+        self._pending = [sql, params, ms, rows, 0, caller, None]
+        return out
+
+    def execute(self, operation, params=(), *args, **kwargs):
+        return self._timed(self._cur.execute, operation, params, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        first = seq_params[0] if seq_params else ()
+        return self._timed(self._cur.executemany, operation, first, operation, seq_params, *args, **kwargs)
+
+    def callproc(self, procname, args=()):
+        sql = f"CALL {procname}({', '.join(['%s'] * len(args))})"
+        return self._timed(self._cur.callproc, sql, tuple(args), procname, args)
+
+    def _fetched(self, t0, rows):
+        p = self._pending
+        if p is None:
+            return
+        p[2] += (time.perf_counter() - t0) * 1000
+        if rows:
+            sample = rows[:SIZE_SAMPLE_ROWS]
+            p[3] += len(rows)
+            p[4] += sum(_size(r) for r in sample) * len(rows) // len(sample)
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = self._cur.fetchone()
+        self._fetched(t0, [row] if row is not None else [])
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        rows = self._cur.fetchmany(*args, **kwargs)
+        self._fetched(t0, rows)
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = self._cur.fetchall()
+        self._fetched(t0, rows)
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._flush()
+        return self._cur.close()
+
+
+def explain(conn, stats):
+    """(columns, rows) of EXPLAIN for the last call of `stats` (a StatementStats)."""
+    if not stats.explainable:
+        raise ProfileError(f"EXPLAIN can't describe {stats.kind} statements" if stats.sample
+                           else "No sample of this statement was kept")
+    sql, params = stats.sample
+    cur = conn.cursor()
+    try:
+        cur.execute("EXPLAIN " + sql, params or ())
+        rows = cur.fetchall()
+        return list(cur.column_names), rows
+    finally:
+        cur.close()
+
+
+# ---------------- export ----------------
+class MetricsExporter:
+    """
+    PROFILER.prometheus() on a local HTTP port (/metrics) and/or rewritten
+    into a file every `seconds` (written aside and renamed, so a reader never
+    sees half a file).
+    """
+
+    def __init__(self, profiler=PROFILER, port=PROFILE_METRICS_PORT, path=PROFILE_METRICS_FILE,
+                 seconds=PROFILE_METRICS_SECONDS, host="127.0.0.1"):
+        self.profiler = profiler
+        self.port = port
+        self.path = path.format(pid=os.getpid()) if path else ""
+        self.seconds = seconds
+        self.host = host
+        self._server = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return bool(self.port or self.path)
+
+    def start(self):
+        if self.port:
+            self._serve()
+        if self.path:
+            self._thread = threading.Thread(target=self._write_loop, name="srs-metrics-file", daemon=True)
+            self._thread.start()
+        return self
+
+    def _serve(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        profiler = self.profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = profiler.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="srs-metrics-http", daemon=True).start()
+
+    def write(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.profiler.prometheus())
+        os.replace(tmp, self.path)
+
+    def _write_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.write()
+            except OSError:
+                pass        # e.g. directory gone; try again next round
+            self._stop.wait(self.seconds)
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def describe(self):
+        parts = []
+        if self.port:
+            parts.append(f"http://{self.host}:{self.port}/metrics")
+        if self.path:
+            parts.append(self.path)
+        return ", ".join(parts) or "off"
+
+
+def start_exporter(profiler=PROFILER):
+    """The exports configured in srs_config, started; None when both are off."""
+    exporter = MetricsExporter(profiler)
+    return exporter.start() if exporter.enabled else None
@@ -0,0 +1,233 @@
+# srs_schedule.py
+"""
+Crew schedule conflicts for SRSMS: no astronaut booked twice at once.
+
+A schedule occupies [StartTime, EndTime); two schedules of the same
+astronaut conflict when they overlap by more than an instant (back-to-back
+is fine). Two ways in:
+
+  validation  BEFORE INSERT / UPDATE triggers on Schedules (see
+              trigger_sql, part of srsms.sql) lock the astronaut and refuse
+              a row that ends before it starts or overlaps another booking,
+              with SQLSTATE 45000; one range probe on
+              idx_schedules_astronaut_span per write, whatever the client.
+              Bulk loads of history drop them (uninstall) and install
+              them again afterwards.
+  scanning    scan() streams the bookings in (AstronautID, StartTime)
+              order straight off that index and sweeps them: per astronaut a
+              heap of the bookings still running, so the whole table is
+              checked in O(n log n + conflicts) instead of the quadratic
+              self-join. check() runs the same sweep over proposed bookings
+              plus the stored ones they could touch.
+
+  python srs_schedule.py scan [--astronaut 7]
+  python srs_schedule.py check --astronaut 7 --start "2026-02-02 10:00" --end "2026-02-02 11:00"
+  python srs_schedule.py install                 # (re)create the triggers (after migration 0003)
+  python srs_schedule.py sql                     # the triggers as a mysql-client script
+"""
+import argparse
+import heapq
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+TRIGGERS = {"INSERT": "trg_schedule_overlap_ins", "UPDATE": "trg_schedule_overlap_upd"}
+SCAN_CHUNK = 10000
+CONFLICT_COLUMNS = ["AstronautID", "ScheduleID", "StartTime", "EndTime",
+                    "ClashesWith", "OtherStart", "OtherEnd", "OverlapMinutes"]
+
+Booking = namedtuple("Booking", "schedule_id astronaut_id start end")
+
+
+class Conflict(namedtuple("Conflict", "astronaut_id first second")):
+    """Two overlapping bookings of one astronaut; `first` starts no later than `second`."""
+
+    @property
+    def overlap(self):
+        return min(self.first.end, self.second.end) - self.second.start
+
+    def row(self):
+        return (self.astronaut_id, self.second.schedule_id, self.second.start, self.second.end,
+                self.first.schedule_id, self.first.start, self.first.end,
+                round(self.overlap.total_seconds() / 60, 1))
+
+
+# ---------------- sweep ----------------
+def sweep(bookings):
+    """
+    Conflicts among `bookings`, which must come sorted by (astronaut_id,
+    start). Each pair is reported once. Bookings that do not end after
+    they start take no time and never conflict.
+    """
+    running = []        # heap of (end, n, booking) for the current astronaut
+    current = None
+    for n, b in enumerate(bookings):
+        if b.astronaut_id != current:
+            running.clear()
+            current = b.astronaut_id
+        if not b.end > b.start:
+            continue
+        while running and running[0][0] <= b.start:
+            heapq.heappop(running)
+        for _end, _n, other in running:
+            yield Conflict(current, other, b)
+        heapq.heappush(running, (b.end, n, b))
+
+
+def find_conflicts(bookings):
+    """sweep() for bookings in any order."""
+    return list(sweep(sorted(bookings, key=lambda b: (b.astronaut_id, b.start, b.schedule_id or 0))))
+
+
+# ---------------- database ----------------
+_BOOKINGS_SQL = ("SELECT ScheduleID, AstronautID, StartTime, EndTime FROM Schedules "
+                 "WHERE AstronautID IS NOT NULL AND StartTime IS NOT NULL AND EndTime > StartTime")
+
+
+def _bookings(cur, chunk=SCAN_CHUNK):
+    while True:
+        rows = cur.fetchmany(chunk)
+        if not rows:
+            return
+        for r in rows:
+            yield Booking(*r)
+
+
+def scan(conn, astronaut_id=None):
+    """
+    Every conflict in Schedules (or one astronaut's), as Conflicts. Rows
+    arrive in index order, so neither MySQL nor Python sorts them and
+    memory holds one astronaut's running bookings at a time.
+    """
+    sql, params = _BOOKINGS_SQL, ()
+    if astronaut_id is not None:
+        sql += " AND AstronautID = %s"
+        params = (astronaut_id,)
+    cur = conn.cursor()
+    cur.execute(sql + " ORDER BY AstronautID, StartTime", params)
+    try:
+        return list(sweep(_bookings(cur)))
+    finally:
+        cur.fetchall()      # only left over if the sweep failed midway
+        cur.close()
+
+
+def check(conn, proposed):
+    """
+    Conflicts that would follow from adding `proposed` (Bookings; a
+    schedule_id replaces that stored row, None is a new one): with stored
+    bookings and among themselves. Conflicts between stored rows only are
+    left out.
+    """
+    proposed = [b for b in proposed if b.astronaut_id is not None and b.start is not None and b.end is not None]
+    if not proposed:
+        return []
+    replaced = {b.schedule_id for b in proposed if b.schedule_id is not None}
+    stored = []
+    cur = conn.cursor()
+    for astronaut in sorted({b.astronaut_id for b in proposed}):
+        mine = [b for b in proposed if b.astronaut_id == astronaut]
+        cur.execute(_BOOKINGS_SQL + " AND AstronautID = %s AND StartTime < %s AND EndTime > %s",
+                    (astronaut, max(b.end for b in mine), min(b.start for b in mine)))
+        stored.extend(b for b in (Booking(*r) for r in cur.fetchall()) if b.schedule_id not in replaced)
+    cur.close()
+    new = {id(b) for b in proposed}
+    return [c for c in find_conflicts(stored + proposed) if id(c.first) in new or id(c.second) in new]
+
+
+# ---------------- triggers ----------------
+def trigger_sql(op):
+    """CREATE TRIGGER statement (no DELIMITER) refusing overlapping bookings on INSERT or UPDATE."""
+    same_row = " AND ScheduleID <> NEW.ScheduleID" if op == "UPDATE" else ""
+    changed = ("NOT (OLD.AstronautID <=> NEW.AstronautID AND OLD.StartTime <=> NEW.StartTime "
+               "AND OLD.EndTime <=> NEW.EndTime) AND " if op == "UPDATE" else "")
+    return f"""CREATE TRIGGER {TRIGGERS[op]}
+BEFORE {op} ON Schedules
+FOR EACH ROW
+BEGIN
+  DECLARE v_locked INT;
+  DECLARE v_clash INT;
+  DECLARE v_msg VARCHAR(255);
+  IF {changed}NEW.StartTime IS NOT NULL AND NEW.EndTime IS NOT NULL THEN
+    IF NEW.EndTime <= NEW.StartTime THEN
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Schedule must end after it starts';
+    END IF;
+    IF NEW.AstronautID IS NOT NULL THEN
+      -- serializes bookings per astronaut, so two sessions can't take the same slot
+      SELECT COUNT(*) INTO v_locked FROM Astronauts WHERE AstronautID = NEW.AstronautID FOR UPDATE;
+      SET v_clash = (SELECT ScheduleID FROM Schedules
+                     WHERE AstronautID = NEW.AstronautID AND StartTime < NEW.EndTime
+                       AND EndTime > NEW.StartTime{same_row}
+                     LIMIT 1);
+      IF v_clash IS NOT NULL THEN
+        SET v_msg = CONCAT('Astronaut ', NEW.AstronautID, ' is already scheduled then (ScheduleID ', v_clash, ')');
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_msg;
+      END IF;
+    END IF;
+  END IF;
+END"""
+
+
+def script():
+    """mysql-client script (with DELIMITER) recreating the triggers."""
+    return "\n".join(f"DROP TRIGGER IF EXISTS {name};\nDELIMITER $$\n{trigger_sql(op)}$$\nDELIMITER ;\n"
+                     for op, name in TRIGGERS.items())
+
+
+def uninstall(conn):
+    cur = conn.cursor()
+    for name in TRIGGERS.values():
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cur.close()
+
+
+def install(conn, catalog=None):
+    uninstall(conn)
+    cur = conn.cursor()
+    for op in TRIGGERS:
+        sql = trigger_sql(op)
+        cur.execute(sql)
+        if catalog is not None:
+            catalog.note_statement(sql)
+    cur.close()
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("action", choices=["scan", "check", "install", "sql"])
+    ap.add_argument("--astronaut", type=int)
+    ap.add_argument("--start", help="check: ISO date/time")
+    ap.add_argument("--end", help="check: ISO date/time")
+    ap.add_argument("--schedule", type=int, help="check: the ScheduleID being moved, if any")
+    args = ap.parse_args(argv)
+
+    if args.action == "sql":
+        print(script())
+        return 0
+    conn = checkout("admin", "worker")
+    try:
+        if args.action == "install":
+            install(conn)
+            print(f"installed {', '.join(TRIGGERS.values())}", file=sys.stderr)
+            return 0
+        if args.action == "check":
+            if args.astronaut is None or not args.start or not args.end:
+                ap.error("check needs --astronaut, --start and --end")
+            found = check(conn, [Booking(args.schedule, args.astronaut, datetime.fromisoformat(args.start),
+                                         datetime.fromisoformat(args.end))])
+        else:
+            found = scan(conn, args.astronaut)
+        print("\t".join(CONFLICT_COLUMNS))
+        for c in found:
+            print("\t".join(str(v) for v in c.row()))
+        print(f"{len(found)} conflict(s)", file=sys.stderr)
+    finally:
+        conn.close()
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# srs_search.py
+"""
+Server-side search for SRSMS tables.
+
+A search string is turned into a parameterised WHERE clause using the
+column types from the schema catalog, so MySQL does the filtering (with
+indexes where they exist) over the whole table, not just the rows that
+happen to be loaded.
+
+Syntax (terms are ANDed, quote values containing spaces):
+    Severity:High            equality (IDs, enums, exact text)
+    Name:Sar*                prefix / wildcard match on text
+    Quantity<50              <, <=, >, >=, != on numbers and dates
+    CheckupDate:2025-11-01..2025-12-31
+                             inclusive range (either end may be empty)
+    oxygen leak              free text: FULLTEXT MATCH when the table has a
+                             FULLTEXT index, else LIKE over text columns;
+                             a bare integer also matches the ID columns
+"""
+import re
+import shlex
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+INT_TYPES = {'tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'year'}
+NUM_TYPES = {'decimal', 'numeric', 'float', 'double', 'real'}
+DATE_TYPES = {'date'}
+DATETIME_TYPES = {'datetime', 'timestamp'}
+TEXT_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum', 'set'}
+
+# InnoDB ignores FULLTEXT tokens shorter than innodb_ft_min_token_size (default 3)
+FT_MIN_TOKEN = 3
+
+# LIKE patterns escape their wildcards with '!': SQLite (the offline mirror)
+# has no default escape character, and a backslash would have to be written
+# '\\' for MySQL but '\' for SQLite
+LIKE_ESCAPE = "ESCAPE '!'"
+
+_TERM_RE = re.compile(r"^(\w+)\s*(<=|>=|!=|<|>|:|=)(.*)$", re.S)
+
+
+class SearchError(ValueError):
+    pass
+
+
+def like_literal(text):
+    """`text` with LIKE's wildcards (and the escape character) escaped, for use with LIKE_ESCAPE."""
+    return text.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+
+
+def _convert(col, raw):
+    raw = raw.strip()
+    dtype = col.data_type.lower()
+    try:
+        if dtype in INT_TYPES:
+            return int(raw)
+        if dtype in NUM_TYPES:
+            return Decimal(raw)
+        if dtype in DATE_TYPES:
+            return date.fromisoformat(raw)
+        if dtype in DATETIME_TYPES:
+            return datetime.fromisoformat(raw)
+    except (ValueError, InvalidOperation):
+        raise SearchError(f"{col.name}: '{raw}' is not a valid {col.column_type} value")
+    return raw
+
+
+def _is_date_only(col, raw):
+    return col.data_type.lower() in DATETIME_TYPES and re.fullmatch(r"\d{4}-\d{2}-\d{2}", raw.strip())
+
+
+def _column_term(col, op, raw, parts, params):
+    name = f"`{col.name}`"
+    dtype = col.data_type.lower()
+    if op in (':', '=') and '..' in raw:
+        lo, hi = raw.split('..', 1)
+        if lo.strip():
+            parts.append(f"{name} >= %s")
+            params.append(_convert(col, lo))
+        if hi.strip():
+            if _is_date_only(col, hi):
+                # whole end day for DATETIME columns
+                parts.append(f"{name} < %s")
+                params.append(_convert(col, hi) + timedelta(days=1))
+            else:
+                parts.append(f"{name} <= %s")
+                params.append(_convert(col, hi))
+        return
+    if op in (':', '='):
+        if raw.strip().lower() == 'null':
+            parts.append(f"{name} IS NULL")
+        elif dtype in TEXT_TYPES and '*' in raw:
+            parts.append(f"{name} LIKE %s {LIKE_ESCAPE}")
+            params.append(like_literal(raw).replace('*', '%'))
+        elif _is_date_only(col, raw):
+            # DATETIME = day -> half-open range so the index is still usable
+            day = _convert(col, raw)
+            parts.append(f"{name} >= %s AND {name} < %s")
+            params.extend([day, day + timedelta(days=1)])
+        else:
+            parts.append(f"{name} = %s")
+            params.append(_convert(col, raw))
+        return
+    if op == '!=' and raw.strip().lower() == 'null':
+        parts.append(f"{name} IS NOT NULL")
+        return
+    if dtype in TEXT_TYPES and dtype not in ('enum', 'set') and op != '!=':
+        raise SearchError(f"{col.name}: '{op}' needs a number or date column")
+    parts.append(f"{name} {op} %s")
+    params.append(_convert(col, raw))
+
+
+def _free_text(meta, words, parts, params):
+    text_cols = [c for c in meta.columns if c.data_type.lower() in TEXT_TYPES]
+    ft = meta.fulltext_indexes()
+    id_cols = [c for c in meta.columns
+               if c.data_type.lower() in INT_TYPES and (c.primary or c.fk_table or c.key in ('PRI', 'MUL'))]
+
+    ft_words = [w for w in words if len(w) >= FT_MIN_TOKEN and not w.isdigit()]
+    if ft and ft_words:
+        # every word must appear; '*' allows prefix matches. Uses the FULLTEXT index.
+        boolean = " ".join("+" + re.sub(r"[+\-<>()~*\"@]", " ", w).strip() + "*" for w in ft_words)
+        matches = []
+        for ix in ft:
+            cols = ", ".join(f"`{c}`" for c in ix.columns)
+            matches.append(f"MATCH({cols}) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(boolean)
+        parts.append("(" + " OR ".join(matches) + ")")
+        words = [w for w in words if w not in ft_words]
+
+    for w in words:
+        alts = []
+        if w.isdigit():
+            for c in id_cols:
+                alts.append(f"`{c.name}` = %s")
+                params.append(int(w))
+        if not ft or not w.isdigit():
+            pattern = "%" + like_literal(w) + "%"
+            for c in text_cols:
+                alts.append(f"`{c.name}` LIKE %s {LIKE_ESCAPE}")
+                params.append(pattern)
+        if not alts:
+            raise SearchError(f"Nothing in {meta.name} can match '{w}'")
+        parts.append("(" + " OR ".join(alts) + ")")
+
+
+def build_where(meta, text):
+    """Translate a search string into (where_sql, params) for `meta` (a catalog TableMeta)."""
+    try:
+        tokens = shlex.split(text)
+    except ValueError as e:
+        raise SearchError(str(e))
+    parts, params, words = [], [], []
+    for tok in tokens:
+        m = _TERM_RE.match(tok)
+        col = meta.column(m.group(1)) if m else None
+        if m and col is None:
+            # allow case-insensitive column names
+            col = next((c for c in meta.columns if c.name.lower() == m.group(1).lower()), None)
+        if m and col is not None and m.group(3) != "":
+            _column_term(col, m.group(2), m.group(3), parts, params)
+        elif m and col is None and m.group(2) != ':':
+            raise SearchError(f"Unknown column '{m.group(1)}' in {meta.name}")
+        else:
+            words.append(tok)
+    if words:
+        _free_text(meta, words, parts, params)
+    return " AND ".join(parts), params
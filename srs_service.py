@@ -0,0 +1,544 @@
+# srs_service.py
+"""
+Headless service layer for SRSMS.
+
+Everything the GUI does against MySQL (paging and searching tables and
+views, row CRUD, the stored procedures and functions, ad-hoc SELECTs),
+as methods that take a connection, so the Tk app, the HTTP API
+(srs_api.py) and scripts share one implementation:
+
+  svc = StationService()
+  with checkout("operator", "worker") as conn:
+      pager, first = svc.open_table(conn, "Supplies", "Quantity<50")
+      svc.allocate_supply(conn, 1, 3, "2.5")
+
+Table and column names are checked against the schema catalog before
+they reach SQL; values always travel as parameters. What a caller may do
+is whatever its connection's MySQL account is granted.
+
+With a QueryCache (srs_cache.py) pages and SELECTs are served from it,
+and every write made through the service invalidates what it touched.
+With a Mirror (srs_mirror.py) pages of the tables and views it holds are
+read from the console's local copy instead; conn may then be None.
+"""
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import partial
+
+from srs_catalog import SchemaCatalog
+from srs_paging import KeysetPager, PAGE_SIZE
+from srs_search import build_where
+from srs_export import table_export_sql
+from srs_alloc import allocate_batch, allocate_resource
+from srs_import import import_file
+from srs_summaries import rebuild as rebuild_summaries
+from srs_cache import affected_tables, PROCEDURE_WRITES
+from srs_schedule import Booking, CONFLICT_COLUMNS, check as check_bookings, scan as scan_schedules
+from srs_config import TELEMETRY_CHART_POINTS
+from srs_profile import PROFILER, explain as explain_statement
+
+STREAM_CHUNK_ROWS = 1000
+MAX_PAGE_SIZE = 5000
+# explicit ID lists go to the bulk function queries this many per execution
+BULK_ID_CHUNK = 1000
+
+# fn_mission_duration / fn_remaining_supply for a whole set of rows in one
+# query: the functions' bodies inlined, so there is no SELECT per row
+BULK_FUNCTIONS = {
+    "fn_mission_duration": ("Missions", "MissionID", """
+        SELECT MissionID, MissionName, LaunchDate, ReturnDate,
+               DATEDIFF(ReturnDate, LaunchDate) AS DurationDays
+        FROM Missions"""),
+    "fn_remaining_supply": ("Supplies", "SupplyID", """
+        SELECT SupplyID, ResourceID, Unit, ExpiryDate, IFNULL(Quantity, 0) AS Remaining
+        FROM Supplies"""),
+}
+
+# the GUI's Queries group
+EXAMPLE_QUERIES = {
+    "join: astronaut assignments": """
+        SELECT A.AstronautID, CONCAT(A.FirstName,' ',A.LastName) AS Name, M.MissionName, AM.Role
+        FROM Astronauts A
+        JOIN Astronaut_Missions AM ON A.AstronautID = AM.AstronautID
+        JOIN Missions M ON M.MissionID = AM.MissionID
+        LIMIT 500""",
+    "aggregate: avg oxygen": """
+        SELECT SM.ModuleName, AVG(LSS.OxygenLevel) AS AvgOxygen
+        FROM LifeSupportSystems LSS
+        JOIN StationModules SM ON SM.ModuleID = LSS.ModuleID
+        GROUP BY SM.ModuleName""",
+    "nested: above-average experiments": """
+        SELECT m.MissionID, m.MissionName, COUNT(e.ExperimentID) AS expCount
+        FROM Missions m
+        LEFT JOIN Experiments e ON m.MissionID = e.MissionID
+        GROUP BY m.MissionID, m.MissionName
+        HAVING COUNT(e.ExperimentID) > (
+            SELECT AVG(t.cnt) FROM (
+                SELECT COUNT(*) AS cnt FROM Experiments GROUP BY MissionID
+            ) AS t
+        ) LIMIT 500""",
+}
+
+# only a plain SELECT: MySQL 8 also accepts WITH ... UPDATE / DELETE
+_SELECT_RE = re.compile(r"^\s*select\b", re.I)
+
+
+class ServiceError(ValueError):
+    """Bad input from the caller (unknown column, missing key, not a SELECT...)."""
+
+
+class NotFound(ServiceError):
+    pass
+
+
+def _int(name, value, required=True):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ServiceError(f"{name} is required")
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(f"{name} must be an integer, got {value!r}")
+
+
+def _qty(value):
+    try:
+        qty = Decimal(str(value).strip())
+    except (InvalidOperation, TypeError):
+        raise ServiceError(f"quantity must be numeric, got {value!r}")
+    if qty <= 0:
+        raise ServiceError("quantity must be positive")
+    return qty
+
+
+def _when(name, value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except (TypeError, ValueError):
+        raise ServiceError(f"{name} must be an ISO date/time, got {value!r}")
+
+
+class RowStream:
+    """
+    Rows of a query read from an unbuffered cursor, chunk by chunk.
+
+    Iterate for lists of up to `chunk_rows` tuples. close() before the end
+    drops the session instead of reading the rest of the result to discard
+    it, so only use it on a connection the caller is happy to lose (pooled
+    connections reconnect on the next checkout).
+    """
+
+    def __init__(self, conn, sql, params=(), chunk_rows=STREAM_CHUNK_ROWS):
+        self.conn = conn
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._cur = conn.cursor(buffered=False)
+        self._cur.execute(sql, tuple(params))
+        self.columns = list(self._cur.column_names)
+        self._exhausted = False
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._closed:
+            raise StopIteration
+        chunk = self._cur.fetchmany(self.chunk_rows)
+        if not chunk:
+            self._exhausted = True
+            self.close()
+            raise StopIteration
+        self.rows += len(chunk)
+        return chunk
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._exhausted:
+            self._cur.close()
+            return
+        # the rest of the result set is still on the wire (see srs_export)
+        try:
+            self.conn.disconnect()
+        except Exception:
+            pass
+
+
+class StationService:
+    def __init__(self, catalog=None, cache=None, scope=None, mirror=None):
+        self.catalog = catalog or SchemaCatalog()
+        self.cache = cache
+        # cached results are only shared between callers of the same scope (role)
+        self.scope = scope
+        self._fetch = partial(cache.fetch, scope=scope) if cache is not None else None
+        self.mirror = mirror
+
+    def for_scope(self, scope):
+        """The same catalog and cache, serving another scope."""
+        return StationService(self.catalog, self.cache, scope, self.mirror)
+
+    # ---------------- cache invalidation ----------------
+    def _changed(self, *tables):
+        if self.mirror is not None:
+            # the write reaches the mirror through AuditLog; sync before the next local read
+            self.mirror.behind = True
+        if self.cache is None:
+            return
+        touched = set()
+        for t in tables:
+            touched |= affected_tables(self.catalog, t)
+        self.cache.invalidate(touched)
+
+    def _called(self, procedure):
+        self._changed(*PROCEDURE_WRITES.get(procedure, ("*",)))
+
+    # ---------------- schema ----------------
+    def tables(self, conn):
+        """Names of every table and view the connection can see."""
+        return self.catalog.load(conn)
+
+    def meta(self, conn, table):
+        try:
+            return self.catalog.get(conn, table)
+        except KeyError:
+            raise NotFound(f"Unknown table or view: {table}")
+
+    def _columns(self, meta, names, what="column"):
+        for name in names:
+            if meta.column(name) is None:
+                raise ServiceError(f"{meta.name} has no {what} {name!r}")
+        return list(names)
+
+    def _key(self, meta, key):
+        """WHERE clause + params for the primary key values in `key` (a dict)."""
+        if not meta.pk:
+            raise ServiceError(f"{meta.name} has no primary key")
+        missing = [c for c in meta.pk if c not in key]
+        if missing:
+            raise ServiceError(f"Missing primary key value(s): {', '.join(missing)}")
+        return " AND ".join(f"`{c}` = %s" for c in meta.pk), [key[c] for c in meta.pk]
+
+    @staticmethod
+    def key_of(meta, row):
+        """Primary key dict of a row given in column order (as the grid shows it)."""
+        names = meta.column_names
+        return {c: row[names.index(c)] for c in meta.pk}
+
+    # ---------------- reading ----------------
+    def local(self, table):
+        """True when pages of `table` come from the mirror (and need no connection)."""
+        return self.mirror is not None and self.mirror.has(table)
+
+    def _source(self, conn, table):
+        """(meta, fetch) for paging `table`: the mirror's when it holds the table, else MySQL's."""
+        if not self.local(table):
+            return self.meta(conn, table), self._fetch
+        if conn is not None and self.mirror.behind:
+            try:
+                self.mirror.sync(conn, self.catalog)
+            except Exception:
+                pass        # serve what the mirror has; MirrorSync reports the failure
+        return self.mirror.meta(table), self.mirror.fetch
+
+    def open_table(self, conn, table, search="", page_size=PAGE_SIZE, sort=None, descending=False):
+        """A KeysetPager over `table` filtered by `search` (ordered by `sort`, ties by key), and its first page."""
+        meta, fetch = self._source(conn, table)
+        # the filter (if any) runs where the rows are, over the whole table
+        where, params = build_where(meta, search) if search else ("", [])
+        col = meta.column(sort) if sort else None
+        if sort and col is None:
+            raise ServiceError(f"{table} has no column {sort}")
+        pager = KeysetPager(table, meta.pk, page_size, where, params, fetch,
+                            sort=sort, descending=descending, nullable=col.nullable if col else True)
+        return pager, pager.fetch_first(conn)
+
+    def page(self, conn, table, search="", after=None, page_size=PAGE_SIZE):
+        """
+        One page as plain data: {"columns", "rows", "next"}. Hand `next` back
+        as `after` for the following page; it is None on the last one.
+        """
+        page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        meta, fetch = self._source(conn, table)
+        where, params = build_where(meta, search) if search else ("", [])
+        pager = KeysetPager(table, meta.pk, page_size, where, params, fetch)
+        if after is None:
+            rows = pager.fetch_first(conn)
+        elif pager.keyset:
+            if not isinstance(after, (list, tuple)) or len(after) != len(meta.pk):
+                raise ServiceError(f"after must list {len(meta.pk)} key value(s): {', '.join(meta.pk)}")
+            rows = pager.fetch_after(conn, tuple(after))
+        else:
+            rows = pager.fetch_after(conn, _int("after", after))
+        nxt = None
+        if len(rows) == page_size:
+            key = rows[-1][0]
+            nxt = list(key) if isinstance(key, tuple) else key
+        return {"columns": pager.columns, "rows": [r for _k, r in rows], "next": nxt}
+
+    def stream_table(self, conn, table, search="", chunk_rows=STREAM_CHUNK_ROWS):
+        """All matching rows of `table` in key order, as a RowStream."""
+        meta = self.meta(conn, table)
+        where, params = build_where(meta, search) if search else ("", [])
+        sql, params = table_export_sql(meta, where, params)
+        return RowStream(conn, sql, params, chunk_rows)
+
+    def select(self, conn, sql):
+        """Run a read-only query; returns (columns, rows)."""
+        if not _SELECT_RE.match(sql or ""):
+            raise ServiceError("Only read-only SELECT queries are allowed here.")
+        self.catalog.note_statement(sql)
+        if self._fetch is not None:
+            return self._fetch(conn, sql)
+        cur = conn.cursor()
+        cur.execute(sql)
+        rows = cur.fetchall()
+        columns = list(cur.column_names)
+        cur.close()
+        return columns, rows
+
+    def explain(self, conn, statement_id):
+        """EXPLAIN of a statement the profiler recorded (by its id), as (columns, rows)."""
+        return explain_statement(conn, PROFILER.get(statement_id))
+
+    def example(self, conn, name):
+        if name not in EXAMPLE_QUERIES:
+            raise NotFound(f"Unknown example query: {name}")
+        return self.select(conn, EXAMPLE_QUERIES[name])
+
+    # ---------------- writing ----------------
+    def insert_row(self, conn, table, values):
+        """Insert `values` ({column: value}); returns the new AUTO_INCREMENT id, if any."""
+        meta = self.meta(conn, table)
+        cols = self._columns(meta, values)
+        if not cols:
+            raise ServiceError("Nothing to insert")
+        sql = (f"INSERT INTO `{table}` (" + ", ".join(f"`{c}`" for c in cols) + ") VALUES ("
+               + ", ".join(["%s"] * len(cols)) + ")")
+        cur = conn.cursor()
+        cur.execute(sql, [values[c] for c in cols])
+        conn.commit()
+        new_id = cur.lastrowid
+        cur.close()
+        self._changed(table)
+        return new_id or None
+
+    def update_row(self, conn, table, key, values):
+        """Set `values` on the row whose primary key is `key`; returns rows changed."""
+        meta = self.meta(conn, table)
+        cols = [c for c in self._columns(meta, values) if c not in meta.pk]
+        if not cols:
+            raise ServiceError("Nothing to update")
+        where, params = self._key(meta, key)
+        sql = f"UPDATE `{table}` SET " + ", ".join(f"`{c}` = %s" for c in cols) + f" WHERE {where}"
+        cur = conn.cursor()
+        cur.execute(sql, [values[c] for c in cols] + params)
+        conn.commit()
+        n = cur.rowcount
+        cur.close()
+        self._changed(table)
+        return n
+
+    def delete_row(self, conn, table, key):
+        meta = self.meta(conn, table)
+        where, params = self._key(meta, key)
+        cur = conn.cursor()
+        cur.execute(f"DELETE FROM `{table}` WHERE {where}", params)
+        conn.commit()
+        n = cur.rowcount
+        cur.close()
+        self._changed(table)
+        if not n:
+            raise NotFound(f"No {table} row with {key}")
+        return n
+
+    def queue_write(self, table, op, key=None, values=None):
+        """
+        Hold an INSERT / UPDATE / DELETE of one row for later while MySQL is
+        unreachable: it shows in the mirror at once and is replayed, with
+        conflict detection, when the link is back (srs_mirror). Returns the
+        outbox id.
+        """
+        if not self.local(table):
+            raise ServiceError(f"{table} is not in the local mirror; it can't be changed offline")
+        return self.mirror.enqueue(table, op, key, values)
+
+    def import_file(self, conn, table, path, **kw):
+        """Bulk-load a CSV / JSONL file (see srs_import); returns its ImportStats."""
+        meta = self.meta(conn, table)
+        try:
+            return import_file(conn, meta, path, **kw)
+        finally:
+            # batches commit as they go, so even a failed import may have written
+            self._changed(table)
+
+    def rebuild_summaries(self, conn):
+        try:
+            return rebuild_summaries(conn)
+        finally:
+            self._called("sp_rebuild_summaries")
+
+    # ---------------- procedures / functions ----------------
+    def allocate_supply(self, conn, mission_id, supply_id, qty):
+        cur = conn.cursor()
+        cur.callproc("sp_allocate_supply", [_int("MissionID", mission_id), _int("SupplyID", supply_id), _qty(qty)])
+        conn.commit()
+        cur.close()
+        self._called("sp_allocate_supply")
+
+    def allocate_batch(self, conn, plan):
+        """All lines or none, see srs_alloc. Returns the number of lines allocated."""
+        n = allocate_batch(conn, plan)
+        self._called("sp_allocate_batch")
+        return n
+
+    def allocate_resource(self, conn, mission_id, resource_id, qty):
+        """Split qty across the resource's lots, soonest expiry first. Returns [(SupplyID, qty)]."""
+        lines = allocate_resource(conn, _int("MissionID", mission_id), _int("ResourceID", resource_id), _qty(qty))
+        self._called("sp_allocate_resource")
+        return lines
+
+    def create_experiment(self, conn, mission_id, title, objective=None, category=None,
+                          module_id=None, lead_astronaut_id=None):
+        """Returns the new ExperimentID."""
+        if not (title or "").strip():
+            raise ServiceError("Title is required")
+        cur = conn.cursor()
+        # OUT parameter: call, then read the session variable back
+        cur.execute("CALL sp_create_experiment(%s,%s,%s,%s,%s,%s,@outexpid)",
+                    (_int("MissionID", mission_id), title.strip(), objective or None, category or None,
+                     _int("ModuleID", module_id, False), _int("LeadAstronautID", lead_astronaut_id, False)))
+        cur.execute("SELECT @outexpid")
+        out = cur.fetchone()
+        conn.commit()
+        cur.close()
+        self._called("sp_create_experiment")
+        return out[0] if out else None
+
+    def _scalar(self, conn, sql, params):
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        r = cur.fetchone()
+        cur.close()
+        return r[0] if r else None
+
+    def mission_duration(self, conn, mission_id):
+        return self._scalar(conn, "SELECT fn_mission_duration(%s)", (_int("MissionID", mission_id),))
+
+    def remaining_supply(self, conn, supply_id):
+        return self._scalar(conn, "SELECT fn_remaining_supply(%s)", (_int("SupplyID", supply_id),))
+
+    def _bulk(self, conn, function, search="", ids=None):
+        """
+        (columns, rows) of BULK_FUNCTIONS[function] for every row matching
+        `search` (srs_search syntax), or for `ids`. Runs as a server-side
+        prepared statement; ID lists are sent BULK_ID_CHUNK at a time,
+        padded with NULLs, so every chunk re-executes the same statement.
+        IDs that don't exist are left out.
+        """
+        table, key, sql = BULK_FUNCTIONS[function]
+        where, params = build_where(self.meta(conn, table), search) if search else ("", [])
+        parts = [f"({where})"] if where else []
+        chunks = [()]
+        if ids is not None:
+            # sorted, so the chunks' results concatenate in key order
+            ids = sorted({_int(key, i) for i in ids})
+            if not ids:
+                return [], []
+            parts.append(f"`{key}` IN ({', '.join(['%s'] * BULK_ID_CHUNK)})")
+            chunks = [tuple(ids[i:i + BULK_ID_CHUNK]) for i in range(0, len(ids), BULK_ID_CHUNK)]
+            chunks[-1] += (None,) * (BULK_ID_CHUNK - len(chunks[-1]))
+        sql += (" WHERE " + " AND ".join(parts) if parts else "") + f" ORDER BY `{key}`"
+        cur = conn.cursor(prepared=True)
+        rows = []
+        try:
+            for chunk in chunks:
+                cur.execute(sql, tuple(params) + chunk)
+                rows.extend(cur.fetchall())
+            columns = list(cur.column_names)
+        finally:
+            cur.close()
+        return columns, rows
+
+    def mission_durations(self, conn, search="", ids=None):
+        """fn_mission_duration for all (or the matching, or the listed) missions, as (columns, rows)."""
+        return self._bulk(conn, "fn_mission_duration", search, ids)
+
+    def remaining_supplies(self, conn, search="", ids=None):
+        """fn_remaining_supply for all (or the matching, or the listed) supplies, as (columns, rows)."""
+        return self._bulk(conn, "fn_remaining_supply", search, ids)
+
+    # ---------------- schedules ----------------
+    def schedule_conflicts(self, conn, astronaut_id=None):
+        """Every double booking in Schedules (or one astronaut's), as (columns, rows)."""
+        found = scan_schedules(conn, _int("AstronautID", astronaut_id, False))
+        return list(CONFLICT_COLUMNS), [c.row() for c in found]
+
+    def check_schedule(self, conn, astronaut_id, start, end, schedule_id=None):
+        """
+        The bookings a schedule from start to end would clash with, as
+        (columns, rows); no rows means it fits. Pass schedule_id when moving
+        an existing schedule.
+        """
+        start, end = _when("start", start), _when("end", end)
+        if end <= start:
+            raise ServiceError("end must be after start")
+        found = check_bookings(conn, [Booking(_int("ScheduleID", schedule_id, False),
+                                              _int("AstronautID", astronaut_id), start, end)])
+        return list(CONFLICT_COLUMNS), [c.row() for c in found]
+
+    # ---------------- telemetry ----------------
+    def telemetry_modules(self, conn):
+        """Modules that have telemetry history (every one has day rollups)."""
+        cur = conn.cursor()
+        cur.execute("SELECT DISTINCT ModuleID FROM LifeSupportRollups WHERE Resolution = 86400 ORDER BY ModuleID")
+        ids = [r[0] for r in cur.fetchall()]
+        cur.close()
+        return ids
+
+    def telemetry(self, conn, modules, start, end, max_points=TELEMETRY_CHART_POINTS):
+        """
+        Chart data for `modules` between start and end, read pre-downsampled
+        (srs_telemetry.load_series): (series frame, resolution in seconds
+        or 0 for raw readings, frame of threshold breaches).
+        """
+        import srs_telemetry as telemetry      # pandas / NumPy: only loaded once telemetry is used
+
+        modules = [_int("ModuleID", m) for m in modules]
+        start, end = _when("start", start), _when("end", end)
+        frame, resolution = telemetry.load_series(conn, modules, start, end, _int("points", max_points))
+        return frame, resolution, telemetry.breaches(frame)
+
+    # ---------------- supply forecast ----------------
+    def refresh_forecast(self, conn, force=False):
+        """
+        Recompute the stored forecast unless it is current (see
+        srs_forecast.refresh). Returns (recomputed, run as a dict).
+        """
+        import srs_forecast as forecast        # pandas / NumPy: only loaded once forecasting is used
+
+        before = forecast.last_run(conn)
+        run = forecast.refresh(conn, force)
+        self._changed("SupplyForecast", "ReorderPlan", "ForecastRuns")
+        return before is None or run.run_id != before.run_id, run._asdict()
+
+    def reorder_plan(self, conn, due_only=True):
+        """
+        The stored reorder list, most urgent first, as (columns, rows, run
+        as a dict or None); reading it never recomputes, so any role can.
+        """
+        from srs_forecast import PLAN_COLUMNS, last_run, reorder_plan
+
+        run = last_run(conn)
+        return list(PLAN_COLUMNS), reorder_plan(conn, due_only), run._asdict() if run else None
+
+    def supply_outlook(self, conn, resource_id=None):
+        """Every supply's stored forecast (or one resource's), as (columns, rows)."""
+        from srs_forecast import SUPPLY_COLUMNS, supply_outlook
+
+        return list(SUPPLY_COLUMNS), supply_outlook(conn, _int("ResourceID", resource_id, False))
@@ -0,0 +1,303 @@
+# srs_summaries.py
+"""
+Materialized dashboard summaries for SRSMS.
+
+vw_ModuleAnomalies, vw_AstronautHealth and vw_LowStock read the mv_*
+tables, which the trg_mv_* triggers keep current as Anomalies,
+MedicalRecords and Supplies change. This module rebuilds them from
+scratch, reports how fresh they are (last rebuild, whether every
+maintaining trigger is installed) and can verify them against the
+original aggregate queries.
+
+  python srs_summaries.py install    # triggers + procedure, then rebuild (after migration 0006)
+  python srs_summaries.py rebuild
+  python srs_summaries.py status
+  python srs_summaries.py verify [vw_LowStock ...]
+  python srs_summaries.py sql        # triggers + procedure as a mysql-client script
+"""
+import argparse
+import datetime
+import sys
+
+
+class Summary:
+    def __init__(self, view, table, triggers, live_sql, mv_sql):
+        self.view = view
+        self.table = table
+        self.triggers = triggers
+        self.live_sql = live_sql        # (key, value) rows from the base tables
+        self.mv_sql = mv_sql            # the same rows as served by the view
+
+
+SUMMARIES = {s.view: s for s in (
+    Summary("vw_ModuleAnomalies", "mv_ModuleAnomalies",
+            ("trg_mv_anomalies_ins", "trg_mv_anomalies_upd", "trg_mv_anomalies_del"),
+            "SELECT sm.ModuleID, COUNT(a.AnomalyID) FROM StationModules sm "
+            "LEFT JOIN Anomalies a ON a.ModuleID = sm.ModuleID GROUP BY sm.ModuleID",
+            "SELECT ModuleID, AnomalyCount FROM vw_ModuleAnomalies"),
+    Summary("vw_AstronautHealth", "mv_AstronautHealth",
+            ("trg_mv_medical_ins", "trg_mv_medical_upd", "trg_mv_medical_del"),
+            "SELECT a.AstronautID, MAX(mr.CheckupDate) FROM Astronauts a "
+            "LEFT JOIN MedicalRecords mr ON mr.AstronautID = a.AstronautID GROUP BY a.AstronautID",
+            "SELECT AstronautID, LastCheckup FROM vw_AstronautHealth"),
+    Summary("vw_LowStock", "mv_LowStock",
+            ("trg_mv_supplies_ins", "trg_mv_supplies_upd"),
+            "SELECT SupplyID, 1 FROM Supplies WHERE Quantity < 50",
+            "SELECT SupplyID, 1 FROM vw_LowStock"),
+)}
+
+
+class SummaryStatus:
+    def __init__(self, summary, rebuilt_at, rows, missing_triggers):
+        self.summary = summary
+        self.rebuilt_at = rebuilt_at
+        self.rows = rows
+        self.missing_triggers = missing_triggers     # None: not visible to this user
+
+    @property
+    def stale(self):
+        # without every trigger the table stops following its base table;
+        # never rebuilt means it may predate rows loaded before the triggers
+        return bool(self.missing_triggers) or self.rebuilt_at is None
+
+    def describe(self, now=None):
+        if self.missing_triggers:
+            return f"STALE: {', '.join(self.missing_triggers)} missing; rebuild after reinstalling"
+        if self.rebuilt_at is None:
+            return "STALE: never rebuilt; run sp_rebuild_summaries()"
+        age = (now or datetime.datetime.now()) - self.rebuilt_at
+        hours = int(age.total_seconds() // 3600)
+        since = f"{hours // 24}d {hours % 24}h" if hours >= 24 else f"{hours}h {int(age.total_seconds() % 3600) // 60}m"
+        live = "live via triggers" if self.missing_triggers is not None else "triggers not visible to this role"
+        return f"Materialized ({self.summary.table}), {live}; full rebuild {since} ago"
+
+
+def rebuild(conn):
+    cur = conn.cursor()
+    cur.callproc("sp_rebuild_summaries")
+    cur.close()
+    conn.commit()
+
+
+def status(conn, views=None):
+    """{view: SummaryStatus} for `views` (default: every summary)."""
+    wanted = [SUMMARIES[v] for v in (views or SUMMARIES)]
+    cur = conn.cursor()
+    cur.execute("SELECT SummaryName, RebuiltAt, RowsBuilt FROM mv_RefreshLog")
+    log = {r[0]: r[1:] for r in cur.fetchall()}
+    names = [t for s in wanted for t in s.triggers]
+    cur.execute("SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE() "
+                f"AND TRIGGER_NAME IN ({', '.join(['%s'] * len(names))})", names)
+    present = {r[0] for r in cur.fetchall()}
+    if not present:
+        # information_schema only lists triggers on tables the user holds TRIGGER on;
+        # seeing none at all (not even the audit triggers) means we cannot tell
+        cur.execute("SELECT COUNT(*) FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()")
+        present = None if cur.fetchone()[0] == 0 else present
+    cur.close()
+    out = {}
+    for s in wanted:
+        rebuilt_at, rows = log.get(s.table, (None, None))
+        missing = None if present is None else [t for t in s.triggers if t not in present]
+        out[s.view] = SummaryStatus(s, rebuilt_at, rows, missing)
+    return out
+
+
+def verify(conn, view):
+    """Keys whose materialized value differs from the live aggregate (empty list = in sync)."""
+    s = SUMMARIES[view]
+    cur = conn.cursor()
+    cur.execute(s.live_sql)
+    live = dict(cur.fetchall())
+    cur.execute(s.mv_sql)
+    mat = dict(cur.fetchall())
+    cur.close()
+    return sorted(k for k in live.keys() | mat.keys() if live.get(k) != mat.get(k))
+
+
+# ---------------- install ----------------
+# the trg_mv_* triggers and sp_rebuild_summaries as in srsms.sql, for databases
+# that got the mv_* tables from migration 0006
+TRIGGER_SQL = {
+    "trg_mv_anomalies_ins": """CREATE TRIGGER trg_mv_anomalies_ins
+AFTER INSERT ON Anomalies
+FOR EACH ROW
+BEGIN
+  INSERT INTO mv_ModuleAnomalies (ModuleID, AnomalyCount) VALUES (NEW.ModuleID, 1)
+    ON DUPLICATE KEY UPDATE AnomalyCount = AnomalyCount + 1;
+END""",
+    "trg_mv_anomalies_upd": """CREATE TRIGGER trg_mv_anomalies_upd
+AFTER UPDATE ON Anomalies
+FOR EACH ROW
+BEGIN
+  IF OLD.ModuleID <> NEW.ModuleID THEN
+    UPDATE mv_ModuleAnomalies SET AnomalyCount = AnomalyCount - 1 WHERE ModuleID = OLD.ModuleID;
+    INSERT INTO mv_ModuleAnomalies (ModuleID, AnomalyCount) VALUES (NEW.ModuleID, 1)
+      ON DUPLICATE KEY UPDATE AnomalyCount = AnomalyCount + 1;
+  END IF;
+END""",
+    "trg_mv_anomalies_del": """CREATE TRIGGER trg_mv_anomalies_del
+AFTER DELETE ON Anomalies
+FOR EACH ROW
+BEGIN
+  UPDATE mv_ModuleAnomalies SET AnomalyCount = AnomalyCount - 1 WHERE ModuleID = OLD.ModuleID;
+END""",
+    "trg_mv_medical_ins": """CREATE TRIGGER trg_mv_medical_ins
+AFTER INSERT ON MedicalRecords
+FOR EACH ROW
+BEGIN
+  INSERT INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups) VALUES (NEW.AstronautID, NEW.CheckupDate, 1)
+    ON DUPLICATE KEY UPDATE
+      LastCheckup = IF(LastCheckup IS NULL OR NEW.CheckupDate > LastCheckup, NEW.CheckupDate, LastCheckup),
+      Checkups = Checkups + 1;
+END""",
+    "trg_mv_medical_upd": """CREATE TRIGGER trg_mv_medical_upd
+AFTER UPDATE ON MedicalRecords
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.AstronautID <=> NEW.AstronautID AND OLD.CheckupDate <=> NEW.CheckupDate) THEN
+    REPLACE INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+      SELECT OLD.AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords WHERE AstronautID = OLD.AstronautID;
+    IF OLD.AstronautID <> NEW.AstronautID THEN
+      REPLACE INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+        SELECT NEW.AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords WHERE AstronautID = NEW.AstronautID;
+    END IF;
+  END IF;
+END""",
+    "trg_mv_medical_del": """CREATE TRIGGER trg_mv_medical_del
+AFTER DELETE ON MedicalRecords
+FOR EACH ROW
+BEGIN
+  REPLACE INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+    SELECT OLD.AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords WHERE AstronautID = OLD.AstronautID;
+END""",
+    "trg_mv_supplies_ins": """CREATE TRIGGER trg_mv_supplies_ins
+AFTER INSERT ON Supplies
+FOR EACH ROW
+BEGIN
+  IF NEW.Quantity < 50 THEN
+    INSERT IGNORE INTO mv_LowStock (SupplyID) VALUES (NEW.SupplyID);
+  END IF;
+END""",
+    "trg_mv_supplies_upd": """CREATE TRIGGER trg_mv_supplies_upd
+AFTER UPDATE ON Supplies
+FOR EACH ROW
+BEGIN
+  IF NEW.Quantity < 50 AND NOT OLD.Quantity < 50 THEN
+    INSERT IGNORE INTO mv_LowStock (SupplyID) VALUES (NEW.SupplyID);
+  ELSEIF OLD.Quantity < 50 AND NOT NEW.Quantity < 50 THEN
+    DELETE FROM mv_LowStock WHERE SupplyID = NEW.SupplyID;
+  END IF;
+END""",
+}
+
+REBUILD_SQL = """CREATE PROCEDURE sp_rebuild_summaries()
+BEGIN
+  -- full recompute of the mv_* tables; the triggers keep them current afterwards
+  DECLARE v_rows INT;
+  DECLARE EXIT HANDLER FOR SQLEXCEPTION
+  BEGIN
+    ROLLBACK;
+    RESIGNAL;
+  END;
+
+  START TRANSACTION;
+  DELETE FROM mv_ModuleAnomalies;
+  INSERT INTO mv_ModuleAnomalies (ModuleID, AnomalyCount)
+    SELECT ModuleID, COUNT(*) FROM Anomalies GROUP BY ModuleID;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_ModuleAnomalies', NOW(), v_rows);
+
+  DELETE FROM mv_AstronautHealth;
+  INSERT INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+    SELECT AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords GROUP BY AstronautID;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_AstronautHealth', NOW(), v_rows);
+
+  DELETE FROM mv_LowStock;
+  INSERT INTO mv_LowStock (SupplyID) SELECT SupplyID FROM Supplies WHERE Quantity < 50;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_LowStock', NOW(), v_rows);
+
+  DELETE FROM mv_ResourceDailyUse;
+  INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations)
+    SELECT s.ResourceID, DATE(ra.AllocationDate), SUM(ra.QuantityAllocated), COUNT(*)
+    FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID
+    WHERE ra.AllocationDate IS NOT NULL GROUP BY s.ResourceID, DATE(ra.AllocationDate);
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_ResourceDailyUse', NOW(), v_rows);
+
+  DELETE FROM mv_MissionResourceUse;
+  INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity)
+    SELECT ra.MissionID, s.ResourceID, SUM(ra.QuantityAllocated)
+    FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID GROUP BY ra.MissionID, s.ResourceID;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_MissionResourceUse', NOW(), v_rows);
+  COMMIT;
+END"""
+
+
+def script():
+    """mysql-client script (with DELIMITER) recreating the triggers and sp_rebuild_summaries."""
+    blocks = [("TRIGGER", name, sql) for name, sql in TRIGGER_SQL.items()]
+    blocks.append(("PROCEDURE", "sp_rebuild_summaries", REBUILD_SQL))
+    return "\n".join(f"DROP {kind} IF EXISTS {name};\nDELIMITER $$\n{sql}$$\nDELIMITER ;\n"
+                      for kind, name, sql in blocks)
+
+
+def install(conn, catalog=None):
+    """
+    (Re)create the triggers and sp_rebuild_summaries, then rebuild, which
+    also fills the mv_* tables from what the triggers missed so far. Needs
+    migrations 0004 and 0006 (the procedure rebuilds the usage tables too).
+    """
+    cur = conn.cursor()
+    for name, sql in TRIGGER_SQL.items():
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cur.execute(sql)
+        if catalog is not None:
+            catalog.note_statement(sql)
+    cur.execute("DROP PROCEDURE IF EXISTS sp_rebuild_summaries")
+    cur.execute(REBUILD_SQL)
+    cur.close()
+    rebuild(conn)
+
+
+# ---------------- command line ----------------
+def main(argv=None):
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description="Rebuild, inspect or verify the materialized dashboard summaries.")
+    ap.add_argument("action", choices=["install", "rebuild", "status", "verify", "sql"])
+    ap.add_argument("views", nargs="*", help=", ".join(SUMMARIES))
+    args = ap.parse_args(argv)
+    unknown = [v for v in args.views if v not in SUMMARIES]
+    if unknown:
+        ap.error(f"not a materialized view: {', '.join(unknown)}")
+    if args.action == "sql":
+        print(script())
+        return 0
+
+    conn = checkout("admin", "worker")
+    bad = 0
+    try:
+        if args.action == "install":
+            install(conn)
+        elif args.action == "rebuild":
+            rebuild(conn)
+        if args.action in ("install", "rebuild", "status"):
+            for view, st in status(conn, args.views).items():
+                print(f"{view:20} {st.rows if st.rows is not None else '-':>8} rows  {st.describe()}")
+                bad += st.stale
+        else:
+            for view in args.views or SUMMARIES:
+                diff = verify(conn, view)
+                bad += bool(diff)
+                print(f"{view:20} " + (f"{len(diff)} keys differ, e.g. {diff[:10]}" if diff else "in sync"))
+    finally:
+        conn.close()
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+# srs_telemetry.py
+"""
+Life-support telemetry history and analytics for SRSMS.
+
+Every O2 / CO2 / pressure / temperature reading is appended to
+LifeSupportReadings, which is partitioned by month (see srsms.sql).
+LifeSupportRollups keeps the count, sum, min and max of each metric per
+module and 1-minute, 1-hour and 1-day bucket. Each ingest refreshes the
+buckets it touched with three set-based statements: minutes from the raw
+rows, hours from the minutes, days from the hours. A chart over any range
+therefore reads at most TELEMETRY_CHART_POINTS rows per module.
+
+The analytics run on whole pandas / NumPy columns, not row by row:
+rolling means, downsampling, min/max envelopes across modules and runs of
+threshold breaches (TELEMETRY_THRESHOLDS).
+
+  python srs_telemetry.py ingest readings.csv        # ModuleID,ReadAt,OxygenLevel,CO2Level,Pressure,Temperature
+  python srs_telemetry.py simulate --days 30 --interval 10
+  python srs_telemetry.py series --module 1 --days 7 --rule 6h
+  python srs_telemetry.py breaches --days 7
+  python srs_telemetry.py rollup --days 30           # rebuild buckets from the raw rows
+  python srs_telemetry.py partitions                 # add next months, drop expired raw months
+"""
+import argparse
+import math
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from srs_config import (AUDIT_PARTITIONS_AHEAD, TELEMETRY_CHART_POINTS, TELEMETRY_RAW_SPAN_HOURS,
+                        TELEMETRY_RETENTION_MONTHS, TELEMETRY_THRESHOLDS)
+
+READINGS = "LifeSupportReadings"
+ROLLUPS = "LifeSupportRollups"
+METRICS = ["OxygenLevel", "CO2Level", "Pressure", "Temperature"]
+# bucket width in seconds -> DATE_FORMAT pattern truncating a time to its bucket
+RESOLUTIONS = {60: "%Y-%m-%d %H:%i:00", 3600: "%Y-%m-%d %H:00:00", 86400: "%Y-%m-%d 00:00:00"}
+RAW = 0
+INGEST_BATCH = 10000
+ROLLUP_COLUMNS = ["Readings"] + [f"{m}{s}" for m in METRICS for s in ("Sum", "Min", "Max")]
+BREACH_COLUMNS = ["Metric", "ModuleID", "Start", "End", "Samples", "Lowest", "Highest", "Limit"]
+
+# simulate(): daily swing, noise and the size of an injected excursion per metric
+SIM_SHAPE = {
+    "OxygenLevel": (120.0, 60.0, -1800.0),
+    "CO2Level": (150.0, 40.0, 5200.0),
+    "Pressure": (0.3, 0.15, -5.0),
+    "Temperature": (0.8, 0.3, 6.0),
+}
+SIM_BASE = {"OxygenLevel": 20900.0, "CO2Level": 400.0, "Pressure": 101.3, "Temperature": 22.0}
+
+
+class TelemetryError(ValueError):
+    pass
+
+
+class IngestStats:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.rejected = 0           # unparseable, incomplete or unknown-module rows
+        self.batches = 0
+        self.seconds = 0.0
+        self.rollup_seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.inserted / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.inserted:,}/{self.read:,} readings stored, {self.rejected:,} rejected, "
+                f"{self.batches} batches in {self.seconds:.2f}s = {self.rate:,.0f} rows/s; "
+                f"rollups {self.rollup_seconds:.2f}s")
+
+
+# ---------------- ingest ----------------
+def prepare(frame, modules=None):
+    """
+    Coerce a frame of readings to typed columns, sorted by module and time.
+    Rows with an unparseable or missing value, or (given `modules`) an
+    unknown ModuleID, are dropped; of duplicate (ModuleID, ReadAt) the last
+    wins. Returns (clean frame, rejected count).
+    """
+    missing = [c for c in ["ModuleID", "ReadAt"] + METRICS if c not in frame.columns]
+    if missing:
+        raise TelemetryError(f"missing column(s): {', '.join(missing)}")
+    df = pd.DataFrame({"ModuleID": pd.to_numeric(frame["ModuleID"], errors="coerce"),
+                       "ReadAt": pd.to_datetime(frame["ReadAt"], errors="coerce")})
+    for m in METRICS:
+        df[m] = pd.to_numeric(frame[m], errors="coerce").astype("float64")
+    ok = df.notna().all(axis=1) & np.isfinite(df[METRICS]).all(axis=1)
+    if modules is not None:
+        ok &= df["ModuleID"].isin(list(modules))
+    df = df[ok].astype({"ModuleID": "int64"})
+    df = df.drop_duplicates(["ModuleID", "ReadAt"], keep="last").sort_values(["ModuleID", "ReadAt"])
+    return df.reset_index(drop=True), int((~ok).sum())
+
+
+def _module_ids(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT ModuleID FROM StationModules")
+    ids = {r[0] for r in cur.fetchall()}
+    cur.close()
+    return ids
+
+
+def _floor(ts, seconds):
+    return pd.Timestamp(ts).floor(f"{seconds}s").to_pydatetime()
+
+
+def ingest(conn, frame, batch=INGEST_BATCH, update_current=True):
+    """
+    Append a frame of readings (columns ModuleID, ReadAt and METRICS) and
+    refresh the rollup buckets they fall in. Re-sent readings replace the
+    stored ones. With update_current, each module's newest reading also
+    becomes its LifeSupportSystems row. Returns IngestStats.
+    """
+    stats = IngestStats()
+    stats.read = len(frame)
+    df, stats.rejected = prepare(frame, _module_ids(conn))
+    if df.empty:
+        return stats
+
+    cols = ["ModuleID", "ReadAt"] + METRICS
+    sql = (f"INSERT INTO {READINGS} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))}) "
+           "ON DUPLICATE KEY UPDATE " + ", ".join(f"{m} = VALUES({m})" for m in METRICS))
+    # plain Python values, built column-wise; the connector turns each
+    # executemany into one multi-row INSERT
+    values = list(zip(df["ModuleID"].tolist(), df["ReadAt"].dt.to_pydatetime().tolist(),
+                      *(df[m].tolist() for m in METRICS)))
+    t0 = time.perf_counter()
+    for i in range(0, len(values), batch):
+        conn.start_transaction()
+        try:
+            cur = conn.cursor()
+            cur.executemany(sql, values[i:i + batch])
+            cur.close()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        stats.batches += 1
+        stats.inserted += len(values[i:i + batch])
+    stats.seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    refresh_rollups(conn, df["ModuleID"].unique().tolist(), df["ReadAt"].min(), df["ReadAt"].max())
+    if update_current:
+        _update_current(conn, df.groupby("ModuleID").tail(1))
+    stats.rollup_seconds = time.perf_counter() - t0
+    return stats
+
+
+def refresh_rollups(conn, modules, first, last):
+    """Recompute every bucket of `modules` that overlaps first..last, finest level first."""
+    if not modules:
+        return
+    marks = ", ".join(["%s"] * len(modules))
+    cols = ", ".join(ROLLUP_COLUMNS)
+    source = RAW
+    cur = conn.cursor()
+    for res in sorted(RESOLUTIONS):
+        lo = _floor(first, res)
+        hi = _floor(last, res) + timedelta(seconds=res)
+        if source == RAW:
+            aggs = "COUNT(*), " + ", ".join(f"SUM({m}), MIN({m}), MAX({m})" for m in METRICS)
+            sql = (f"SELECT ModuleID, {res}, DATE_FORMAT(ReadAt, %s) AS Bucket, {aggs} FROM {READINGS} "
+                   f"WHERE ModuleID IN ({marks}) AND ReadAt >= %s AND ReadAt < %s")
+            params = [RESOLUTIONS[res], *modules, lo, hi]
+        else:
+            aggs = "SUM(Readings), " + ", ".join(f"SUM({m}Sum), MIN({m}Min), MAX({m}Max)" for m in METRICS)
+            sql = (f"SELECT ModuleID, {res}, DATE_FORMAT(BucketStart, %s) AS Bucket, {aggs} FROM {ROLLUPS} "
+                   f"WHERE ModuleID IN ({marks}) AND Resolution = %s AND BucketStart >= %s AND BucketStart < %s")
+            params = [RESOLUTIONS[res], *modules, source, lo, hi]
+        cur.execute(f"REPLACE INTO {ROLLUPS} (ModuleID, Resolution, BucketStart, {cols}) "
+                    f"{sql} GROUP BY ModuleID, Bucket", params)
+        source = res
+    cur.close()
+    if not conn.autocommit:
+        conn.commit()
+
+
+def rebuild_rollups(conn, first, last):
+    """Rollups for first..last recomputed from the raw readings still in MySQL."""
+    cur = conn.cursor()
+    cur.execute(f"SELECT DISTINCT ModuleID FROM {READINGS} WHERE ReadAt >= %s AND ReadAt < %s", (first, last))
+    modules = [r[0] for r in cur.fetchall()]
+    cur.close()
+    refresh_rollups(conn, modules, first, last)
+    return modules
+
+
+def _update_current(conn, latest):
+    sql = ("UPDATE LifeSupportSystems SET " + ", ".join(f"{m} = %s" for m in METRICS) + " WHERE ModuleID = %s")
+    cur = conn.cursor()
+    for row in latest.itertuples(index=False):
+        cur.execute(sql, [round(getattr(row, m), 3) for m in METRICS] + [int(row.ModuleID)])
+    cur.close()
+    if not conn.autocommit:
+        conn.commit()
+
+
+def maintain_partitions(conn, keep_months=TELEMETRY_RETENTION_MONTHS, ahead=AUDIT_PARTITIONS_AHEAD, catalog=None):
+    """
+    Add partitions for the coming months and drop raw months past retention
+    (None keeps everything); the rollups stay.
+    """
+    from srs_audit_archive import drop_partition, ensure_partitions, expired_partitions
+
+    created = ensure_partitions(conn, ahead, table=READINGS, catalog=catalog)
+    dropped = []
+    for part in expired_partitions(conn, keep_months, table=READINGS) if keep_months is not None else ():
+        drop_partition(conn, part, table=READINGS, catalog=catalog)
+        dropped.append(part.name)
+    return created, dropped
+
+
+# ---------------- loading series ----------------
+def pick_resolution(span_seconds, max_points=TELEMETRY_CHART_POINTS):
+    """RAW for short spans, else the finest rollup giving at most max_points buckets."""
+    if span_seconds <= TELEMETRY_RAW_SPAN_HOURS * 3600:
+        return RAW
+    for res in sorted(RESOLUTIONS):
+        if span_seconds / res <= max_points:
+            return res
+    return max(RESOLUTIONS)
+
+
+def load_series(conn, modules, start, end, max_points=TELEMETRY_CHART_POINTS, resolution=None):
+    """
+    Readings of `modules` in start..end as a frame sorted by ModuleID, Time:
+    ModuleID, Time, Readings and per metric its mean plus <metric>Min /
+    <metric>Max. Returns (frame, resolution in seconds, RAW for raw rows).
+    Raw rows beyond max_points per module are downsampled here.
+    """
+    modules = [int(m) for m in modules]
+    if not modules:
+        raise TelemetryError("no modules selected")
+    span = (end - start).total_seconds()
+    if span <= 0:
+        raise TelemetryError("the range is empty")
+    if resolution is None:
+        resolution = pick_resolution(span, max_points)
+    marks = ", ".join(["%s"] * len(modules))
+    if resolution == RAW:
+        sql = (f"SELECT ModuleID, ReadAt, {', '.join(METRICS)} FROM {READINGS} "
+               f"WHERE ModuleID IN ({marks}) AND ReadAt >= %s AND ReadAt < %s ORDER BY ModuleID, ReadAt")
+        params = [*modules, start, end]
+        columns = ["ModuleID", "Time"] + METRICS
+    else:
+        means = ", ".join(f"{m}Sum / Readings, {m}Min, {m}Max" for m in METRICS)
+        sql = (f"SELECT ModuleID, BucketStart, Readings, {means} FROM {ROLLUPS} "
+               f"WHERE ModuleID IN ({marks}) AND Resolution = %s AND BucketStart >= %s AND BucketStart < %s "
+               "ORDER BY ModuleID, BucketStart")
+        params = [*modules, resolution, _floor(start, resolution), end]
+        columns = ["ModuleID", "Time", "Readings"] + [f"{m}{s}" for m in METRICS for s in ("", "Min", "Max")]
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    cur.close()
+
+    frame = pd.DataFrame(rows, columns=columns)
+    frame["Time"] = pd.to_datetime(frame["Time"])
+    frame = frame.astype({c: "float64" for c in columns[2:]})
+    if resolution == RAW:
+        frame["Readings"] = 1
+        if len(frame) > max_points * len(modules):
+            frame = downsample(frame, f"{math.ceil(span / max_points)}s")
+    return frame, resolution
+
+
+# ---------------- analytics ----------------
+def _bounds(frame, metric):
+    """Per-row low and high of `metric`: its Min / Max columns when the rows are buckets."""
+    lo = frame[f"{metric}Min"] if f"{metric}Min" in frame else frame[metric]
+    hi = frame[f"{metric}Max"] if f"{metric}Max" in frame else frame[metric]
+    return lo, hi
+
+
+def downsample(frame, rule, metrics=METRICS):
+    """
+    Buckets of `rule` (a pandas offset, e.g. "5min", "6h") per module:
+    reading-weighted mean, min and max of each metric. Empty buckets are
+    left out.
+    """
+    weights = frame["Readings"] if "Readings" in frame else pd.Series(1.0, index=frame.index)
+    work = pd.DataFrame({"ModuleID": frame["ModuleID"], "Time": frame["Time"], "Readings": weights})
+    spec = {"Readings": ("Readings", "sum")}
+    for m in metrics:
+        lo, hi = _bounds(frame, m)
+        work[f"_{m}"] = frame[m] * weights
+        work[f"{m}Min"], work[f"{m}Max"] = lo, hi
+        spec[f"_{m}"] = (f"_{m}", "sum")
+        spec[f"{m}Min"] = (f"{m}Min", "min")
+        spec[f"{m}Max"] = (f"{m}Max", "max")
+    out = work.groupby(["ModuleID", pd.Grouper(key="Time", freq=rule)]).agg(**spec).reset_index()
+    out = out[out["Readings"] > 0]
+    for m in metrics:
+        out.insert(out.columns.get_loc(f"{m}Min"), m, out.pop(f"_{m}") / out["Readings"])
+    return out.reset_index(drop=True)
+
+
+def rolling_mean(frame, metric, window="15min"):
+    """Time-based rolling mean of `metric` within each module, aligned with frame's rows."""
+    out = pd.Series(np.nan, index=frame.index, name=f"{metric} {window} mean")
+    for _module, rows in frame.groupby("ModuleID", sort=False):
+        out.loc[rows.index] = rows.rolling(window, on="Time")[metric].mean().to_numpy()
+    return out
+
+
+def envelope(frame, metric, rule=None):
+    """
+    Mean, min and max of `metric` across modules per time (per `rule`
+    bucket when given, so unaligned raw readings line up).
+    """
+    if rule:
+        frame = downsample(frame, rule, [metric])
+    lo, hi = _bounds(frame, metric)
+    work = pd.DataFrame({"Time": frame["Time"], "ModuleID": frame["ModuleID"],
+                         "mean": frame[metric], "lo": lo, "hi": hi})
+    return (work.groupby("Time")
+            .agg(Mean=("mean", "mean"), Min=("lo", "min"), Max=("hi", "max"), Modules=("ModuleID", "nunique"))
+            .reset_index())
+
+
+def breaches(frame, thresholds=TELEMETRY_THRESHOLDS, metrics=METRICS):
+    """
+    Runs of consecutive rows (per module) outside each metric's (low, high)
+    limits, judged by the bucket min / max when present. One row per run:
+    BREACH_COLUMNS, earliest first.
+    """
+    found = []
+    modules = frame["ModuleID"].to_numpy()
+    times = frame["Time"].to_numpy()
+    same_module = np.r_[False, modules[1:] == modules[:-1]]
+    for m in metrics:
+        low_limit, high_limit = thresholds.get(m, (None, None))
+        lo, hi = (s.to_numpy() for s in _bounds(frame, m))
+        out = np.zeros(len(frame), dtype=bool)
+        if low_limit is not None:
+            out |= lo < low_limit
+        if high_limit is not None:
+            out |= hi > high_limit
+        if not out.any():
+            continue
+        # a run starts where a row is out but the previous row of the same module was not
+        starts = out & ~(np.r_[False, out[:-1]] & same_module)
+        run = np.cumsum(starts)[out]
+        runs = (pd.DataFrame({"run": run, "ModuleID": modules[out], "Time": times[out],
+                              "lo": lo[out], "hi": hi[out]})
+                .groupby("run")
+                .agg(ModuleID=("ModuleID", "first"), Start=("Time", "min"), End=("Time", "max"),
+                     Samples=("Time", "size"), Lowest=("lo", "min"), Highest=("hi", "max")))
+        runs.insert(0, "Metric", m)
+        limit = np.full(len(runs), f"> {high_limit}", dtype=object)
+        if low_limit is not None:
+            limit[(runs["Lowest"] < low_limit).to_numpy()] = f"< {low_limit}"
+        runs["Limit"] = limit
+        found.append(runs)
+    if not found:
+        return pd.DataFrame(columns=BREACH_COLUMNS)
+    return pd.concat(found, ignore_index=True).sort_values(["Start", "ModuleID"]).reset_index(drop=True)
+
+
+# ---------------- synthetic readings ----------------
+def _smooth_noise(rng, n, std, span=120):
+    """Noise with standard deviation ~std that drifts over ~span samples (an EWM of white noise)."""
+    alpha = 2 / (span + 1)
+    white = rng.normal(0.0, std / math.sqrt(alpha / (2 - alpha)), n)
+    white[0] = 0.0      # start at the base value, not one full-size draw off it
+    return pd.Series(white).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def simulate(conn, days=7, interval=10, seed=42, end=None, modules=None):
+    """
+    Synthetic readings every `interval` seconds for the `days` before `end`,
+    around each module's current LifeSupportSystems values: a daily cycle,
+    drifting noise and now and then a five-minute excursion past a limit.
+    """
+    cur = conn.cursor()
+    cur.execute(f"SELECT ModuleID, {', '.join(METRICS)} FROM LifeSupportSystems")
+    current = {r[0]: dict(zip(METRICS, r[1:])) for r in cur.fetchall()}
+    cur.close()
+    modules = list(modules) if modules else sorted(current) or sorted(_module_ids(conn))
+    end = _floor(end or datetime.now(), interval)
+    times = pd.date_range(end=end, periods=int(days * 86400 // interval), freq=f"{interval}s")
+    n = len(times)
+    rng = np.random.default_rng(seed)
+    day_phase = 2 * np.pi * (times.hour * 3600 + times.minute * 60 + times.second).to_numpy() / 86400
+    spike = np.hanning(max(3, 300 // interval))
+    frames = []
+    for module in modules:
+        cols = {"ModuleID": np.full(n, module), "ReadAt": times}
+        for m, (swing, noise, excursion) in SIM_SHAPE.items():
+            base = float((current.get(module) or {}).get(m) or SIM_BASE[m])
+            v = base + swing * np.sin(day_phase + rng.uniform(0, 2 * np.pi)) + _smooth_noise(rng, n, noise)
+            for at in rng.integers(0, max(1, n - len(spike)), size=max(1, int(days // 2))):
+                if rng.random() < 0.5:
+                    v[at:at + len(spike)] += excursion * spike[:n - at]
+            cols[m] = np.maximum(v, 0.0)
+        frames.append(pd.DataFrame(cols))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---------------- command line ----------------
+def _range(args):
+    end = datetime.fromisoformat(args.end) if args.end else datetime.now()
+    return end - timedelta(days=args.days), end
+
+
+def main(argv=None):
+    from srs_pool import checkout
+
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("ingest", help="load readings from a CSV file")
+    p.add_argument("path")
+    p.add_argument("--no-current", action="store_true", help="leave LifeSupportSystems as it is")
+    p = sub.add_parser("simulate", help="generate and ingest synthetic readings")
+    p.add_argument("--days", type=float, default=7)
+    p.add_argument("--interval", type=int, default=10, help="seconds between readings")
+    p.add_argument("--seed", type=int, default=42)
+    for name in ("series", "breaches", "rollup"):
+        p = sub.add_parser(name)
+        p.add_argument("--days", type=float, default=1)
+        p.add_argument("--end", help="ISO time (default: now)")
+        if name != "rollup":
+            p.add_argument("--module", type=int, nargs="*", help="default: every module with readings")
+    sub.choices["series"].add_argument("--rule", help="downsample further, e.g. 6h")
+    p = sub.add_parser("partitions", help="add future partitions, drop expired raw months")
+    p.add_argument("--keep-months", type=int, default=TELEMETRY_RETENTION_MONTHS)
+    args = ap.parse_args(argv)
+
+    conn = checkout("admin", "worker")
+    try:
+        if args.action == "ingest":
+            print(ingest(conn, pd.read_csv(args.path), update_current=not args.no_current))
+        elif args.action == "simulate":
+            maintain_partitions(conn, keep_months=None)
+            frame = simulate(conn, args.days, args.interval, args.seed)
+            print(ingest(conn, frame))
+        elif args.action == "rollup":
+            start, end = _range(args)
+            print(f"rollups rebuilt for modules {rebuild_rollups(conn, start, end)}")
+        elif args.action == "partitions":
+            created, dropped = maintain_partitions(conn, args.keep_months)
+            print(f"created: {', '.join(created) or '-'}; dropped: {', '.join(dropped) or '-'}")
+        else:
+            start, end = _range(args)
+            modules = args.module or sorted(_module_ids(conn))
+            frame, res = load_series(conn, modules, start, end)
+            if args.action == "series":
+                if args.rule:
+                    frame = downsample(frame, args.rule)
+                print(f"{len(frame):,} rows at {'raw' if res == RAW else f'{res}s'} resolution")
+                print(frame.to_string(index=False, max_rows=60))
+            else:
+                found = breaches(frame)
+                print(found.to_string(index=False) if len(found) else "no breaches")
+    except TelemetryError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
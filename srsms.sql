@@ -226,191 +226,1587 @@ CREATE TABLE Experiment_Astronauts (
 -- =========================
 -- audit
 -- =========================
+-- Monthly RANGE partitions on ChangedAt: retention drops or archives a whole
+-- month at once (srs_audit_archive.py) instead of deleting row by row.
+-- The partition column has to be part of the primary key.
+-- srs_audit_archive.py adds next months' partitions by splitting pmax.
+-- The months below are fixed: run `python srs_migrate.py up` right after
+-- this script so pmax is split up to the current month before rows arrive.
 CREATE TABLE AuditLog (
-  AuditID    INT AUTO_INCREMENT PRIMARY KEY,
+  AuditID    INT AUTO_INCREMENT,
   TableName  VARCHAR(200) NOT NULL,
   Operation  VARCHAR(10) NOT NULL,
   KeyData    VARCHAR(500),
   OldRow     JSON,
   NewRow     JSON,
-  ChangedAt  DATETIME DEFAULT CURRENT_TIMESTAMP
+  ChangedAt  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (AuditID, ChangedAt)
+) ENGINE=InnoDB
+PARTITION BY RANGE COLUMNS (ChangedAt) (
+  PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+  PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+  PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+  PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+  PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+  PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+  PARTITION pmax    VALUES LESS THAN (MAXVALUE)
+);
+
+-- Staged audit mode (srs_audit_triggers.py install --mode staged): triggers
+-- append here, a narrow table with no secondary indexes, and the drainer
+-- moves rows into AuditLog in batches.
+CREATE TABLE AuditStaging (
+  StageID    BIGINT AUTO_INCREMENT PRIMARY KEY,
+  TableName  VARCHAR(200) NOT NULL,
+  Operation  VARCHAR(10) NOT NULL,
+  KeyData    VARCHAR(500),
+  OldRow     JSON,
+  NewRow     JSON,
+  ChangedAt  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+-- =========================
+-- materialized summaries
+-- =========================
+-- Kept current row by row by the trg_mv_* triggers (section 6), so the
+-- dashboard views read a primary-key lookup instead of re-running their
+-- GROUP BY. Only keys with data have a row; the views LEFT JOIN and default
+-- to 0 / NULL. FKs cascade, so deleting a module, astronaut or supply (whose
+-- own cascades skip triggers) removes its summary row too.
+-- sp_rebuild_summaries() recomputes everything and stamps mv_RefreshLog.
+CREATE TABLE mv_ModuleAnomalies (
+  ModuleID      INT PRIMARY KEY,
+  AnomalyCount  INT NOT NULL DEFAULT 0,
+  CONSTRAINT fk_mv_anom_module FOREIGN KEY (ModuleID) REFERENCES StationModules(ModuleID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE mv_AstronautHealth (
+  AstronautID   INT PRIMARY KEY,
+  LastCheckup   DATE,
+  Checkups      INT NOT NULL DEFAULT 0,
+  CONSTRAINT fk_mv_health_astronaut FOREIGN KEY (AstronautID) REFERENCES Astronauts(AstronautID)
+    ON DELETE CASCADE ON UPDATE CASCADE
 ) ENGINE=InnoDB;
 
--- =========================
--- Indexes
--- =========================
-CREATE INDEX idx_supplies_resource ON Supplies(ResourceID);
-CREATE INDEX idx_allocations_mission ON ResourceAllocations(MissionID);
-CREATE INDEX idx_allocations_supply ON ResourceAllocations(SupplyID);
-CREATE INDEX idx_experiments_mission ON Experiments(MissionID);
-CREATE INDEX idx_anomalies_module ON Anomalies(ModuleID);
-CREATE INDEX idx_comm_mission ON Communications(MissionID);
+-- the set of supplies below the low-stock threshold (Quantity < 50)
+CREATE TABLE mv_LowStock (
+  SupplyID      INT PRIMARY KEY,
+  CONSTRAINT fk_mv_lowstock_supply FOREIGN KEY (SupplyID) REFERENCES Supplies(SupplyID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- allocated quantity per resource and day, and per mission and resource,
+-- for srs_forecast.py; kept by the trg_mv_alloc_* triggers. Deleting a
+-- mission cascades to its allocations without triggers: mv_MissionResourceUse
+-- follows through its FK, mv_ResourceDailyUse until the next rebuild.
+CREATE TABLE mv_ResourceDailyUse (
+  ResourceID    INT NOT NULL,
+  UseDate       DATE NOT NULL,
+  Quantity      DECIMAL(18,3) NOT NULL DEFAULT 0,
+  Allocations   INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (ResourceID, UseDate),
+  CONSTRAINT fk_mv_dailyuse_resource FOREIGN KEY (ResourceID) REFERENCES Resources(ResourceID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE mv_MissionResourceUse (
+  MissionID     INT NOT NULL,
+  ResourceID    INT NOT NULL,
+  Quantity      DECIMAL(18,3) NOT NULL DEFAULT 0,
+  PRIMARY KEY (MissionID, ResourceID),
+  CONSTRAINT fk_mv_missionuse_mission FOREIGN KEY (MissionID) REFERENCES Missions(MissionID)
+    ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT fk_mv_missionuse_resource FOREIGN KEY (ResourceID) REFERENCES Resources(ResourceID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE mv_RefreshLog (
+  SummaryName   VARCHAR(64) PRIMARY KEY,
+  RebuiltAt     DATETIME NOT NULL,
+  RowsBuilt     INT NOT NULL
+) ENGINE=InnoDB;
+
+-- =========================
+-- supply depletion forecast (srs_forecast.py)
+-- =========================
+-- Written whole by srs_forecast.refresh() and read as-is by the dashboard.
+-- Dates are NULL when they fall past the forecast horizon.
+CREATE TABLE SupplyForecast (
+  SupplyID       INT PRIMARY KEY,
+  ResourceID     INT NOT NULL,
+  StartsOn       DATE,
+  DepletesOn     DATE,
+  ExpiresUnused  DECIMAL(18,3) NOT NULL DEFAULT 0,
+  CONSTRAINT fk_forecast_supply FOREIGN KEY (SupplyID) REFERENCES Supplies(SupplyID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE ReorderPlan (
+  ResourceID       INT PRIMARY KEY,
+  Priority         INT NOT NULL,
+  DailyRate        DECIMAL(18,3) NOT NULL,
+  OnHand           DECIMAL(18,3) NOT NULL,
+  MissionNeed      DECIMAL(18,3) NOT NULL,
+  StockoutOn       DATE,
+  ReorderBy        DATE,
+  ReorderQuantity  DECIMAL(18,3) NOT NULL,
+  INDEX idx_reorder_priority (Priority),
+  CONSTRAINT fk_reorder_resource FOREIGN KEY (ResourceID) REFERENCES Resources(ResourceID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- one row per recompute; the latest tells refresh() whether it still stands
+CREATE TABLE ForecastRuns (
+  RunID             INT AUTO_INCREMENT PRIMARY KEY,
+  ComputedAt        DATETIME NOT NULL,
+  AsOf              DATE NOT NULL,
+  LastAllocationID  INT NOT NULL,
+  SupplyCount       INT NOT NULL,
+  SupplyStock       DECIMAL(20,3) NOT NULL,
+  Seconds           FLOAT NOT NULL
+) ENGINE=InnoDB;
+
+-- =========================
+-- life-support telemetry (srs_telemetry.py)
+-- =========================
+-- LifeSupportSystems holds each module's current reading; every reading is
+-- also appended here. Append-only and partitioned by month like AuditLog, so
+-- expiring raw history is a DROP PARTITION. The primary key keeps a module's
+-- readings in time order for range scans (partitioned tables can't have
+-- foreign keys; srs_telemetry.ingest checks ModuleID instead).
+CREATE TABLE LifeSupportReadings (
+  ModuleID     INT NOT NULL,
+  ReadAt       DATETIME(3) NOT NULL,
+  OxygenLevel  FLOAT NOT NULL,
+  CO2Level     FLOAT NOT NULL,
+  Pressure     FLOAT NOT NULL,
+  Temperature  FLOAT NOT NULL,
+  PRIMARY KEY (ModuleID, ReadAt)
+) ENGINE=InnoDB
+PARTITION BY RANGE COLUMNS (ReadAt) (
+  PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+  PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+  PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+  PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+  PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+  PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+  PARTITION pmax    VALUES LESS THAN (MAXVALUE)
+);
+
+-- Count, sum, min and max of every metric per module and 1-minute, 1-hour
+-- or 1-day bucket (Resolution in seconds), refreshed by each ingest and kept
+-- after the raw months expire. Charts read these instead of raw readings.
+CREATE TABLE LifeSupportRollups (
+  ModuleID        INT NOT NULL,
+  Resolution      INT NOT NULL,
+  BucketStart     DATETIME NOT NULL,
+  Readings        INT NOT NULL,
+  OxygenLevelSum  DOUBLE NOT NULL,
+  OxygenLevelMin  FLOAT NOT NULL,
+  OxygenLevelMax  FLOAT NOT NULL,
+  CO2LevelSum     DOUBLE NOT NULL,
+  CO2LevelMin     FLOAT NOT NULL,
+  CO2LevelMax     FLOAT NOT NULL,
+  PressureSum     DOUBLE NOT NULL,
+  PressureMin     FLOAT NOT NULL,
+  PressureMax     FLOAT NOT NULL,
+  TemperatureSum  DOUBLE NOT NULL,
+  TemperatureMin  FLOAT NOT NULL,
+  TemperatureMax  FLOAT NOT NULL,
+  PRIMARY KEY (ModuleID, Resolution, BucketStart),
+  CONSTRAINT fk_rollup_module FOREIGN KEY (ModuleID) REFERENCES StationModules(ModuleID)
+    ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- =========================
+-- schema version (srs_migrate.py)
+-- =========================
+-- migrations/ holds changes for databases created before them; this script
+-- already includes those listed below.
+CREATE TABLE SchemaMigrations (
+  Version    INT PRIMARY KEY,
+  Name       VARCHAR(200) NOT NULL,
+  AppliedAt  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+INSERT INTO SchemaMigrations (Version, Name) VALUES (1, 'hot_predicate_indexes'), (2, 'telemetry'),
+  (3, 'schedule_conflicts'), (4, 'supply_forecast'),
+  (5, 'fefo_allocation'), (6, 'dashboard_summaries'),
+  (7, 'audit_table_tail');
+
+-- =========================
+-- Indexes
+-- =========================
+-- FEFO lot picking in sp_allocate_resource (migrations/0005); also serves fk_supplies_resource
+CREATE INDEX idx_supplies_resource_expiry ON Supplies(ResourceID, ExpiryDate);
+-- vw_LowStock's threshold scan and sp_rebuild_summaries (Quantity < 50)
+CREATE INDEX idx_supplies_quantity ON Supplies(Quantity);
+CREATE INDEX idx_allocations_mission ON ResourceAllocations(MissionID);
+CREATE INDEX idx_allocations_supply ON ResourceAllocations(SupplyID);
+CREATE INDEX idx_experiments_mission ON Experiments(MissionID);
+CREATE INDEX idx_anomalies_module ON Anomalies(ModuleID);
+CREATE INDEX idx_comm_mission ON Communications(MissionID);
+-- hot GUI / view predicates (migrations/0001_hot_predicate_indexes.sql for existing databases)
+CREATE INDEX idx_missions_status ON Missions(CurrentStatus, LaunchDate, MissionName);
+CREATE INDEX idx_med_astronaut_checkup ON MedicalRecords(AstronautID, CheckupDate);
+-- covers the schedule conflict check and scan (srs_schedule.py, migrations/0003)
+CREATE INDEX idx_schedules_astronaut_span ON Schedules(AstronautID, StartTime, EndTime);
+CREATE INDEX idx_anomalies_severity_date ON Anomalies(Severity, DateDetected);
+CREATE INDEX idx_comm_timestamp ON Communications(TimeStamp);
+CREATE INDEX idx_supplies_expiry ON Supplies(ExpiryDate);
+-- audit panel: time-range reads and per-table filtering without a filesort
+CREATE INDEX idx_audit_changedat ON AuditLog(ChangedAt);
+CREATE INDEX idx_audit_table_changedat ON AuditLog(TableName, ChangedAt);
+-- per-table audit tail (srs_audit.AuditTail): TableName = ? AND AuditID > ? ORDER BY AuditID
+CREATE INDEX idx_audit_table_id ON AuditLog(TableName, AuditID);
+
+-- FULLTEXT indexes for the GUI's server-side search (MATCH ... AGAINST) on text-heavy columns
+CREATE FULLTEXT INDEX ftx_comm_content ON Communications(MessageContent);
+CREATE FULLTEXT INDEX ftx_experiments_objective ON Experiments(Objective);
+CREATE FULLTEXT INDEX ftx_anomalies_description ON Anomalies(Description);
+CREATE FULLTEXT INDEX ftx_medical_treatment ON MedicalRecords(Treatment);
+
+-- =========================
+-- 4) FUNCTIONS (2)
+-- =========================
+DROP FUNCTION IF EXISTS fn_mission_duration;
+DELIMITER $$
+CREATE FUNCTION fn_mission_duration(p_missionid INT)
+RETURNS INT DETERMINISTIC
+BEGIN
+  DECLARE v_launch DATE;
+  DECLARE v_return DATE;
+  DECLARE v_days INT;
+  SELECT LaunchDate, ReturnDate INTO v_launch, v_return FROM Missions WHERE MissionID = p_missionid;
+  IF v_launch IS NULL OR v_return IS NULL THEN
+    RETURN NULL;
+  END IF;
+  SET v_days = DATEDIFF(v_return, v_launch);
+  RETURN v_days;
+END$$
+DELIMITER ;
+
+DROP FUNCTION IF EXISTS fn_remaining_supply;
+DELIMITER $$
+CREATE FUNCTION fn_remaining_supply(p_supplyid INT)
+RETURNS DECIMAL(18,3) DETERMINISTIC
+BEGIN
+  DECLARE q DECIMAL(18,3);
+  SELECT Quantity INTO q FROM Supplies WHERE SupplyID = p_supplyid;
+  RETURN IFNULL(q, 0);
+END$$
+DELIMITER ;
+
+-- =========================
+-- 5) PROCEDURES (4)
+-- =========================
+-- Allocation debits stock exactly once: trg_before_alloc_insert debits every
+-- row inserted into ResourceAllocations, whoever inserts it. The procedures
+-- below lock the plan's supply rows up front and check the stock set-based,
+-- so the trigger's own lock and check per line find the row already held.
+DROP PROCEDURE IF EXISTS sp_allocate_batch;
+DELIMITER $$
+CREATE PROCEDURE sp_allocate_batch(IN p_plan JSON)
+BEGIN
+  -- p_plan: [{"mission": 1, "supply": 2, "qty": 10.5}, ...]
+  DECLARE v_lines INT;
+  DECLARE v_supplies INT;
+  DECLARE v_locked INT;
+  DECLARE v_supply INT;
+  DECLARE v_qty DECIMAL(18,3);
+  DECLARE v_done BOOLEAN DEFAULT FALSE;
+  DECLARE v_err_msg VARCHAR(255);
+  DECLARE cur_supplies CURSOR FOR
+    SELECT DISTINCT SupplyID FROM tmp_alloc_plan ORDER BY SupplyID;
+  DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_done = TRUE;
+  DECLARE EXIT HANDLER FOR SQLEXCEPTION
+  BEGIN
+    ROLLBACK;
+    DROP TEMPORARY TABLE IF EXISTS tmp_alloc_plan;
+    RESIGNAL;
+  END;
+
+  DROP TEMPORARY TABLE IF EXISTS tmp_alloc_plan;
+  CREATE TEMPORARY TABLE tmp_alloc_plan (
+    PlanLine  INT NOT NULL,
+    MissionID INT,
+    SupplyID  INT,
+    Qty       DECIMAL(18,3),
+    KEY (SupplyID)
+  ) ENGINE=MEMORY;
+  INSERT INTO tmp_alloc_plan (PlanLine, MissionID, SupplyID, Qty)
+    SELECT j.PlanLine, j.MissionID, j.SupplyID, j.Qty
+    FROM JSON_TABLE(p_plan, '$[*]' COLUMNS (
+      PlanLine  FOR ORDINALITY,
+      MissionID INT           PATH '$.mission',
+      SupplyID  INT           PATH '$.supply',
+      Qty       DECIMAL(18,3) PATH '$.qty')) AS j;
+
+  SELECT COUNT(*), COUNT(DISTINCT SupplyID) INTO v_lines, v_supplies FROM tmp_alloc_plan;
+  IF v_lines = 0 THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Allocation plan is empty';
+  END IF;
+
+  SELECT CONCAT('Line ', MIN(PlanLine), ': needs mission, supply and a positive qty') INTO v_err_msg
+    FROM tmp_alloc_plan WHERE Qty IS NULL OR Qty <= 0 OR MissionID IS NULL OR SupplyID IS NULL
+    HAVING COUNT(*) > 0;
+  IF v_err_msg IS NOT NULL THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_err_msg;
+  END IF;
+
+  SELECT CONCAT('Mission not found: ', MIN(p.MissionID)) INTO v_err_msg
+    FROM tmp_alloc_plan p LEFT JOIN Missions m ON m.MissionID = p.MissionID
+    WHERE m.MissionID IS NULL HAVING COUNT(*) > 0;
+  IF v_err_msg IS NOT NULL THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_err_msg;
+  END IF;
+
+  START TRANSACTION;
+    -- lock every supply row once, in ascending SupplyID order: all
+    -- allocators take their locks in the same order, so batches touching
+    -- the same supplies queue up instead of deadlocking
+    SET v_locked = 0;
+    SET v_done = FALSE;
+    OPEN cur_supplies;
+    lock_loop: LOOP
+      FETCH cur_supplies INTO v_supply;
+      IF v_done THEN
+        LEAVE lock_loop;
+      END IF;
+      SET v_qty = NULL;
+      SELECT Quantity INTO v_qty FROM Supplies WHERE SupplyID = v_supply FOR UPDATE;
+      IF v_qty IS NOT NULL THEN
+        SET v_locked = v_locked + 1;
+      END IF;
+      SET v_done = FALSE;
+    END LOOP;
+    CLOSE cur_supplies;
+    IF v_locked < v_supplies THEN
+      SELECT CONCAT('Supply not found: ', MIN(p.SupplyID)) INTO v_err_msg
+        FROM tmp_alloc_plan p LEFT JOIN Supplies s ON s.SupplyID = p.SupplyID
+        WHERE s.SupplyID IS NULL;
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_err_msg;
+    END IF;
+
+    SELECT CONCAT('Insufficient stock for SupplyID ', s.SupplyID, '. Available: ', s.Quantity,
+                  ', requested: ', need.Total) INTO v_err_msg
+      FROM Supplies s
+      JOIN (SELECT SupplyID, SUM(Qty) AS Total FROM tmp_alloc_plan GROUP BY SupplyID) need
+        ON need.SupplyID = s.SupplyID
+      WHERE s.Quantity < need.Total
+      ORDER BY s.SupplyID LIMIT 1;
+    IF v_err_msg IS NOT NULL THEN
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_err_msg;
+    END IF;
+
+    -- trg_before_alloc_insert debits each line on the rows locked above
+    INSERT INTO ResourceAllocations (MissionID, SupplyID, QuantityAllocated, AllocationDate)
+      SELECT MissionID, SupplyID, Qty, NOW() FROM tmp_alloc_plan ORDER BY PlanLine;
+  COMMIT;
+  DROP TEMPORARY TABLE IF EXISTS tmp_alloc_plan;
+END$$
+DELIMITER ;
+
+DROP PROCEDURE IF EXISTS sp_allocate_supply;
+DELIMITER $$
+CREATE PROCEDURE sp_allocate_supply(
+  IN p_missionid INT,
+  IN p_supplyid INT,
+  IN p_qty DECIMAL(18,3)
+)
+BEGIN
+  -- a plan of one: same locking and stock check as the batch path
+  CALL sp_allocate_batch(JSON_ARRAY(JSON_OBJECT('mission', p_missionid, 'supply', p_supplyid, 'qty', p_qty)));
+END$$
+DELIMITER ;
+
+-- Resource-level allocation: first-expired-first-out across every usable lot
+-- of the resource, whatever module stores it. The lots are picked with a plain
+-- read along idx_supplies_resource_expiry; sp_allocate_batch then locks just
+-- those rows, in the ascending SupplyID order every allocator uses, and
+-- re-checks their stock. If another session drained a picked lot in between,
+-- the lots are picked again (up to 3 times). Returns the lines allocated.
+DROP PROCEDURE IF EXISTS sp_allocate_resource;
+DELIMITER $$
+CREATE PROCEDURE sp_allocate_resource(
+  IN p_missionid INT,
+  IN p_resourceid INT,
+  IN p_qty DECIMAL(18,3)
+)
+BEGIN
+  DECLARE v_plan JSON;
+  DECLARE v_available DECIMAL(18,3);
+  DECLARE v_attempt INT DEFAULT 0;
+  DECLARE v_done BOOLEAN DEFAULT FALSE;
+  DECLARE v_msg VARCHAR(255);
+
+  IF p_qty IS NULL OR p_qty <= 0 THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Quantity must be positive';
+  END IF;
+
+  WHILE NOT v_done DO
+    SET v_attempt = v_attempt + 1;
+    SELECT COALESCE(SUM(Quantity), 0) INTO v_available FROM Supplies
+      WHERE ResourceID = p_resourceid AND Quantity > 0 AND (ExpiryDate IS NULL OR ExpiryDate >= CURDATE());
+    IF v_available < p_qty THEN
+      SET v_msg = CONCAT('Insufficient stock for ResourceID ', p_resourceid, '. Available: ', v_available,
+                         ', requested: ', p_qty);
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_msg;
+    END IF;
+
+    -- each lot in expiry order (no expiry last) gives what is still needed after the earlier ones
+    SELECT JSON_ARRAYAGG(JSON_OBJECT('mission', p_missionid, 'supply', SupplyID,
+                                     'qty', LEAST(Quantity, p_qty - Earlier))) INTO v_plan
+      FROM (SELECT SupplyID, Quantity,
+                   COALESCE(SUM(Quantity) OVER (ORDER BY ExpiryDate IS NULL, ExpiryDate, SupplyID
+                                                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0) AS Earlier
+            FROM Supplies
+            WHERE ResourceID = p_resourceid AND Quantity > 0
+              AND (ExpiryDate IS NULL OR ExpiryDate >= CURDATE())) lots
+      WHERE Earlier < p_qty;
+
+    BEGIN
+      DECLARE EXIT HANDLER FOR SQLSTATE '45000'
+      BEGIN
+        GET DIAGNOSTICS CONDITION 1 v_msg = MESSAGE_TEXT;
+        IF v_attempt >= 3 OR v_msg NOT LIKE 'Insufficient stock%' THEN
+          RESIGNAL;
+        END IF;
+      END;
+      CALL sp_allocate_batch(v_plan);
+      SET v_done = TRUE;
+    END;
+  END WHILE;
+
+  SELECT j.SupplyID, j.Qty
+    FROM JSON_TABLE(v_plan, '$[*]' COLUMNS (SupplyID INT PATH '$.supply', Qty DECIMAL(18,3) PATH '$.qty')) AS j;
+END$$
+DELIMITER ;
+
+DROP PROCEDURE IF EXISTS sp_create_experiment;
+DELIMITER $$
+CREATE PROCEDURE sp_create_experiment(
+  IN p_missionid INT,
+  IN p_title VARCHAR(250),
+  IN p_objective TEXT,
+  IN p_category VARCHAR(80),
+  IN p_moduleid INT,
+  IN p_leadastronautid INT,
+  OUT p_expid INT
+)
+BEGIN
+  IF (SELECT COUNT(*) FROM Missions WHERE MissionID = p_missionid) = 0 THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Mission not found';
+  END IF;
+
+  INSERT INTO Experiments (MissionID, Title, Objective, Category, CurrentStatus, ModuleID, LeadAstronautID)
+    VALUES (p_missionid, p_title, p_objective, p_category, 'Planned', p_moduleid, p_leadastronautid);
+  SET p_expid = LAST_INSERT_ID();
+END$$
+DELIMITER ;
+
+DROP PROCEDURE IF EXISTS sp_rebuild_summaries;
+DELIMITER $$
+CREATE PROCEDURE sp_rebuild_summaries()
+BEGIN
+  -- full recompute of the mv_* tables; the triggers keep them current afterwards
+  DECLARE v_rows INT;
+  DECLARE EXIT HANDLER FOR SQLEXCEPTION
+  BEGIN
+    ROLLBACK;
+    RESIGNAL;
+  END;
+
+  START TRANSACTION;
+  DELETE FROM mv_ModuleAnomalies;
+  INSERT INTO mv_ModuleAnomalies (ModuleID, AnomalyCount)
+    SELECT ModuleID, COUNT(*) FROM Anomalies GROUP BY ModuleID;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_ModuleAnomalies', NOW(), v_rows);
+
+  DELETE FROM mv_AstronautHealth;
+  INSERT INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+    SELECT AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords GROUP BY AstronautID;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_AstronautHealth', NOW(), v_rows);
+
+  DELETE FROM mv_LowStock;
+  INSERT INTO mv_LowStock (SupplyID) SELECT SupplyID FROM Supplies WHERE Quantity < 50;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_LowStock', NOW(), v_rows);
+
+  DELETE FROM mv_ResourceDailyUse;
+  INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations)
+    SELECT s.ResourceID, DATE(ra.AllocationDate), SUM(ra.QuantityAllocated), COUNT(*)
+    FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID
+    WHERE ra.AllocationDate IS NOT NULL GROUP BY s.ResourceID, DATE(ra.AllocationDate);
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_ResourceDailyUse', NOW(), v_rows);
+
+  DELETE FROM mv_MissionResourceUse;
+  INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity)
+    SELECT ra.MissionID, s.ResourceID, SUM(ra.QuantityAllocated)
+    FROM ResourceAllocations ra JOIN Supplies s ON s.SupplyID = ra.SupplyID GROUP BY ra.MissionID, s.ResourceID;
+  SET v_rows = ROW_COUNT();
+  REPLACE INTO mv_RefreshLog VALUES ('mv_MissionResourceUse', NOW(), v_rows);
+  COMMIT;
+END$$
+DELIMITER ;
+
+-- =========================
+-- 6) TRIGGERS (16 + generated audit triggers)
+-- =========================
+DROP TRIGGER IF EXISTS trg_before_alloc_insert;
+DELIMITER $$
+CREATE TRIGGER trg_before_alloc_insert
+BEFORE INSERT ON ResourceAllocations
+FOR EACH ROW
+BEGIN
+  DECLARE cur_qty DECIMAL(18,3);
+  -- every insert is debited here, so ResourceAllocations never outruns stock
+  SELECT Quantity INTO cur_qty FROM Supplies WHERE SupplyID = NEW.SupplyID FOR UPDATE;
+  IF cur_qty IS NULL THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Supply not found (trigger)';
+  END IF;
+  IF cur_qty < NEW.QuantityAllocated THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Not enough supply (trigger)';
+  END IF;
+  UPDATE Supplies SET Quantity = Quantity - NEW.QuantityAllocated WHERE SupplyID = NEW.SupplyID;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_check_astronaut_dob_insert;
+DELIMITER $$
+
+CREATE TRIGGER trg_check_astronaut_dob_insert
+BEFORE INSERT ON Astronauts
+FOR EACH ROW
+BEGIN
+    IF TIMESTAMPDIFF(YEAR, NEW.DOB, CURDATE()) < 22 THEN
+        SIGNAL SQLSTATE '45000'
+            SET MESSAGE_TEXT = 'Astronaut must be at least 22 years old.';
+    END IF;
+END$$
+
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_check_astronaut_dob_update;
+DELIMITER $$
+
+CREATE TRIGGER trg_check_astronaut_dob_update
+BEFORE UPDATE ON Astronauts
+FOR EACH ROW
+BEGIN
+    IF TIMESTAMPDIFF(YEAR, NEW.DOB, CURDATE()) < 22 THEN
+        SIGNAL SQLSTATE '45000'
+            SET MESSAGE_TEXT = 'Astronaut must be at least 22 years old.';
+    END IF;
+END$$
+
+DELIMITER ;
+
+-- ---- materialized summaries (see mv_* tables) ----
+-- written by  python srs_summaries.py sql  (with sp_rebuild_summaries)
+DROP TRIGGER IF EXISTS trg_mv_anomalies_ins;
+DELIMITER $$
+CREATE TRIGGER trg_mv_anomalies_ins
+AFTER INSERT ON Anomalies
+FOR EACH ROW
+BEGIN
+  INSERT INTO mv_ModuleAnomalies (ModuleID, AnomalyCount) VALUES (NEW.ModuleID, 1)
+    ON DUPLICATE KEY UPDATE AnomalyCount = AnomalyCount + 1;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_mv_anomalies_upd;
+DELIMITER $$
+CREATE TRIGGER trg_mv_anomalies_upd
+AFTER UPDATE ON Anomalies
+FOR EACH ROW
+BEGIN
+  IF OLD.ModuleID <> NEW.ModuleID THEN
+    UPDATE mv_ModuleAnomalies SET AnomalyCount = AnomalyCount - 1 WHERE ModuleID = OLD.ModuleID;
+    INSERT INTO mv_ModuleAnomalies (ModuleID, AnomalyCount) VALUES (NEW.ModuleID, 1)
+      ON DUPLICATE KEY UPDATE AnomalyCount = AnomalyCount + 1;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_mv_anomalies_del;
+DELIMITER $$
+CREATE TRIGGER trg_mv_anomalies_del
+AFTER DELETE ON Anomalies
+FOR EACH ROW
+BEGIN
+  UPDATE mv_ModuleAnomalies SET AnomalyCount = AnomalyCount - 1 WHERE ModuleID = OLD.ModuleID;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_mv_medical_ins;
+DELIMITER $$
+CREATE TRIGGER trg_mv_medical_ins
+AFTER INSERT ON MedicalRecords
+FOR EACH ROW
+BEGIN
+  INSERT INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups) VALUES (NEW.AstronautID, NEW.CheckupDate, 1)
+    ON DUPLICATE KEY UPDATE
+      LastCheckup = IF(LastCheckup IS NULL OR NEW.CheckupDate > LastCheckup, NEW.CheckupDate, LastCheckup),
+      Checkups = Checkups + 1;
+END$$
+DELIMITER ;
+
+-- a changed or removed checkup may have been the latest one: recompute that
+-- astronaut's row (an index lookup on fk_med_astronaut, not a table scan)
+DROP TRIGGER IF EXISTS trg_mv_medical_upd;
+DELIMITER $$
+CREATE TRIGGER trg_mv_medical_upd
+AFTER UPDATE ON MedicalRecords
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.AstronautID <=> NEW.AstronautID AND OLD.CheckupDate <=> NEW.CheckupDate) THEN
+    REPLACE INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+      SELECT OLD.AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords WHERE AstronautID = OLD.AstronautID;
+    IF OLD.AstronautID <> NEW.AstronautID THEN
+      REPLACE INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+        SELECT NEW.AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords WHERE AstronautID = NEW.AstronautID;
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_mv_medical_del;
+DELIMITER $$
+CREATE TRIGGER trg_mv_medical_del
+AFTER DELETE ON MedicalRecords
+FOR EACH ROW
+BEGIN
+  REPLACE INTO mv_AstronautHealth (AstronautID, LastCheckup, Checkups)
+    SELECT OLD.AstronautID, MAX(CheckupDate), COUNT(*) FROM MedicalRecords WHERE AstronautID = OLD.AstronautID;
+END$$
+DELIMITER ;
+
+-- only crossings of the threshold touch mv_LowStock; deletes cascade via its FK
+DROP TRIGGER IF EXISTS trg_mv_supplies_ins;
+DELIMITER $$
+CREATE TRIGGER trg_mv_supplies_ins
+AFTER INSERT ON Supplies
+FOR EACH ROW
+BEGIN
+  IF NEW.Quantity < 50 THEN
+    INSERT IGNORE INTO mv_LowStock (SupplyID) VALUES (NEW.SupplyID);
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_mv_supplies_upd;
+DELIMITER $$
+CREATE TRIGGER trg_mv_supplies_upd
+AFTER UPDATE ON Supplies
+FOR EACH ROW
+BEGIN
+  IF NEW.Quantity < 50 AND NOT OLD.Quantity < 50 THEN
+    INSERT IGNORE INTO mv_LowStock (SupplyID) VALUES (NEW.SupplyID);
+  ELSEIF OLD.Quantity < 50 AND NOT NEW.Quantity < 50 THEN
+    DELETE FROM mv_LowStock WHERE SupplyID = NEW.SupplyID;
+  END IF;
+END$$
+DELIMITER ;
+
+-- ---- allocation history buckets (srs_forecast.py) ----
+-- Each allocation is added to its resource's day and its mission's total
+-- once, as it is written; written by  python srs_forecast.py sql
+DROP TRIGGER IF EXISTS trg_mv_alloc_ins;
+DELIMITER $$
+CREATE TRIGGER trg_mv_alloc_ins
+AFTER INSERT ON ResourceAllocations
+FOR EACH ROW
+BEGIN
+  DECLARE v_resource INT;
+  SET v_resource = (SELECT ResourceID FROM Supplies WHERE SupplyID = NEW.SupplyID);
+  IF v_resource IS NOT NULL THEN
+    IF NEW.AllocationDate IS NOT NULL THEN
+      INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations)
+        VALUES (v_resource, DATE(NEW.AllocationDate), NEW.QuantityAllocated, 1)
+        ON DUPLICATE KEY UPDATE Quantity = Quantity + NEW.QuantityAllocated, Allocations = Allocations + 1;
+    END IF;
+    INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity)
+      VALUES (NEW.MissionID, v_resource, NEW.QuantityAllocated)
+      ON DUPLICATE KEY UPDATE Quantity = Quantity + NEW.QuantityAllocated;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_mv_alloc_upd;
+DELIMITER $$
+CREATE TRIGGER trg_mv_alloc_upd
+AFTER UPDATE ON ResourceAllocations
+FOR EACH ROW
+BEGIN
+  DECLARE v_resource INT;
+  IF NOT (OLD.MissionID <=> NEW.MissionID AND OLD.SupplyID <=> NEW.SupplyID
+          AND OLD.QuantityAllocated <=> NEW.QuantityAllocated AND OLD.AllocationDate <=> NEW.AllocationDate) THEN
+    SET v_resource = (SELECT ResourceID FROM Supplies WHERE SupplyID = OLD.SupplyID);
+    IF v_resource IS NOT NULL THEN
+      IF OLD.AllocationDate IS NOT NULL THEN
+        INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations)
+          VALUES (v_resource, DATE(OLD.AllocationDate), -OLD.QuantityAllocated, -1)
+          ON DUPLICATE KEY UPDATE Quantity = Quantity - OLD.QuantityAllocated, Allocations = Allocations - 1;
+      END IF;
+      INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity)
+        VALUES (OLD.MissionID, v_resource, -OLD.QuantityAllocated)
+        ON DUPLICATE KEY UPDATE Quantity = Quantity - OLD.QuantityAllocated;
+    END IF;
+    SET v_resource = (SELECT ResourceID FROM Supplies WHERE SupplyID = NEW.SupplyID);
+    IF v_resource IS NOT NULL THEN
+      IF NEW.AllocationDate IS NOT NULL THEN
+        INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations)
+          VALUES (v_resource, DATE(NEW.AllocationDate), NEW.QuantityAllocated, 1)
+          ON DUPLICATE KEY UPDATE Quantity = Quantity + NEW.QuantityAllocated, Allocations = Allocations + 1;
+      END IF;
+      INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity)
+        VALUES (NEW.MissionID, v_resource, NEW.QuantityAllocated)
+        ON DUPLICATE KEY UPDATE Quantity = Quantity + NEW.QuantityAllocated;
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_mv_alloc_del;
+DELIMITER $$
+CREATE TRIGGER trg_mv_alloc_del
+AFTER DELETE ON ResourceAllocations
+FOR EACH ROW
+BEGIN
+  DECLARE v_resource INT;
+  SET v_resource = (SELECT ResourceID FROM Supplies WHERE SupplyID = OLD.SupplyID);
+  IF v_resource IS NOT NULL THEN
+    IF OLD.AllocationDate IS NOT NULL THEN
+      INSERT INTO mv_ResourceDailyUse (ResourceID, UseDate, Quantity, Allocations)
+        VALUES (v_resource, DATE(OLD.AllocationDate), -OLD.QuantityAllocated, -1)
+        ON DUPLICATE KEY UPDATE Quantity = Quantity - OLD.QuantityAllocated, Allocations = Allocations - 1;
+    END IF;
+    INSERT INTO mv_MissionResourceUse (MissionID, ResourceID, Quantity)
+      VALUES (OLD.MissionID, v_resource, -OLD.QuantityAllocated)
+      ON DUPLICATE KEY UPDATE Quantity = Quantity - OLD.QuantityAllocated;
+  END IF;
+END$$
+DELIMITER ;
+
+-- ---- schedule conflicts (srs_schedule.py) ----
+-- No astronaut booked twice at once; written by  python srs_schedule.py sql
+DROP TRIGGER IF EXISTS trg_schedule_overlap_ins;
+DELIMITER $$
+CREATE TRIGGER trg_schedule_overlap_ins
+BEFORE INSERT ON Schedules
+FOR EACH ROW
+BEGIN
+  DECLARE v_locked INT;
+  DECLARE v_clash INT;
+  DECLARE v_msg VARCHAR(255);
+  IF NEW.StartTime IS NOT NULL AND NEW.EndTime IS NOT NULL THEN
+    IF NEW.EndTime <= NEW.StartTime THEN
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Schedule must end after it starts';
+    END IF;
+    IF NEW.AstronautID IS NOT NULL THEN
+      -- serializes bookings per astronaut, so two sessions can't take the same slot
+      SELECT COUNT(*) INTO v_locked FROM Astronauts WHERE AstronautID = NEW.AstronautID FOR UPDATE;
+      SET v_clash = (SELECT ScheduleID FROM Schedules
+                     WHERE AstronautID = NEW.AstronautID AND StartTime < NEW.EndTime
+                       AND EndTime > NEW.StartTime
+                     LIMIT 1);
+      IF v_clash IS NOT NULL THEN
+        SET v_msg = CONCAT('Astronaut ', NEW.AstronautID, ' is already scheduled then (ScheduleID ', v_clash, ')');
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_msg;
+      END IF;
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_schedule_overlap_upd;
+DELIMITER $$
+CREATE TRIGGER trg_schedule_overlap_upd
+BEFORE UPDATE ON Schedules
+FOR EACH ROW
+BEGIN
+  DECLARE v_locked INT;
+  DECLARE v_clash INT;
+  DECLARE v_msg VARCHAR(255);
+  IF NOT (OLD.AstronautID <=> NEW.AstronautID AND OLD.StartTime <=> NEW.StartTime AND OLD.EndTime <=> NEW.EndTime) AND NEW.StartTime IS NOT NULL AND NEW.EndTime IS NOT NULL THEN
+    IF NEW.EndTime <= NEW.StartTime THEN
+      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Schedule must end after it starts';
+    END IF;
+    IF NEW.AstronautID IS NOT NULL THEN
+      -- serializes bookings per astronaut, so two sessions can't take the same slot
+      SELECT COUNT(*) INTO v_locked FROM Astronauts WHERE AstronautID = NEW.AstronautID FOR UPDATE;
+      SET v_clash = (SELECT ScheduleID FROM Schedules
+                     WHERE AstronautID = NEW.AstronautID AND StartTime < NEW.EndTime
+                       AND EndTime > NEW.StartTime AND ScheduleID <> NEW.ScheduleID
+                     LIMIT 1);
+      IF v_clash IS NOT NULL THEN
+        SET v_msg = CONCAT('Astronaut ', NEW.AstronautID, ' is already scheduled then (ScheduleID ', v_clash, ')');
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_msg;
+      END IF;
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+-- ---- audit triggers (generated) ----
+-- AFTER INSERT/UPDATE/DELETE on every table in TABLES_TO_SHOW, written by
+--   python srs_audit_triggers.py sql
+-- Regenerate after changing any table's columns. 'install --mode staged'
+-- swaps them to append to AuditStaging instead (see srs_audit_triggers.py).
+DROP TRIGGER IF EXISTS trg_audit_Astronauts_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Astronauts_ins
+AFTER INSERT ON `Astronauts`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Astronauts', 'INSERT', CONCAT_WS(',', CONCAT('AstronautID=', NEW.`AstronautID`)),
+            NULL,
+            JSON_OBJECT('AstronautID', NEW.`AstronautID`, 'FirstName', NEW.`FirstName`, 'LastName', NEW.`LastName`, 'DOB', NEW.`DOB`, 'Nationality', NEW.`Nationality`, 'JobTitle', NEW.`JobTitle`, 'MedicalStatus', NEW.`MedicalStatus`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Astronauts_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Astronauts_upd
+AFTER UPDATE ON `Astronauts`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`AstronautID` <=> NEW.`AstronautID` AND OLD.`FirstName` <=> NEW.`FirstName` AND OLD.`LastName` <=> NEW.`LastName` AND OLD.`DOB` <=> NEW.`DOB` AND OLD.`Nationality` <=> NEW.`Nationality` AND OLD.`JobTitle` <=> NEW.`JobTitle` AND OLD.`MedicalStatus` <=> NEW.`MedicalStatus`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Astronauts', 'UPDATE', CONCAT_WS(',', CONCAT('AstronautID=', NEW.`AstronautID`)),
+              JSON_OBJECT('AstronautID', OLD.`AstronautID`, 'FirstName', OLD.`FirstName`, 'LastName', OLD.`LastName`, 'DOB', OLD.`DOB`, 'Nationality', OLD.`Nationality`, 'JobTitle', OLD.`JobTitle`, 'MedicalStatus', OLD.`MedicalStatus`),
+              JSON_OBJECT('AstronautID', NEW.`AstronautID`, 'FirstName', NEW.`FirstName`, 'LastName', NEW.`LastName`, 'DOB', NEW.`DOB`, 'Nationality', NEW.`Nationality`, 'JobTitle', NEW.`JobTitle`, 'MedicalStatus', NEW.`MedicalStatus`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Astronauts_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Astronauts_del
+AFTER DELETE ON `Astronauts`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Astronauts', 'DELETE', CONCAT_WS(',', CONCAT('AstronautID=', OLD.`AstronautID`)),
+            JSON_OBJECT('AstronautID', OLD.`AstronautID`, 'FirstName', OLD.`FirstName`, 'LastName', OLD.`LastName`, 'DOB', OLD.`DOB`, 'Nationality', OLD.`Nationality`, 'JobTitle', OLD.`JobTitle`, 'MedicalStatus', OLD.`MedicalStatus`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_AstronautSkills_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_AstronautSkills_ins
+AFTER INSERT ON `AstronautSkills`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('AstronautSkills', 'INSERT', CONCAT_WS(',', CONCAT('AstronautID=', NEW.`AstronautID`), CONCAT('Skill=', NEW.`Skill`)),
+            NULL,
+            JSON_OBJECT('AstronautID', NEW.`AstronautID`, 'Skill', NEW.`Skill`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_AstronautSkills_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_AstronautSkills_upd
+AFTER UPDATE ON `AstronautSkills`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`AstronautID` <=> NEW.`AstronautID` AND OLD.`Skill` <=> NEW.`Skill`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('AstronautSkills', 'UPDATE', CONCAT_WS(',', CONCAT('AstronautID=', NEW.`AstronautID`), CONCAT('Skill=', NEW.`Skill`)),
+              JSON_OBJECT('AstronautID', OLD.`AstronautID`, 'Skill', OLD.`Skill`),
+              JSON_OBJECT('AstronautID', NEW.`AstronautID`, 'Skill', NEW.`Skill`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_AstronautSkills_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_AstronautSkills_del
+AFTER DELETE ON `AstronautSkills`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('AstronautSkills', 'DELETE', CONCAT_WS(',', CONCAT('AstronautID=', OLD.`AstronautID`), CONCAT('Skill=', OLD.`Skill`)),
+            JSON_OBJECT('AstronautID', OLD.`AstronautID`, 'Skill', OLD.`Skill`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Missions_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Missions_ins
+AFTER INSERT ON `Missions`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Missions', 'INSERT', CONCAT_WS(',', CONCAT('MissionID=', NEW.`MissionID`)),
+            NULL,
+            JSON_OBJECT('MissionID', NEW.`MissionID`, 'MissionName', NEW.`MissionName`, 'LaunchDate', NEW.`LaunchDate`, 'ReturnDate', NEW.`ReturnDate`, 'MissionType', NEW.`MissionType`, 'CurrentStatus', NEW.`CurrentStatus`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Missions_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Missions_upd
+AFTER UPDATE ON `Missions`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`MissionName` <=> NEW.`MissionName` AND OLD.`LaunchDate` <=> NEW.`LaunchDate` AND OLD.`ReturnDate` <=> NEW.`ReturnDate` AND OLD.`MissionType` <=> NEW.`MissionType` AND OLD.`CurrentStatus` <=> NEW.`CurrentStatus`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Missions', 'UPDATE', CONCAT_WS(',', CONCAT('MissionID=', NEW.`MissionID`)),
+              JSON_OBJECT('MissionID', OLD.`MissionID`, 'MissionName', OLD.`MissionName`, 'LaunchDate', OLD.`LaunchDate`, 'ReturnDate', OLD.`ReturnDate`, 'MissionType', OLD.`MissionType`, 'CurrentStatus', OLD.`CurrentStatus`),
+              JSON_OBJECT('MissionID', NEW.`MissionID`, 'MissionName', NEW.`MissionName`, 'LaunchDate', NEW.`LaunchDate`, 'ReturnDate', NEW.`ReturnDate`, 'MissionType', NEW.`MissionType`, 'CurrentStatus', NEW.`CurrentStatus`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Missions_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Missions_del
+AFTER DELETE ON `Missions`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Missions', 'DELETE', CONCAT_WS(',', CONCAT('MissionID=', OLD.`MissionID`)),
+            JSON_OBJECT('MissionID', OLD.`MissionID`, 'MissionName', OLD.`MissionName`, 'LaunchDate', OLD.`LaunchDate`, 'ReturnDate', OLD.`ReturnDate`, 'MissionType', OLD.`MissionType`, 'CurrentStatus', OLD.`CurrentStatus`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_StationModules_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_StationModules_ins
+AFTER INSERT ON `StationModules`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('StationModules', 'INSERT', CONCAT_WS(',', CONCAT('ModuleID=', NEW.`ModuleID`)),
+            NULL,
+            JSON_OBJECT('ModuleID', NEW.`ModuleID`, 'ModuleName', NEW.`ModuleName`, 'ModuleType', NEW.`ModuleType`, 'Capacity', NEW.`Capacity`, 'CurrentStatus', NEW.`CurrentStatus`, 'Location', NEW.`Location`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_StationModules_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_StationModules_upd
+AFTER UPDATE ON `StationModules`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`ModuleID` <=> NEW.`ModuleID` AND OLD.`ModuleName` <=> NEW.`ModuleName` AND OLD.`ModuleType` <=> NEW.`ModuleType` AND OLD.`Capacity` <=> NEW.`Capacity` AND OLD.`CurrentStatus` <=> NEW.`CurrentStatus` AND OLD.`Location` <=> NEW.`Location`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('StationModules', 'UPDATE', CONCAT_WS(',', CONCAT('ModuleID=', NEW.`ModuleID`)),
+              JSON_OBJECT('ModuleID', OLD.`ModuleID`, 'ModuleName', OLD.`ModuleName`, 'ModuleType', OLD.`ModuleType`, 'Capacity', OLD.`Capacity`, 'CurrentStatus', OLD.`CurrentStatus`, 'Location', OLD.`Location`),
+              JSON_OBJECT('ModuleID', NEW.`ModuleID`, 'ModuleName', NEW.`ModuleName`, 'ModuleType', NEW.`ModuleType`, 'Capacity', NEW.`Capacity`, 'CurrentStatus', NEW.`CurrentStatus`, 'Location', NEW.`Location`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_StationModules_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_StationModules_del
+AFTER DELETE ON `StationModules`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('StationModules', 'DELETE', CONCAT_WS(',', CONCAT('ModuleID=', OLD.`ModuleID`)),
+            JSON_OBJECT('ModuleID', OLD.`ModuleID`, 'ModuleName', OLD.`ModuleName`, 'ModuleType', OLD.`ModuleType`, 'Capacity', OLD.`Capacity`, 'CurrentStatus', OLD.`CurrentStatus`, 'Location', OLD.`Location`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Resources_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Resources_ins
+AFTER INSERT ON `Resources`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Resources', 'INSERT', CONCAT_WS(',', CONCAT('ResourceID=', NEW.`ResourceID`)),
+            NULL,
+            JSON_OBJECT('ResourceID', NEW.`ResourceID`, 'ResourceName', NEW.`ResourceName`, 'Unit', NEW.`Unit`, 'Description', NEW.`Description`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Resources_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Resources_upd
+AFTER UPDATE ON `Resources`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`ResourceID` <=> NEW.`ResourceID` AND OLD.`ResourceName` <=> NEW.`ResourceName` AND OLD.`Unit` <=> NEW.`Unit` AND OLD.`Description` <=> NEW.`Description`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Resources', 'UPDATE', CONCAT_WS(',', CONCAT('ResourceID=', NEW.`ResourceID`)),
+              JSON_OBJECT('ResourceID', OLD.`ResourceID`, 'ResourceName', OLD.`ResourceName`, 'Unit', OLD.`Unit`, 'Description', OLD.`Description`),
+              JSON_OBJECT('ResourceID', NEW.`ResourceID`, 'ResourceName', NEW.`ResourceName`, 'Unit', NEW.`Unit`, 'Description', NEW.`Description`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Resources_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Resources_del
+AFTER DELETE ON `Resources`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Resources', 'DELETE', CONCAT_WS(',', CONCAT('ResourceID=', OLD.`ResourceID`)),
+            JSON_OBJECT('ResourceID', OLD.`ResourceID`, 'ResourceName', OLD.`ResourceName`, 'Unit', OLD.`Unit`, 'Description', OLD.`Description`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Supplies_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Supplies_ins
+AFTER INSERT ON `Supplies`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Supplies', 'INSERT', CONCAT_WS(',', CONCAT('SupplyID=', NEW.`SupplyID`)),
+            NULL,
+            JSON_OBJECT('SupplyID', NEW.`SupplyID`, 'ResourceID', NEW.`ResourceID`, 'Quantity', NEW.`Quantity`, 'Unit', NEW.`Unit`, 'ExpiryDate', NEW.`ExpiryDate`, 'SupplierName', NEW.`SupplierName`, 'StorageModuleID', NEW.`StorageModuleID`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Supplies_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Supplies_upd
+AFTER UPDATE ON `Supplies`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`SupplyID` <=> NEW.`SupplyID` AND OLD.`ResourceID` <=> NEW.`ResourceID` AND OLD.`Quantity` <=> NEW.`Quantity` AND OLD.`Unit` <=> NEW.`Unit` AND OLD.`ExpiryDate` <=> NEW.`ExpiryDate` AND OLD.`SupplierName` <=> NEW.`SupplierName` AND OLD.`StorageModuleID` <=> NEW.`StorageModuleID`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Supplies', 'UPDATE', CONCAT_WS(',', CONCAT('SupplyID=', NEW.`SupplyID`)),
+              JSON_OBJECT('SupplyID', OLD.`SupplyID`, 'ResourceID', OLD.`ResourceID`, 'Quantity', OLD.`Quantity`, 'Unit', OLD.`Unit`, 'ExpiryDate', OLD.`ExpiryDate`, 'SupplierName', OLD.`SupplierName`, 'StorageModuleID', OLD.`StorageModuleID`),
+              JSON_OBJECT('SupplyID', NEW.`SupplyID`, 'ResourceID', NEW.`ResourceID`, 'Quantity', NEW.`Quantity`, 'Unit', NEW.`Unit`, 'ExpiryDate', NEW.`ExpiryDate`, 'SupplierName', NEW.`SupplierName`, 'StorageModuleID', NEW.`StorageModuleID`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Supplies_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Supplies_del
+AFTER DELETE ON `Supplies`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Supplies', 'DELETE', CONCAT_WS(',', CONCAT('SupplyID=', OLD.`SupplyID`)),
+            JSON_OBJECT('SupplyID', OLD.`SupplyID`, 'ResourceID', OLD.`ResourceID`, 'Quantity', OLD.`Quantity`, 'Unit', OLD.`Unit`, 'ExpiryDate', OLD.`ExpiryDate`, 'SupplierName', OLD.`SupplierName`, 'StorageModuleID', OLD.`StorageModuleID`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_LifeSupportSystems_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_LifeSupportSystems_ins
+AFTER INSERT ON `LifeSupportSystems`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('LifeSupportSystems', 'INSERT', CONCAT_WS(',', CONCAT('SystemID=', NEW.`SystemID`)),
+            NULL,
+            JSON_OBJECT('SystemID', NEW.`SystemID`, 'ModuleID', NEW.`ModuleID`, 'SystemType', NEW.`SystemType`, 'OxygenLevel', NEW.`OxygenLevel`, 'Pressure', NEW.`Pressure`, 'Temperature', NEW.`Temperature`, 'CO2Level', NEW.`CO2Level`, 'CurrentStatus', NEW.`CurrentStatus`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_LifeSupportSystems_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_LifeSupportSystems_upd
+AFTER UPDATE ON `LifeSupportSystems`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`SystemID` <=> NEW.`SystemID` AND OLD.`ModuleID` <=> NEW.`ModuleID` AND OLD.`SystemType` <=> NEW.`SystemType` AND OLD.`OxygenLevel` <=> NEW.`OxygenLevel` AND OLD.`Pressure` <=> NEW.`Pressure` AND OLD.`Temperature` <=> NEW.`Temperature` AND OLD.`CO2Level` <=> NEW.`CO2Level` AND OLD.`CurrentStatus` <=> NEW.`CurrentStatus`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('LifeSupportSystems', 'UPDATE', CONCAT_WS(',', CONCAT('SystemID=', NEW.`SystemID`)),
+              JSON_OBJECT('SystemID', OLD.`SystemID`, 'ModuleID', OLD.`ModuleID`, 'SystemType', OLD.`SystemType`, 'OxygenLevel', OLD.`OxygenLevel`, 'Pressure', OLD.`Pressure`, 'Temperature', OLD.`Temperature`, 'CO2Level', OLD.`CO2Level`, 'CurrentStatus', OLD.`CurrentStatus`),
+              JSON_OBJECT('SystemID', NEW.`SystemID`, 'ModuleID', NEW.`ModuleID`, 'SystemType', NEW.`SystemType`, 'OxygenLevel', NEW.`OxygenLevel`, 'Pressure', NEW.`Pressure`, 'Temperature', NEW.`Temperature`, 'CO2Level', NEW.`CO2Level`, 'CurrentStatus', NEW.`CurrentStatus`));
+  END IF;
+END$$
+DELIMITER ;
 
--- =========================
--- 4) FUNCTIONS (2)
--- =========================
-DROP FUNCTION IF EXISTS fn_mission_duration;
+DROP TRIGGER IF EXISTS trg_audit_LifeSupportSystems_del;
 DELIMITER $$
-CREATE FUNCTION fn_mission_duration(p_missionid INT)
-RETURNS INT DETERMINISTIC
+CREATE TRIGGER trg_audit_LifeSupportSystems_del
+AFTER DELETE ON `LifeSupportSystems`
+FOR EACH ROW
 BEGIN
-  DECLARE v_launch DATE;
-  DECLARE v_return DATE;
-  DECLARE v_days INT;
-  SELECT LaunchDate, ReturnDate INTO v_launch, v_return FROM Missions WHERE MissionID = p_missionid;
-  IF v_launch IS NULL OR v_return IS NULL THEN
-    RETURN NULL;
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('LifeSupportSystems', 'DELETE', CONCAT_WS(',', CONCAT('SystemID=', OLD.`SystemID`)),
+            JSON_OBJECT('SystemID', OLD.`SystemID`, 'ModuleID', OLD.`ModuleID`, 'SystemType', OLD.`SystemType`, 'OxygenLevel', OLD.`OxygenLevel`, 'Pressure', OLD.`Pressure`, 'Temperature', OLD.`Temperature`, 'CO2Level', OLD.`CO2Level`, 'CurrentStatus', OLD.`CurrentStatus`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Spacecrafts_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Spacecrafts_ins
+AFTER INSERT ON `Spacecrafts`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Spacecrafts', 'INSERT', CONCAT_WS(',', CONCAT('SpacecraftID=', NEW.`SpacecraftID`)),
+            NULL,
+            JSON_OBJECT('SpacecraftID', NEW.`SpacecraftID`, 'Name', NEW.`Name`, 'SystemType', NEW.`SystemType`, 'CrewCapacity', NEW.`CrewCapacity`, 'CargoCapacity', NEW.`CargoCapacity`, 'LaunchDate', NEW.`LaunchDate`, 'CurrentStatus', NEW.`CurrentStatus`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Spacecrafts_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Spacecrafts_upd
+AFTER UPDATE ON `Spacecrafts`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`SpacecraftID` <=> NEW.`SpacecraftID` AND OLD.`Name` <=> NEW.`Name` AND OLD.`SystemType` <=> NEW.`SystemType` AND OLD.`CrewCapacity` <=> NEW.`CrewCapacity` AND OLD.`CargoCapacity` <=> NEW.`CargoCapacity` AND OLD.`LaunchDate` <=> NEW.`LaunchDate` AND OLD.`CurrentStatus` <=> NEW.`CurrentStatus`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Spacecrafts', 'UPDATE', CONCAT_WS(',', CONCAT('SpacecraftID=', NEW.`SpacecraftID`)),
+              JSON_OBJECT('SpacecraftID', OLD.`SpacecraftID`, 'Name', OLD.`Name`, 'SystemType', OLD.`SystemType`, 'CrewCapacity', OLD.`CrewCapacity`, 'CargoCapacity', OLD.`CargoCapacity`, 'LaunchDate', OLD.`LaunchDate`, 'CurrentStatus', OLD.`CurrentStatus`),
+              JSON_OBJECT('SpacecraftID', NEW.`SpacecraftID`, 'Name', NEW.`Name`, 'SystemType', NEW.`SystemType`, 'CrewCapacity', NEW.`CrewCapacity`, 'CargoCapacity', NEW.`CargoCapacity`, 'LaunchDate', NEW.`LaunchDate`, 'CurrentStatus', NEW.`CurrentStatus`));
   END IF;
-  SET v_days = DATEDIFF(v_return, v_launch);
-  RETURN v_days;
 END$$
 DELIMITER ;
 
-DROP FUNCTION IF EXISTS fn_remaining_supply;
+DROP TRIGGER IF EXISTS trg_audit_Spacecrafts_del;
 DELIMITER $$
-CREATE FUNCTION fn_remaining_supply(p_supplyid INT)
-RETURNS DECIMAL(18,3) DETERMINISTIC
+CREATE TRIGGER trg_audit_Spacecrafts_del
+AFTER DELETE ON `Spacecrafts`
+FOR EACH ROW
 BEGIN
-  DECLARE q DECIMAL(18,3);
-  SELECT Quantity INTO q FROM Supplies WHERE SupplyID = p_supplyid;
-  RETURN IFNULL(q, 0);
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Spacecrafts', 'DELETE', CONCAT_WS(',', CONCAT('SpacecraftID=', OLD.`SpacecraftID`)),
+            JSON_OBJECT('SpacecraftID', OLD.`SpacecraftID`, 'Name', OLD.`Name`, 'SystemType', OLD.`SystemType`, 'CrewCapacity', OLD.`CrewCapacity`, 'CargoCapacity', OLD.`CargoCapacity`, 'LaunchDate', OLD.`LaunchDate`, 'CurrentStatus', OLD.`CurrentStatus`),
+            NULL);
 END$$
 DELIMITER ;
 
--- =========================
--- 5) PROCEDURES (2)
--- =========================
-DROP PROCEDURE IF EXISTS sp_allocate_supply;
+DROP TRIGGER IF EXISTS trg_audit_Experiments_ins;
 DELIMITER $$
-CREATE PROCEDURE sp_allocate_supply(
-  IN p_missionid INT,
-  IN p_supplyid INT,
-  IN p_qty DECIMAL(18,3)
-)
+CREATE TRIGGER trg_audit_Experiments_ins
+AFTER INSERT ON `Experiments`
+FOR EACH ROW
 BEGIN
-  DECLARE cur_qty DECIMAL(18,3);
-  DECLARE v_err_msg VARCHAR(255);
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Experiments', 'INSERT', CONCAT_WS(',', CONCAT('ExperimentID=', NEW.`ExperimentID`)),
+            NULL,
+            JSON_OBJECT('ExperimentID', NEW.`ExperimentID`, 'MissionID', NEW.`MissionID`, 'Title', NEW.`Title`, 'Objective', NEW.`Objective`, 'Category', NEW.`Category`, 'CurrentStatus', NEW.`CurrentStatus`, 'ModuleID', NEW.`ModuleID`, 'LeadAstronautID', NEW.`LeadAstronautID`));
+END$$
+DELIMITER ;
 
-  IF p_qty <= 0 THEN
-    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Quantity must be positive';
+DROP TRIGGER IF EXISTS trg_audit_Experiments_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Experiments_upd
+AFTER UPDATE ON `Experiments`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`ExperimentID` <=> NEW.`ExperimentID` AND OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`Title` <=> NEW.`Title` AND OLD.`Objective` <=> NEW.`Objective` AND OLD.`Category` <=> NEW.`Category` AND OLD.`CurrentStatus` <=> NEW.`CurrentStatus` AND OLD.`ModuleID` <=> NEW.`ModuleID` AND OLD.`LeadAstronautID` <=> NEW.`LeadAstronautID`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Experiments', 'UPDATE', CONCAT_WS(',', CONCAT('ExperimentID=', NEW.`ExperimentID`)),
+              JSON_OBJECT('ExperimentID', OLD.`ExperimentID`, 'MissionID', OLD.`MissionID`, 'Title', OLD.`Title`, 'Objective', OLD.`Objective`, 'Category', OLD.`Category`, 'CurrentStatus', OLD.`CurrentStatus`, 'ModuleID', OLD.`ModuleID`, 'LeadAstronautID', OLD.`LeadAstronautID`),
+              JSON_OBJECT('ExperimentID', NEW.`ExperimentID`, 'MissionID', NEW.`MissionID`, 'Title', NEW.`Title`, 'Objective', NEW.`Objective`, 'Category', NEW.`Category`, 'CurrentStatus', NEW.`CurrentStatus`, 'ModuleID', NEW.`ModuleID`, 'LeadAstronautID', NEW.`LeadAstronautID`));
   END IF;
+END$$
+DELIMITER ;
 
-  IF (SELECT COUNT(*) FROM Missions WHERE MissionID = p_missionid) = 0 THEN
-    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Mission not found';
+DROP TRIGGER IF EXISTS trg_audit_Experiments_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Experiments_del
+AFTER DELETE ON `Experiments`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Experiments', 'DELETE', CONCAT_WS(',', CONCAT('ExperimentID=', OLD.`ExperimentID`)),
+            JSON_OBJECT('ExperimentID', OLD.`ExperimentID`, 'MissionID', OLD.`MissionID`, 'Title', OLD.`Title`, 'Objective', OLD.`Objective`, 'Category', OLD.`Category`, 'CurrentStatus', OLD.`CurrentStatus`, 'ModuleID', OLD.`ModuleID`, 'LeadAstronautID', OLD.`LeadAstronautID`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Schedules_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Schedules_ins
+AFTER INSERT ON `Schedules`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Schedules', 'INSERT', CONCAT_WS(',', CONCAT('ScheduleID=', NEW.`ScheduleID`)),
+            NULL,
+            JSON_OBJECT('ScheduleID', NEW.`ScheduleID`, 'MissionID', NEW.`MissionID`, 'TaskDescription', NEW.`TaskDescription`, 'TaskType', NEW.`TaskType`, 'StartTime', NEW.`StartTime`, 'EndTime', NEW.`EndTime`, 'AstronautID', NEW.`AstronautID`, 'CurrentStatus', NEW.`CurrentStatus`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Schedules_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Schedules_upd
+AFTER UPDATE ON `Schedules`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`ScheduleID` <=> NEW.`ScheduleID` AND OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`TaskDescription` <=> NEW.`TaskDescription` AND OLD.`TaskType` <=> NEW.`TaskType` AND OLD.`StartTime` <=> NEW.`StartTime` AND OLD.`EndTime` <=> NEW.`EndTime` AND OLD.`AstronautID` <=> NEW.`AstronautID` AND OLD.`CurrentStatus` <=> NEW.`CurrentStatus`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Schedules', 'UPDATE', CONCAT_WS(',', CONCAT('ScheduleID=', NEW.`ScheduleID`)),
+              JSON_OBJECT('ScheduleID', OLD.`ScheduleID`, 'MissionID', OLD.`MissionID`, 'TaskDescription', OLD.`TaskDescription`, 'TaskType', OLD.`TaskType`, 'StartTime', OLD.`StartTime`, 'EndTime', OLD.`EndTime`, 'AstronautID', OLD.`AstronautID`, 'CurrentStatus', OLD.`CurrentStatus`),
+              JSON_OBJECT('ScheduleID', NEW.`ScheduleID`, 'MissionID', NEW.`MissionID`, 'TaskDescription', NEW.`TaskDescription`, 'TaskType', NEW.`TaskType`, 'StartTime', NEW.`StartTime`, 'EndTime', NEW.`EndTime`, 'AstronautID', NEW.`AstronautID`, 'CurrentStatus', NEW.`CurrentStatus`));
   END IF;
+END$$
+DELIMITER ;
 
-  START TRANSACTION;
-    SELECT Quantity INTO cur_qty FROM Supplies WHERE SupplyID = p_supplyid FOR UPDATE;
-    IF cur_qty IS NULL THEN
-      ROLLBACK;
-      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Supply not found';
-    END IF;
-    IF cur_qty < p_qty THEN
-      SET v_err_msg = CONCAT('Insufficient stock. Available: ', cur_qty);
-      ROLLBACK;
-      SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_err_msg;
-    END IF;
+DROP TRIGGER IF EXISTS trg_audit_Schedules_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Schedules_del
+AFTER DELETE ON `Schedules`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Schedules', 'DELETE', CONCAT_WS(',', CONCAT('ScheduleID=', OLD.`ScheduleID`)),
+            JSON_OBJECT('ScheduleID', OLD.`ScheduleID`, 'MissionID', OLD.`MissionID`, 'TaskDescription', OLD.`TaskDescription`, 'TaskType', OLD.`TaskType`, 'StartTime', OLD.`StartTime`, 'EndTime', OLD.`EndTime`, 'AstronautID', OLD.`AstronautID`, 'CurrentStatus', OLD.`CurrentStatus`),
+            NULL);
+END$$
+DELIMITER ;
 
-    UPDATE Supplies SET Quantity = Quantity - p_qty WHERE SupplyID = p_supplyid;
-    INSERT INTO ResourceAllocations (MissionID, SupplyID, QuantityAllocated, AllocationDate)
-      VALUES (p_missionid, p_supplyid, p_qty, NOW());
-  COMMIT;
+DROP TRIGGER IF EXISTS trg_audit_MedicalRecords_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_MedicalRecords_ins
+AFTER INSERT ON `MedicalRecords`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('MedicalRecords', 'INSERT', CONCAT_WS(',', CONCAT('RecordID=', NEW.`RecordID`)),
+            NULL,
+            JSON_OBJECT('RecordID', NEW.`RecordID`, 'AstronautID', NEW.`AstronautID`, 'CheckupDate', NEW.`CheckupDate`, 'HealthCondition', NEW.`HealthCondition`, 'Treatment', NEW.`Treatment`, 'DoctorID', NEW.`DoctorID`));
 END$$
 DELIMITER ;
 
-DROP PROCEDURE IF EXISTS sp_create_experiment;
+DROP TRIGGER IF EXISTS trg_audit_MedicalRecords_upd;
 DELIMITER $$
-CREATE PROCEDURE sp_create_experiment(
-  IN p_missionid INT,
-  IN p_title VARCHAR(250),
-  IN p_objective TEXT,
-  IN p_category VARCHAR(80),
-  IN p_moduleid INT,
-  IN p_leadastronautid INT,
-  OUT p_expid INT
-)
+CREATE TRIGGER trg_audit_MedicalRecords_upd
+AFTER UPDATE ON `MedicalRecords`
+FOR EACH ROW
 BEGIN
-  IF (SELECT COUNT(*) FROM Missions WHERE MissionID = p_missionid) = 0 THEN
-    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Mission not found';
+  IF NOT (OLD.`RecordID` <=> NEW.`RecordID` AND OLD.`AstronautID` <=> NEW.`AstronautID` AND OLD.`CheckupDate` <=> NEW.`CheckupDate` AND OLD.`HealthCondition` <=> NEW.`HealthCondition` AND OLD.`Treatment` <=> NEW.`Treatment` AND OLD.`DoctorID` <=> NEW.`DoctorID`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('MedicalRecords', 'UPDATE', CONCAT_WS(',', CONCAT('RecordID=', NEW.`RecordID`)),
+              JSON_OBJECT('RecordID', OLD.`RecordID`, 'AstronautID', OLD.`AstronautID`, 'CheckupDate', OLD.`CheckupDate`, 'HealthCondition', OLD.`HealthCondition`, 'Treatment', OLD.`Treatment`, 'DoctorID', OLD.`DoctorID`),
+              JSON_OBJECT('RecordID', NEW.`RecordID`, 'AstronautID', NEW.`AstronautID`, 'CheckupDate', NEW.`CheckupDate`, 'HealthCondition', NEW.`HealthCondition`, 'Treatment', NEW.`Treatment`, 'DoctorID', NEW.`DoctorID`));
   END IF;
+END$$
+DELIMITER ;
 
-  INSERT INTO Experiments (MissionID, Title, Objective, Category, CurrentStatus, ModuleID, LeadAstronautID)
-    VALUES (p_missionid, p_title, p_objective, p_category, 'Planned', p_moduleid, p_leadastronautid);
-  SET p_expid = LAST_INSERT_ID();
+DROP TRIGGER IF EXISTS trg_audit_MedicalRecords_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_MedicalRecords_del
+AFTER DELETE ON `MedicalRecords`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('MedicalRecords', 'DELETE', CONCAT_WS(',', CONCAT('RecordID=', OLD.`RecordID`)),
+            JSON_OBJECT('RecordID', OLD.`RecordID`, 'AstronautID', OLD.`AstronautID`, 'CheckupDate', OLD.`CheckupDate`, 'HealthCondition', OLD.`HealthCondition`, 'Treatment', OLD.`Treatment`, 'DoctorID', OLD.`DoctorID`),
+            NULL);
 END$$
 DELIMITER ;
 
--- =========================
--- 6) TRIGGERS (2)
--- =========================
-DROP TRIGGER IF EXISTS trg_audit_supplies_after;
+DROP TRIGGER IF EXISTS trg_audit_ResourceAllocations_ins;
 DELIMITER $$
-CREATE TRIGGER trg_audit_supplies_after
-AFTER INSERT ON Supplies
+CREATE TRIGGER trg_audit_ResourceAllocations_ins
+AFTER INSERT ON `ResourceAllocations`
 FOR EACH ROW
 BEGIN
-  INSERT INTO AuditLog (TableName, Operation, KeyData, NewRow)
-    VALUES ('Supplies', 'INSERT', CONCAT('SupplyID=', NEW.SupplyID), JSON_OBJECT('SupplyID', NEW.SupplyID, 'ResourceID', NEW.ResourceID, 'Quantity', NEW.Quantity));
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('ResourceAllocations', 'INSERT', CONCAT_WS(',', CONCAT('AllocationID=', NEW.`AllocationID`)),
+            NULL,
+            JSON_OBJECT('AllocationID', NEW.`AllocationID`, 'MissionID', NEW.`MissionID`, 'SupplyID', NEW.`SupplyID`, 'QuantityAllocated', NEW.`QuantityAllocated`, 'AllocationDate', NEW.`AllocationDate`));
 END$$
 DELIMITER ;
 
-DROP TRIGGER IF EXISTS trg_before_alloc_insert;
+DROP TRIGGER IF EXISTS trg_audit_ResourceAllocations_upd;
 DELIMITER $$
-CREATE TRIGGER trg_before_alloc_insert
-BEFORE INSERT ON ResourceAllocations
+CREATE TRIGGER trg_audit_ResourceAllocations_upd
+AFTER UPDATE ON `ResourceAllocations`
 FOR EACH ROW
 BEGIN
-  DECLARE cur_qty DECIMAL(18,3);
-  SELECT Quantity INTO cur_qty FROM Supplies WHERE SupplyID = NEW.SupplyID FOR UPDATE;
-  IF cur_qty IS NULL THEN
-    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Supply not found (trigger)';
+  IF NOT (OLD.`AllocationID` <=> NEW.`AllocationID` AND OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`SupplyID` <=> NEW.`SupplyID` AND OLD.`QuantityAllocated` <=> NEW.`QuantityAllocated` AND OLD.`AllocationDate` <=> NEW.`AllocationDate`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('ResourceAllocations', 'UPDATE', CONCAT_WS(',', CONCAT('AllocationID=', NEW.`AllocationID`)),
+              JSON_OBJECT('AllocationID', OLD.`AllocationID`, 'MissionID', OLD.`MissionID`, 'SupplyID', OLD.`SupplyID`, 'QuantityAllocated', OLD.`QuantityAllocated`, 'AllocationDate', OLD.`AllocationDate`),
+              JSON_OBJECT('AllocationID', NEW.`AllocationID`, 'MissionID', NEW.`MissionID`, 'SupplyID', NEW.`SupplyID`, 'QuantityAllocated', NEW.`QuantityAllocated`, 'AllocationDate', NEW.`AllocationDate`));
   END IF;
-  IF cur_qty < NEW.QuantityAllocated THEN
-    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Not enough supply (trigger)';
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_ResourceAllocations_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_ResourceAllocations_del
+AFTER DELETE ON `ResourceAllocations`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('ResourceAllocations', 'DELETE', CONCAT_WS(',', CONCAT('AllocationID=', OLD.`AllocationID`)),
+            JSON_OBJECT('AllocationID', OLD.`AllocationID`, 'MissionID', OLD.`MissionID`, 'SupplyID', OLD.`SupplyID`, 'QuantityAllocated', OLD.`QuantityAllocated`, 'AllocationDate', OLD.`AllocationDate`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Communications_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Communications_ins
+AFTER INSERT ON `Communications`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Communications', 'INSERT', CONCAT_WS(',', CONCAT('CommID=', NEW.`CommID`)),
+            NULL,
+            JSON_OBJECT('CommID', NEW.`CommID`, 'MissionID', NEW.`MissionID`, 'AstronautID', NEW.`AstronautID`, 'MessageType', NEW.`MessageType`, 'TimeStamp', NEW.`TimeStamp`, 'MessageContent', NEW.`MessageContent`, 'Recipient', NEW.`Recipient`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Communications_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Communications_upd
+AFTER UPDATE ON `Communications`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`CommID` <=> NEW.`CommID` AND OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`AstronautID` <=> NEW.`AstronautID` AND OLD.`MessageType` <=> NEW.`MessageType` AND OLD.`TimeStamp` <=> NEW.`TimeStamp` AND OLD.`MessageContent` <=> NEW.`MessageContent` AND OLD.`Recipient` <=> NEW.`Recipient`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Communications', 'UPDATE', CONCAT_WS(',', CONCAT('CommID=', NEW.`CommID`)),
+              JSON_OBJECT('CommID', OLD.`CommID`, 'MissionID', OLD.`MissionID`, 'AstronautID', OLD.`AstronautID`, 'MessageType', OLD.`MessageType`, 'TimeStamp', OLD.`TimeStamp`, 'MessageContent', OLD.`MessageContent`, 'Recipient', OLD.`Recipient`),
+              JSON_OBJECT('CommID', NEW.`CommID`, 'MissionID', NEW.`MissionID`, 'AstronautID', NEW.`AstronautID`, 'MessageType', NEW.`MessageType`, 'TimeStamp', NEW.`TimeStamp`, 'MessageContent', NEW.`MessageContent`, 'Recipient', NEW.`Recipient`));
   END IF;
-  -- trigger also deducts stock to keep ResourceAllocations safe if insertion proceeds
-  UPDATE Supplies SET Quantity = Quantity - NEW.QuantityAllocated WHERE SupplyID = NEW.SupplyID;
 END$$
 DELIMITER ;
 
-DROP TRIGGER IF EXISTS trg_check_astronaut_dob_insert;
+DROP TRIGGER IF EXISTS trg_audit_Communications_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Communications_del
+AFTER DELETE ON `Communications`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Communications', 'DELETE', CONCAT_WS(',', CONCAT('CommID=', OLD.`CommID`)),
+            JSON_OBJECT('CommID', OLD.`CommID`, 'MissionID', OLD.`MissionID`, 'AstronautID', OLD.`AstronautID`, 'MessageType', OLD.`MessageType`, 'TimeStamp', OLD.`TimeStamp`, 'MessageContent', OLD.`MessageContent`, 'Recipient', OLD.`Recipient`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Anomalies_ins;
 DELIMITER $$
+CREATE TRIGGER trg_audit_Anomalies_ins
+AFTER INSERT ON `Anomalies`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Anomalies', 'INSERT', CONCAT_WS(',', CONCAT('AnomalyID=', NEW.`AnomalyID`)),
+            NULL,
+            JSON_OBJECT('AnomalyID', NEW.`AnomalyID`, 'ModuleID', NEW.`ModuleID`, 'DateDetected', NEW.`DateDetected`, 'Severity', NEW.`Severity`, 'Description', NEW.`Description`, 'ResolvedByAstronautID', NEW.`ResolvedByAstronautID`, 'ResolutionDate', NEW.`ResolutionDate`));
+END$$
+DELIMITER ;
 
-CREATE TRIGGER trg_check_astronaut_dob_insert
-BEFORE INSERT ON Astronauts
+DROP TRIGGER IF EXISTS trg_audit_Anomalies_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Anomalies_upd
+AFTER UPDATE ON `Anomalies`
 FOR EACH ROW
 BEGIN
-    IF TIMESTAMPDIFF(YEAR, NEW.DOB, CURDATE()) < 22 THEN
-        SIGNAL SQLSTATE '45000'
-            SET MESSAGE_TEXT = 'Astronaut must be at least 22 years old.';
-    END IF;
+  IF NOT (OLD.`AnomalyID` <=> NEW.`AnomalyID` AND OLD.`ModuleID` <=> NEW.`ModuleID` AND OLD.`DateDetected` <=> NEW.`DateDetected` AND OLD.`Severity` <=> NEW.`Severity` AND OLD.`Description` <=> NEW.`Description` AND OLD.`ResolvedByAstronautID` <=> NEW.`ResolvedByAstronautID` AND OLD.`ResolutionDate` <=> NEW.`ResolutionDate`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Anomalies', 'UPDATE', CONCAT_WS(',', CONCAT('AnomalyID=', NEW.`AnomalyID`)),
+              JSON_OBJECT('AnomalyID', OLD.`AnomalyID`, 'ModuleID', OLD.`ModuleID`, 'DateDetected', OLD.`DateDetected`, 'Severity', OLD.`Severity`, 'Description', OLD.`Description`, 'ResolvedByAstronautID', OLD.`ResolvedByAstronautID`, 'ResolutionDate', OLD.`ResolutionDate`),
+              JSON_OBJECT('AnomalyID', NEW.`AnomalyID`, 'ModuleID', NEW.`ModuleID`, 'DateDetected', NEW.`DateDetected`, 'Severity', NEW.`Severity`, 'Description', NEW.`Description`, 'ResolvedByAstronautID', NEW.`ResolvedByAstronautID`, 'ResolutionDate', NEW.`ResolutionDate`));
+  END IF;
 END$$
+DELIMITER ;
 
+DROP TRIGGER IF EXISTS trg_audit_Anomalies_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Anomalies_del
+AFTER DELETE ON `Anomalies`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Anomalies', 'DELETE', CONCAT_WS(',', CONCAT('AnomalyID=', OLD.`AnomalyID`)),
+            JSON_OBJECT('AnomalyID', OLD.`AnomalyID`, 'ModuleID', OLD.`ModuleID`, 'DateDetected', OLD.`DateDetected`, 'Severity', OLD.`Severity`, 'Description', OLD.`Description`, 'ResolvedByAstronautID', OLD.`ResolvedByAstronautID`, 'ResolutionDate', OLD.`ResolutionDate`),
+            NULL);
+END$$
 DELIMITER ;
 
-DROP TRIGGER IF EXISTS trg_check_astronaut_dob_update;
+DROP TRIGGER IF EXISTS trg_audit_Astronaut_Missions_ins;
 DELIMITER $$
+CREATE TRIGGER trg_audit_Astronaut_Missions_ins
+AFTER INSERT ON `Astronaut_Missions`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Astronaut_Missions', 'INSERT', CONCAT_WS(',', CONCAT('AstronautID=', NEW.`AstronautID`), CONCAT('MissionID=', NEW.`MissionID`)),
+            NULL,
+            JSON_OBJECT('AstronautID', NEW.`AstronautID`, 'MissionID', NEW.`MissionID`, 'Role', NEW.`Role`, 'HoursWorked', NEW.`HoursWorked`));
+END$$
+DELIMITER ;
 
-CREATE TRIGGER trg_check_astronaut_dob_update
-BEFORE UPDATE ON Astronauts
+DROP TRIGGER IF EXISTS trg_audit_Astronaut_Missions_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Astronaut_Missions_upd
+AFTER UPDATE ON `Astronaut_Missions`
 FOR EACH ROW
 BEGIN
-    IF TIMESTAMPDIFF(YEAR, NEW.DOB, CURDATE()) < 22 THEN
-        SIGNAL SQLSTATE '45000'
-            SET MESSAGE_TEXT = 'Astronaut must be at least 22 years old.';
-    END IF;
+  IF NOT (OLD.`AstronautID` <=> NEW.`AstronautID` AND OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`Role` <=> NEW.`Role` AND OLD.`HoursWorked` <=> NEW.`HoursWorked`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Astronaut_Missions', 'UPDATE', CONCAT_WS(',', CONCAT('AstronautID=', NEW.`AstronautID`), CONCAT('MissionID=', NEW.`MissionID`)),
+              JSON_OBJECT('AstronautID', OLD.`AstronautID`, 'MissionID', OLD.`MissionID`, 'Role', OLD.`Role`, 'HoursWorked', OLD.`HoursWorked`),
+              JSON_OBJECT('AstronautID', NEW.`AstronautID`, 'MissionID', NEW.`MissionID`, 'Role', NEW.`Role`, 'HoursWorked', NEW.`HoursWorked`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Astronaut_Missions_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Astronaut_Missions_del
+AFTER DELETE ON `Astronaut_Missions`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Astronaut_Missions', 'DELETE', CONCAT_WS(',', CONCAT('AstronautID=', OLD.`AstronautID`), CONCAT('MissionID=', OLD.`MissionID`)),
+            JSON_OBJECT('AstronautID', OLD.`AstronautID`, 'MissionID', OLD.`MissionID`, 'Role', OLD.`Role`, 'HoursWorked', OLD.`HoursWorked`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Mission_Spacecraft_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Mission_Spacecraft_ins
+AFTER INSERT ON `Mission_Spacecraft`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Mission_Spacecraft', 'INSERT', CONCAT_WS(',', CONCAT('MissionID=', NEW.`MissionID`), CONCAT('SpacecraftID=', NEW.`SpacecraftID`)),
+            NULL,
+            JSON_OBJECT('MissionID', NEW.`MissionID`, 'SpacecraftID', NEW.`SpacecraftID`, 'AssignmentDate', NEW.`AssignmentDate`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Mission_Spacecraft_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Mission_Spacecraft_upd
+AFTER UPDATE ON `Mission_Spacecraft`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`SpacecraftID` <=> NEW.`SpacecraftID` AND OLD.`AssignmentDate` <=> NEW.`AssignmentDate`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Mission_Spacecraft', 'UPDATE', CONCAT_WS(',', CONCAT('MissionID=', NEW.`MissionID`), CONCAT('SpacecraftID=', NEW.`SpacecraftID`)),
+              JSON_OBJECT('MissionID', OLD.`MissionID`, 'SpacecraftID', OLD.`SpacecraftID`, 'AssignmentDate', OLD.`AssignmentDate`),
+              JSON_OBJECT('MissionID', NEW.`MissionID`, 'SpacecraftID', NEW.`SpacecraftID`, 'AssignmentDate', NEW.`AssignmentDate`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Mission_Spacecraft_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Mission_Spacecraft_del
+AFTER DELETE ON `Mission_Spacecraft`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Mission_Spacecraft', 'DELETE', CONCAT_WS(',', CONCAT('MissionID=', OLD.`MissionID`), CONCAT('SpacecraftID=', OLD.`SpacecraftID`)),
+            JSON_OBJECT('MissionID', OLD.`MissionID`, 'SpacecraftID', OLD.`SpacecraftID`, 'AssignmentDate', OLD.`AssignmentDate`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Mission_Modules_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Mission_Modules_ins
+AFTER INSERT ON `Mission_Modules`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Mission_Modules', 'INSERT', CONCAT_WS(',', CONCAT('MissionID=', NEW.`MissionID`), CONCAT('ModuleID=', NEW.`ModuleID`)),
+            NULL,
+            JSON_OBJECT('MissionID', NEW.`MissionID`, 'ModuleID', NEW.`ModuleID`, 'AssignmentDate', NEW.`AssignmentDate`));
 END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Mission_Modules_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Mission_Modules_upd
+AFTER UPDATE ON `Mission_Modules`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`MissionID` <=> NEW.`MissionID` AND OLD.`ModuleID` <=> NEW.`ModuleID` AND OLD.`AssignmentDate` <=> NEW.`AssignmentDate`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Mission_Modules', 'UPDATE', CONCAT_WS(',', CONCAT('MissionID=', NEW.`MissionID`), CONCAT('ModuleID=', NEW.`ModuleID`)),
+              JSON_OBJECT('MissionID', OLD.`MissionID`, 'ModuleID', OLD.`ModuleID`, 'AssignmentDate', OLD.`AssignmentDate`),
+              JSON_OBJECT('MissionID', NEW.`MissionID`, 'ModuleID', NEW.`ModuleID`, 'AssignmentDate', NEW.`AssignmentDate`));
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Mission_Modules_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Mission_Modules_del
+AFTER DELETE ON `Mission_Modules`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Mission_Modules', 'DELETE', CONCAT_WS(',', CONCAT('MissionID=', OLD.`MissionID`), CONCAT('ModuleID=', OLD.`ModuleID`)),
+            JSON_OBJECT('MissionID', OLD.`MissionID`, 'ModuleID', OLD.`ModuleID`, 'AssignmentDate', OLD.`AssignmentDate`),
+            NULL);
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Experiment_Astronauts_ins;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Experiment_Astronauts_ins
+AFTER INSERT ON `Experiment_Astronauts`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Experiment_Astronauts', 'INSERT', CONCAT_WS(',', CONCAT('ExperimentID=', NEW.`ExperimentID`), CONCAT('AstronautID=', NEW.`AstronautID`)),
+            NULL,
+            JSON_OBJECT('ExperimentID', NEW.`ExperimentID`, 'AstronautID', NEW.`AstronautID`, 'Role', NEW.`Role`));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_audit_Experiment_Astronauts_upd;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Experiment_Astronauts_upd
+AFTER UPDATE ON `Experiment_Astronauts`
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.`ExperimentID` <=> NEW.`ExperimentID` AND OLD.`AstronautID` <=> NEW.`AstronautID` AND OLD.`Role` <=> NEW.`Role`) THEN
+    INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+      VALUES ('Experiment_Astronauts', 'UPDATE', CONCAT_WS(',', CONCAT('ExperimentID=', NEW.`ExperimentID`), CONCAT('AstronautID=', NEW.`AstronautID`)),
+              JSON_OBJECT('ExperimentID', OLD.`ExperimentID`, 'AstronautID', OLD.`AstronautID`, 'Role', OLD.`Role`),
+              JSON_OBJECT('ExperimentID', NEW.`ExperimentID`, 'AstronautID', NEW.`AstronautID`, 'Role', NEW.`Role`));
+  END IF;
+END$$
+DELIMITER ;
 
+DROP TRIGGER IF EXISTS trg_audit_Experiment_Astronauts_del;
+DELIMITER $$
+CREATE TRIGGER trg_audit_Experiment_Astronauts_del
+AFTER DELETE ON `Experiment_Astronauts`
+FOR EACH ROW
+BEGIN
+  INSERT INTO AuditLog (TableName, Operation, KeyData, OldRow, NewRow)
+    VALUES ('Experiment_Astronauts', 'DELETE', CONCAT_WS(',', CONCAT('ExperimentID=', OLD.`ExperimentID`), CONCAT('AstronautID=', OLD.`AstronautID`)),
+            JSON_OBJECT('ExperimentID', OLD.`ExperimentID`, 'AstronautID', OLD.`AstronautID`, 'Role', OLD.`Role`),
+            NULL);
+END$$
 DELIMITER ;
 
 -- =========================
 -- 7) VIEWS
 -- =========================
+-- vw_LowStock, vw_ModuleAnomalies and vw_AstronautHealth read the mv_* summary
+-- tables (primary-key joins, no GROUP BY); the aggregate definitions live in
+-- sp_rebuild_summaries and srs_summaries.py.
 DROP VIEW IF EXISTS vw_LowStock;
 CREATE VIEW vw_LowStock AS
 SELECT s.SupplyID, r.ResourceName, s.Quantity, s.Unit, s.StorageModuleID
-FROM Supplies s JOIN Resources r ON s.ResourceID = r.ResourceID
-WHERE s.Quantity < 50;
+FROM mv_LowStock l
+JOIN Supplies s ON s.SupplyID = l.SupplyID
+JOIN Resources r ON s.ResourceID = r.ResourceID;
 
 DROP VIEW IF EXISTS vw_ActiveMissions;
 CREATE VIEW vw_ActiveMissions AS
@@ -425,18 +1821,16 @@ LEFT JOIN StationModules sm ON e.ModuleID = sm.ModuleID;
 
 DROP VIEW IF EXISTS vw_ModuleAnomalies;
 CREATE VIEW vw_ModuleAnomalies AS
-SELECT sm.ModuleID, sm.ModuleName, COUNT(a.AnomalyID) AS AnomalyCount
+SELECT sm.ModuleID, sm.ModuleName, COALESCE(mv.AnomalyCount, 0) AS AnomalyCount
 FROM StationModules sm
-LEFT JOIN Anomalies a ON a.ModuleID = sm.ModuleID
-GROUP BY sm.ModuleID, sm.ModuleName;
+LEFT JOIN mv_ModuleAnomalies mv ON mv.ModuleID = sm.ModuleID;
 
 DROP VIEW IF EXISTS vw_AstronautHealth;
 CREATE VIEW vw_AstronautHealth AS
 SELECT a.AstronautID, CONCAT(a.FirstName,' ',a.LastName) AS Name, a.MedicalStatus,
-       MAX(mr.CheckupDate) AS LastCheckup
+       mv.LastCheckup
 FROM Astronauts a
-LEFT JOIN MedicalRecords mr ON a.AstronautID = mr.AstronautID
-GROUP BY a.AstronautID, a.FirstName, a.LastName, a.MedicalStatus;
+LEFT JOIN mv_AstronautHealth mv ON mv.AstronautID = a.AstronautID;
 
 -- =========================
 -- 8) SAMPLE DATA (5 entries per core table) - insert parents first
@@ -587,6 +1981,9 @@ INSERT INTO ResourceAllocations (MissionID, SupplyID, QuantityAllocated) VALUES
 ((SELECT MissionID FROM Missions WHERE MissionName='SRS-Maint-1'), (SELECT SupplyID FROM Supplies WHERE SupplierName='OrbitalParts' LIMIT 1), 5.000),
 ((SELECT MissionID FROM Missions WHERE MissionName='Orbital-Physics'), (SELECT SupplyID FROM Supplies WHERE SupplierName='LabKitsInc' LIMIT 1), 10.000);
 
+-- the triggers already maintained the summaries row by row; stamp mv_RefreshLog
+CALL sp_rebuild_summaries();
+
 -- =========================
 -- 9) USERS & PRIVILEGES (3 users)
 -- =========================
@@ -610,6 +2007,8 @@ GRANT SELECT, INSERT, UPDATE, DELETE ON srsdb.Supplies TO 'operator_srs'@'localh
 GRANT SELECT, INSERT, UPDATE, DELETE ON srsdb.Schedules TO 'operator_srs'@'localhost';
 GRANT SELECT, INSERT, UPDATE, DELETE ON srsdb.MedicalRecords TO 'operator_srs'@'localhost';
 GRANT EXECUTE ON PROCEDURE srsdb.sp_allocate_supply TO 'operator_srs'@'localhost';
+GRANT EXECUTE ON PROCEDURE srsdb.sp_allocate_batch TO 'operator_srs'@'localhost';
+GRANT EXECUTE ON PROCEDURE srsdb.sp_allocate_resource TO 'operator_srs'@'localhost';
 GRANT EXECUTE ON PROCEDURE srsdb.sp_create_experiment TO 'operator_srs'@'localhost';
 GRANT EXECUTE ON FUNCTION srsdb.fn_mission_duration TO 'operator_srs'@'localhost';
 GRANT EXECUTE ON FUNCTION srsdb.fn_remaining_supply TO 'operator_srs'@'localhost';
@@ -620,8 +2019,30 @@ GRANT SELECT ON srsdb.vw_ActiveMissions TO 'viewer_srs'@'localhost';
 GRANT SELECT ON srsdb.vw_ExperimentSummary TO 'viewer_srs'@'localhost';
 GRANT SELECT ON srsdb.vw_ModuleAnomalies TO 'viewer_srs'@'localhost';
 GRANT SELECT ON srsdb.vw_AstronautHealth TO 'viewer_srs'@'localhost';
+-- summary freshness (srs_summaries.status) for the GUI's staleness indicator
+GRANT SELECT ON srsdb.mv_RefreshLog TO 'operator_srs'@'localhost';
+GRANT SELECT ON srsdb.mv_RefreshLog TO 'viewer_srs'@'localhost';
 GRANT SELECT ON srsdb.Astronauts TO 'viewer_srs'@'localhost';
 GRANT SELECT ON srsdb.Missions TO 'viewer_srs'@'localhost';
+-- telemetry charts (srs_telemetry.load_series); ingest runs as admin
+GRANT SELECT ON srsdb.LifeSupportReadings TO 'operator_srs'@'localhost';
+GRANT SELECT ON srsdb.LifeSupportRollups TO 'operator_srs'@'localhost';
+GRANT SELECT ON srsdb.LifeSupportReadings TO 'viewer_srs'@'localhost';
+GRANT SELECT ON srsdb.LifeSupportRollups TO 'viewer_srs'@'localhost';
+
+-- forecast: operators may recompute it (srs_forecast.refresh), viewers read it
+GRANT SELECT ON srsdb.mv_ResourceDailyUse TO 'operator_srs'@'localhost';
+GRANT SELECT ON srsdb.mv_MissionResourceUse TO 'operator_srs'@'localhost';
+GRANT SELECT, INSERT, DELETE ON srsdb.SupplyForecast TO 'operator_srs'@'localhost';
+GRANT SELECT, INSERT, DELETE ON srsdb.ReorderPlan TO 'operator_srs'@'localhost';
+GRANT SELECT, INSERT ON srsdb.ForecastRuns TO 'operator_srs'@'localhost';
+GRANT SELECT ON srsdb.Resources TO 'operator_srs'@'localhost';
+GRANT SELECT ON srsdb.ResourceAllocations TO 'operator_srs'@'localhost';
+GRANT SELECT ON srsdb.SupplyForecast TO 'viewer_srs'@'localhost';
+GRANT SELECT ON srsdb.ReorderPlan TO 'viewer_srs'@'localhost';
+GRANT SELECT ON srsdb.ForecastRuns TO 'viewer_srs'@'localhost';
+GRANT SELECT ON srsdb.Resources TO 'viewer_srs'@'localhost';
+GRANT SELECT ON srsdb.Supplies TO 'viewer_srs'@'localhost';
 
 FLUSH PRIVILEGES;
 
@@ -632,6 +2053,7 @@ FLUSH PRIVILEGES;
 -- SELECT fn_mission_duration((SELECT MissionID FROM Missions WHERE MissionName='SRS-Maint-1'));
 -- SELECT fn_remaining_supply((SELECT SupplyID FROM Supplies WHERE SupplierName='SpaceSupplyCo' LIMIT 1));
 -- CALL sp_allocate_supply((SELECT MissionID FROM Missions WHERE MissionName='SRS-Alpha'), (SELECT SupplyID FROM Supplies WHERE SupplierName='SpaceSupplyCo' LIMIT 1), 1.000);
+-- CALL sp_allocate_batch('[{"mission": 1, "supply": 1, "qty": 5}, {"mission": 2, "supply": 2, "qty": 3}]');
 -- CALL sp_create_experiment((SELECT MissionID FROM Missions WHERE MissionName='SRS-Alpha'), 'Test Exp', 'Objective', 'Test', 2, (SELECT AstronautID FROM Astronauts WHERE FirstName='Anil'), @outid); SELECT @outid;
 
 -- =========================